@@ -0,0 +1,60 @@
+"""Store a SHA-256 digest in user_session.jwt_token instead of the raw JWT
+
+Sessions are now written by services/session_recorder.py, which only keeps
+hash_session_token(token). Existing rows are rewritten to the same digest so
+the column can shrink to a fixed VARCHAR(64).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from hashlib import sha256
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == "postgresql":
+        op.execute(
+            "UPDATE user_session "
+            "SET jwt_token = encode(sha256(convert_to(jwt_token, 'UTF8')), 'hex') "
+            "WHERE length(jwt_token) <> 64"
+        )
+    else:
+        rows = bind.execute(
+            sa.text("SELECT session_id, jwt_token FROM user_session WHERE length(jwt_token) <> 64")
+        ).all()
+        for session_id, token in rows:
+            bind.execute(
+                sa.text("UPDATE user_session SET jwt_token = :digest WHERE session_id = :session_id"),
+                {"digest": sha256(token.encode("utf-8")).hexdigest(), "session_id": session_id},
+            )
+
+    with op.batch_alter_table("user_session") as batch_op:
+        batch_op.alter_column(
+            "jwt_token",
+            existing_type=sa.String(),
+            type_=sa.String(64),
+            existing_nullable=False,
+        )
+
+
+def downgrade() -> None:
+    # Digests cannot be turned back into tokens; only the column width is restored.
+    with op.batch_alter_table("user_session") as batch_op:
+        batch_op.alter_column(
+            "jwt_token",
+            existing_type=sa.String(64),
+            type_=sa.String(),
+            existing_nullable=False,
+        )
@@ -0,0 +1,79 @@
+"""Secondary indexes for the hot query predicates
+
+Covers the filters used by the dashboard stats, cleanup jobs, leaderboards,
+question listing and login/logout paths. On PostgreSQL the indexes are built
+CONCURRENTLY so the migration does not block writes on live tables.
+
+competition_leaderboard_entry.competition_id needs no extra index: it is the
+leading column of uix_competition_user (competition_id, user_id).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns, partial-index predicate)
+INDEXES = [
+    ("ix_user_account_created_at", "user_account", ["created_at"], None),
+    ("ix_user_session_created_at", "user_session", ["created_at"], None),
+    ("ix_user_session_expires_at", "user_session", ["expires_at"], None),
+    ("ix_user_session_user_active", "user_session", ["user_id"], "is_active"),
+    ("ix_base_event_dates", "base_event", ["event_start_date", "event_end_date"], None),
+    ("ix_base_event_end_date", "base_event", ["event_end_date"], None),
+    ("ix_question_instance_event_riddle", "question_instance", ["event_id", "riddle_id"], None),
+    ("ix_question_instance_frontpage", "question_instance", ["question_id"], "event_id IS NULL"),
+    ("ix_user_question_instance_user_instance", "user_question_instance", ["user_id", "question_instance_id"], None),
+    ("ix_user_question_instance_question_instance_id", "user_question_instance", ["question_instance_id"], None),
+    ("ix_submission_uqi_submitted_on", "submission", ["user_question_instance_id", "submitted_on"], None),
+    ("ix_submission_submitted_on", "submission", ["submitted_on"], None),
+]
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    if _is_postgres():
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+        with op.get_context().autocommit_block():
+            for name, table, columns, where in INDEXES:
+                op.create_index(
+                    name,
+                    table,
+                    columns,
+                    postgresql_where=sa.text(where) if where else None,
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+        return
+
+    for name, table, columns, where in INDEXES:
+        op.create_index(
+            name,
+            table,
+            columns,
+            sqlite_where=sa.text(where) if where else None,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for name, table, _, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        return
+
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,69 @@
+"""Trigram GIN indexes for the admin free-text searches
+
+The question, account, competition and algotime listings search with
+`ILIKE '%term%'` over a few text columns (see endpoints/search_utils.py).
+A pg_trgm GIN index on each column lets PostgreSQL answer those predicates
+(and the word_similarity() relevance sort) with a bitmap index scan instead of
+a sequential scan. The planner ORs the per-column indexes together.
+
+The indexes are PostgreSQL-only and therefore not declared in models/schema.py;
+on SQLite this revision is a no-op and search stays an unindexed LIKE.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column)
+TRIGRAM_INDEXES = [
+    ("ix_question_name_trgm", "question", "question_name"),
+    ("ix_question_description_trgm", "question", "question_description"),
+    ("ix_user_account_email_trgm", "user_account", "email"),
+    ("ix_user_account_first_name_trgm", "user_account", "first_name"),
+    ("ix_user_account_last_name_trgm", "user_account", "last_name"),
+    ("ix_base_event_name_trgm", "base_event", "event_name"),
+    ("ix_base_event_location_trgm", "base_event", "event_location"),
+    ("ix_algotime_series_name_trgm", "algotime_series", "algotime_series_name"),
+]
+
+
+def _is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    if not _is_postgres():
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(
+                name,
+                table,
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    if not _is_postgres():
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(TRIGRAM_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    # The pg_trgm extension is left installed; other objects may depend on it.
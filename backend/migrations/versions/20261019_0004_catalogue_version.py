@@ -0,0 +1,37 @@
+"""Catalogue version table backing the question listing ETag
+
+Every question write bumps catalogue_version('questions') in the same
+transaction, so /questions/get-all-questions can build its ETag from a cached
+counter instead of aggregating the question and question_instance tables.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    table = op.create_table(
+        "catalogue_version",
+        sa.Column("catalogue_name", sa.String(32), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.bulk_insert(table, [
+        {"catalogue_name": "questions", "version": 1, "updated_at": datetime.now(timezone.utc)},
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table("catalogue_version")
@@ -0,0 +1,62 @@
+"""Content-addressed side table for large test case payloads
+
+Test case inputs / expected outputs whose JSON encoding is larger than
+TEST_CASE_INLINE_MAX_BYTES are stored once, zlib-compressed, in
+test_case_payload keyed by their SHA-256; test_case.input_ref / output_ref
+point at them (see services/test_case_storage.py).
+
+Existing rows keep their inline JSONB and are left untouched; payloads are
+externalized as test cases are written.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REF_COLUMNS = ("input_ref", "output_ref")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "test_case_payload",
+        sa.Column("payload_hash", sa.String(64), primary_key=True),
+        sa.Column("encoding", sa.String(16), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("compressed_size", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    with op.batch_alter_table("test_case") as batch:
+        for column in REF_COLUMNS:
+            batch.add_column(sa.Column(column, sa.String(64), nullable=True))
+            batch.create_foreign_key(
+                f"fk_test_case_{column}", "test_case_payload", [column], ["payload_hash"]
+            )
+    for column in REF_COLUMNS:
+        op.create_index(
+            f"ix_test_case_{column}",
+            "test_case",
+            [column],
+            postgresql_where=sa.text(f"{column} IS NOT NULL"),
+            sqlite_where=sa.text(f"{column} IS NOT NULL"),
+        )
+
+
+def downgrade() -> None:
+    for column in REF_COLUMNS:
+        op.drop_index(f"ix_test_case_{column}", table_name="test_case")
+    with op.batch_alter_table("test_case") as batch:
+        for column in REF_COLUMNS:
+            batch.drop_constraint(f"fk_test_case_{column}", type_="foreignkey")
+            batch.drop_column(column)
+    op.drop_table("test_case_payload")
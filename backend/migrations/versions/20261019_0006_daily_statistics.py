@@ -0,0 +1,38 @@
+"""Daily statistics rollup table for the admin dashboard
+
+The dashboard charts read one row per day from daily_statistics instead of
+scanning user_account, user_session and submission. Rows are written by the
+daily statistics job (services/daily_statistics.py), which backfills the
+existing history on its first runs.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_statistics",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("new_accounts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("logins", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("competition_submissions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("algotime_submissions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("is_final", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_statistics")
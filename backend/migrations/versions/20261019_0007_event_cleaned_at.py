@@ -0,0 +1,51 @@
+"""Cleanup watermark on base_event
+
+The competition and AlgoTime cleanup jobs stamp base_event.cleaned_at once an
+ended event's question instances are purged, and only look at ended events
+without a stamp (served by the partial index ix_base_event_pending_cleanup).
+
+Ended events that already have no question instances were handled by earlier
+runs and are stamped here, so the first run after the upgrade does not
+revisit the whole history.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("base_event", sa.Column("cleaned_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute(
+        """
+        UPDATE base_event
+        SET cleaned_at = CURRENT_TIMESTAMP
+        WHERE event_end_date < CURRENT_TIMESTAMP
+          AND NOT EXISTS (
+              SELECT 1 FROM question_instance
+              WHERE question_instance.event_id = base_event.event_id
+          )
+        """
+    )
+    op.create_index(
+        "ix_base_event_pending_cleanup",
+        "base_event",
+        ["event_end_date"],
+        postgresql_where=sa.text("cleaned_at IS NULL"),
+        sqlite_where=sa.text("cleaned_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_base_event_pending_cleanup", table_name="base_event")
+    op.drop_column("base_event", "cleaned_at")
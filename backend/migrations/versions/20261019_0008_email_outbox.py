@@ -0,0 +1,57 @@
+"""Email outbox for scheduled competition emails
+
+The email scheduler no longer sends a due reminder directly: it queues one
+email_outbox row per recipient, in the same transaction that clears the
+reminder time, and a worker sends the pending rows with per-recipient retry
+(services/email_outbox.py). The unique (email_id, recipient, kind)
+constraint makes queueing idempotent; the partial index serves the worker's
+"pending and due" scan.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "email_outbox",
+        sa.Column("outbox_id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "email_id",
+            sa.Integer(),
+            sa.ForeignKey("competition_email.email_id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("recipient", sa.String(), nullable=False),
+        sa.Column("kind", sa.String(16), nullable=False),
+        sa.Column("status", sa.String(16), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("email_id", "recipient", "kind", name="uix_email_outbox_delivery"),
+    )
+    op.create_index(
+        "ix_email_outbox_pending",
+        "email_outbox",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_email_outbox_pending", table_name="email_outbox")
+    op.drop_table("email_outbox")
@@ -0,0 +1,369 @@
+"""
+benchmark_query_plans.py
+
+Seeds a throwaway database with realistic volumes and prints the query plan
+and timing of the hot-path queries covered by the indexes in
+migrations/versions/*_hot_path_indexes.py.
+
+Usage (from backend/):
+    python scripts/benchmark_query_plans.py --database-url postgresql+psycopg2://.../thinkly_bench --seed
+    python scripts/benchmark_query_plans.py --database-url sqlite:///./bench.db --seed --users 2000
+
+Dashboard series (the daily_statistics rollup and its time buckets) against
+a million login sessions:
+    python scripts/benchmark_query_plans.py --database-url ... --seed --sessions 1000000 --only dashboard_series
+
+The target database is created with Base.metadata.create_all() and filled
+with synthetic rows. Never point it at a database holding real data.
+
+The pg_trgm search indexes are PostgreSQL-only and live in a migration; after
+seeding a PostgreSQL database add them with
+    DATABASE_URL=... alembic stamp 0002 && DATABASE_URL=... alembic upgrade head
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+BACKEND_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, BACKEND_SRC)
+# database_operations.db builds an engine at import time; the benchmark uses its own.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event, insert, text  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from database_operations.db import Base  # noqa: E402
+from models.schema import (  # noqa: E402
+    AlgoTimeSession,
+    BaseEvent,
+    Competition,
+    Language,
+    Question,
+    QuestionInstance,
+    Submission,
+    UserAccount,
+    UserQuestionInstance,
+    UserSession,
+)
+from services.daily_statistics import (  # noqa: E402
+    BACKFILL_BATCH_DAYS,
+    compute_daily_statistics,
+    day_buckets,
+    month_buckets,
+    rollup_daily_statistics,
+    sum_daily_statistics,
+    week_buckets,
+)
+
+CHUNK_SIZE = 5_000
+
+# name -> (SQL, bind parameters). Parameters are filled in by _query_params().
+HOT_QUERIES = {
+    "frontpage_flags": (
+        "SELECT question_id FROM question_instance "
+        "WHERE question_id IN (1, 2, 3, 4, 5) AND event_id IS NULL",
+        {},
+    ),
+    "event_question_counts": (
+        "SELECT count(*) FROM question_instance WHERE event_id = :event_id AND riddle_id IS NULL",
+        {},
+    ),
+    "user_instances_for_event": (
+        "SELECT uqi.* FROM user_question_instance uqi "
+        "JOIN question_instance qi ON qi.question_instance_id = uqi.question_instance_id "
+        "WHERE uqi.user_id = :user_id AND qi.event_id = :event_id",
+        {},
+    ),
+    "submissions_for_instance": (
+        "SELECT * FROM submission WHERE user_question_instance_id = :uqi_id",
+        {},
+    ),
+    "submissions_last_30_days": (
+        "SELECT count(*) FROM submission WHERE submitted_on >= :since",
+        {},
+    ),
+    "logins_last_30_days": (
+        "SELECT count(*) FROM user_session WHERE created_at >= :since",
+        {},
+    ),
+    # What /stats/logins?time_range=3months used to run before the rollup.
+    "logins_by_month_to_char": (
+        "SELECT to_char(created_at, 'Mon'), count(session_id) FROM user_session "
+        "WHERE created_at >= :since_90 GROUP BY to_char(created_at, 'Mon')",
+        {},
+    ),
+    "new_accounts_last_30_days": (
+        "SELECT count(*) FROM user_account WHERE created_at >= :since",
+        {},
+    ),
+    "ended_events": (
+        "SELECT event_id FROM base_event WHERE event_end_date < :now",
+        {},
+    ),
+    "active_events": (
+        "SELECT event_id FROM base_event WHERE event_start_date <= :now AND event_end_date >= :now",
+        {},
+    ),
+    "question_search": (
+        "SELECT question_id FROM question "
+        "WHERE question_name ILIKE :needle OR question_description ILIKE :needle",
+        {"needle": "%tion 4242%"},
+    ),
+    "account_search": (
+        "SELECT user_id FROM user_account "
+        "WHERE email ILIKE :needle OR first_name ILIKE :needle OR last_name ILIKE :needle",
+        {"needle": "%st1234%"},
+    ),
+}
+
+POSTGRES_ONLY = {"logins_by_month_to_char"}
+DASHBOARD_SERIES = "dashboard_series"
+
+
+def _chunks(rows: list[dict]):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        yield rows[start:start + CHUNK_SIZE]
+
+
+def _bulk_insert(engine: Engine, model, rows: list[dict]) -> None:
+    with engine.begin() as conn:
+        for chunk in _chunks(rows):
+            conn.execute(insert(model), chunk)
+
+
+def seed(engine: Engine, users: int, questions: int, events: int, sessions: int,
+         submissions_per_instance: int) -> None:
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    _bulk_insert(engine, Language, [
+        {"lang_judge_id": 71, "monaco_id": "python", "display_name": "Python", "active": True},
+    ])
+    _bulk_insert(engine, UserAccount, [
+        {
+            "user_id": i,
+            "email": f"user{i}@bench.test",
+            "hashed_password": "",
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "user_type": "participant",
+            "created_at": now - timedelta(days=rng.randint(0, 365)),
+        }
+        for i in range(1, users + 1)
+    ])
+    # Generated chunk by chunk so a million sessions never sit in memory at once.
+    with engine.begin() as conn:
+        for start in range(0, sessions, CHUNK_SIZE):
+            conn.execute(insert(UserSession), [
+                {
+                    "user_id": rng.randint(1, users),
+                    "jwt_token": f"{i:064x}",
+                    "created_at": now - timedelta(minutes=rng.randint(0, 180 * 24 * 60)),
+                    "expires_at": now,
+                    "is_active": False,
+                }
+                for i in range(start, min(start + CHUNK_SIZE, sessions))
+            ])
+    _bulk_insert(engine, Question, [
+        {
+            "question_id": i,
+            "question_name": f"Question {i}",
+            "question_description": "Benchmark question",
+            "difficulty": rng.choice(["easy", "medium", "hard"]),
+            "created_at": now,
+            "last_modified_at": now,
+        }
+        for i in range(1, questions + 1)
+    ])
+
+    event_rows = []
+    for i in range(1, events + 1):
+        start = now - timedelta(days=rng.randint(-30, 365))
+        event_rows.append({
+            "event_id": i,
+            "event_name": f"Event {i}",
+            "event_start_date": start,
+            "event_end_date": start + timedelta(hours=2),
+            "created_at": start,
+            "updated_at": start,
+        })
+    _bulk_insert(engine, BaseEvent, event_rows)
+    _bulk_insert(engine, Competition, [{"event_id": i} for i in range(1, events + 1, 2)])
+    _bulk_insert(engine, AlgoTimeSession, [{"event_id": i} for i in range(2, events + 1, 2)])
+
+    instance_rows = [
+        {"question_instance_id": idx, "question_id": qid, "event_id": None}
+        for idx, qid in enumerate(range(1, questions + 1, 10), start=1)
+    ]
+    next_id = len(instance_rows) + 1
+    for event_id in range(1, events + 1):
+        for question_id in rng.sample(range(1, questions + 1), k=min(5, questions)):
+            instance_rows.append({"question_instance_id": next_id, "question_id": question_id, "event_id": event_id})
+            next_id += 1
+    _bulk_insert(engine, QuestionInstance, instance_rows)
+
+    uqi_rows = []
+    event_instances = [row["question_instance_id"] for row in instance_rows if row["event_id"] is not None]
+    for uqi_id in range(1, users * 5 + 1):
+        uqi_rows.append({
+            "user_question_instance_id": uqi_id,
+            "user_id": rng.randint(1, users),
+            "question_instance_id": rng.choice(event_instances),
+            "points": rng.choice([None, 0, 100]),
+            "lapse_time": rng.randint(10, 3600),
+            "attempts": 1,
+        })
+    _bulk_insert(engine, UserQuestionInstance, uqi_rows)
+    _bulk_insert(engine, Submission, [
+        {
+            "user_question_instance_id": row["user_question_instance_id"],
+            "submitted_on": now - timedelta(minutes=rng.randint(0, 120 * 24 * 60)),
+            "status": "Accepted",
+            "lang_judge_id": 71,
+        }
+        for row in uqi_rows
+        for _ in range(submissions_per_instance)
+    ])
+
+    with Session(engine) as db:
+        rollup_daily_statistics(db, (now - timedelta(days=365)).date(), now=now)
+        db.commit()
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+
+
+def _query_params(now: datetime) -> dict:
+    return {
+        "event_id": 1,
+        "user_id": 1,
+        "uqi_id": 1,
+        "since": now - timedelta(days=30),
+        "since_90": now - timedelta(days=90),
+        "now": now,
+    }
+
+
+def _explain_prefix(engine: Engine) -> str:
+    if engine.dialect.name == "postgresql":
+        return "EXPLAIN (ANALYZE, BUFFERS) "
+    return "EXPLAIN QUERY PLAN "
+
+
+def _dialect_sql(engine: Engine, sql: str) -> str:
+    # SQLite has no ILIKE; its LIKE is already case-insensitive for ASCII.
+    if engine.dialect.name == "postgresql":
+        return sql
+    return sql.replace(" ILIKE ", " LIKE ")
+
+
+def report(engine: Engine, queries: dict) -> None:
+    now = datetime.now(timezone.utc)
+    params = _query_params(now)
+    prefix = _explain_prefix(engine)
+
+    with engine.connect() as conn:
+        for name, (sql, extra_params) in queries.items():
+            if name in POSTGRES_ONLY and engine.dialect.name != "postgresql":
+                continue
+            sql = _dialect_sql(engine, sql)
+            bound = {**params, **extra_params}
+            plan_rows = conn.execute(text(prefix + sql), bound).all()
+
+            started = time.perf_counter()
+            conn.execute(text(sql), bound).all()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            print(f"=== {name}  ({elapsed_ms:.2f} ms)")
+            for row in plan_rows:
+                print("   ", " | ".join(str(col) for col in row))
+            print()
+
+
+def _report_call(engine: Engine, name: str, call) -> None:
+    """Time call(), then print the plan of every statement it issued."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        started = time.perf_counter()
+        call()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    print(f"=== {name}  ({elapsed_ms:.2f} ms, {len(statements)} statement(s))")
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            for row in conn.exec_driver_sql(_explain_prefix(engine) + statement, parameters).all():
+                print("   ", " | ".join(str(col) for col in row))
+    print()
+
+
+def report_dashboard_series(engine: Engine) -> None:
+    """The admin dashboard series read from daily_statistics, and the rollup batch that fills it."""
+    today = datetime.now(timezone.utc).date()
+    series = {
+        "logins_7days": day_buckets(today, 7, "%a"),
+        "logins_30days": week_buckets(today, 4),
+        "logins_3months": month_buckets(today, 3),
+        "participation_3months": day_buckets(today, 90, "%b %d"),
+    }
+    with Session(engine) as db:
+        for name, buckets in series.items():
+            field = "logins" if name.startswith("logins") else "competition_submissions"
+            _report_call(engine, name, lambda: sum_daily_statistics(db, buckets, field))
+        _report_call(
+            engine,
+            f"rollup_batch_{BACKFILL_BATCH_DAYS}_days",
+            lambda: compute_daily_statistics(db, today - timedelta(days=BACKFILL_BATCH_DAYS - 1), today),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCHMARK_DATABASE_URL"),
+                        help="Throwaway database to seed (defaults to $BENCHMARK_DATABASE_URL).")
+    parser.add_argument("--seed", action="store_true", help="Drop, recreate and seed all tables first.")
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--questions", type=int, default=5_000)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--sessions-per-user", type=int, default=10)
+    parser.add_argument("--sessions", type=int,
+                        help="Total user_session rows to seed (overrides --sessions-per-user).")
+    parser.add_argument("--submissions-per-instance", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="Only report the named queries.")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url (or BENCHMARK_DATABASE_URL) is required")
+
+    engine = create_engine(args.database_url)
+
+    if args.seed:
+        started = time.perf_counter()
+        sessions = args.sessions if args.sessions is not None else args.users * args.sessions_per_user
+        seed(engine, args.users, args.questions, args.events, sessions, args.submissions_per_instance)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s\n")
+
+    queries = HOT_QUERIES
+    if args.only:
+        queries = {name: HOT_QUERIES[name] for name in args.only if name != DASHBOARD_SERIES}
+    report(engine, queries)
+    if not args.only or DASHBOARD_SERIES in args.only:
+        report_dashboard_series(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""
+dialect.py
+
+Helpers for the few queries that differ between PostgreSQL (production) and
+SQLite (tests and local development).
+"""
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def is_postgresql(db: Session) -> bool:
+    try:
+        return db.get_bind().dialect.name == "postgresql"
+    except Exception:
+        return False
+
+
+def insert_for(db: Session):
+    """The dialect's insert() construct, which supports ON CONFLICT on both databases."""
+    if is_postgresql(db):
+        return postgresql.insert
+    return sqlite.insert
@@ -1,20 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func, inspect
 from sqlalchemy.exc import OperationalError, ProgrammingError
 from models.schema import (
-    UserAccount, Competition, BaseEvent, Question,
-    AlgoTimeSession, QuestionInstance, UserQuestionInstance, Submission, UserSession
+    UserAccount, Competition, BaseEvent, Question, AlgoTimeSession
 )
-from database_operations.database import get_db
+from database_operations.database import SessionLocal, get_db
 from endpoints.authentification_api import get_current_user
 from endpoints.long_term_statistics_api import get_long_term_statistics_summary
 from pydantic import BaseModel
-from typing import List, Optional, Literal
-from datetime import datetime, timezone, timedelta
+from typing import Any, Callable, Dict, List, Optional, Literal
+from datetime import date, datetime, timezone, timedelta
+import asyncio
 import logging
 from typing import Annotated
 from services.posthog_analytics import track_custom_event
+from services.job_runner import JobMetrics, job_metrics
+from services.daily_statistics import (
+    TimeBucket,
+    day_buckets,
+    month_buckets,
+    sum_daily_statistics,
+    week_buckets,
+)
+from services.response_cache import build_cache_key, response_cache, serialize_json
 
 logger = logging.getLogger(__name__)
 admin_dashboard_router = APIRouter(tags=["Admin Dashboard"])
@@ -92,8 +101,35 @@ class ParticipationDataPoint(BaseModel):
     participation: int
 
 
+class DashboardSnapshotResponse(BaseModel):
+    time_range: str
+    generated_at: datetime
+    overview: DashboardOverviewResponse
+    new_accounts: NewAccountsStatsResponse
+    questions_solved: List[QuestionsSolvedItem]
+    time_to_solve: List[TimeToSolveItem]
+    logins: List[LoginsDataPoint]
+    participation: Dict[Literal["algotime", "competitions"], List[ParticipationDataPoint]]
+
+
+class ResponseCacheStatsResponse(BaseModel):
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    invalidations: int
+
+
 # ---------------- Helper Functions ----------------
 
+DASHBOARD_SNAPSHOT_TTL_SECONDS = 30.0
+DASHBOARD_SNAPSHOT_TAG = "admin-dashboard"
+# time_range -> lock letting one request compute a snapshot while others wait for it
+_snapshot_locks: dict[str, asyncio.Lock] = {}
+
 # Time range configuration: maps time_range to (days, label)
 DEFAULT_TIME_RANGE = (90, "3 months")
 TIME_RANGE_CONFIG = {
@@ -103,20 +139,6 @@ TIME_RANGE_CONFIG = {
 }
 
 
-def get_time_range_start(time_range: str) -> datetime:
-    """Get the start datetime based on time range filter."""
-    now = datetime.now(timezone.utc)
-    days = TIME_RANGE_CONFIG.get(time_range, DEFAULT_TIME_RANGE)[0]
-    return now - timedelta(days=days)
-
-
-def get_period_config(time_range: str, range_start: datetime) -> tuple[datetime, str]:
-    """Get previous period start and label for a time range."""
-    days, label = TIME_RANGE_CONFIG.get(time_range, DEFAULT_TIME_RANGE)
-    previous_start = range_start - timedelta(days=days)
-    return previous_start, label
-
-
 def calculate_trend(current_count: int, previous_count: int) -> tuple[str, str]:
     """Calculate trend percentage and direction from period counts."""
     if previous_count > 0:
@@ -158,96 +180,239 @@ def _get_long_term_window_days(time_range: str) -> int:
     return TIME_RANGE_CONFIG.get(time_range, DEFAULT_TIME_RANGE)[0]
 
 
-def _build_zero_participation_series(time_range: str) -> List[ParticipationDataPoint]:
-    now = datetime.now(timezone.utc)
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
 
+def _participation_buckets(time_range: str, today: date) -> List[TimeBucket]:
     if time_range == "7days":
-        days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        return [ParticipationDataPoint(date=day, participation=0) for day in days]
+        return day_buckets(today, 7, "%a")
+    if time_range == "30days":
+        return day_buckets(today, 30)
+    return day_buckets(today, 90, "%b %d")
 
+
+def _login_buckets(time_range: str, today: date) -> List[TimeBucket]:
+    if time_range == "7days":
+        return day_buckets(today, 7, "%a")
     if time_range == "30days":
-        return [
-            ParticipationDataPoint(date=f"Day {index}", participation=0)
-            for index in range(1, 31)
-        ]
+        return week_buckets(today, 4)
+    return month_buckets(today, 3)
 
+
+def _build_zero_participation_series(time_range: str) -> List[ParticipationDataPoint]:
     return [
-        ParticipationDataPoint(date=(now - timedelta(days=day)).strftime("%b %d"), participation=0)
-        for day in range(90, 0, -1)
+        ParticipationDataPoint(date=bucket.label, participation=0)
+        for bucket in _participation_buckets(time_range, _today())
     ]
 
 
-def _legacy_participation_tables_available(db: Session) -> bool:
-    try:
-        inspector = inspect(db.get_bind())
-        required_tables = {"submission", "user_question_instance", "question_instance"}
-        existing_tables = set(inspector.get_table_names())
-        return required_tables.issubset(existing_tables)
-    except Exception:
-        return True
-
-
-def _get_submission_count(
+def _build_participation_series(
     db: Session,
+    time_range: str,
     event_type: Literal["algotime", "competitions"],
-    day_start: datetime,
-    day_end: datetime,
-) -> int:
-    query = (
-        db.query(func.count(Submission.submission_id))
-        .join(UserQuestionInstance, Submission.user_question_instance_id == UserQuestionInstance.user_question_instance_id)
-        .join(QuestionInstance, UserQuestionInstance.question_instance_id == QuestionInstance.question_instance_id)
-        .filter(
-            Submission.submitted_on >= day_start,
-            Submission.submitted_on < day_end,
+) -> List[ParticipationDataPoint]:
+    field = "competition_submissions" if event_type == "competitions" else "algotime_submissions"
+    buckets = _participation_buckets(time_range, _today())
+    counts = sum_daily_statistics(db, buckets, field)[field]
+    return [
+        ParticipationDataPoint(date=bucket.label, participation=count)
+        for bucket, count in zip(buckets, counts)
+    ]
+
+
+def _build_dashboard_overview(db: Session) -> DashboardOverviewResponse:
+    competition_colors = ["var(--color-chart-1)", "var(--color-chart-4)"]
+
+    # Recent Accounts (2 most recent)
+    recent_users = (
+        db.query(UserAccount)
+        .order_by(UserAccount.user_id.desc())
+        .limit(2)
+        .all()
+    )
+    recent_accounts = [
+        RecentAccountItem(
+            name=f"{user.first_name} {user.last_name}",
+            info=user.email,
+            avatarUrl=None  # Can add avatar URL field to schema if needed
         )
+        for user in recent_users
+    ]
+
+    # Recent Competitions (2 most recent)
+    recent_comps = (
+        db.query(BaseEvent, Competition)
+        .join(Competition, BaseEvent.event_id == Competition.event_id)
+        .order_by(BaseEvent.created_at.desc())
+        .limit(2)
+        .all()
     )
+    recent_competitions = [
+        RecentCompetitionItem(
+            name=base_event.event_name,
+            info=format_date(base_event.event_start_date),
+            color=competition_colors[i % len(competition_colors)]
+        )
+        for i, (base_event, comp) in enumerate(recent_comps)
+    ]
 
-    if event_type == "competitions":
-        query = query.filter(
-            QuestionInstance.event_id.in_(db.query(Competition.event_id))
+    # Recent Questions (2 most recent)
+    recent_qs = (
+        db.query(Question)
+        .order_by(Question.created_at.desc())
+        .limit(2)
+        .all()
+    )
+    recent_questions = [
+        RecentQuestionItem(
+            name=q.question_name,
+            info=f"Date added: {format_date(q.created_at)}"
         )
-    else:
-        query = query.filter(
-            QuestionInstance.event_id.in_(db.query(AlgoTimeSession.event_id))
+        for q in recent_qs
+    ]
+
+    # Recent AlgoTime Sessions (2 most recent)
+    recent_algos = (
+        db.query(BaseEvent, AlgoTimeSession)
+        .join(AlgoTimeSession, BaseEvent.event_id == AlgoTimeSession.event_id)
+        .order_by(BaseEvent.created_at.desc())
+        .limit(2)
+        .all()
+    )
+    recent_algotime_sessions = [
+        RecentAlgoTimeSessionItem(
+            name=base_event.event_name,
+            info=f"Date added: {format_date(base_event.created_at)}"
         )
+        for base_event, algo in recent_algos
+    ]
 
-    return query.scalar() or 0
+    return DashboardOverviewResponse(
+        recent_accounts=recent_accounts,
+        recent_competitions=recent_competitions,
+        recent_questions=recent_questions,
+        recent_algotime_sessions=recent_algotime_sessions
+    )
 
 
-def _build_participation_series(
+def _build_new_accounts_stats(db: Session, time_range: str) -> NewAccountsStatsResponse:
+    days, period_label = TIME_RANGE_CONFIG.get(time_range, DEFAULT_TIME_RANGE)
+    today = _today()
+    periods = [
+        TimeBucket("previous", today - timedelta(days=2 * days - 1), today - timedelta(days=days)),
+        TimeBucket("current", today - timedelta(days=days - 1), today),
+    ]
+    previous_period_count, current_period_count = sum_daily_statistics(db, periods, "new_accounts")["new_accounts"]
+
+    trend, trend_direction = calculate_trend(current_period_count, previous_period_count)
+    subtitle = f"{trend_direction} {abs(int(trend.replace('%', '').replace('+', '')))}% in the last {period_label}"
+    description = get_trend_description(trend_direction)
+
+    return NewAccountsStatsResponse(
+        value=current_period_count,
+        subtitle=subtitle,
+        trend=trend,
+        description=description
+    )
+
+
+def _get_solve_summary(db: Session, time_range: str):
+    """Long-term solve statistics backing both the questions-solved and time-to-solve charts."""
+    return get_long_term_statistics_summary(
+        db=db,
+        window_value=_get_long_term_window_days(time_range),
+        window_unit="days",
+        difficulty=None,
+    )
+
+
+def _build_questions_solved(summary) -> List[QuestionsSolvedItem]:
+    colors = get_chart_colors()
+    counts = {
+        item.difficulty: item.total_questions_solved
+        for item in summary.stats
+    }
+
+    return [
+        QuestionsSolvedItem(name="Easy", value=counts.get("easy", 0), color=colors["easy"]),
+        QuestionsSolvedItem(name="Medium", value=counts.get("medium", 0), color=colors["medium"]),
+        QuestionsSolvedItem(name="Hard", value=counts.get("hard", 0), color=colors["hard"]),
+    ]
+
+
+def _build_time_to_solve(summary) -> List[TimeToSolveItem]:
+    colors = get_chart_colors()
+    times = {
+        item.difficulty: round(item.average_solve_time, 1) if item.average_solve_time else 0
+        for item in summary.stats
+    }
+
+    return [
+        TimeToSolveItem(type="Easy", time=times.get("easy", 0), color=colors["easy"]),
+        TimeToSolveItem(type="Medium", time=times.get("medium", 0), color=colors["medium"]),
+        TimeToSolveItem(type="Hard", time=times.get("hard", 0), color=colors["hard"]),
+    ]
+
+
+def _build_logins_series(db: Session, time_range: str) -> List[LoginsDataPoint]:
+    buckets = _login_buckets(time_range, _today())
+    counts = sum_daily_statistics(db, buckets, "logins")["logins"]
+    return [
+        LoginsDataPoint(month=bucket.label, logins=count)
+        for bucket, count in zip(buckets, counts)
+    ]
+
+
+def _build_participation_stats(
     db: Session,
     time_range: str,
     event_type: Literal["algotime", "competitions"],
 ) -> List[ParticipationDataPoint]:
-    now = datetime.now(timezone.utc)
+    """Participation series, zero-filled when the rollup table is missing or unreadable."""
+    try:
+        return _build_participation_series(db, time_range, event_type)
 
-    if time_range == "7days":
-        days = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        data = []
-        for index, day in enumerate(days):
-            day_start = now - timedelta(days=(6 - index))
-            day_end = day_start + timedelta(days=1)
-            count = _get_submission_count(db, event_type, day_start, day_end)
-            data.append(ParticipationDataPoint(date=day, participation=count))
-        return data
+    except (OperationalError, ProgrammingError) as e:
+        logger.warning("Participation stats query failed; returning zero-filled series: %s", e)
+        return _build_zero_participation_series(time_range)
 
-    if time_range == "30days":
-        data = []
-        for day in range(30, 0, -1):
-            day_start = now - timedelta(days=day)
-            day_end = day_start + timedelta(days=1)
-            count = _get_submission_count(db, event_type, day_start, day_end)
-            data.append(ParticipationDataPoint(date=f"Day {31 - day}", participation=count))
-        return data
-
-    data = []
-    for day in range(90, 0, -1):
-        day_start = now - timedelta(days=day)
-        day_end = day_start + timedelta(days=1)
-        count = _get_submission_count(db, event_type, day_start, day_end)
-        data.append(ParticipationDataPoint(date=day_start.strftime("%b %d"), participation=count))
-    return data
+
+def _run_with_session(build: Callable[..., Any], *args: Any) -> Any:
+    """Run one snapshot part on its own session (sessions must not be shared across threads)."""
+    db = SessionLocal()
+    try:
+        return build(db, *args)
+    finally:
+        db.close()
+
+
+async def build_dashboard_snapshot(time_range: str) -> DashboardSnapshotResponse:
+    """
+    Compute every dashboard widget for `time_range`, running the independent
+    parts concurrently in the threadpool. The long-term solve summary is read
+    once and shared by the questions-solved and time-to-solve charts.
+    """
+    overview, new_accounts, summary, logins, participation_algotime, participation_competitions = (
+        await asyncio.gather(
+            run_in_threadpool(_run_with_session, _build_dashboard_overview),
+            run_in_threadpool(_run_with_session, _build_new_accounts_stats, time_range),
+            run_in_threadpool(_run_with_session, _get_solve_summary, time_range),
+            run_in_threadpool(_run_with_session, _build_logins_series, time_range),
+            run_in_threadpool(_run_with_session, _build_participation_stats, time_range, "algotime"),
+            run_in_threadpool(_run_with_session, _build_participation_stats, time_range, "competitions"),
+        )
+    )
+    return DashboardSnapshotResponse(
+        time_range=time_range,
+        generated_at=datetime.now(timezone.utc),
+        overview=overview,
+        new_accounts=new_accounts,
+        questions_solved=_build_questions_solved(summary),
+        time_to_solve=_build_time_to_solve(summary),
+        logins=logins,
+        participation={"algotime": participation_algotime, "competitions": participation_competitions},
+    )
 
 
 def admin_or_owner_required(
@@ -276,72 +441,8 @@ async def get_dashboard_overview(
     user_email = current_user.get("sub")
     logger.info(f"Admin '{user_email}' requesting dashboard overview")
 
-    competition_colors = ["var(--color-chart-1)", "var(--color-chart-4)"]
-
     try:
-        # Recent Accounts (2 most recent)
-        recent_users = (
-            db.query(UserAccount)
-            .order_by(UserAccount.user_id.desc())
-            .limit(2)
-            .all()
-        )
-        recent_accounts = [
-            RecentAccountItem(
-                name=f"{user.first_name} {user.last_name}",
-                info=user.email,
-                avatarUrl=None  # Can add avatar URL field to schema if needed
-            )
-            for user in recent_users
-        ]
-
-        # Recent Competitions (2 most recent)
-        recent_comps = (
-            db.query(BaseEvent, Competition)
-            .join(Competition, BaseEvent.event_id == Competition.event_id)
-            .order_by(BaseEvent.created_at.desc())
-            .limit(2)
-            .all()
-        )
-        recent_competitions = [
-            RecentCompetitionItem(
-                name=base_event.event_name,
-                info=format_date(base_event.event_start_date),
-                color=competition_colors[i % len(competition_colors)]
-            )
-            for i, (base_event, comp) in enumerate(recent_comps)
-        ]
-
-        # Recent Questions (2 most recent)
-        recent_qs = (
-            db.query(Question)
-            .order_by(Question.created_at.desc())
-            .limit(2)
-            .all()
-        )
-        recent_questions = [
-            RecentQuestionItem(
-                name=q.question_name,
-                info=f"Date added: {format_date(q.created_at)}"
-            )
-            for q in recent_qs
-        ]
-
-        # Recent AlgoTime Sessions (2 most recent)
-        recent_algos = (
-            db.query(BaseEvent, AlgoTimeSession)
-            .join(AlgoTimeSession, BaseEvent.event_id == AlgoTimeSession.event_id)
-            .order_by(BaseEvent.created_at.desc())
-            .limit(2)
-            .all()
-        )
-        recent_algotime_sessions = [
-            RecentAlgoTimeSessionItem(
-                name=base_event.event_name,
-                info=f"Date added: {format_date(base_event.created_at)}"
-            )
-            for base_event, algo in recent_algos
-        ]
+        overview = _build_dashboard_overview(db)
 
         # Track admin dashboard access
         track_custom_event(
@@ -349,19 +450,14 @@ async def get_dashboard_overview(
             event_name="admin_dashboard_accessed",
             properties={
                 "user_email": user_email,
-                "recent_users_count": len(recent_accounts),
-                "recent_competitions_count": len(recent_competitions),
-                "recent_questions_count": len(recent_questions),
-                "recent_algotime_count": len(recent_algotime_sessions),
+                "recent_users_count": len(overview.recent_accounts),
+                "recent_competitions_count": len(overview.recent_competitions),
+                "recent_questions_count": len(overview.recent_questions),
+                "recent_algotime_count": len(overview.recent_algotime_sessions),
             }
         )
 
-        return DashboardOverviewResponse(
-            recent_accounts=recent_accounts,
-            recent_competitions=recent_competitions,
-            recent_questions=recent_questions,
-            recent_algotime_sessions=recent_algotime_sessions
-        )
+        return overview
 
     except Exception as e:
         logger.exception(f"Error fetching dashboard overview: {str(e)}")
@@ -371,9 +467,8 @@ async def get_dashboard_overview(
         )
 
 
-@admin_dashboard_router.get("/stats/new-accounts", response_model=NewAccountsStatsResponse)
-async def get_new_accounts_stats(
-    db: Annotated[Session, Depends(get_db)],
+@admin_dashboard_router.get("/snapshot", response_model=DashboardSnapshotResponse)
+async def get_dashboard_snapshot(
     current_user: Annotated[dict, Depends(admin_or_owner_required)],
     time_range: Annotated[
             Literal["7days", "30days", "3months"],
@@ -381,41 +476,59 @@ async def get_new_accounts_stats(
         ] = "3months",
 ):
     """
-    Get new accounts statistics for the specified time range.
+    Get every admin dashboard widget in one response.
+
+    The parts are computed concurrently and the serialized result is kept for
+    DASHBOARD_SNAPSHOT_TTL_SECONDS per time range (per worker); concurrent
+    requests for the same range wait for a single computation.
     """
-    logger.info(f"Fetching new accounts stats for range: {time_range}")
+    user_email = current_user.get("sub")
+    logger.info(f"Admin '{user_email}' requesting dashboard snapshot for range: {time_range}")
+    key = build_cache_key("admin-dashboard-snapshot", {"time_range": time_range})
 
     try:
-        range_start = get_time_range_start(time_range)
-        previous_start, period_label = get_period_config(time_range, range_start)
-
-        # Get new accounts in current period
-        current_period_count = (
-            db.query(func.count(UserAccount.user_id))
-            .filter(UserAccount.created_at >= range_start)
-            .scalar() or 0
+        body = response_cache.get(key)
+        cached = body is not None
+        if body is None:
+            lock = _snapshot_locks.setdefault(time_range, asyncio.Lock())
+            async with lock:
+                body = response_cache.get(key)
+                if body is None:
+                    snapshot = await build_dashboard_snapshot(time_range)
+                    body = serialize_json(snapshot)
+                    response_cache.set(key, body, [DASHBOARD_SNAPSHOT_TAG], DASHBOARD_SNAPSHOT_TTL_SECONDS)
+
+        track_custom_event(
+            user_id=str(current_user.get("id")),
+            event_name="admin_dashboard_accessed",
+            properties={"user_email": user_email, "time_range": time_range, "snapshot_cached": cached},
         )
+        return Response(content=body, media_type="application/json")
 
-        # Get previous period for comparison
-        previous_period_count = (
-            db.query(func.count(UserAccount.user_id))
-            .filter(
-                UserAccount.created_at >= previous_start,
-                UserAccount.created_at < range_start
-            )
-            .scalar() or 0
+    except Exception as e:
+        logger.exception(f"Error building dashboard snapshot: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch dashboard snapshot"
         )
 
-        trend, trend_direction = calculate_trend(current_period_count, previous_period_count)
-        subtitle = f"{trend_direction} {abs(int(trend.replace('%', '').replace('+', '')))}% in the last {period_label}"
-        description = get_trend_description(trend_direction)
 
-        return NewAccountsStatsResponse(
-            value=current_period_count,
-            subtitle=subtitle,
-            trend=trend,
-            description=description
-        )
+@admin_dashboard_router.get("/stats/new-accounts", response_model=NewAccountsStatsResponse)
+async def get_new_accounts_stats(
+    db: Annotated[Session, Depends(get_db)],
+    current_user: Annotated[dict, Depends(admin_or_owner_required)],
+    time_range: Annotated[
+            Literal["7days", "30days", "3months"],
+            Query()
+        ] = "3months",
+):
+    """
+    Get new accounts statistics for the specified time range.
+    """
+    logger.info(f"Fetching new accounts stats for range: {time_range}")
+
+    try:
+        return _build_new_accounts_stats(db, time_range)
 
     except Exception as e:
         logger.exception(f"Error fetching new accounts stats: {str(e)}")
@@ -439,26 +552,9 @@ async def get_questions_solved_stats(
     Returns data for pie chart.
     """
     logger.info(f"Fetching questions solved stats for range: {time_range}")
-    colors = get_chart_colors()
 
     try:
-        summary = get_long_term_statistics_summary(
-            db=db,
-            window_value=_get_long_term_window_days(time_range),
-            window_unit="days",
-            difficulty=None,
-        )
-
-        counts = {
-            item.difficulty: item.total_questions_solved
-            for item in summary.stats
-        }
-
-        return [
-            QuestionsSolvedItem(name="Easy", value=counts.get("easy", 0), color=colors["easy"]),
-            QuestionsSolvedItem(name="Medium", value=counts.get("medium", 0), color=colors["medium"]),
-            QuestionsSolvedItem(name="Hard", value=counts.get("hard", 0), color=colors["hard"]),
-        ]
+        return _build_questions_solved(_get_solve_summary(db, time_range))
 
     except Exception as e:
         logger.exception(f"Error fetching questions solved stats: {str(e)}")
@@ -483,26 +579,9 @@ async def get_time_to_solve_stats(
     Time is calculated as minutes from event start to successful submission.
     """
     logger.info(f"Fetching time to solve stats for range: {time_range}")
-    colors = get_chart_colors()
 
     try:
-        summary = get_long_term_statistics_summary(
-            db=db,
-            window_value=_get_long_term_window_days(time_range),
-            window_unit="days",
-            difficulty=None,
-        )
-
-        times = {
-            item.difficulty: round(item.average_solve_time, 1) if item.average_solve_time else 0
-            for item in summary.stats
-        }
-
-        return [
-            TimeToSolveItem(type="Easy", time=times.get("easy", 0), color=colors["easy"]),
-            TimeToSolveItem(type="Medium", time=times.get("medium", 0), color=colors["medium"]),
-            TimeToSolveItem(type="Hard", time=times.get("hard", 0), color=colors["hard"]),
-        ]
+        return _build_time_to_solve(_get_solve_summary(db, time_range))
 
     except Exception as e:
         logger.exception(f"Error fetching time to solve stats: {str(e)}")
@@ -523,73 +602,13 @@ async def get_logins_stats(
 ):
     """
     Get login counts over time.
-    Returns data for line chart.
+    Returns data for line chart: one point per day (7days), per week (30days)
+    or per calendar month (3months), oldest first.
     """
     logger.info(f"Fetching logins stats for range: {time_range}")
 
     try:
-        now = datetime.now(timezone.utc)
-        range_start = get_time_range_start(time_range)
-
-        # Query user sessions (logins) grouped by time period
-        if time_range == "7days":
-            # Group by day of week
-            sessions = (
-                db.query(
-                    func.to_char(UserSession.created_at, 'Dy').label('day'),
-                    func.count(UserSession.session_id).label('count')
-                )
-                .filter(UserSession.created_at >= range_start)
-                .group_by(func.to_char(UserSession.created_at, 'Dy'))
-                .all()
-            )
-
-            day_order = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-            counts = {s.day: s.count for s in sessions}
-            return [
-                LoginsDataPoint(month=day, logins=counts.get(day, 0))
-                for day in day_order
-            ]
-
-        elif time_range == "30days":
-            # Group by week
-            data = []
-            for week in range(4, 0, -1):
-                week_start = now - timedelta(days=week * 7)
-                week_end = week_start + timedelta(days=7)
-                count = (
-                    db.query(func.count(UserSession.session_id))
-                    .filter(
-                        UserSession.created_at >= week_start,
-                        UserSession.created_at < week_end
-                    )
-                    .scalar() or 0
-                )
-                data.append(LoginsDataPoint(month=f"Week {5 - week}", logins=count))
-            return data
-
-        else:  # 3months
-            # Generate dynamic months for last 3 months
-            months = []
-            for i in range(2, -1, -1):
-                month_date = now - timedelta(days=i * 30)
-                months.append(month_date.strftime('%b'))
-
-            sessions = (
-                db.query(
-                    func.to_char(UserSession.created_at, 'Mon').label('month'),
-                    func.count(UserSession.session_id).label('count')
-                )
-                .filter(UserSession.created_at >= range_start)
-                .group_by(func.to_char(UserSession.created_at, 'Mon'))
-                .all()
-            )
-
-            counts = {s.month: s.count for s in sessions}
-            return [
-                LoginsDataPoint(month=m, logins=counts.get(m, 0))
-                for m in months
-            ]
+        return _build_logins_series(db, time_range)
 
     except Exception as e:
         logger.exception(f"Error fetching logins stats: {str(e)}")
@@ -619,21 +638,31 @@ async def get_participation_stats(
     logger.info(f"Fetching participation stats for range: {time_range}, type: {event_type}")
 
     try:
-        if not _legacy_participation_tables_available(db):
-            logger.warning(
-                "Legacy participation tables are missing; returning zero-filled participation stats."
-            )
-            return _build_zero_participation_series(time_range)
-
-        return _build_participation_series(db, time_range, event_type)
-
-    except (OperationalError, ProgrammingError) as e:
-        logger.warning("Participation stats query failed; returning zero-filled series: %s", e)
-        return _build_zero_participation_series(time_range)
+        return _build_participation_stats(db, time_range, event_type)
 
     except Exception as e:
         logger.exception(f"Error fetching participation stats: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch participation statistics"
-        )
\ No newline at end of file
+        )
+
+
+@admin_dashboard_router.get("/stats/response-cache", response_model=ResponseCacheStatsResponse)
+async def get_response_cache_stats(
+    current_user: Annotated[dict, Depends(admin_or_owner_required)],
+):
+    """
+    Get hit ratio and memory usage of this worker's catalogue response cache.
+    """
+    return ResponseCacheStatsResponse(**response_cache.stats())
+
+
+@admin_dashboard_router.get("/stats/jobs", response_model=List[JobMetrics])
+async def get_job_stats(
+    current_user: Annotated[dict, Depends(admin_or_owner_required)],
+):
+    """
+    Get run counts, durations and start lag of this worker's scheduled jobs.
+    """
+    return job_metrics()
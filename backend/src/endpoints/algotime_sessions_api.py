@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, or_
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from models.schema import AlgoTimeSession, AlgoTimeSeries, BaseEvent, QuestionInstance, Question
 from database_operations.database import get_db
@@ -11,11 +11,14 @@ from services.posthog_analytics import track_custom_event
 from endpoints.authentification_api import get_current_user
 from endpoints.event_utils import (
     apply_event_status_filter,
+    build_event_keyset,
     build_event_date_order,
     build_event_status_order,
     parse_local_datetime_from_request,
     validate_event_times,
 )
+from endpoints.pagination_utils import estimate_total, keyset_paginate
+from endpoints.search_utils import apply_text_search
 from zoneinfo import ZoneInfo
 logger = logging.getLogger(__name__)
 algotime_router = APIRouter(tags=["Algotime"])
@@ -92,10 +95,11 @@ class AlgoTimeSessionCardResponse(BaseModel):
 
 
 class AlgoTimeSessionCardPageResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int]
+    page: Optional[int]
     page_size: int
     items: List[AlgoTimeSessionCardResponse]
+    next_cursor: Optional[str] = None
 
 class DetailedAlgoTimeSessionResponse(BaseModel):
     """Response model for editing algotime sessions - includes all necessary details"""
@@ -335,6 +339,8 @@ def get_all_algotime_sessions(
     search: Optional[str] = None,
     status_filter: Annotated[Optional[Literal["active", "upcoming", "completed"]], Query(alias="status")] = None,
     sort: Annotated[Literal["asc", "desc"], Query()] = "desc",
+    cursor: Annotated[Optional[str], Query(max_length=512)] = None,
+    include_total: Annotated[bool, Query()] = False,
 ):
     try:
         now = datetime.now(timezone.utc)
@@ -344,27 +350,27 @@ def get_all_algotime_sessions(
             .outerjoin(AlgoTimeSeries, AlgoTimeSession.algotime_series_id == AlgoTimeSeries.algotime_series_id)
         )
 
-        if search and search.strip():
-            search_term = f"%{search.strip()}%"
-            query = query.filter(
-                or_(
-                    BaseEvent.event_name.ilike(search_term),
-                    AlgoTimeSeries.algotime_series_name.ilike(search_term),
-                )
-            )
+        query = apply_text_search(query, search, BaseEvent.event_name, AlgoTimeSeries.algotime_series_name)
 
         query = apply_event_status_filter(query, BaseEvent, status_filter, now)
 
-        total = query.count()
-        status_order = build_event_status_order(BaseEvent, now)
-        date_order = build_event_date_order(BaseEvent, sort)
-        sessions = (
-            query
-            .order_by(status_order.asc(), date_order)
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-            .all()
-        )
+        next_cursor = None
+        if cursor is not None:
+            total = estimate_total(db, query) if include_total else None
+            keys = build_event_keyset(BaseEvent, sort, lambda session: session.base_event)
+            sessions, next_cursor = keyset_paginate(query, keys, cursor, page_size, f"algotime:{sort}")
+            page = None
+        else:
+            total = query.count()
+            status_order = build_event_status_order(BaseEvent, now)
+            date_order = build_event_date_order(BaseEvent, sort)
+            sessions = (
+                query
+                .order_by(status_order.asc(), date_order)
+                .offset((page - 1) * page_size)
+                .limit(page_size)
+                .all()
+            )
         logger.info("Fetched %s AlgoTime sessions for page=%s page_size=%s", len(sessions), page, page_size)
 
         event_ids = [session.event_id for session in sessions]
@@ -396,8 +402,11 @@ def get_all_algotime_sessions(
                 }
                 for s in sessions
             ],
+            "next_cursor": next_cursor,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching AlgoTime sessions: {e}")
         raise HTTPException(
@@ -443,6 +452,8 @@ def update_algotime_session(
     event.event_location = request.location
     event.event_start_date = start_dt
     event.event_end_date = end_dt
+    # Questions are replaced below; let the cleanup job look at the session again.
+    event.cleaned_at = None
 
     replace_session_questions(db, session_id, request.selectedQuestions)
 
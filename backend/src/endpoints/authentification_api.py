@@ -2,7 +2,7 @@ import bcrypt
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, EmailStr, Field
 from typing import Annotated, Optional
-from models.schema import UserAccount, UserPreferences, UserSession
+from models.schema import UserAccount, UserPreferences
 from google.oauth2 import id_token
 from google.auth.transport import requests as grequests
 from jose import jwt, JWTError
@@ -14,6 +14,7 @@ from database_operations.database import get_db, _commit_or_rollback
 import logging
 from endpoints.send_email_api import send_email_via_brevo
 from services.posthog_analytics import identify_user, track_custom_event
+from services.session_recorder import record_logout, record_session
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from sqlalchemy.orm import Session
@@ -290,16 +291,9 @@ async def login(login_request: LoginRequest, response: Response, db: Annotated[S
         }
     )
 
-    # Create a session record for tracking logins
+    # Queue a session record for tracking logins (written in batches)
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    session = UserSession(
-        user_id=user.user_id,
-        jwt_token=access_token,
-        expires_at=expires_at,
-        is_active=True
-    )
-    db.add(session)
-    _commit_or_rollback(db)
+    record_session(user.user_id, access_token, expires_at)
 
     # Set Refresh Token in HttpOnly Cookie
     response.set_cookie(
@@ -397,17 +391,10 @@ async def google_login(request: GoogleAuthRequest,response: Response, db: Annota
         token = create_access_token({"sub": user.email, "role": user.user_type, "id": user.user_id})
         refresh_token = create_refresh_token({"sub": user.email})
 
-        # Create a session record for tracking logins
+        # Queue a session record for tracking logins (written in batches)
         expires_at = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        session = UserSession(
-            user_id=user.user_id,
-            jwt_token=token,
-            expires_at=expires_at,
-            is_active=True
-        )
-        db.add(session)
-        _commit_or_rollback(db)
-        
+        record_session(user.user_id, token, expires_at)
+
         response.set_cookie(
             key="refresh_token",
             value=refresh_token,
@@ -489,7 +476,6 @@ async def profile(
 async def logout(
         request: Request,
         response: Response,
-        db: Annotated[Session, Depends(get_db)],
         current_user: Annotated[dict, Depends(get_current_user)]
 ):
     user_email = current_user.get("sub", "N/A")
@@ -523,13 +509,9 @@ async def logout(
         secure=True
     )
 
-    # 2. Database Cleanup
+    # 2. Session Cleanup (applied by the session recorder's next flush)
     if user_id:
-        db.query(UserSession).filter(
-            UserSession.user_id == user_id,
-            UserSession.is_active
-        ).update({"is_active": False})
-        db.commit()
+        record_logout(user_id)
 
     # 3. Analytics
     track_custom_event(
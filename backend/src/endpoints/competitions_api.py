@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from models.schema import Competition, BaseEvent, QuestionInstance, CompetitionEmail, UserAccount, UserPreferences, \
     CompetitionLeaderboardEntry
@@ -7,16 +7,19 @@ from database_operations.database import get_db, _commit_or_rollback
 from endpoints.authentification_api import get_current_user
 from endpoints.event_utils import (
     apply_event_status_filter,
+    build_event_keyset,
     build_event_date_order,
     build_event_status_order,
     parse_local_datetime_from_request,
     validate_event_times,
 )
+from endpoints.pagination_utils import estimate_total, keyset_paginate
+from endpoints.search_utils import apply_text_search
 from endpoints.send_email_api import send_email_via_brevo
 import logging
 from datetime import datetime, timezone, timedelta
 from pydantic import BaseModel, validator
-from typing import Annotated, List, Literal, Optional
+from typing import Annotated, Iterator, List, Literal, Optional
 from zoneinfo import ZoneInfo
 from services.posthog_analytics import track_custom_event
 
@@ -28,6 +31,8 @@ logger = logging.getLogger(__name__)
 competitions_router = APIRouter(tags=["Competitions"])
 DEFAULT_PAGE_SIZE = 11
 MAX_PAGE_SIZE = 100
+ALL_PARTICIPANTS_KEYWORDS = ("all", "all participants", "all users")
+RECIPIENT_FETCH_SIZE = 5000
 
 
 # ---------------- Models ----------------
@@ -131,10 +136,11 @@ class CompetitionCardResponse(BaseModel):
 
 
 class CompetitionCardPageResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int]
+    page: Optional[int]
     page_size: int
     items: List[CompetitionCardResponse]
+    next_cursor: Optional[str] = None
 
 
 class DetailedCompetitionResponse(BaseModel):
@@ -309,35 +315,60 @@ def create_competition_emails(
         )
 
 
-def resolve_email_recipients(db: Session, recipient_str: str) -> List[str]:
-    if recipient_str.strip().lower() in ("all", "all participants", "all users"):
-        try:
-            # Fetch all user emails first, then filter by preference in Python
-            # to avoid issues with missing UserPreferences rows
-            all_users = db.query(UserAccount.user_id, UserAccount.email).all()
-
-            opted_out_ids = {
-                row.user_id
-                for row in db.query(UserPreferences.user_id)
-                .filter(UserPreferences.notifications_enabled == False)  # noqa: E712
-                .all()
-            }
+def iter_all_participant_emails(db: Session) -> Iterator[str]:
+    """
+    Emails of every user who has not turned notifications off, as one
+    anti-join (users without a preferences row are included), streamed in
+    RECIPIENT_FETCH_SIZE batches: only the current batch is held in memory.
+    """
+    opted_out = select(UserPreferences.user_id).where(
+        UserPreferences.user_id == UserAccount.user_id,
+        UserPreferences.notifications_enabled == False,  # noqa: E712
+    )
+    query = (
+        select(UserAccount.email)
+        .where(UserAccount.email.is_not(None), UserAccount.email != "", ~opted_out.exists())
+        .order_by(UserAccount.user_id)
+        .execution_options(yield_per=RECIPIENT_FETCH_SIZE)
+    )
+    yield from db.execute(query).scalars()
 
-            recipients = [
-                user.email
-                for user in all_users
-                if user.user_id not in opted_out_ids and user.email
-            ]
 
-            logger.info(f"Resolved {len(recipients)} recipients from 'all participants'")
-            return recipients
+def recipients_key(recipient_str: str) -> str:
+    """The same key for every spelling of "all participants"; other `to` strings are their own key."""
+    if recipient_str.strip().lower() in ALL_PARTICIPANTS_KEYWORDS:
+        return ALL_PARTICIPANTS_KEYWORDS[0]
+    return recipient_str
 
-        except Exception as e:
-            logger.error(f"Failed to resolve 'all participants' recipients: {str(e)}")
-            # Return empty list rather than crashing the whole request
-            return []
 
-    return [e.strip() for e in recipient_str.split(",") if e.strip()]
+def iter_email_recipients(db: Session, recipient_str: str) -> Iterator[str]:
+    """
+    Recipients of a competition email's `to` string, streamed for "all
+    participants". Database errors are raised to the caller.
+    """
+    if recipients_key(recipient_str) == ALL_PARTICIPANTS_KEYWORDS[0]:
+        return iter_all_participant_emails(db)
+    return iter([e.strip() for e in recipient_str.split(",") if e.strip()])
+
+
+def resolve_email_recipients(db: Session, recipient_str: str) -> List[str]:
+    """
+    Every recipient of a competition email's `to` string at once, for sending
+    right away. A failed "all participants" lookup is rolled back to its
+    savepoint, leaving the session usable, and resolves to no recipients.
+    """
+    if recipients_key(recipient_str) != ALL_PARTICIPANTS_KEYWORDS[0]:
+        return list(iter_email_recipients(db, recipient_str))
+
+    try:
+        with db.begin_nested():
+            recipients = list(iter_all_participant_emails(db))
+    except Exception as e:
+        logger.error(f"Failed to resolve 'all participants' recipients: {str(e)}")
+        # Return empty list rather than crashing the whole request
+        return []
+    logger.info(f"Resolved {len(recipients)} recipients from 'all participants'")
+    return recipients
 
 
 def send_competition_emails(
@@ -377,34 +408,41 @@ def get_all_competitions(
         search: Optional[str] = None,
         status_filter: Annotated[Optional[Literal["active", "upcoming", "completed"]], Query(alias="status")] = None,
         sort: Annotated[Literal["asc", "desc"], Query()] = "desc",
+        cursor: Annotated[Optional[str], Query(max_length=512)] = None,
+        include_total: Annotated[bool, Query()] = False,
 ):
-    """Get competitions with pagination, optional search, and optional status filtering."""
+    """
+    Get competitions with pagination, optional search, and optional status filtering.
+
+    Passing `cursor` (empty for the first page) switches to keyset pagination;
+    `total` is then only filled in when `include_total` is set.
+    """
     try:
         now = datetime.now(timezone.utc)
         query = db.query(Competition).join(BaseEvent)
 
-        if search and search.strip():
-            search_term = f"%{search.strip()}%"
-            query = query.filter(
-                or_(
-                    BaseEvent.event_name.ilike(search_term),
-                    BaseEvent.event_location.ilike(search_term),
-                )
-            )
+        query = apply_text_search(query, search, BaseEvent.event_name, BaseEvent.event_location)
 
         query = apply_event_status_filter(query, BaseEvent, status_filter, now)
 
-        total = query.count()
-
-        status_order = build_event_status_order(BaseEvent, now)
-        date_order = build_event_date_order(BaseEvent, sort)
-        competitions = (
-            query
-            .order_by(status_order.asc(), date_order)
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-            .all()
-        )
+        next_cursor = None
+        if cursor is not None:
+            total = estimate_total(db, query) if include_total else None
+            keys = build_event_keyset(BaseEvent, sort, lambda comp: comp.base_event)
+            competitions, next_cursor = keyset_paginate(query, keys, cursor, page_size, f"competitions:{sort}")
+            page = None
+        else:
+            total = query.count()
+
+            status_order = build_event_status_order(BaseEvent, now)
+            date_order = build_event_date_order(BaseEvent, sort)
+            competitions = (
+                query
+                .order_by(status_order.asc(), date_order)
+                .offset((page - 1) * page_size)
+                .limit(page_size)
+                .all()
+            )
         logger.info(
             "Fetched %s competitions for page=%s page_size=%s has_search=%s has_status_filter=%s",
             len(competitions),
@@ -428,7 +466,10 @@ def get_all_competitions(
                 }
                 for comp in competitions
             ],
+            "next_cursor": next_cursor,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching competitions: {e}")
         raise HTTPException(
@@ -437,48 +478,75 @@ def get_all_competitions(
         )
 
 
+def competition_question_counts(event_ids: List[int]):
+    """
+    Question and riddle counts of the given events as one grouped query,
+    instead of counting each event separately.
+    """
+    return (
+        select(
+            QuestionInstance.event_id,
+            func.count().filter(QuestionInstance.riddle_id.is_(None)).label("question_count"),
+            func.count(QuestionInstance.riddle_id).label("riddle_count"),
+        )
+        .where(QuestionInstance.event_id.in_(event_ids))
+        .group_by(QuestionInstance.event_id)
+    )
+
+
 @competitions_router.get("/list", response_model=List[CompetitionResponse])
 async def list_competitions(
+        request: Request,
+        response: Response,
         db: Annotated[Session, Depends(get_db)],
-        current_user: Annotated[dict, Depends(get_current_user)]
+        current_user: Annotated[dict, Depends(get_current_user)],
+        page: Annotated[int, Query(ge=1)] = 1,
+        page_size: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = MAX_PAGE_SIZE,
 ):
     """
-    List all competitions with detailed information.
+    List competitions with detailed information, most recent first.
     Accessible by any authenticated user.
+
+    - **page** / **page_size**: 1-based pagination (default page_size=100, max=100)
+
+    The total number of competitions is returned in the `X-Total-Count`
+    header, and a `Link` header with `rel="next"` points to the next page
+    when there is one.
     """
     user_email = current_user.get("sub")
     logger.info(f"User '{user_email}' requesting competitions list")
 
     try:
-        competitions = (
-            db.query(BaseEvent, Competition)
-            .join(Competition, BaseEvent.event_id == Competition.event_id)
-            .order_by(BaseEvent.event_start_date.desc())
+        query = db.query(BaseEvent, Competition).join(Competition, BaseEvent.event_id == Competition.event_id)
+        total = query.count()
+        rows = (
+            query
+            .order_by(BaseEvent.event_start_date.desc(), BaseEvent.event_id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
             .all()
         )
 
-        result = []
-        for base_event, competition in competitions:
-            question_count = db.query(QuestionInstance).filter(
-                QuestionInstance.event_id == base_event.event_id,
-                QuestionInstance.riddle_id.is_(None)
-            ).count()
-
-            riddle_count = db.query(QuestionInstance).filter(
-                QuestionInstance.event_id == base_event.event_id,
-                QuestionInstance.riddle_id.isnot(None)
-            ).count()
-
-            result.append(
-                build_competition_response(
-                    base_event,
-                    competition,
-                    question_count,
-                    riddle_count,
-                )
-            )
+        counts = {}
+        if rows:
+            counts = {
+                event_id: (question_count, riddle_count)
+                for event_id, question_count, riddle_count in db.execute(
+                    competition_question_counts([base_event.event_id for base_event, _ in rows])
+                ).all()
+            }
+
+        result = [
+            build_competition_response(base_event, competition, *counts.get(base_event.event_id, (0, 0)))
+            for base_event, competition in rows
+        ]
+
+        response.headers["X-Total-Count"] = str(total)
+        if page * page_size < total:
+            next_url = request.url.include_query_params(page=page + 1, page_size=page_size)
+            response.headers["Link"] = f'<{next_url}>; rel="next"'
 
-        logger.info(f"Retrieved {len(result)} competitions for user '{user_email}'")
+        logger.info(f"Retrieved {len(result)} of {total} competitions for user '{user_email}' (page={page})")
         return result
 
     except Exception as e:
@@ -702,6 +770,8 @@ async def update_competition(
         base_event.event_start_date = start_dt
         base_event.event_end_date = end_dt
         base_event.updated_at = datetime.now(timezone.utc)
+        # Questions are replaced below; let the cleanup job look at the event again.
+        base_event.cleaned_at = None
 
         # Update Competition
         competition.riddle_cooldown = request.riddleCooldownTime
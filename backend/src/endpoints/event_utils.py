@@ -7,6 +7,8 @@ from fastapi import HTTPException, status
 from sqlalchemy import case
 from sqlalchemy.orm import Query
 
+from endpoints.pagination_utils import SortKey
+
 EventStatusFilter = Optional[Literal["active", "upcoming", "completed"]]
 SortOrder = Literal["asc", "desc"]
 
@@ -72,3 +74,19 @@ def build_event_status_order(event_model, now: datetime):
 
 def build_event_date_order(event_model, sort: SortOrder):
     return event_model.event_start_date.asc() if sort == "asc" else event_model.event_start_date.desc()
+
+
+def build_event_keyset(event_model, sort: SortOrder, get_event) -> list[SortKey]:
+    """
+    Keyset ordering for the event listings: start date, with event_id as the
+    tie-breaker. Unlike the page listing it does not group by status first:
+    the status depends on the time of each request, so an event starting or
+    ending between two pages would move and be skipped or repeated. Filter
+    by status to page through one group. `get_event` maps a result row
+    (Competition, AlgoTimeSession, ...) to its BaseEvent.
+    """
+    descending = sort == "desc"
+    return [
+        SortKey(event_model.event_start_date, descending, lambda row: get_event(row).event_start_date),
+        SortKey(event_model.event_id, descending, lambda row: get_event(row).event_id),
+    ]
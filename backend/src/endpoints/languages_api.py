@@ -5,6 +5,7 @@ from models.schema import Language
 from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from services.response_cache import LANGUAGES_TAG, build_cache_key, cached_json_response, serialize_json
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +22,7 @@ class LanguageModel(BaseModel):
     responses={500: {"description": "Error retrieving languages."}}
 )
 def get_all_languages(db: Annotated[Session, Depends(get_db)], active: Annotated[bool, Query()] = None):
-    try:
+    def build_body() -> bytes:
         langs = db.query(Language)
 
         if active is not None:
@@ -31,7 +32,7 @@ def get_all_languages(db: Annotated[Session, Depends(get_db)], active: Annotated
 
         logger.info(f"Fetched {len(langs)} languages from the database.")
 
-        return {"status_code": 200, "data": [
+        return serialize_json({"status_code": 200, "data": [
             LanguageModel(
                 row_id = lang.row_id,
                 lang_judge_id = lang.lang_judge_id,
@@ -40,7 +41,13 @@ def get_all_languages(db: Annotated[Session, Depends(get_db)], active: Annotated
                 monaco_id = lang.monaco_id
             ).model_dump()
             for lang in langs]
-        }
+        })
+
+    try:
+        # Languages are only changed by seeding/migrations, so entries live
+        # until the TTL runs out or LANGUAGES_TAG is invalidated.
+        cache_key = build_cache_key("languages", {"active": active})
+        return cached_json_response(cache_key, [LANGUAGES_TAG], build_body)
     except Exception as e:
         logger.error(f"Error fetching languages: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve languages.")
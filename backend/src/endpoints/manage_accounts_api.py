@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
 from models.schema import UserAccount, UserPreferences
 from database_operations.database import get_db
 from pydantic import BaseModel, Field
@@ -8,6 +7,8 @@ from typing import Annotated, Literal, Optional
 import logging
 from services.posthog_analytics import track_custom_event
 from endpoints.authentification_api import get_current_user
+from endpoints.pagination_utils import SortKey, build_keyset_order, estimate_total, keyset_paginate
+from endpoints.search_utils import apply_text_search
 logger = logging.getLogger(__name__)
 accounts_router = APIRouter(tags=["Accounts"])
 DEFAULT_PAGE_SIZE = 25
@@ -39,10 +40,29 @@ class AccountItemResponse(BaseModel):
 
 
 class PaginatedAccountsResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int]
+    page: Optional[int]
     page_size: int
     items: list[AccountItemResponse]
+    next_cursor: Optional[str] = None
+
+
+AccountSort = Literal["name_asc", "name_desc", "email_asc", "email_desc"]
+
+
+def build_account_keyset(sort: Optional[AccountSort]) -> list[SortKey]:
+    """Keyset equivalent of the get_all_accounts orderings (user_id is the tie-breaker)."""
+    user_id_key = SortKey(UserAccount.user_id, sort in ("name_desc", "email_desc"), lambda a: a.user_id)
+    if sort in ("name_asc", "name_desc"):
+        descending = sort == "name_desc"
+        return [
+            SortKey(UserAccount.first_name, descending, lambda a: a.first_name),
+            SortKey(UserAccount.last_name, descending, lambda a: a.last_name),
+            user_id_key,
+        ]
+    if sort in ("email_asc", "email_desc"):
+        return [SortKey(UserAccount.email, sort == "email_desc", lambda a: a.email), user_id_key]
+    return [user_id_key]
 
 
 @accounts_router.get("/users", response_model=PaginatedAccountsResponse)
@@ -52,45 +72,35 @@ def get_all_accounts(
     page_size: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
     search: Annotated[Optional[str], Query(max_length=200)] = None,
     user_type: Annotated[Optional[Literal["owner", "admin", "participant"]], Query()] = None,
-    sort: Annotated[
-        Optional[Literal[
-            "name_asc",
-            "name_desc",
-            "email_asc",
-            "email_desc",
-        ]],
-        Query(),
-    ] = None,
+    sort: Annotated[Optional[AccountSort], Query()] = None,
+    cursor: Annotated[Optional[str], Query(max_length=512)] = None,
+    include_total: Annotated[bool, Query()] = False,
 ):
     query = db.query(UserAccount)
 
-    if search and search.strip():
-        needle = f"%{search.strip()}%"
-        query = query.filter(
-            or_(
-                UserAccount.email.ilike(needle),
-                UserAccount.first_name.ilike(needle),
-                UserAccount.last_name.ilike(needle),
-            )
-        )
+    query = apply_text_search(
+        query,
+        search,
+        UserAccount.email,
+        UserAccount.first_name,
+        UserAccount.last_name,
+    )
 
     if user_type:
         query = query.filter(UserAccount.user_type == user_type)
 
-    if sort == "name_asc":
-        query = query.order_by(UserAccount.first_name.asc(), UserAccount.last_name.asc(), UserAccount.user_id.asc())
-    elif sort == "name_desc":
-        query = query.order_by(UserAccount.first_name.desc(), UserAccount.last_name.desc(), UserAccount.user_id.desc())
-    elif sort == "email_asc":
-        query = query.order_by(UserAccount.email.asc(), UserAccount.user_id.asc())
-    elif sort == "email_desc":
-        query = query.order_by(UserAccount.email.desc(), UserAccount.user_id.desc())
+    next_cursor = None
+    if cursor is not None:
+        total = estimate_total(db, query) if include_total else None
+        accounts, next_cursor = keyset_paginate(
+            query, build_account_keyset(sort), cursor, page_size, f"accounts:{sort or 'default'}"
+        )
+        page = None
     else:
-        query = query.order_by(UserAccount.user_id.asc())
-
-    total = query.count()
-    offset = (page - 1) * page_size
-    accounts = query.offset(offset).limit(page_size).all()
+        query = query.order_by(*build_keyset_order(build_account_keyset(sort)))
+        total = query.count()
+        offset = (page - 1) * page_size
+        accounts = query.offset(offset).limit(page_size).all()
 
     logger.info(
         "Fetched %s account(s) for page=%s, page_size=%s (total=%s).",
@@ -114,6 +124,7 @@ def get_all_accounts(
             }
             for account in accounts
         ],
+        "next_cursor": next_cursor,
     }
 
 
@@ -0,0 +1,137 @@
+"""
+Keyset (cursor) pagination shared by the admin and public list endpoints.
+
+The list endpoints default to `page`/`page_size` (OFFSET/LIMIT + COUNT(*)).
+Passing `cursor=` switches to keyset mode instead:
+
+    GET /questions/get-all-questions?cursor=            first page
+    GET /questions/get-all-questions?cursor=<next_cursor>
+
+Each page is fetched with a `WHERE (sort keys) > (last row's sort keys)`
+predicate and `LIMIT page_size + 1`, so deep pages cost the same as the first
+one and no COUNT(*) is issued. The total is only computed when the client asks
+for it (`include_total=true`); on PostgreSQL it is the planner's row estimate.
+
+Cursors are opaque, URL-safe tokens. They carry the sort they were issued
+for, so a cursor from one sort order is rejected on another.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Query, Session
+
+from database_operations.dialect import is_postgresql
+
+INVALID_CURSOR = "Invalid cursor."
+
+
+class SortKey(NamedTuple):
+    """One column of a keyset ordering; `value` reads it back from a result row."""
+    expression: Any
+    descending: bool
+    value: Callable[[Any], Any]
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(sort_id: str, values: list) -> str:
+    payload = json.dumps({"s": sort_id, "v": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_id: str, key_count: int) -> Optional[list]:
+    """
+    Return the sort-key values stored in a cursor, or None for an empty cursor
+    (the first page in keyset mode). Raises 400 for anything malformed.
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [_decode_value(v) for v in payload["v"]]
+        issued_for = payload["s"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_CURSOR)
+
+    if issued_for != sort_id or len(values) != key_count:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=INVALID_CURSOR)
+    return values
+
+
+def build_keyset_predicate(keys: list[SortKey], values: list):
+    """Rows strictly after `values` in the ordering described by `keys`."""
+    if len(keys) == 1:
+        key = keys[0]
+        return key.expression < values[0] if key.descending else key.expression > values[0]
+
+    if len({key.descending for key in keys}) == 1:
+        # Uniform direction: a row-value comparison, which PostgreSQL can
+        # answer straight from a composite index.
+        row = tuple_(*(key.expression for key in keys))
+        bound = tuple_(*values)
+        return row < bound if keys[0].descending else row > bound
+
+    clauses = []
+    for index, key in enumerate(keys):
+        equal_prefix = [prev.expression == value for prev, value in zip(keys[:index], values[:index])]
+        after = key.expression < values[index] if key.descending else key.expression > values[index]
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
+
+
+def build_keyset_order(keys: list[SortKey]) -> list:
+    return [key.expression.desc() if key.descending else key.expression.asc() for key in keys]
+
+
+def keyset_paginate(
+    query: Query,
+    keys: list[SortKey],
+    cursor: str,
+    page_size: int,
+    sort_id: str,
+) -> tuple[list, Optional[str]]:
+    """Fetch one keyset page. Returns (items, next_cursor); next_cursor is None on the last page."""
+    values = decode_cursor(cursor, sort_id, len(keys))
+    if values is not None:
+        query = query.filter(build_keyset_predicate(keys, values))
+
+    rows = query.order_by(*build_keyset_order(keys)).limit(page_size + 1).all()
+    if len(rows) <= page_size:
+        return rows, None
+
+    items = rows[:page_size]
+    last = items[-1]
+    return items, encode_cursor(sort_id, [key.value(last) for key in keys])
+
+
+def estimate_total(db: Session, query: Query) -> int:
+    """
+    Row count for a filtered (unordered, unpaginated) query.
+
+    PostgreSQL: the planner estimate from EXPLAIN, which costs no scan and
+    is good enough for "about N results". Elsewhere: an exact COUNT(*).
+    """
+    if not is_postgresql(db):
+        return query.count()
+
+    bind = db.get_bind()
+    compiled = query.statement.compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
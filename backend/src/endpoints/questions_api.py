@@ -2,20 +2,51 @@ from typing import Annotated, Literal, Optional, List, Any as AnyJSONNode
 from datetime import datetime, timezone
 from email.utils import format_datetime, parsedate_to_datetime
 from hashlib import sha256
-from fastapi import APIRouter, Depends, HTTPException, Body, Query, Response, Request
-from pydantic import BaseModel, Field, ConfigDict, model_validator
-from sqlalchemy import or_, func
-from sqlalchemy.orm import Session
+import os
+import tempfile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Body, Query, Response, Request, UploadFile
+from pydantic import BaseModel, Field, ConfigDict, SerializeAsAny, model_validator
+from sqlalchemy.orm import Session, noload, selectinload
 from sqlalchemy.exc import IntegrityError, DataError
-from models.schema import Language, Question, QuestionLanguageSpecificProperties, QuestionInstance, Riddle, Tag, TestCase
+from models.schema import Language, Question, QuestionLanguageSpecificProperties, QuestionInstance, Riddle, Tag, TestCase, TestCasePayload
 from database_operations.database import get_db
 import logging
 from services.posthog_analytics import track_custom_event
+from services.catalogue_version import QUESTIONS_CATALOGUE, bump_catalogue_version, get_catalogue_version
+from services.question_import import IMPORT_CHUNK_SIZE, bulk_import_questions
+from services.question_update import apply_question_update
+from services.test_case_storage import (
+    describe_test_case,
+    load_payloads,
+    payload_refs,
+    prepare_test_case_rows,
+    prune_orphan_payloads,
+    question_payload_refs,
+    resolve_test_case,
+)
+from services.question_import_jobs import (
+    QuestionImportJob,
+    create_import_job,
+    get_import_job,
+    run_question_import_job,
+)
+from services.response_cache import (
+    QUESTIONS_TAG,
+    build_cache_key,
+    cached_json_response,
+    invalidate_tags,
+    question_tag,
+)
+from endpoints.pagination_utils import SortKey, estimate_total, keyset_paginate
+from endpoints.search_utils import apply_text_search, build_search_rank, normalize_search
 
 logger = logging.getLogger(__name__)
 questions_router = APIRouter(tags=["Questions"])
 DEFAULT_PAGE_SIZE = 25
 MAX_PAGE_SIZE = 100
+MAX_IMPORT_CHUNK_SIZE = 1000
+MAX_IMPORT_FILE_MB = int(os.getenv("QUESTION_IMPORT_MAX_MB", "200"))
+IMPORT_READ_SIZE = 1024 * 1024
 
 class TagResponse(BaseModel):
     tag_id: int
@@ -35,12 +66,38 @@ class TestCaseResponse(BaseModel):
     expected_output: AnyJSONNode
 
     @staticmethod
-    def from_testcase(tc: TestCase):
+    def from_testcase(tc: TestCase, payloads: Optional[dict] = None):
+        input_data, expected_output = resolve_test_case(tc, payloads or {})
         return TestCaseResponse(
             test_case_id=getattr(tc, "test_case_id", 0),
             question_id=getattr(tc, "question_id", 0),
-            input_data=getattr(tc, "input_data", None),
-            expected_output=getattr(tc, "expected_output", None)
+            input_data=input_data,
+            expected_output=expected_output
+        )
+
+class TestCaseSummaryResponse(TestCaseResponse):
+    """
+    Listing form of a test case: sizes and hashes of both payloads. Payloads
+    stored in test_case_payload are left out (null) and can be fetched from
+    /testcase/payload/{hash}; small inline payloads are included as is.
+    """
+    input_hash: str
+    output_hash: str
+    input_size: Optional[int] = None
+    output_size: Optional[int] = None
+
+    @staticmethod
+    def from_testcase(tc: TestCase, payloads: Optional[dict] = None):
+        description = describe_test_case(tc)
+        return TestCaseSummaryResponse(
+            test_case_id=getattr(tc, "test_case_id", 0),
+            question_id=getattr(tc, "question_id", 0),
+            input_data=None if description["input_external"] else getattr(tc, "input_data", None),
+            expected_output=None if description["output_external"] else getattr(tc, "expected_output", None),
+            input_hash=description["input_hash"],
+            output_hash=description["output_hash"],
+            input_size=description["input_size"],
+            output_size=description["output_size"],
         )
 
 class QuestionLanguageSpecificPropertiesResponse(BaseModel):
@@ -73,14 +130,20 @@ class QuestionListItemResponse(BaseModel):
     media: str | None = None
     difficulty: str
     language_specific_properties: List[QuestionLanguageSpecificPropertiesResponse]
-    test_cases: List[TestCaseResponse]
+    # None when the listing was requested without include=test_cases.
+    test_cases: Optional[List[SerializeAsAny[TestCaseResponse]]] = None
     created_at: str
     last_modified_at: str
     show_on_frontpage: bool = False
     tags: List[TagResponse]
 
     @staticmethod
-    def from_question(question: Question) -> "QuestionListItemResponse":
+    def from_question(
+        question: Question,
+        include_test_cases: bool = True,
+        payloads: Optional[dict] = None,
+        summarize_test_cases: bool = False,
+    ) -> "QuestionListItemResponse":
         # Support both persisted/mutated flag and relationship-derived fallback.
         instance_frontpage_flag = any(
             getattr(instance, "event_id", None) is None
@@ -96,7 +159,11 @@ class QuestionListItemResponse(BaseModel):
                 QuestionLanguageSpecificPropertiesResponse.from_question_language_specific_properties(qlsp)
                 for qlsp in getattr(question, "language_specific_properties", [])
             ],
-            test_cases=[TestCaseResponse.from_testcase(tc) for tc in getattr(question, "test_cases", [])],
+            test_cases=[
+                TestCaseSummaryResponse.from_testcase(tc) if summarize_test_cases
+                else TestCaseResponse.from_testcase(tc, payloads)
+                for tc in getattr(question, "test_cases", [])
+            ] if include_test_cases else None,
             created_at=question.created_at.isoformat(),
             last_modified_at=question.last_modified_at.isoformat(),
             show_on_frontpage=bool(getattr(question, "show_on_frontpage", False) or instance_frontpage_flag),
@@ -105,10 +172,11 @@ class QuestionListItemResponse(BaseModel):
 
 
 class PaginatedQuestionsResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int]
+    page: Optional[int]
     page_size: int
     items: list[QuestionListItemResponse]
+    next_cursor: Optional[str] = None
 
 
 class RiddleListItemResponse(BaseModel):
@@ -125,13 +193,6 @@ class PaginatedRiddlesResponse(BaseModel):
     items: list[RiddleListItemResponse]
 
 
-def apply_text_search(query, search: Optional[str], *columns):
-    if search and search.strip():
-        needle = f"%{search.strip()}%"
-        query = query.filter(or_(*(column.ilike(needle) for column in columns)))
-    return query
-
-
 def paginate_query(query, page: int, page_size: int):
     total = query.count()
     offset = (page - 1) * page_size
@@ -139,12 +200,19 @@ def paginate_query(query, page: int, page_size: int):
     return total, items
 
 
-def build_paginated_response(total: int, page: int, page_size: int, items: list[dict]) -> dict:
+def build_paginated_response(
+    total: Optional[int],
+    page: Optional[int],
+    page_size: int,
+    items: list[dict],
+    next_cursor: Optional[str] = None,
+) -> dict:
     return {
         "total": total,
         "page": page,
         "page_size": page_size,
         "items": items,
+        "next_cursor": next_cursor,
     }
 
 
@@ -157,12 +225,13 @@ def serialize_riddle(riddle: Riddle) -> dict:
     }
 
 
-def serialize_test_case(test_case: TestCase) -> dict:
+def serialize_test_case(test_case: TestCase, payloads: Optional[dict] = None) -> dict:
+    input_data, expected_output = resolve_test_case(test_case, payloads or {})
     return {
         "test_case_id": test_case.test_case_id,
         "question_id": test_case.question_id,
-        "input_data": test_case.input_data,
-        "expected_output": test_case.expected_output,
+        "input_data": input_data,
+        "expected_output": expected_output,
     }
 
 
@@ -185,32 +254,18 @@ def normalize_latest_modified(latest_modified: Optional[datetime]) -> datetime:
     return latest_modified.replace(microsecond=0)
 
 
-def build_cache_headers(
-    total: int,
-    max_question_id: int,
-    sum_question_ids: int,
-    latest_modified: datetime,
-    frontpage_count: int = 0,
-    frontpage_max_instance_id: int = 0,
-    frontpage_sum_question_ids: int = 0,
-) -> dict:
+def build_cache_headers(catalogue_version: int, latest_modified: datetime) -> dict:
     """
     Build cache-related HTTP headers for the questions response.
 
     Args:
-        total: Total count of questions matching the query
-        max_question_id: Maximum question ID in the dataset
-        sum_question_ids: Sum of all question IDs matching the query
-        latest_modified: Latest modification timestamp (UTC, no microseconds)
+        catalogue_version: Current question catalogue version (see services/catalogue_version.py)
+        latest_modified: Time of the last catalogue change (UTC, no microseconds)
 
     Returns:
         Dict containing Cache-Control, Last-Modified, and ETag headers
     """
-    etag_seed = (
-        f"questions:{total}:{max_question_id}:{sum_question_ids}:"
-        f"{int(latest_modified.timestamp())}:"
-        f"frontpage:{frontpage_count}:{frontpage_max_instance_id}:{frontpage_sum_question_ids}"
-    )
+    etag_seed = f"questions:v{catalogue_version}:{int(latest_modified.timestamp())}"
     etag = f'W/"{sha256(etag_seed.encode("utf-8")).hexdigest()}"'
     return {
         "Cache-Control": "no-cache, must-revalidate",
@@ -332,50 +387,55 @@ def build_filtered_questions_query(
     return query
 
 
-def build_questions_cache_headers(query, db: Session) -> tuple[dict, datetime]:
-    # Fetch cache-related aggregates for current filtered question set.
-    total_for_cache, latest_modified, max_question_id, sum_question_ids = (
-        query.with_entities(
-            func.count(Question.question_id),
-            func.max(Question.last_modified_at),
-            func.max(Question.question_id),
-            func.sum(Question.question_id),
-        ).first()
-    )
+def build_questions_cache_headers(db: Session) -> tuple[dict, datetime]:
+    # The catalogue version is bumped by every question write (including
+    # frontpage toggles) and is served from an in-process cache, so
+    # validating a client's ETag normally costs no query at all.
+    version, updated_at = get_catalogue_version(db, QUESTIONS_CATALOGUE)
+    latest_modified = normalize_latest_modified(updated_at)
+    return build_cache_headers(version, latest_modified), latest_modified
 
-    total_for_cache = total_for_cache or 0
-    max_question_id = max_question_id or 0
-    sum_question_ids = sum_question_ids or 0
 
-    # Include frontpage state so ETag changes when QuestionInstance toggles happen.
-    frontpage_aggregates = (
-        db.query(
-            func.count(QuestionInstance.question_instance_id),
-            func.max(QuestionInstance.question_instance_id),
-            func.sum(QuestionInstance.question_id),
-        )
-        .filter(QuestionInstance.event_id.is_(None))
-        .first()
-        or (0, 0, 0)
-    )
-    frontpage_count = frontpage_aggregates[0] or 0
-    frontpage_max_instance_id = frontpage_aggregates[1] or 0
-    frontpage_sum_question_ids = frontpage_aggregates[2] or 0
-
-    latest_modified = normalize_latest_modified(latest_modified)
-    headers = build_cache_headers(
-        total_for_cache,
-        max_question_id,
-        sum_question_ids,
-        latest_modified,
-        frontpage_count,
-        frontpage_max_instance_id,
-        frontpage_sum_question_ids,
-    )
-    return headers, latest_modified
+def build_question_keyset(sort: Literal["asc", "desc"]) -> list[SortKey]:
+    return [SortKey(Question.question_id, sort == "desc", lambda question: question.question_id)]
+
 
+def build_question_listing_options(include_test_cases: bool) -> list:
+    """
+    Loader options for a page of questions: every relationship read by
+    QuestionListItemResponse.from_question is fetched with one SELECT ... IN
+    per relationship for the whole page instead of lazily per question.
 
-def apply_question_sort(query, sort: Literal["asc", "desc"]):
+    question_instances is not loaded at all; the frontpage flag comes from
+    populate_frontpage_flags' single query.
+    """
+    options = [
+        selectinload(Question.language_specific_properties).selectinload(QuestionLanguageSpecificProperties.language),
+        selectinload(Question.tags),
+        noload(Question.question_instances),
+    ]
+    if include_test_cases:
+        # Externalized payloads are listed by size and hash only; never load their data.
+        test_cases = selectinload(Question.test_cases)
+        options.extend([
+            test_cases.selectinload(TestCase.input_payload).load_only(
+                TestCasePayload.payload_hash, TestCasePayload.size_bytes),
+            test_cases.selectinload(TestCase.output_payload).load_only(
+                TestCasePayload.payload_hash, TestCasePayload.size_bytes),
+        ])
+    return options
+
+
+def apply_question_sort(
+    query,
+    sort: Literal["asc", "desc", "relevance"],
+    db: Optional[Session] = None,
+    search: Optional[str] = None,
+):
+    term = normalize_search(search)
+    if sort == "relevance" and term is not None and db is not None:
+        rank = build_search_rank(db, term, Question.question_name, Question.question_description)
+        return query.order_by(rank.desc(), Question.question_id.asc())
     if sort == "desc":
         return query.order_by(Question.question_id.desc())
     return query.order_by(Question.question_id.asc())
@@ -395,8 +455,9 @@ def get_question_by_id(question_id: int, db: Annotated[Session, Depends(get_db)]
         if not question:
             raise HTTPException(status_code=404, detail=f"Question with id {question_id} not found")
         populate_frontpage_flags(db, [question])
+        payloads = load_payloads(db, payload_refs(question.test_cases))
         logger.info(f"Fetched question with ID {question_id}")
-        return QuestionListItemResponse.from_question(question)
+        return QuestionListItemResponse.from_question(question, payloads=payloads)
     except HTTPException:
         raise
     except Exception as e:
@@ -410,41 +471,81 @@ def get_question_by_id(question_id: int, db: Annotated[Session, Depends(get_db)]
 )
 def get_all_questions(
     request: Request,
-    response: Response,
     db: Annotated[Session, Depends(get_db)],
     page: Annotated[int, Query(ge=1)] = 1,
     page_size: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
     search: Annotated[Optional[str], Query(max_length=200)] = None,
     difficulty: Annotated[Optional[Literal["easy", "medium", "hard"]], Query()] = None,
     frontpage_only: Annotated[bool, Query()] = False,
-    sort: Annotated[Literal["asc", "desc"], Query()] = "asc",
+    sort: Annotated[Literal["asc", "desc", "relevance"], Query()] = "asc",
+    cursor: Annotated[Optional[str], Query(max_length=512)] = None,
+    include_total: Annotated[bool, Query()] = False,
+    include: Annotated[Optional[Literal["test_cases"]], Query()] = None,
 ):
+    if cursor is not None and sort == "relevance":
+        raise HTTPException(status_code=400, detail="Cursor pagination is not available with sort=relevance.")
+
     try:
-        query = build_filtered_questions_query(db, search, difficulty, frontpage_only)
-        common_headers, latest_modified = build_questions_cache_headers(query, db)
+        common_headers, latest_modified = build_questions_cache_headers(db)
         etag = common_headers["ETag"]
 
         if check_cache_validators(request, etag, latest_modified):
             return Response(status_code=304, headers=common_headers)
 
-        query = apply_question_sort(query, sort)
-        total, questions = paginate_query(query, page, page_size)
-        populate_frontpage_flags(db, questions)
-        response.headers.update(common_headers)
-
-        logger.info(
-            "Fetched %s question(s) for page=%s, page_size=%s (total=%s).",
-            len(questions),
-            page,
-            page_size,
-            total,
-        )
-        return build_paginated_response(
-            total,
-            page,
-            page_size,
-            [QuestionListItemResponse.from_question(question) for question in questions],
-        )
+        def build_page() -> bytes:
+            query = build_filtered_questions_query(db, search, difficulty, frontpage_only)
+
+            include_test_cases = include == "test_cases"
+            page_number = page
+            next_cursor = None
+            if cursor is not None:
+                total = estimate_total(db, query) if include_total else None
+                query = query.options(*build_question_listing_options(include_test_cases))
+                questions, next_cursor = keyset_paginate(
+                    query, build_question_keyset(sort), cursor, page_size, f"questions:{sort}"
+                )
+                page_number = None
+            else:
+                query = apply_question_sort(query, sort, db, search)
+                query = query.options(*build_question_listing_options(include_test_cases))
+                total, questions = paginate_query(query, page, page_size)
+            populate_frontpage_flags(db, questions)
+
+            logger.info(
+                "Fetched %s question(s) for page=%s, page_size=%s (total=%s).",
+                len(questions),
+                page_number,
+                page_size,
+                total,
+            )
+            payload = build_paginated_response(
+                total,
+                page_number,
+                page_size,
+                [
+                    QuestionListItemResponse.from_question(question, include_test_cases, summarize_test_cases=True)
+                    for question in questions
+                ],
+                next_cursor,
+            )
+            return PaginatedQuestionsResponse.model_validate(payload).model_dump_json().encode("utf-8")
+
+        # The ETag embeds the catalogue version, so a bump also retires old entries.
+        cache_key = build_cache_key("questions", {
+            "etag": etag,
+            "page": page,
+            "page_size": page_size,
+            "search": search,
+            "difficulty": difficulty,
+            "frontpage_only": frontpage_only,
+            "sort": sort,
+            "cursor": cursor,
+            "include_total": include_total,
+            "include": include,
+        })
+        return cached_json_response(cache_key, [QUESTIONS_TAG], build_page, headers=common_headers)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching questions: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve questions.")
@@ -472,6 +573,8 @@ class CreateLanguageSpecificPropertiesRequest(BaseModel):
     template_code: str
 
 class CreateTestCaseRequest(BaseModel):
+    # Set when editing an existing test case, so update_question can match it by ID.
+    test_case_id: Optional[int] = None
     input_data: AnyJSONNode
     expected_output: AnyJSONNode
 
@@ -519,13 +622,11 @@ def get_question_from_request(db: Session, request: CreateQuestionRequest) -> Qu
         template_code=qlsp.template_code,
     ) for qlsp in request.language_specific_properties]
 
-    question.test_cases = []
-    for tc in request.test_cases:
-        question.test_cases.append(TestCase(
-            question_id=question.question_id,
-            input_data=tc.input_data,
-            expected_output=tc.expected_output
-        ))
+    test_case_rows = prepare_test_case_rows(db, [
+        {"input_data": tc.input_data, "expected_output": tc.expected_output}
+        for tc in request.test_cases
+    ])
+    question.test_cases = [TestCase(question_id=question.question_id, **row) for row in test_case_rows]
 
     return question
 
@@ -538,7 +639,9 @@ def upload_question(question_request: CreateQuestionRequest, db: Annotated[Sessi
     try:
         question = get_question_from_request(db, question_request)
         db.add(question)
+        bump_catalogue_version(db, QUESTIONS_CATALOGUE)
         db.commit()
+        invalidate_tags(QUESTIONS_TAG)
         db.refresh(question)
         logger.info(f"Uploaded new question with ID: {question.question_id}")
 
@@ -572,24 +675,36 @@ def upload_question_batch(
     error_message = None
     error_code = 500
     try:
-        questions = [
-            get_question_from_request(db, q) for q in question_request
-        ]
-        db.add_all(questions)
+        result = bulk_import_questions(db, question_request)
+        if not result.created:
+            db.rollback()
+            rejected = "; ".join(f"row {error.index}: {error.detail}" for error in result.errors)
+            raise HTTPException(status_code=400, detail=f"Failed to upload question batch: {rejected}")
+
+        bump_catalogue_version(db, QUESTIONS_CATALOGUE)
         db.commit()
-        logger.info(f"Uploaded batch of {len(questions)} questions.")
+        invalidate_tags(QUESTIONS_TAG)
+        logger.info(
+            f"Uploaded batch of {result.created} questions ({len(result.errors)} rejected)."
+        )
 
         # Track batch upload
         track_custom_event(
             user_id="admin",
             event_name="questions_batch_uploaded",
             properties={
-                "question_count": len(questions),
+                "question_count": result.created,
+                "rejected_count": len(result.errors),
                 "difficulties": [q.difficulty for q in question_request],
             }
         )
 
-        return {"message": f"Successfully uploaded {len(questions)} questions."}
+        return {
+            "message": f"Successfully uploaded {result.created} questions.",
+            **result.model_dump(),
+        }
+    except HTTPException:
+        raise
     except IntegrityError as e:
         error_message = getattr(e.orig, 'diag', {}).message_detail or "Duplicate entry found."
         error_code = 409
@@ -606,6 +721,64 @@ def upload_question_batch(
     db.rollback()
     raise HTTPException(status_code=error_code, detail=f"Failed to upload question batch: {error_message}")
 
+@questions_router.post(
+    "/import-questions", status_code=202, response_model=QuestionImportJob,
+    responses={
+        413: {"description": "Import file is too large."},
+        500: {"description": "Failed to start question import."},
+    }
+)
+async def import_questions_file(
+    background_tasks: BackgroundTasks,
+    file: Annotated[UploadFile, File()],
+    chunk_size: Annotated[int, Query(ge=1, le=MAX_IMPORT_CHUNK_SIZE)] = IMPORT_CHUNK_SIZE,
+):
+    """
+    Import a question bank file (NDJSON, or a JSON array of questions).
+
+    The upload is spooled to disk and imported in the background in chunks of
+    `chunk_size`; poll GET /import-questions/{job_id} for progress.
+    """
+    path = None
+    try:
+        with tempfile.NamedTemporaryFile(prefix="question-import-", suffix=".json", delete=False) as spool:
+            path = spool.name
+            size = 0
+            while chunk := await file.read(IMPORT_READ_SIZE):
+                size += len(chunk)
+                if size > MAX_IMPORT_FILE_MB * 1024 * 1024:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Import file is too large (max {MAX_IMPORT_FILE_MB} MB).",
+                    )
+                spool.write(chunk)
+
+        job = create_import_job(chunk_size)
+        background_tasks.add_task(run_question_import_job, job.job_id, path)
+        logger.info(f"Queued question import {job.job_id} ({size} bytes, chunks of {chunk_size}).")
+        return job
+    except HTTPException:
+        if path:
+            os.remove(path)
+        raise
+    except Exception as e:
+        if path and os.path.exists(path):
+            os.remove(path)
+        logger.error(f"Error starting question import: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start question import.")
+
+
+@questions_router.get(
+    "/import-questions/{job_id}", response_model=QuestionImportJob,
+    responses={404: {"description": "Import job not found."}}
+)
+def get_question_import_job(job_id: str):
+    job = get_import_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Import job {job_id} not found")
+    return job
+
+
 class BatchDeleteQuestionsRequest(BaseModel):
     question_ids: list[int]
 
@@ -652,7 +825,9 @@ def show_question_on_frontpage_by_id(
                 .delete(synchronize_session=False)
             )
 
+        bump_catalogue_version(db, QUESTIONS_CATALOGUE)
         db.commit()
+        invalidate_tags(QUESTIONS_TAG)
         return {
             "question_id": question_id,
             "show_on_frontpage": payload.should_show,
@@ -678,15 +853,20 @@ def batch_delete_questions(payload: BatchDeleteQuestionsRequest, db: Annotated[S
             .all()
         ]
         if existing_ids:
+            refs = question_payload_refs(db, existing_ids)
             deleted_count = (
                 db.query(Question)
                 .filter(Question.question_id.in_(existing_ids))
                 .delete(synchronize_session=False)
             )
+            prune_orphan_payloads(db, refs)
+            bump_catalogue_version(db, QUESTIONS_CATALOGUE)
         else:
             deleted_count = 0
 
         db.commit()
+        if existing_ids:
+            invalidate_tags(QUESTIONS_TAG, *(question_tag(question_id) for question_id in existing_ids))
         logger.info(f"Deleted {deleted_count} questions from the database.")
 
         existing_set = set(existing_ids)
@@ -719,49 +899,16 @@ def update_question(question_id: int, question_request: CreateQuestionRequest, d
                 status_code=404,
                 detail=f"Update failed: Question with id {question_id} not found"
             )
-        for old_qlsp in getattr(db_question, "language_specific_properties", []):
-            db.delete(old_qlsp)
-        db_question.language_specific_properties = []
-        for qlsp in question_request.language_specific_properties:
-            language = db.query(Language).filter(Language.display_name == qlsp.language_name).first()
-            if language is None:
-                continue
-            db_question.language_specific_properties.append(
-                QuestionLanguageSpecificProperties(
-                    question_id=db_question.question_id,
-                    language=language,
-                    imports=qlsp.imports,
-                    preset_classes=qlsp.preset_classes,
-                    preset_functions=qlsp.preset_functions,
-                    main_function=qlsp.main_function,
-                    template_code=qlsp.template_code,
-                )
-            )
-        
-        db_question.question_name=question_request.question_name
-        db_question.question_description=question_request.question_description
-        db_question.media=question_request.media
-        db_question.difficulty=question_request.difficulty
-        
-        existing_tags = db.query(Tag).filter(Tag.tag_name.in_(question_request.tags)).all()
-        existing_tag_names = [tag.tag_name for tag in existing_tags]
-        new_tags = [Tag(tag_name=tag_name) for tag_name in question_request.tags if tag_name not in existing_tag_names]
-        db_question.tags = existing_tags + new_tags
-        
-        for old_tc in getattr(db_question, "test_cases", []):
-            db.delete(old_tc)
-        
-        db_question.test_cases = []
-        for tc in question_request.test_cases:
-            db_question.test_cases.append(TestCase(
-                question_id=db_question.question_id,
-                input_data=tc.input_data,
-                expected_output=tc.expected_output
-            ))
+        summary = apply_question_update(db, db_question, question_request)
+        if not summary.changed:
+            logger.info(f"Question {question_id} unchanged; nothing to update.")
+            return
 
+        bump_catalogue_version(db, QUESTIONS_CATALOGUE)
         db.commit()
+        invalidate_tags(QUESTIONS_TAG, question_tag(question_id))
         db.refresh(db_question)
-        logger.info(f"Updated question: {question_id}")
+        logger.info(f"Updated question {question_id}: {summary.model_dump(exclude_defaults=True)}")
     except HTTPException:
         raise
     except Exception as e:
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from models.schema import Riddle
@@ -10,6 +10,14 @@ import time
 import re
 from urllib.parse import urlparse
 from services.posthog_analytics import track_custom_event
+from endpoints.pagination_utils import SortKey, estimate_total, keyset_paginate
+from services.response_cache import (
+    RIDDLES_TAG,
+    build_cache_key,
+    cached_json_response,
+    invalidate_tags,
+    serialize_json,
+)
 from pydantic import BaseModel
 
 from supabase import create_client, Client
@@ -43,10 +51,11 @@ class RiddleListItemResponse(BaseModel):
 
 
 class PaginatedRiddlesResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int]
+    page: Optional[int]
     page_size: int
     items: list[RiddleListItemResponse]
+    next_cursor: Optional[str] = None
 
 
 def serialize_riddle(riddle: Riddle) -> dict:
@@ -87,10 +96,15 @@ def _paginate_query(query, page: int, page_size: int):
     return total, items
 
 
-def _set_riddle_cache_headers(response: Response) -> None:
-    response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
+def _riddle_keyset() -> list[SortKey]:
+    return [SortKey(Riddle.riddle_id, True, lambda riddle: riddle.riddle_id)]
+
+
+RIDDLE_NO_STORE_HEADERS = {
+    "Cache-Control": "no-store, no-cache, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0",
+}
 
 
 def check_riddle_exists(db: Session, question: str) -> bool:
@@ -257,27 +271,49 @@ async def get_riddle_by_id(
     response_model=PaginatedRiddlesResponse,
 )
 async def list_riddles(
-    response: Response,
     db: Annotated[Session, Depends(get_db)],
     page: Annotated[int, Query(ge=1)] = 1,
     page_size: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
     search: Annotated[Optional[str], Query(max_length=200)] = None,
+    cursor: Annotated[Optional[str], Query(max_length=512)] = None,
+    include_total: Annotated[bool, Query()] = False,
 ):
     logger.info("Public user requesting riddles page=%s page_size=%s", page, page_size)
 
-    try:
+    def build_page() -> bytes:
         query = _apply_riddle_search(db.query(Riddle), search)
-        query = query.order_by(Riddle.riddle_id.desc())
-        total, riddles = _paginate_query(query, page, page_size)
-        _set_riddle_cache_headers(response)
+        page_number = page
+        next_cursor = None
+        if cursor is not None:
+            total = estimate_total(db, query) if include_total else None
+            riddles, next_cursor = keyset_paginate(query, _riddle_keyset(), cursor, page_size, "riddles")
+            page_number = None
+        else:
+            query = query.order_by(Riddle.riddle_id.desc())
+            total, riddles = _paginate_query(query, page, page_size)
+
+        return serialize_json(PaginatedRiddlesResponse(
+            total=total,
+            page=page_number,
+            page_size=page_size,
+            items=[serialize_riddle(r) for r in riddles],
+            next_cursor=next_cursor,
+        ))
 
-        return {
-            "total": total,
+    try:
+        # Browsers must not cache riddles (no-store), but the server-side
+        # cache is invalidated by every riddle write below.
+        cache_key = build_cache_key("riddles", {
             "page": page,
             "page_size": page_size,
-            "items": [serialize_riddle(r) for r in riddles],
-        }
+            "search": search,
+            "cursor": cursor,
+            "include_total": include_total,
+        })
+        return cached_json_response(cache_key, [RIDDLES_TAG], build_page, headers=RIDDLE_NO_STORE_HEADERS)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error retrieving riddles list: {str(e)}")
         raise HTTPException(
@@ -329,6 +365,7 @@ async def create_riddle(
 
         db.add(new_riddle)
         _commit_or_rollback(db)
+        invalidate_tags(RIDDLES_TAG)
         db.refresh(new_riddle)
 
         # Track riddle creation
@@ -380,6 +417,7 @@ async def edit_riddle(
         await _apply_file_update(riddle, file, remove_file)
 
         _commit_or_rollback(db)
+        invalidate_tags(RIDDLES_TAG)
         db.refresh(riddle)
 
         # Track riddle edit
@@ -428,6 +466,7 @@ async def delete_riddle(
 
         db.delete(riddle)
         _commit_or_rollback(db)
+        invalidate_tags(RIDDLES_TAG)
 
         # Track riddle deletion
         track_custom_event(
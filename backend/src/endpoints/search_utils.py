@@ -0,0 +1,75 @@
+"""
+Shared free-text search helpers for the admin listings (questions, accounts,
+competitions, algotime sessions).
+
+Search is a case-insensitive substring match (`ILIKE '%term%'`) across a few
+columns. On PostgreSQL every searched column carries a pg_trgm GIN index
+(migrations/versions/*_trigram_search_indexes.py), which the planner uses for
+ILIKE with a leading wildcard, so these filters no longer seq-scan. Relevance
+ranking uses pg_trgm's word_similarity() there.
+
+On other dialects (SQLite in tests and local dev) the same ILIKE filter runs
+unindexed and the rank falls back to exact / prefix / substring matches.
+"""
+from typing import Optional
+
+from sqlalchemy import case, func, literal, or_
+from sqlalchemy.orm import Query, Session
+
+from database_operations.dialect import is_postgresql
+
+LIKE_ESCAPE_CHAR = "\\"
+
+
+def normalize_search(search: Optional[str]) -> Optional[str]:
+    """Return the stripped search term, or None when there is nothing to search for."""
+    if search is None:
+        return None
+    search = search.strip()
+    return search or None
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input such as `100%` or `a_b` matches literally."""
+    return (
+        term.replace(LIKE_ESCAPE_CHAR, LIKE_ESCAPE_CHAR * 2)
+        .replace("%", f"{LIKE_ESCAPE_CHAR}%")
+        .replace("_", f"{LIKE_ESCAPE_CHAR}_")
+    )
+
+
+def build_search_filter(search: str, *columns):
+    """OR of `column ILIKE '%search%'` over columns; each is served by a trigram index on PostgreSQL."""
+    needle = f"%{escape_like(search)}%"
+    return or_(*(column.ilike(needle, escape=LIKE_ESCAPE_CHAR) for column in columns))
+
+
+def apply_text_search(query: Query, search: Optional[str], *columns) -> Query:
+    term = normalize_search(search)
+    if term is None:
+        return query
+    return query.filter(build_search_filter(term, *columns))
+
+
+def build_search_rank(db: Session, search: str, *columns):
+    """
+    Relevance score for ordering search results (higher is better).
+
+    PostgreSQL: greatest word_similarity() over the columns (pg_trgm).
+    Elsewhere: 3 for an exact match, 2 for a prefix match, 1 for a substring match.
+    """
+    term = normalize_search(search) or ""
+    if is_postgresql(db):
+        scores = [func.word_similarity(literal(term), func.coalesce(column, "")) for column in columns]
+        return scores[0] if len(scores) == 1 else func.greatest(*scores)
+
+    lowered = term.lower()
+    escaped = escape_like(lowered)
+    whens = []
+    for score, pattern in ((3, None), (2, f"{escaped}%"), (1, f"%{escaped}%")):
+        for column in columns:
+            if pattern is None:
+                whens.append((func.lower(column) == lowered, score))
+            else:
+                whens.append((func.lower(column).like(pattern, escape=LIKE_ESCAPE_CHAR), score))
+    return case(*whens, else_=0)
@@ -1,5 +1,7 @@
 from typing import Annotated, List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 import logging
 
@@ -10,12 +12,16 @@ from endpoints.questions_api import (
     TestCaseResponse,
     serialize_test_case
 )
+from services.response_cache import TESTCASES_TAG, build_cache_key, cached_json_response, question_tag
+from services.test_case_storage import get_payload, iter_payload_chunks, load_payloads, payload_refs
 
 logger = logging.getLogger(__name__)
 
 
 testcase_router = APIRouter(tags=["TestCases"])
 
+_test_case_list_adapter = TypeAdapter(List[TestCaseResponse])
+
 @testcase_router.get(
     "/get-all-testcases/{question_id}",
     response_model=List[TestCaseResponse],
@@ -26,20 +32,59 @@ testcase_router = APIRouter(tags=["TestCases"])
 )
 def get_all_testcases(question_id: int, db: Annotated[Session, Depends(get_db)]):
     """Retrieve all test cases for a specific question."""
-    try:
+    def build_body() -> bytes:
         # Check if question exists first to provide a better error message
         question_exists = db.query(Question).filter(Question.question_id == question_id).first()
         if not question_exists:
             raise HTTPException(status_code=404, detail=f"Question {question_id} not found")
 
         testcases = db.query(TestCase).filter_by(question_id=question_id).all()
+        payloads = load_payloads(db, payload_refs(testcases))
         logger.info(f"Fetched {len(testcases)} test cases for question {question_id}")
-        
+
         # Using your existing serialization helper
-        return [serialize_test_case(tc) for tc in testcases]
+        items = _test_case_list_adapter.validate_python([serialize_test_case(tc, payloads) for tc in testcases])
+        return _test_case_list_adapter.dump_json(items)
+
+    try:
+        # Invalidated by question writes through question_tag(question_id).
+        cache_key = build_cache_key("testcases", {"question_id": question_id})
+        return cached_json_response(cache_key, [TESTCASES_TAG, question_tag(question_id)], build_body)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error fetching test cases: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve test cases.")
 
+
+@testcase_router.get(
+    "/payload/{payload_hash}",
+    responses={
+        200: {"content": {"application/json": {}}, "description": "The payload's JSON value."},
+        304: {"description": "Not modified."},
+        404: {"description": "Payload not found."},
+        500: {"description": "Failed to retrieve test case payload."}
+    }
+)
+def get_test_case_payload(
+    payload_hash: Annotated[str, Path(pattern=r"^[0-9a-f]{64}$")],
+    request: Request,
+    db: Annotated[Session, Depends(get_db)],
+):
+    """Stream a large test case input/output by the hash listed in input_hash / output_hash."""
+    # Payloads are content-addressed, so a hash always names the same bytes.
+    headers = {"ETag": f'"{payload_hash}"', "Cache-Control": "public, max-age=31536000, immutable"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        payload = get_payload(db, payload_hash)
+        if payload is None:
+            raise HTTPException(status_code=404, detail=f"Payload {payload_hash} not found")
+        headers["Content-Length"] = str(payload.size_bytes)
+        return StreamingResponse(iter_payload_chunks(payload), media_type="application/json", headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching test case payload {payload_hash}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve test case payload.")
@@ -32,12 +32,22 @@ from services.competition_cleanup import cleanup_ended_competitions
 from services.algotime_cleanup import cleanup_ended_algotime_sessions
 from services.posthog_analytics import init_posthog, track_api_call, shutdown_posthog
 from services.email_scheduler import run_scheduled_emails
+from services.bulk_email import close_bulk_email_client
+from services.daily_statistics import ROLLUP_INTERVAL_HOURS, refresh_daily_statistics
+from services.session_recorder import (
+    FLUSH_INTERVAL_SECONDS,
+    flush_pending_sessions,
+    prune_expired_sessions,
+)
+from services.job_runner import create_scheduler, schedule_job, shutdown_scheduler
+from services.scheduler_leader import SchedulerLeadership
+from database_operations.database import engine
 from contextlib import asynccontextmanager
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import os
 from dotenv import load_dotenv
 import logging
 import time
+from datetime import datetime, timezone
 
 
 load_dotenv()
@@ -54,10 +64,17 @@ async def lifespan(app: FastAPI):
     init_posthog()
     logger.info("✓ PostHog analytics initialized")
 
-    scheduler = AsyncIOScheduler()
-    scheduler.add_job(run_scheduled_emails, "interval", minutes=1, id="email_scheduler")
-    scheduler.add_job(cleanup_ended_competitions, "interval", weeks=1, id="competition_cleanup")
-    scheduler.add_job(cleanup_ended_algotime_sessions, "interval", hours=1, id="algotime_cleanup")
+    # Every worker schedules the jobs; only the leader process runs them.
+    scheduler = create_scheduler(SchedulerLeadership(engine))
+    schedule_job(scheduler, run_scheduled_emails, "interval", id="email_scheduler", minutes=1)
+    schedule_job(scheduler, cleanup_ended_competitions, "interval", id="competition_cleanup", weeks=1)
+    schedule_job(scheduler, cleanup_ended_algotime_sessions, "interval", id="algotime_cleanup", hours=1)
+    # Drains this process's in-memory login queue, so every worker runs it.
+    schedule_job(scheduler, flush_pending_sessions, "interval", id="session_flush", leader_only=False,
+                 seconds=FLUSH_INTERVAL_SECONDS)
+    schedule_job(scheduler, prune_expired_sessions, "interval", id="session_prune", days=1)
+    schedule_job(scheduler, refresh_daily_statistics, "interval", id="daily_statistics_rollup",
+                 hours=ROLLUP_INTERVAL_HOURS, next_run_time=datetime.now(timezone.utc))
     scheduler.start()
     logger.info("✓ Email scheduler started (polling every 60s)")
 
@@ -65,8 +82,11 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("🛑 Shutting down...")
-    scheduler.shutdown(wait=False)
+    shutdown_scheduler(scheduler)
     logger.info("✓ Email scheduler stopped")
+    await close_bulk_email_client()
+    flush_pending_sessions()
+    logger.info("✓ Pending login sessions flushed")
     shutdown_posthog()
     logger.info("✓ PostHog analytics shut down")
 
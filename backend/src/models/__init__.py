@@ -8,12 +8,15 @@ from .schema import (
     AlgoTimeSession,
     Question,
     TestCase,
+    TestCasePayload,
     Tag,
     Riddle,
     QuestionInstance,
     Submission,
     CompetitionLeaderboardEntry,
     AlgoTimeLeaderboardEntry,
+    DailyStatistics,
+    EmailOutbox,
 )
 
 __all__ = [
@@ -26,11 +29,14 @@ __all__ = [
     "AlgoTimeSession",
     "Question",
     "TestCase",
+    "TestCasePayload",
     "Tag",
     "Riddle",
     "QuestionInstance",
     "Submission",
     "CompetitionLeaderboardEntry",
     "AlgoTimeLeaderboardEntry",
+    "DailyStatistics",
+    "EmailOutbox",
     
 ]
@@ -1,10 +1,10 @@
 from __future__ import annotations
-from sqlalchemy import CheckConstraint, Column, DateTime, Enum, ForeignKey, Integer, Table, UniqueConstraint
+from sqlalchemy import CheckConstraint, Column, Date, DateTime, Enum, ForeignKey, Index, Integer, LargeBinary, String, Table, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from database_operations.db import Base
 from typing import List, Optional, Any
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
 # Foreign key reference constants
 FK_USER_ACCOUNT_USER_ID = 'user_account.user_id'
@@ -40,6 +40,10 @@ class UserAccount(Base):
                                                                                back_populates='user_account',
                                                                                uselist=True)
 
+    __table_args__ = (
+        Index('ix_user_account_created_at', 'created_at'),
+    )
+
 
 class UserPreferences(Base):
     __tablename__ = 'user_preferences'
@@ -59,13 +63,22 @@ class UserSession(Base):
 
     session_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey(FK_USER_ACCOUNT_USER_ID))
-    jwt_token: Mapped[str] = mapped_column(unique=True)
+    # SHA-256 hex digest of the access token (see services/session_recorder.py), not the raw JWT.
+    jwt_token: Mapped[str] = mapped_column(String(64), unique=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.now(timezone.utc))
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     is_active: Mapped[bool] = mapped_column(default=True)
 
     user_account: Mapped[UserAccount] = relationship('UserAccount', back_populates='sessions', uselist=False)
 
+    __table_args__ = (
+        Index('ix_user_session_created_at', 'created_at'),
+        Index('ix_user_session_expires_at', 'expires_at'),
+        # logout only ever touches the user's active sessions
+        Index('ix_user_session_user_active', 'user_id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active')),
+    )
+
 
 class BaseEvent(Base):
     __tablename__ = 'base_event'
@@ -79,6 +92,9 @@ class BaseEvent(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.now(timezone.utc))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.now(timezone.utc),
                                                  onupdate=datetime.now(timezone.utc))
+    # Set by the cleanup jobs once the event's question instances are purged;
+    # reset when an edit could give the event new instances.
+    cleaned_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     competition: Mapped[Optional[Competition]] = relationship('Competition', back_populates='base_event', uselist=False, passive_deletes=True)
     algotime: Mapped[Optional[AlgoTimeSession]] = relationship('AlgoTimeSession', back_populates='base_event',
@@ -88,6 +104,10 @@ class BaseEvent(Base):
 
     __table_args__ = (
         CheckConstraint('event_end_date > event_start_date', name='chk_event_dates'),
+        Index('ix_base_event_dates', 'event_start_date', 'event_end_date'),
+        Index('ix_base_event_end_date', 'event_end_date'),
+        Index('ix_base_event_pending_cleanup', 'event_end_date',
+              postgresql_where=text('cleaned_at IS NULL'), sqlite_where=text('cleaned_at IS NULL')),
     )
 
 
@@ -124,6 +144,28 @@ class CompetitionEmail(Base):
     competition: Mapped[Competition] = relationship('Competition', back_populates='emails', uselist=False)
 
 
+class EmailOutbox(Base):
+    """One delivery of a competition email to one recipient, drained by services/email_outbox.py."""
+    __tablename__ = 'email_outbox'
+
+    outbox_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    email_id: Mapped[int] = mapped_column(ForeignKey('competition_email.email_id', ondelete='CASCADE'))
+    recipient: Mapped[str] = mapped_column()
+    kind: Mapped[str] = mapped_column(String(16))  # '24h', '5min' or 'custom'
+    status: Mapped[str] = mapped_column(String(16), default='pending')  # 'pending', 'sent' or 'failed'
+    attempts: Mapped[int] = mapped_column(default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    last_error: Mapped[Optional[str]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('email_id', 'recipient', 'kind', name='uix_email_outbox_delivery'),
+        Index('ix_email_outbox_pending', 'next_attempt_at',
+              postgresql_where=text("status = 'pending'"), sqlite_where=text("status = 'pending'")),
+    )
+
+
 class AlgoTimeSeries(Base):
     __tablename__ = 'algotime_series'
     algotime_series_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -198,8 +240,37 @@ class TestCase(Base):
     question_id: Mapped[int] = mapped_column(ForeignKey(FK_QUESTION_QUESTION_ID, ondelete='CASCADE'))
     input_data: Mapped[Any] = mapped_column(JSONB)
     expected_output: Mapped[Any] = mapped_column(JSONB)
+    # Set when the payload is too large to keep inline; input_data / expected_output are then null.
+    input_ref: Mapped[Optional[str]] = mapped_column(
+        String(64), ForeignKey('test_case_payload.payload_hash'), nullable=True)
+    output_ref: Mapped[Optional[str]] = mapped_column(
+        String(64), ForeignKey('test_case_payload.payload_hash'), nullable=True)
 
     question: Mapped[Question] = relationship('Question', back_populates='test_cases', uselist=False)
+    input_payload: Mapped[Optional[TestCasePayload]] = relationship(
+        'TestCasePayload', foreign_keys=[input_ref], uselist=False)
+    output_payload: Mapped[Optional[TestCasePayload]] = relationship(
+        'TestCasePayload', foreign_keys=[output_ref], uselist=False)
+
+    __table_args__ = (
+        # Orphan checks look payloads up by ref; most test cases have none.
+        Index('ix_test_case_input_ref', 'input_ref',
+              postgresql_where=text('input_ref IS NOT NULL'), sqlite_where=text('input_ref IS NOT NULL')),
+        Index('ix_test_case_output_ref', 'output_ref',
+              postgresql_where=text('output_ref IS NOT NULL'), sqlite_where=text('output_ref IS NOT NULL')),
+    )
+
+
+class TestCasePayload(Base):
+    """Compressed, content-addressed test case payload shared by every test case with the same content."""
+    __tablename__ = 'test_case_payload'
+
+    payload_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    encoding: Mapped[str] = mapped_column(String(16))
+    size_bytes: Mapped[int] = mapped_column()
+    compressed_size: Mapped[int] = mapped_column()
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
 
 class Tag(Base):
@@ -246,7 +317,13 @@ class QuestionInstance(Base):
     event: Mapped[BaseEvent] = relationship('BaseEvent', back_populates='question_instances', uselist=False)
     user_question_instances: Mapped[List[UserQuestionInstance]] = relationship('UserQuestionInstance', back_populates='question_instance', uselist=True)
 
-    __table_args__ = (UniqueConstraint('question_id', 'event_id', name='uix_question_instance'),)
+    __table_args__ = (
+        UniqueConstraint('question_id', 'event_id', name='uix_question_instance'),
+        Index('ix_question_instance_event_riddle', 'event_id', 'riddle_id'),
+        # frontpage questions are the instances without an event (populate_frontpage_flags)
+        Index('ix_question_instance_frontpage', 'question_id',
+              postgresql_where=text('event_id IS NULL'), sqlite_where=text('event_id IS NULL')),
+    )
 
 class UserQuestionInstance(Base):
     __tablename__ = 'user_question_instance'
@@ -267,6 +344,11 @@ class UserQuestionInstance(Base):
     submissions: Mapped[List[Submission]] = relationship('Submission', back_populates='user_question_instance', uselist=True)
     most_recent_submission: Mapped[MostRecentSubmission] = relationship('MostRecentSubmission', back_populates='user_question_instance', uselist=False)
 
+    __table_args__ = (
+        Index('ix_user_question_instance_user_instance', 'user_id', 'question_instance_id'),
+        Index('ix_user_question_instance_question_instance_id', 'question_instance_id'),
+    )
+
 class Submission(Base):
     __tablename__ = 'submission'
 
@@ -286,6 +368,11 @@ class Submission(Base):
     user_question_instance: Mapped[UserQuestionInstance] = relationship('UserQuestionInstance', back_populates='submissions',
                                                                uselist=False)
 
+    __table_args__ = (
+        Index('ix_submission_uqi_submitted_on', 'user_question_instance_id', 'submitted_on'),
+        Index('ix_submission_submitted_on', 'submitted_on'),
+    )
+
 class MostRecentSubmission(Base):
     __tablename__ = 'most_recent_submission'
 
@@ -357,4 +444,27 @@ class LongTermStatistics(Base):
 
     __table_args__ = (
         UniqueConstraint('event_id', 'difficulty', name='uix_long_term_stats_event_difficulty'),
-    )
\ No newline at end of file
+    )
+
+class CatalogueVersion(Base):
+    """One row per cached catalogue; version is bumped by every write to that catalogue."""
+    __tablename__ = 'catalogue_version'
+
+    catalogue_name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    version: Mapped[int] = mapped_column(default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class DailyStatistics(Base):
+    """Per-day (UTC) dashboard counters, rolled up by services/daily_statistics.py."""
+    __tablename__ = 'daily_statistics'
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    new_accounts: Mapped[int] = mapped_column(default=0)
+    logins: Mapped[int] = mapped_column(default=0)
+    competition_submissions: Mapped[int] = mapped_column(default=0)
+    algotime_submissions: Mapped[int] = mapped_column(default=0)
+    # Set once the day is over; final rows are never recomputed, so they
+    # survive the cleanup jobs purging the underlying submissions.
+    is_final: Mapped[bool] = mapped_column(default=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
@@ -10,9 +10,11 @@ as they are cumulative across sessions and are only reset manually via the
 DELETE /leaderboards/algotime/reset endpoint at end of semester.
 
 Scheduled to run every hour from main.py.
-Similar to competition_cleanup.py
+Similar to competition_cleanup.py (including the cleaned_at watermark, the
+submission archive, the chunked purge and the "cleanup_job_completed" report)
 """
 import logging
+import time
 from datetime import datetime, timezone
 
 from sqlalchemy.orm import Session
@@ -24,43 +26,56 @@ from models.schema import (
     BaseEvent,
     QuestionInstance,
 )
+from services.daily_statistics import rollup_event_submission_days
+from services.posthog_analytics import track_custom_event
+from services.question_instance_purge import purge_event_question_instances
+from services.submission_archive import archive_event_submissions
 from services.long_term_statistics_upsert import (
-    upsert_long_term_stats_for_events,
+    upsert_long_term_stats_for_unpurged_events,
 )
 
 logger = logging.getLogger(__name__)
 def cleanup_ended_algotime_sessions() -> None:
     """
-    Finds all AlgoTime sessions that have ended and deletes their QuestionInstance rows.
+    Finds the AlgoTime sessions that have ended since the last run and deletes their QuestionInstance rows.
 
-    Cascade chain (defined in schema.py ForeignKeys):
-        QuestionInstance (deleted here)
+    Cascade chain (defined in schema.py ForeignKeys), purged bottom-up in
+    committed batches by question_instance_purge.py:
+        QuestionInstance
             └── UserQuestionInstance     ON DELETE CASCADE
                     ├── Submission            ON DELETE CASCADE
                     └── MostRecentSubmission  ON DELETE CASCADE
 
-    Safe to run repeatedly — if a session was already cleaned up, the query
-    returns no rows and nothing happens.
+    Safe to run repeatedly — a session that was already cleaned up has
+    cleaned_at set and is not selected again.
     """
     db: Session = next(get_db())
+    started = time.perf_counter()
+    ended_event_ids: list[int] = []
+    deleted = 0
+    rows_deleted = 0
+    rows_archived = 0
+    upserted_stats = 0
+    purge_complete = True
+    failed = False
 
     try:
         now = datetime.now(timezone.utc)
 
-        ended_event_ids: list[int] = (
+        pending_rows = (
             db.query(BaseEvent.event_id)
             .join(AlgoTimeSession, AlgoTimeSession.event_id == BaseEvent.event_id)
-            .filter(BaseEvent.event_end_date < now)
+            .filter(BaseEvent.event_end_date < now, BaseEvent.cleaned_at.is_(None))
             .all()
         )
 
-        if not ended_event_ids:
-            logger.debug("AlgoTime cleanup: no ended sessions found.")
+        if not pending_rows:
+            logger.debug("AlgoTime cleanup: no newly ended sessions found.")
             return
 
-        ended_event_ids = [row.event_id for row in ended_event_ids]
+        ended_event_ids = [row.event_id for row in pending_rows]
 
-        upserted_stats = upsert_long_term_stats_for_events(db, ended_event_ids)
+        upserted_stats = upsert_long_term_stats_for_unpurged_events(db, ended_event_ids)
 
         instances_to_delete = (
             db.query(QuestionInstance)
@@ -68,40 +83,73 @@ def cleanup_ended_algotime_sessions() -> None:
             .count()
         )
 
-        if instances_to_delete == 0:
-            if upserted_stats > 0:
-                db.commit()
-            logger.debug(
-                "AlgoTime cleanup: ended sessions found %s, "
-                "but QuestionInstances already cleaned up. Upserted %d long-term stat row(s).",
-                ended_event_ids,
-                upserted_stats,
+        if instances_to_delete > 0:
+            # Capture the submissions about to be purged in the dashboard rollup
+            # (committed with the first purge batch).
+            rollup_event_submission_days(db, ended_event_ids)
+            # Keep the per-submission history offline before it is destroyed.
+            rows_archived = sum(archive_event_submissions(db, ended_event_ids).values())
+
+            purge = purge_event_question_instances(db, ended_event_ids)
+            deleted = purge.question_instances_deleted
+            rows_deleted = sum(purge.deleted.values())
+            purge_complete = purge.complete
+
+        cleaned_event_ids = ended_event_ids
+        if not purge_complete:
+            # Out of time: only stamp the events with nothing left, the rest resume next tick.
+            remaining = {
+                row.event_id
+                for row in db.query(QuestionInstance.event_id)
+                .filter(QuestionInstance.event_id.in_(ended_event_ids))
+                .distinct()
+            }
+            cleaned_event_ids = [event_id for event_id in ended_event_ids if event_id not in remaining]
+
+        # Watermark: later runs skip these events.
+        if cleaned_event_ids:
+            db.query(BaseEvent).filter(BaseEvent.event_id.in_(cleaned_event_ids)).update(
+                {BaseEvent.cleaned_at: now}, synchronize_session=False
             )
-            return
-
-        deleted = (
-            db.query(QuestionInstance)
-            .filter(QuestionInstance.event_id.in_(ended_event_ids))
-            .delete(synchronize_session=False)
-        )
 
         db.commit()
 
         logger.info(
-            "AlgoTime cleanup: deleted %d QuestionInstance row(s) "
-            "across event_ids %s. Cascaded children (UserQuestionInstance, "
-            "Submission, MostRecentSubmission) removed by DB. Upserted %d "
-            "long-term stat row(s).",
-            deleted,
+            "AlgoTime cleanup: processed %d newly ended event(s) %s, deleted %d "
+            "QuestionInstance row(s) (%d row(s) in total, leaf tables first, %d archived), upserted "
+            "%d long-term stat row(s) in %.0f ms%s.",
+            len(ended_event_ids),
             ended_event_ids,
+            deleted,
+            rows_deleted,
+            rows_archived,
             upserted_stats,
+            (time.perf_counter() - started) * 1000,
+            "" if purge_complete else "; purge hit its time limit and resumes next run",
         )
 
     except SQLAlchemyError as e:
         db.rollback()
+        failed = True
         logger.error("AlgoTime cleanup: database error during cleanup: %s", e)
     except Exception as e:
         db.rollback()
+        failed = True
         logger.error("AlgoTime cleanup: unexpected error: %s", e)
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+        track_custom_event(
+            user_id="system",
+            event_name="cleanup_job_completed",
+            properties={
+                "job": "algotime_cleanup",
+                "events_processed": len(ended_event_ids),
+                "question_instances_deleted": deleted,
+                "rows_deleted": rows_deleted,
+                "rows_archived": rows_archived,
+                "purge_complete": purge_complete,
+                "long_term_stats_upserted": upserted_stats,
+                "failed": failed,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+        )
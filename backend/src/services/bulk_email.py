@@ -0,0 +1,192 @@
+"""
+bulk_email.py
+
+Sending one email to many recipients through Brevo, for the scheduled
+competition reminders.
+
+send_bulk_email() splits the recipients into chunks of BULK_EMAIL_CHUNK_SIZE
+and sends each chunk as one Brevo request with one messageVersion per
+recipient, so every recipient gets their own copy (nobody sees the other
+addresses) while a reminder to 5,000 users is a handful of HTTP calls
+instead of 5,000:
+- the requests go through one pooled httpx.AsyncClient on the event loop; no
+  thread per send
+- at most BULK_EMAIL_CONCURRENCY chunks are in flight at a time
+- a chunk failing on a network error, a 429 or a 5xx is retried up to
+  BULK_EMAIL_MAX_ATTEMPTS times with exponential backoff; other 4xx are not
+  retried. A failed chunk does not stop the others.
+
+Recipients are checked for syntax only (no DNS lookup per address); invalid
+ones are skipped and counted as failed. The result lists every recipient
+that was not sent to, for callers tracking delivery per recipient, and which
+of them were rejected for good (invalid address or a non-retryable 4xx) as
+opposed to failing on an error worth retrying later.
+"""
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import httpx
+from email_validator import EmailNotValidError, validate_email
+from pydantic import BaseModel
+
+from endpoints import send_email_api
+
+logger = logging.getLogger(__name__)
+
+# Brevo accepts at most 1000 message versions per request.
+BREVO_MAX_MESSAGE_VERSIONS = 1000
+BULK_EMAIL_CHUNK_SIZE = min(int(os.getenv("BULK_EMAIL_CHUNK_SIZE", "500")), BREVO_MAX_MESSAGE_VERSIONS)
+BULK_EMAIL_CONCURRENCY = int(os.getenv("BULK_EMAIL_CONCURRENCY", "4"))
+BULK_EMAIL_MAX_ATTEMPTS = int(os.getenv("BULK_EMAIL_MAX_ATTEMPTS", "3"))
+BULK_EMAIL_RETRY_BASE_SECONDS = 1.0
+BULK_EMAIL_TIMEOUT_SECONDS = 30.0
+
+
+class BulkSendResult(BaseModel):
+    sent: int = 0
+    failed: int = 0
+    failed_recipients: list[str] = []
+    # Subset of failed_recipients that will fail again on retry.
+    rejected_recipients: list[str] = []
+    last_error: Optional[str] = None
+
+
+class _RetryableError(Exception):
+    pass
+
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=BULK_EMAIL_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=BULK_EMAIL_CONCURRENCY,
+                                max_keepalive_connections=BULK_EMAIL_CONCURRENCY),
+        )
+    return _client
+
+
+async def close_bulk_email_client() -> None:
+    """Close the pooled HTTP client (application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _valid_recipients(recipients: list[str]) -> list[str]:
+    valid = []
+    for recipient in dict.fromkeys(recipients):
+        try:
+            validate_email(recipient, check_deliverability=False)
+            valid.append(recipient)
+        except EmailNotValidError:
+            logger.warning("Skipping invalid recipient email in bulk send")
+    return valid
+
+
+def _payload(chunk: list[str], subject: str, text: str, html: Optional[str]) -> dict:
+    payload = {
+        "sender": {"email": send_email_api.DEFAULT_SENDER_EMAIL, "name": send_email_api.DEFAULT_SENDER_NAME},
+        "subject": subject,
+        "textContent": text,
+        "messageVersions": [{"to": [{"email": recipient}]} for recipient in chunk],
+    }
+    if html:
+        payload["htmlContent"] = html
+    return payload
+
+
+async def _post_chunk(client: httpx.AsyncClient, payload: dict) -> None:
+    headers = {
+        "accept": "application/json",
+        "content-type": "application/json",
+        "api-key": send_email_api.BREVO_API_KEY,
+    }
+    try:
+        resp = await client.post(send_email_api.BREVO_SEND_URL, headers=headers, json=payload)
+    except httpx.HTTPError as e:
+        raise _RetryableError(f"Network error calling Brevo: {e}") from e
+
+    if resp.status_code == 429 or resp.status_code >= 500:
+        raise _RetryableError(f"Brevo API error {resp.status_code}: {resp.text}")
+    if resp.status_code >= 400:
+        raise RuntimeError(f"Brevo API error {resp.status_code}: {resp.text}")
+
+
+async def _send_chunk(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    chunk: list[str],
+    subject: str,
+    text: str,
+    html: Optional[str],
+    max_attempts: int,
+) -> Optional[tuple[str, bool]]:
+    """Send one chunk; returns None on success, else (error, retryable)."""
+    payload = _payload(chunk, subject, text, html)
+    async with semaphore:
+        for attempt in range(1, max_attempts + 1):
+            try:
+                await _post_chunk(client, payload)
+                return None
+            except _RetryableError as e:
+                if attempt == max_attempts:
+                    logger.error(f"Bulk email chunk of {len(chunk)} failed after {attempt} attempts: {e}")
+                    return str(e), True
+                delay = BULK_EMAIL_RETRY_BASE_SECONDS * 2 ** (attempt - 1)
+                logger.warning(f"Bulk email chunk of {len(chunk)} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logger.error(f"Bulk email chunk of {len(chunk)} rejected: {e}")
+                return str(e), False
+    return "No attempt made", True
+
+
+async def send_bulk_email(
+    recipients: list[str],
+    subject: str,
+    text: str,
+    html: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    chunk_size: int = BULK_EMAIL_CHUNK_SIZE,
+    concurrency: int = BULK_EMAIL_CONCURRENCY,
+    max_attempts: int = BULK_EMAIL_MAX_ATTEMPTS,
+) -> BulkSendResult:
+    """Send the same email to every recipient, each getting their own copy."""
+    if not send_email_api.BREVO_API_KEY or not send_email_api.DEFAULT_SENDER_EMAIL:
+        raise RuntimeError("Email service is not configured.")
+
+    valid = _valid_recipients(recipients)
+    valid_set = set(valid)
+    invalid = [recipient for recipient in dict.fromkeys(recipients) if recipient not in valid_set]
+    result = BulkSendResult(failed=len(invalid), failed_recipients=invalid, rejected_recipients=list(invalid))
+    if invalid:
+        result.last_error = "Invalid recipient email"
+    if not valid:
+        return result
+
+    chunk_size = max(1, min(chunk_size, BREVO_MAX_MESSAGE_VERSIONS))
+    chunks = [valid[i:i + chunk_size] for i in range(0, len(valid), chunk_size)]
+    semaphore = asyncio.Semaphore(concurrency)
+    client = client or _get_client()
+
+    errors = await asyncio.gather(*[
+        _send_chunk(client, semaphore, chunk, subject, text, html, max_attempts)
+        for chunk in chunks
+    ])
+    for chunk, error in zip(chunks, errors):
+        if error is None:
+            result.sent += len(chunk)
+        else:
+            result.last_error, retryable = error
+            result.failed += len(chunk)
+            result.failed_recipients.extend(chunk)
+            if not retryable:
+                result.rejected_recipients.extend(chunk)
+    return result
@@ -0,0 +1,90 @@
+"""
+catalogue_version.py
+
+Monotonic version counters for cacheable catalogues (currently the question
+catalogue served by /questions/get-all-questions).
+
+Write paths call bump_catalogue_version() inside their own transaction; the
+listing builds its ETag / Last-Modified from get_catalogue_version(), which is
+answered from an in-process cache. The cache entry is dropped as soon as a
+bump commits in this process, and otherwise refreshed every
+CACHE_TTL_SECONDS so bumps made by other workers are picked up too.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from models.schema import CatalogueVersion
+
+QUESTIONS_CATALOGUE = "questions"
+CACHE_TTL_SECONDS = 5.0
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Session.info key holding the catalogues bumped in the open transaction.
+_PENDING_BUMPS_KEY = "catalogue_version_bumps"
+
+_lock = threading.Lock()
+# catalogue name -> (version, updated_at, time.monotonic() when read)
+_cache: dict[str, tuple[int, datetime, float]] = {}
+
+
+def get_catalogue_version(db: Session, name: str = QUESTIONS_CATALOGUE) -> tuple[int, datetime]:
+    """Return (version, updated_at) for a catalogue, querying only when the cached value is stale."""
+    now = time.monotonic()
+    with _lock:
+        cached = _cache.get(name)
+    if cached is not None and now - cached[2] < CACHE_TTL_SECONDS:
+        return cached[0], cached[1]
+
+    row = db.execute(
+        select(CatalogueVersion.version, CatalogueVersion.updated_at)
+        .where(CatalogueVersion.catalogue_name == name)
+    ).first()
+    version, updated_at = (row[0], row[1]) if row else (0, _EPOCH)
+
+    with _lock:
+        _cache[name] = (version, updated_at, now)
+    return version, updated_at
+
+
+def bump_catalogue_version(db: Session, name: str = QUESTIONS_CATALOGUE) -> None:
+    """
+    Increment a catalogue version as part of the caller's transaction.
+
+    The local cache entry is invalidated when that transaction commits, so a
+    reader can never pair the new version with data that is not yet visible.
+    """
+    now = datetime.now(timezone.utc)
+    result = db.execute(
+        update(CatalogueVersion)
+        .where(CatalogueVersion.catalogue_name == name)
+        .values(version=CatalogueVersion.version + 1, updated_at=now)
+    )
+    if result.rowcount == 0:
+        db.execute(insert(CatalogueVersion).values(catalogue_name=name, version=1, updated_at=now))
+
+    db.info.setdefault(_PENDING_BUMPS_KEY, set()).add(name)
+
+
+def invalidate_catalogue_version(name: Optional[str] = None) -> None:
+    """Drop one cached catalogue version (or all of them)."""
+    with _lock:
+        if name is None:
+            _cache.clear()
+        else:
+            _cache.pop(name, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for name in session.info.pop(_PENDING_BUMPS_KEY, ()):
+        invalidate_catalogue_version(name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_BUMPS_KEY, None)
@@ -8,10 +8,24 @@ competitions whose event_end_date has passed.
 Leaderboard entries (CompetitionLeaderboardEntry) are intentionally left intact
 because they link directly to competition.event_id, not through QuestionInstance.
 
+Each run only looks at ended events whose base_event.cleaned_at is still NULL
+and stamps them once processed, so events purged by earlier runs are never
+revisited. Processed counts and the run duration are logged and reported to
+PostHog ("cleanup_job_completed").
+
+The rows are deleted leaf-first in small committed batches with a pause in
+between (see question_instance_purge.py). A purge that runs out of time
+leaves its events unstamped and carries on at the next run; their long-term
+statistics were captured before the first batch and are not recomputed from
+the rows that are left. When
+SUBMISSION_ARCHIVE_DIR is set, submissions are archived to compressed NDJSON
+first (see submission_archive.py).
+
 Scheduled to run every hour from main.py.
 """
 
 import logging
+import time
 from datetime import datetime, timezone
 
 from sqlalchemy.orm import Session
@@ -19,44 +33,57 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from database_operations.database import get_db
 from models.schema import BaseEvent, Competition, QuestionInstance
+from services.daily_statistics import rollup_event_submission_days
+from services.posthog_analytics import track_custom_event
+from services.question_instance_purge import purge_event_question_instances
+from services.submission_archive import archive_event_submissions
 from services.long_term_statistics_upsert import (
-    upsert_long_term_stats_for_events,
+    upsert_long_term_stats_for_unpurged_events,
 )
 
 logger = logging.getLogger(__name__)
 def cleanup_ended_competitions() -> None:
     """
-    Finds all competitions that have ended and deletes their QuestionInstance rows.
+    Finds the competitions that have ended since the last run and deletes their QuestionInstance rows.
 
-    Cascade chain (defined in schema.py ForeignKeys):
-        QuestionInstance (deleted here)
+    Cascade chain (defined in schema.py ForeignKeys), purged bottom-up in
+    committed batches by question_instance_purge.py:
+        QuestionInstance
             └── UserQuestionInstance     ON DELETE CASCADE
                     ├── Submission            ON DELETE CASCADE
                     └── MostRecentSubmission  ON DELETE CASCADE
 
-    Safe to run repeatedly — if a competition was already cleaned up, the query
-    returns no rows and nothing happens.
+    Safe to run repeatedly — a competition that was already cleaned up has
+    cleaned_at set and is not selected again.
     """
     db: Session = next(get_db())
+    started = time.perf_counter()
+    ended_event_ids: list[int] = []
+    deleted = 0
+    rows_deleted = 0
+    rows_archived = 0
+    upserted_stats = 0
+    purge_complete = True
+    failed = False
 
     try:
         now = datetime.now(timezone.utc)
 
-        # Find event_ids for competitions (not AlgoTime) that have ended
-        ended_event_ids: list[int] = (
+        # Find event_ids for competitions (not AlgoTime) that have ended and were not cleaned up yet
+        pending_rows = (
             db.query(BaseEvent.event_id)
             .join(Competition, Competition.event_id == BaseEvent.event_id)
-            .filter(BaseEvent.event_end_date < now)
+            .filter(BaseEvent.event_end_date < now, BaseEvent.cleaned_at.is_(None))
             .all()
         )
 
-        if not ended_event_ids:
-            logger.debug("Competition cleanup: no ended competitions found.")
+        if not pending_rows:
+            logger.debug("Competition cleanup: no newly ended competitions found.")
             return
 
-        ended_event_ids = [row.event_id for row in ended_event_ids]
+        ended_event_ids = [row.event_id for row in pending_rows]
 
-        upserted_stats = upsert_long_term_stats_for_events(db, ended_event_ids)
+        upserted_stats = upsert_long_term_stats_for_unpurged_events(db, ended_event_ids)
 
         # Count before deletion for logging
         instances_to_delete = (
@@ -65,42 +92,73 @@ def cleanup_ended_competitions() -> None:
             .count()
         )
 
-        if instances_to_delete == 0:
-            if upserted_stats > 0:
-                db.commit()
-            logger.debug(
-                "Competition cleanup: ended competitions found %s, "
-                "but QuestionInstances already cleaned up. Upserted %d long-term stat row(s).",
-                ended_event_ids,
-                upserted_stats,
+        if instances_to_delete > 0:
+            # Capture the submissions about to be purged in the dashboard rollup
+            # (committed with the first purge batch).
+            rollup_event_submission_days(db, ended_event_ids)
+            # Keep the per-submission history offline before it is destroyed.
+            rows_archived = sum(archive_event_submissions(db, ended_event_ids).values())
+
+            purge = purge_event_question_instances(db, ended_event_ids)
+            deleted = purge.question_instances_deleted
+            rows_deleted = sum(purge.deleted.values())
+            purge_complete = purge.complete
+
+        cleaned_event_ids = ended_event_ids
+        if not purge_complete:
+            # Out of time: only stamp the events with nothing left, the rest resume next tick.
+            remaining = {
+                row.event_id
+                for row in db.query(QuestionInstance.event_id)
+                .filter(QuestionInstance.event_id.in_(ended_event_ids))
+                .distinct()
+            }
+            cleaned_event_ids = [event_id for event_id in ended_event_ids if event_id not in remaining]
+
+        # Watermark: later runs skip these events.
+        if cleaned_event_ids:
+            db.query(BaseEvent).filter(BaseEvent.event_id.in_(cleaned_event_ids)).update(
+                {BaseEvent.cleaned_at: now}, synchronize_session=False
             )
-            return
-
-        # Bulk delete — cascade handles UserQuestionInstance / Submission /
-        # MostRecentSubmission automatically at the DB level.
-        deleted = (
-            db.query(QuestionInstance)
-            .filter(QuestionInstance.event_id.in_(ended_event_ids))
-            .delete(synchronize_session=False)
-        )
 
         db.commit()
 
         logger.info(
-            "Competition cleanup: deleted %d QuestionInstance row(s) "
-            "across event_ids %s. Cascaded children (UserQuestionInstance, "
-            "Submission, MostRecentSubmission) removed by DB. Upserted %d "
-            "long-term stat row(s).",
-            deleted,
+            "Competition cleanup: processed %d newly ended event(s) %s, deleted %d "
+            "QuestionInstance row(s) (%d row(s) in total, leaf tables first, %d archived), upserted "
+            "%d long-term stat row(s) in %.0f ms%s.",
+            len(ended_event_ids),
             ended_event_ids,
+            deleted,
+            rows_deleted,
+            rows_archived,
             upserted_stats,
+            (time.perf_counter() - started) * 1000,
+            "" if purge_complete else "; purge hit its time limit and resumes next run",
         )
 
     except SQLAlchemyError as e:
         db.rollback()
+        failed = True
         logger.error("Competition cleanup: database error during cleanup: %s", e)
     except Exception as e:
         db.rollback()
+        failed = True
         logger.error("Competition cleanup: unexpected error: %s", e)
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+        track_custom_event(
+            user_id="system",
+            event_name="cleanup_job_completed",
+            properties={
+                "job": "competition_cleanup",
+                "events_processed": len(ended_event_ids),
+                "question_instances_deleted": deleted,
+                "rows_deleted": rows_deleted,
+                "rows_archived": rows_archived,
+                "purge_complete": purge_complete,
+                "long_term_stats_upserted": upserted_stats,
+                "failed": failed,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+        )
@@ -0,0 +1,300 @@
+"""
+daily_statistics.py
+
+Daily rollup of the admin dashboard counters (new accounts, logins and
+submissions per event type) into the daily_statistics table.
+
+The dashboard reads O(days) rows from that table instead of scanning
+user_account, user_session and submission on every load:
+- rollup_daily_statistics() recomputes every day from the first one that is
+  not final yet up to today, with one grouped query per source table, and
+  writes them with one upsert (ON CONFLICT (day) DO UPDATE)
+- a day becomes final once the scheduled rollup has counted it after it was
+  over; final rows are never recomputed, and open rows only ever grow (the
+  upsert keeps the larger of the stored and the new count), so counts
+  survive the cleanup jobs purging submissions
+- rollup_event_submission_days() is what the cleanup jobs run right before
+  purging: it only recomputes the days the purged submissions fall on, and
+  leaves those rows open for the scheduled rollup. Both may run at the same
+  time; the upsert makes that safe
+- refresh_daily_statistics() is the scheduled entry point; on an empty table
+  it backfills from the oldest source row, BACKFILL_BATCH_DAYS at a time,
+  committing after each batch
+- day_buckets() / week_buckets() / month_buckets() describe the chronological
+  buckets of a dashboard series, and sum_daily_statistics() fills any of them
+  from one grouped query (CASE over the day primary key, so the range scan
+  stays on the index)
+
+Days are UTC calendar days.
+
+Scheduled from main.py (hourly, and once at startup).
+"""
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+from sqlalchemy import Integer, case, cast, extract, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from database_operations.database import SessionLocal
+from database_operations.dialect import insert_for, is_postgresql
+from models.schema import (
+    AlgoTimeSession,
+    Competition,
+    DailyStatistics,
+    QuestionInstance,
+    Submission,
+    UserAccount,
+    UserQuestionInstance,
+    UserSession,
+)
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_INTERVAL_HOURS = 1
+BACKFILL_BATCH_DAYS = 92
+UPSERT_BATCH_ROWS = 500
+COUNTER_FIELDS = ("new_accounts", "logins", "competition_submissions", "algotime_submissions")
+
+
+def day_bucket_index(db: Session, column, range_start: datetime):
+    """
+    SQL expression giving the number of whole days between `range_start` and
+    `column`, so rows can be grouped into consecutive 24h buckets in one query.
+    """
+    if is_postgresql(db):
+        return func.floor(extract("epoch", column - range_start) / 86400)
+    return cast(func.julianday(column) - func.julianday(range_start), Integer)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _count_by_day(db: Session, column, first_day: date, days: int, *columns, joins: Iterable = ()) -> list[tuple]:
+    """Rows of (day index, *columns) for `column` within [first_day, first_day + days)."""
+    range_start = _day_start(first_day)
+    bucket = day_bucket_index(db, column, range_start).label("bucket")
+    query = select(bucket, *columns).select_from(column.table)
+    for target, onclause, outer in joins:
+        query = query.join(target, onclause, isouter=outer)
+    query = query.where(column >= range_start, column < range_start + timedelta(days=days)).group_by(bucket)
+    return [row for row in db.execute(query) if row[0] is not None and 0 <= int(row[0]) < days]
+
+
+def compute_daily_statistics(db: Session, first_day: date, last_day: date) -> dict[date, dict[str, int]]:
+    """Counters for every day in [first_day, last_day], straight from the source tables."""
+    days = (last_day - first_day).days + 1
+    counters = {
+        first_day + timedelta(days=index): dict.fromkeys(COUNTER_FIELDS, 0)
+        for index in range(days)
+    }
+
+    def add(field: str, rows: list[tuple], position: int = 1) -> None:
+        for row in rows:
+            counters[first_day + timedelta(days=int(row[0]))][field] += row[position] or 0
+
+    add("new_accounts", _count_by_day(db, UserAccount.created_at, first_day, days, func.count()))
+    add("logins", _count_by_day(db, UserSession.created_at, first_day, days, func.count()))
+
+    submissions = _count_by_day(
+        db, Submission.submitted_on, first_day, days,
+        func.count(Competition.event_id),
+        func.count(AlgoTimeSession.event_id),
+        joins=(
+            (UserQuestionInstance,
+             Submission.user_question_instance_id == UserQuestionInstance.user_question_instance_id, False),
+            (QuestionInstance,
+             UserQuestionInstance.question_instance_id == QuestionInstance.question_instance_id, False),
+            (Competition, Competition.event_id == QuestionInstance.event_id, True),
+            (AlgoTimeSession, AlgoTimeSession.event_id == QuestionInstance.event_id, True),
+        ),
+    )
+    add("competition_submissions", submissions, 1)
+    add("algotime_submissions", submissions, 2)
+    return counters
+
+
+def _earliest_source_day(db: Session) -> Optional[date]:
+    earliest = [
+        db.scalar(select(func.min(column)))
+        for column in (UserAccount.created_at, UserSession.created_at, Submission.submitted_on)
+    ]
+    earliest = [value for value in earliest if value is not None]
+    return min(earliest).date() if earliest else None
+
+
+def next_rollup_day(db: Session, today: date) -> date:
+    """
+    First day that still needs computing: the day after the last final one,
+    else (nothing final yet) the oldest day with data.
+    """
+    last_final = db.scalar(select(func.max(DailyStatistics.day)).where(DailyStatistics.is_final.is_(True)))
+    if last_final is not None:
+        return min(last_final + timedelta(days=1), today)
+    earliest = [
+        day for day in (_earliest_source_day(db), db.scalar(select(func.min(DailyStatistics.day))))
+        if day is not None
+    ]
+    return min(earliest + [today])
+
+
+def rollup_daily_statistics(
+    db: Session,
+    first_day: Optional[date] = None,
+    last_day: Optional[date] = None,
+    now: Optional[datetime] = None,
+    finalize: bool = True,
+) -> int:
+    """
+    Upsert daily_statistics rows for [first_day, last_day] (by default from
+    next_rollup_day() up to today); past days are marked final unless
+    `finalize` is False. Final rows are left alone. Returns the number of
+    rows written; committing is left to the caller.
+    """
+    now = now or datetime.now(timezone.utc)
+    today = now.date()
+    last_day = min(last_day or today, today)
+    first_day = first_day or next_rollup_day(db, today)
+    if first_day > last_day:
+        return 0
+
+    rows = [
+        {"day": day, **counters, "is_final": finalize and day < today, "computed_at": now}
+        for day, counters in compute_daily_statistics(db, first_day, last_day).items()
+    ]
+    insert = insert_for(db)
+    written = 0
+    for start in range(0, len(rows), UPSERT_BATCH_ROWS):
+        statement = insert(DailyStatistics).values(rows[start:start + UPSERT_BATCH_ROWS])
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[DailyStatistics.day],
+            set_={
+                # Source rows may have been purged since the last run; never lose counts.
+                **{
+                    field: case(
+                        (excluded[field] > getattr(DailyStatistics, field), excluded[field]),
+                        else_=getattr(DailyStatistics, field),
+                    )
+                    for field in COUNTER_FIELDS
+                },
+                "is_final": excluded.is_final,
+                "computed_at": excluded.computed_at,
+            },
+            where=DailyStatistics.is_final.is_(False),
+        )
+        written += db.execute(statement).rowcount or 0
+    return written
+
+
+def _utc_day(value: datetime) -> date:
+    return value.astimezone(timezone.utc).date() if value.tzinfo else value.date()
+
+
+def rollup_event_submission_days(db: Session, event_ids: Iterable[int], now: Optional[datetime] = None) -> int:
+    """
+    Roll up the days the submissions of `event_ids` were made on, before the
+    cleanup jobs purge them. The rows stay open: the scheduled rollup
+    finalizes them, so days it has not reached yet are not skipped.
+    """
+    event_ids = list(event_ids)
+    if not event_ids:
+        return 0
+    first, last = db.execute(
+        select(func.min(Submission.submitted_on), func.max(Submission.submitted_on))
+        .join(UserQuestionInstance,
+              Submission.user_question_instance_id == UserQuestionInstance.user_question_instance_id)
+        .join(QuestionInstance,
+              UserQuestionInstance.question_instance_id == QuestionInstance.question_instance_id)
+        .where(QuestionInstance.event_id.in_(event_ids))
+    ).one()
+    if first is None:
+        return 0
+    return rollup_daily_statistics(db, _utc_day(first), _utc_day(last), now=now, finalize=False)
+
+
+class TimeBucket(NamedTuple):
+    label: str
+    first_day: date
+    last_day: date
+
+
+def day_buckets(last_day: date, days: int, label_format: Optional[str] = None) -> list[TimeBucket]:
+    """`days` one-day buckets ending on `last_day`, labelled with strftime(label_format) or "Day N"."""
+    buckets = []
+    for index in range(days):
+        day = last_day - timedelta(days=days - 1 - index)
+        label = day.strftime(label_format) if label_format else f"Day {index + 1}"
+        buckets.append(TimeBucket(label, day, day))
+    return buckets
+
+
+def week_buckets(last_day: date, weeks: int) -> list[TimeBucket]:
+    """`weeks` consecutive 7-day buckets ending on `last_day`, labelled "Week N"."""
+    first_day = last_day - timedelta(days=7 * weeks - 1)
+    return [
+        TimeBucket(f"Week {index + 1}", first_day + timedelta(days=7 * index), first_day + timedelta(days=7 * index + 6))
+        for index in range(weeks)
+    ]
+
+
+def month_buckets(last_day: date, months: int) -> list[TimeBucket]:
+    """The last `months` calendar months (the current one ending on `last_day`), labelled "%b"."""
+    buckets = []
+    month_end = last_day
+    for _ in range(months):
+        month_start = month_end.replace(day=1)
+        buckets.append(TimeBucket(month_start.strftime("%b"), month_start, month_end))
+        month_end = month_start - timedelta(days=1)
+    return buckets[::-1]
+
+
+def sum_daily_statistics(db: Session, buckets: Sequence[TimeBucket], *fields: str) -> dict[str, list[int]]:
+    """
+    Sum each counter in `fields` per bucket with one grouped query. Buckets
+    must be chronological and non-overlapping; empty buckets are zero.
+    """
+    totals = {field: [0] * len(buckets) for field in fields}
+    if not buckets:
+        return totals
+
+    bucket = case(
+        *[(DailyStatistics.day.between(b.first_day, b.last_day), index) for index, b in enumerate(buckets)]
+    ).label("bucket")
+    rows = db.execute(
+        select(bucket, *[func.sum(getattr(DailyStatistics, field)) for field in fields])
+        .where(DailyStatistics.day >= buckets[0].first_day, DailyStatistics.day <= buckets[-1].last_day)
+        .group_by(bucket)
+    ).all()
+
+    for row in rows:
+        if row[0] is None:
+            continue
+        for position, field in enumerate(fields, 1):
+            totals[field][int(row[0])] = int(row[position] or 0)
+    return totals
+
+
+def refresh_daily_statistics() -> None:
+    """Scheduled job: roll up every pending day, BACKFILL_BATCH_DAYS per transaction."""
+    db = SessionLocal()
+    try:
+        today = datetime.now(timezone.utc).date()
+        first_day = next_rollup_day(db, today)
+        written = 0
+        while first_day <= today:
+            last_day = min(first_day + timedelta(days=BACKFILL_BATCH_DAYS - 1), today)
+            written += rollup_daily_statistics(db, first_day, last_day)
+            db.commit()
+            first_day = last_day + timedelta(days=1)
+        logger.info("Daily statistics rollup: wrote %d day row(s).", written)
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error("Daily statistics rollup: database error: %s", e)
+    except Exception as e:
+        db.rollback()
+        logger.error("Daily statistics rollup: unexpected error: %s", e)
+    finally:
+        db.close()
@@ -0,0 +1,207 @@
+"""
+email_outbox.py
+
+Durable, per-recipient delivery of the scheduled competition emails.
+
+When a reminder is due, the email scheduler queues one email_outbox row per
+(email, recipient, kind) with enqueue_email_deliveries(), in the same
+transaction that clears the reminder time: a crash either queues everything
+or nothing, and queueing twice is a no-op (ON CONFLICT DO NOTHING on the
+unique delivery key).
+
+drain_email_outbox() then sends the rows that are pending and due:
+- at most EMAIL_OUTBOX_MAX_PER_RUN rows per run; the scheduler drains once a
+  minute, so this caps the send rate to stay within Brevo's limits
+- claimed rows get their attempt counted and their next attempt pushed back
+  before anything is sent, and the claim is committed; rows of a run that
+  dies mid-send are picked up again after the backoff instead of being lost
+- rows are sent with send_bulk_email(), grouped by email and kind, and each
+  row is marked sent, failed right away if Brevo rejected it for good
+  (invalid address, non-retryable 4xx), or failed after
+  EMAIL_OUTBOX_MAX_ATTEMPTS attempts on retryable errors. Retries wait EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2^(attempts - 1), at most
+  EMAIL_OUTBOX_MAX_RETRY_SECONDS.
+
+Delivery is at-least-once: a run that dies between Brevo accepting a batch
+and committing the result sends that batch again.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Iterable, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from database_operations.dialect import insert_for
+from models.schema import CompetitionEmail, EmailOutbox
+from services.bulk_email import send_bulk_email
+
+logger = logging.getLogger(__name__)
+
+EMAIL_OUTBOX_MAX_PER_RUN = int(os.getenv("EMAIL_OUTBOX_MAX_PER_RUN", "1000"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = 60.0
+EMAIL_OUTBOX_MAX_RETRY_SECONDS = 3600.0
+ENQUEUE_BATCH_SIZE = 1000
+
+KIND_24H = "24h"
+KIND_5MIN = "5min"
+KIND_CUSTOM = "custom"
+
+STATUS_PENDING = "pending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+_SUBJECT_PREFIXES = {
+    KIND_24H: "[24h Reminder] ",
+    KIND_5MIN: "[5min Reminder] ",
+    KIND_CUSTOM: "",
+}
+
+
+class OutboxDrainResult(BaseModel):
+    sent: int = 0
+    retrying: int = 0
+    failed: int = 0
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, EMAIL_OUTBOX_MAX_RETRY_SECONDS))
+
+
+def enqueue_email_deliveries(db: Session, email_id: int, kind: str, recipients: Iterable[str],
+                             now: datetime) -> int:
+    """Queue one delivery per recipient; already queued ones are skipped. Does not commit."""
+    rows = [
+        {
+            "email_id": email_id,
+            "recipient": recipient,
+            "kind": kind,
+            "status": STATUS_PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        }
+        for recipient in dict.fromkeys(recipients)
+    ]
+    insert = insert_for(db)
+    queued = 0
+    # Batched to stay under the bind parameter limits of both databases.
+    for start in range(0, len(rows), ENQUEUE_BATCH_SIZE):
+        statement = insert(EmailOutbox).values(rows[start:start + ENQUEUE_BATCH_SIZE]).on_conflict_do_nothing(
+            index_elements=[EmailOutbox.email_id, EmailOutbox.recipient, EmailOutbox.kind]
+        )
+        queued += db.execute(statement).rowcount or 0
+    return queued
+
+
+def _claim_due_deliveries(db: Session, now: datetime, limit: int) -> list[tuple]:
+    """
+    (email_id, kind, subject, body, {recipient: outbox_id}) per group of due
+    deliveries, claimed and committed.
+    """
+    rows = db.execute(
+        select(EmailOutbox, CompetitionEmail.subject, CompetitionEmail.body)
+        .join(CompetitionEmail, CompetitionEmail.email_id == EmailOutbox.email_id)
+        .where(EmailOutbox.status == STATUS_PENDING, EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.outbox_id)
+        .limit(limit)
+        .with_for_update(skip_locked=True, of=EmailOutbox)
+    ).all()
+    rows.sort(key=lambda row: (row[0].email_id, row[0].kind))
+
+    groups = []
+    for (email_id, kind), members in groupby(rows, key=lambda row: (row[0].email_id, row[0].kind)):
+        members = list(members)
+        _, subject, body = members[0]
+        groups.append((email_id, kind, subject, body, {row[0].recipient: row[0].outbox_id for row in members}))
+        for delivery, _, _ in members:
+            delivery.attempts += 1
+            delivery.next_attempt_at = now + retry_delay(delivery.attempts)
+    db.commit()
+    return groups
+
+
+def _record_results(db: Session, sent_ids: list[int], failed_ids: list[int], rejected_ids: list[int],
+                    error: Optional[str], now: datetime) -> int:
+    """
+    Mark deliveries sent, rejected ones failed, and other failed ones failed
+    once out of attempts; returns how many failed for good. Commits.
+    """
+    last_error = (error or "Unknown error")[:1000]
+    if sent_ids:
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.outbox_id.in_(sent_ids))
+            .values(status=STATUS_SENT, sent_at=now, last_error=None)
+        )
+    exhausted = len(rejected_ids)
+    if rejected_ids:
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.outbox_id.in_(rejected_ids))
+            .values(status=STATUS_FAILED, last_error=last_error)
+        )
+    if failed_ids:
+        exhausted += db.scalar(
+            select(func.count()).select_from(EmailOutbox).where(
+                EmailOutbox.outbox_id.in_(failed_ids),
+                EmailOutbox.attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS,
+            )
+        ) or 0
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.outbox_id.in_(failed_ids))
+            .values(
+                status=case(
+                    (EmailOutbox.attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS, STATUS_FAILED),
+                    else_=STATUS_PENDING,
+                ),
+                last_error=last_error,
+            )
+        )
+    db.commit()
+    return exhausted
+
+
+async def drain_email_outbox(db: Session, now: Optional[datetime] = None,
+                             limit: int = EMAIL_OUTBOX_MAX_PER_RUN) -> OutboxDrainResult:
+    """Send up to `limit` due deliveries. Database work runs in a worker thread."""
+    now = now or datetime.now(timezone.utc)
+    result = OutboxDrainResult()
+    groups = await asyncio.to_thread(_claim_due_deliveries, db, now, limit)
+
+    for email_id, kind, subject, body, outbox_ids in groups:
+        try:
+            sent = await send_bulk_email(
+                list(outbox_ids), _SUBJECT_PREFIXES.get(kind, "") + subject, body, max_attempts=1
+            )
+            failed, rejected, error = set(sent.failed_recipients), set(sent.rejected_recipients), sent.last_error
+        except Exception as e:
+            logger.error(f"Failed to send outbox deliveries for email_id={email_id} ({kind}): {e}")
+            failed, rejected, error = set(outbox_ids), set(), str(e)
+
+        sent_ids, failed_ids, rejected_ids = [], [], []
+        for recipient, outbox_id in outbox_ids.items():
+            if recipient in rejected:
+                rejected_ids.append(outbox_id)
+            elif recipient in failed:
+                failed_ids.append(outbox_id)
+            else:
+                sent_ids.append(outbox_id)
+        exhausted = await asyncio.to_thread(
+            _record_results, db, sent_ids, failed_ids, rejected_ids, error, datetime.now(timezone.utc)
+        )
+        result.sent += len(sent_ids)
+        result.failed += exhausted
+        result.retrying += len(failed_ids) + len(rejected_ids) - exhausted
+
+    if result.failed or result.retrying:
+        logger.warning(
+            f"Email outbox: {result.sent} sent, {result.retrying} to retry, {result.failed} failed for good"
+        )
+    return result
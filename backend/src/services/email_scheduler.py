@@ -1,114 +1,101 @@
 import logging
 import asyncio
 from datetime import datetime, timezone
+from itertools import islice
+from typing import Iterable
+
+from sqlalchemy.exc import SQLAlchemyError
 
 from database_operations.database import SessionLocal
 from models.schema import CompetitionEmail
-from endpoints.send_email_api import send_email_via_brevo
-from endpoints.competitions_api import resolve_email_recipients
+from services.email_outbox import (
+    ENQUEUE_BATCH_SIZE,
+    KIND_24H,
+    KIND_5MIN,
+    KIND_CUSTOM,
+    drain_email_outbox,
+    enqueue_email_deliveries,
+)
+from endpoints.competitions_api import iter_email_recipients, recipients_key
 
 logger = logging.getLogger(__name__)
 
 
-async def _send_one_email(email_id: int, recipient: str, subject: str, body: str) -> bool:
-    try:
-        # Run sync function in a thread (safe even if already async)
-        await asyncio.to_thread(
-            send_email_via_brevo,
-            to=[recipient],
-            subject=subject,
-            text=body,
-        )
-        return True
-    except Exception as e:
-        logger.error(
-            f"Failed to send reminder for email_id={email_id} "
-            f"to {recipient}: {e}"
-        )
-        return False
+# (send time field, outbox kind), in the order they are queued
+SEND_TIMES = (("time_24h_before", KIND_24H), ("time_5min_before", KIND_5MIN), ("other_time", KIND_CUSTOM))
+
 
+def _due_send_times(email, now: datetime) -> list[tuple[str, str]]:
+    return [(field, kind) for field, kind in SEND_TIMES if getattr(email, field) and getattr(email, field) <= now]
 
-async def _send_reminder(email_id: int, recipients: list, subject: str, body: str) -> bool:
+
+def _queue_emails(db, emails: list, recipients: Iterable[str], now: datetime) -> int:
     """
-    Send emails concurrently.
-    Return True if at least ONE succeeds.
+    Queue the deliveries of every due send time of `emails`, which share one
+    `to` string, ENQUEUE_BATCH_SIZE recipients at a time, and clear those
+    times. Returns the number of recipients; with none, nothing is cleared.
     """
-    if not recipients:
-        return False
-
-    tasks = [
-        _send_one_email(email_id, recipient, subject, body)
-        for recipient in recipients
-    ]
-
-    results = await asyncio.gather(*tasks)
-
-    return any(results)  # ✅ your requirement
-
-
-async def _process_email(email, recipients: list, now: datetime) -> None:
-    if email.time_24h_before and email.time_24h_before <= now:
-        logger.info(f"Sending 24h reminder for email_id={email.email_id}")
-        if await _send_reminder(
-            email.email_id,
-            recipients,
-            f"[24h Reminder] {email.subject}",
-            email.body,
-        ):
-            email.time_24h_before = None  # ✅ erase if at least 1 success
-
-    if email.time_5min_before and email.time_5min_before <= now:
-        logger.info(f"Sending 5min reminder for email_id={email.email_id}")
-        if await _send_reminder(
-            email.email_id,
-            recipients,
-            f"[5min Reminder] {email.subject}",
-            email.body,
-        ):
-            email.time_5min_before = None
-
-    if email.other_time and email.other_time <= now:
-        logger.info(f"Sending custom-time email for email_id={email.email_id}")
-        if await _send_reminder(
-            email.email_id,
-            recipients,
-            email.subject,
-            email.body,
-        ):
-            email.other_time = None
+    due = [(email, _due_send_times(email, now)) for email in emails]
+    queued = 0
+    recipients = iter(recipients)
+    while batch := list(islice(recipients, ENQUEUE_BATCH_SIZE)):
+        queued += len(batch)
+        for email, send_times in due:
+            for _, kind in send_times:
+                enqueue_email_deliveries(db, email.email_id, kind, batch, now)
+
+    if queued:
+        for email, send_times in due:
+            for field, kind in send_times:
+                logger.info(f"Queued {kind} email for email_id={email.email_id}")
+                setattr(email, field, None)
+    return queued
+
+
+def _queue_due_emails(db, now: datetime) -> None:
+    emails = db.query(CompetitionEmail).filter(
+        (CompetitionEmail.time_24h_before <= now) |
+        (CompetitionEmail.time_5min_before <= now) |
+        (CompetitionEmail.other_time <= now)
+    ).all()
+
+    # Emails sharing a `to` string (typically "all participants") stream its recipients once per tick.
+    groups: dict[str, list] = {}
+    for email in emails:
+        groups.setdefault(recipients_key(email.to), []).append(email)
+
+    for group in groups.values():
+        email_ids = [email.email_id for email in group]
+        try:
+            # A failed lookup only rolls this group back; it stays due for the next tick.
+            with db.begin_nested():
+                queued = _queue_emails(db, group, iter_email_recipients(db, group[0].to), now)
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to queue competition_email ids={email_ids}: {e}")
+            continue
+        if not queued:
+            logger.warning(f"No recipients resolved for competition_email ids={email_ids}")
+
+    # Deliveries and cleared send times are committed together.
+    db.commit()
 
 
 async def run_scheduled_emails():
+    """
+    Scheduled job (every minute). Due emails are queued in the email outbox,
+    then the outbox is drained (services/email_outbox.py). The blocking
+    database work runs in a worker thread so the event loop keeps serving
+    requests; only the sends run on the loop.
+    """
     db = SessionLocal()
     now = datetime.now(timezone.utc)
 
     try:
-        emails = db.query(CompetitionEmail).filter(
-            (CompetitionEmail.time_24h_before <= now) |
-            (CompetitionEmail.time_5min_before <= now) |
-            (CompetitionEmail.other_time <= now)
-        ).all()
-
-        tasks = []
-
-        for email in emails:
-            recipients = resolve_email_recipients(db, email.to)
-
-            if not recipients:
-                logger.warning(
-                    f"No recipients resolved for competition_email id={email.email_id}"
-                )
-                continue
-
-            tasks.append(_process_email(email, recipients, now))
-
-        # Run all emails concurrently
-        await asyncio.gather(*tasks)
-
-        db.commit()
+        await asyncio.to_thread(_queue_due_emails, db, now)
+        await drain_email_outbox(db, now)
 
     except Exception as e:
         logger.exception(f"Error in scheduled email job: {e}")
         db.rollback()
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
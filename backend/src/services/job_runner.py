@@ -0,0 +1,206 @@
+"""
+job_runner.py
+
+Scheduling of the background jobs started from main.py.
+
+create_scheduler() builds the AsyncIOScheduler and schedule_job() registers a
+job on it with the settings every job here needs:
+- sync functions (all the DB work) run on a dedicated thread pool of
+  JOB_THREAD_POOL_SIZE workers, never on the event loop and not on the loop's
+  default executor that asyncio.to_thread() relies on; coroutine functions run
+  on the loop and must push their own blocking calls to threads
+- max_instances=1: a run that is still going makes the next one skip instead
+  of stacking up
+- coalesce: runs missed while the process was busy collapse into one
+- every run records its duration and its lag (actual start minus scheduled
+  time) in job_metrics(); slow or late runs are logged as warnings
+- with a SchedulerLeadership (scheduler_leader.py) a run only does its work
+  in the process holding the leader lock; the other workers count it as a
+  standby run, so each job runs once per interval across the cluster. Jobs
+  draining per-process state (leader_only=False) run in every process.
+
+Metrics are kept in memory, per worker process.
+"""
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+)
+from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.job import Job
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from pydantic import BaseModel
+
+from services.scheduler_leader import SchedulerLeadership
+
+logger = logging.getLogger(__name__)
+
+JOB_EXECUTOR = "jobs"
+JOB_THREAD_POOL_SIZE = int(os.getenv("JOB_THREAD_POOL_SIZE", "4"))
+JOB_MISFIRE_GRACE_SECONDS = 60
+SLOW_JOB_WARNING_SECONDS = 60.0
+LATE_JOB_WARNING_SECONDS = 30.0
+
+
+class JobMetrics(BaseModel):
+    job_id: str
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0  # previous run still going
+    missed: int = 0  # later than the misfire grace time
+    standby: int = 0  # another process is the scheduler leader
+    last_started_at: Optional[datetime] = None
+    last_duration_seconds: Optional[float] = None
+    max_duration_seconds: float = 0.0
+    last_lag_seconds: Optional[float] = None
+    max_lag_seconds: float = 0.0
+
+
+_metrics: dict[str, JobMetrics] = {}
+# job id -> (wall clock start, perf_counter start) of the run in progress
+_running: dict[str, tuple[datetime, float]] = {}
+_lock = threading.Lock()
+_leadership: Optional[SchedulerLeadership] = None
+
+
+def _is_leader() -> bool:
+    if _leadership is None:
+        return True
+    try:
+        return _leadership.is_leader()
+    except Exception as e:
+        logger.error("Scheduler leadership check failed, skipping run: %s", e)
+        return False
+
+
+def _mark_started(job_id: str) -> None:
+    with _lock:
+        _running[job_id] = (datetime.now(timezone.utc), time.perf_counter())
+
+
+def _timed(job_id: str, func: Callable[..., Any], leader_only: bool) -> Callable[..., Any]:
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def run_async(*args, **kwargs):
+            if leader_only and not await asyncio.to_thread(_is_leader):
+                return None
+            _mark_started(job_id)
+            return await func(*args, **kwargs)
+        return run_async
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        if leader_only and not _is_leader():
+            return None
+        _mark_started(job_id)
+        return func(*args, **kwargs)
+    return run
+
+
+def _on_job_event(event) -> None:
+    with _lock:
+        metrics = _metrics.setdefault(event.job_id, JobMetrics(job_id=event.job_id))
+        if event.code == EVENT_JOB_MAX_INSTANCES:
+            metrics.skipped += 1
+            started = None
+        elif event.code == EVENT_JOB_MISSED:
+            metrics.missed += 1
+            started = None
+        else:
+            started = _running.pop(event.job_id, None)
+            if started is None and event.exception is None:
+                metrics.standby += 1
+            else:
+                metrics.runs += 1
+            if event.exception is not None:
+                metrics.failures += 1
+            if started is not None:
+                started_at, started_perf = started
+                duration = time.perf_counter() - started_perf
+                lag = max((started_at - event.scheduled_run_time).total_seconds(), 0.0)
+                metrics.last_started_at = started_at
+                metrics.last_duration_seconds = duration
+                metrics.max_duration_seconds = max(metrics.max_duration_seconds, duration)
+                metrics.last_lag_seconds = lag
+                metrics.max_lag_seconds = max(metrics.max_lag_seconds, lag)
+
+    if event.code == EVENT_JOB_MAX_INSTANCES:
+        logger.warning("Job %s skipped: previous run still in progress.", event.job_id)
+    elif event.code == EVENT_JOB_MISSED:
+        logger.warning("Job %s missed its run scheduled at %s.", event.job_id, event.scheduled_run_time)
+    elif started is not None:
+        if duration >= SLOW_JOB_WARNING_SECONDS:
+            logger.warning("Job %s took %.1f s.", event.job_id, duration)
+        if lag >= LATE_JOB_WARNING_SECONDS:
+            logger.warning("Job %s started %.1f s late.", event.job_id, lag)
+
+
+def create_scheduler(leadership: Optional[SchedulerLeadership] = None) -> AsyncIOScheduler:
+    """Scheduler for the jobs of this process; without `leadership` every run does its work."""
+    global _leadership
+    _leadership = leadership
+    scheduler = AsyncIOScheduler(
+        executors={
+            "default": AsyncIOExecutor(),
+            JOB_EXECUTOR: ThreadPoolExecutor(JOB_THREAD_POOL_SIZE),
+        },
+        job_defaults={
+            "coalesce": True,
+            "max_instances": 1,
+            "misfire_grace_time": JOB_MISFIRE_GRACE_SECONDS,
+        },
+    )
+    scheduler.add_listener(
+        _on_job_event,
+        EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES,
+    )
+    return scheduler
+
+
+def schedule_job(
+    scheduler: AsyncIOScheduler,
+    func: Callable[..., Any],
+    trigger: str,
+    id: str,
+    leader_only: bool = True,
+    **trigger_args: Any,
+) -> Job:
+    """
+    Add `func` as job `id`; sync functions go to the job thread pool,
+    coroutines to the loop. Unless `leader_only` is False, runs only do their
+    work in the scheduler leader process.
+    """
+    executor = "default" if asyncio.iscoroutinefunction(func) else JOB_EXECUTOR
+    return scheduler.add_job(
+        _timed(id, func, leader_only),
+        trigger,
+        id=id,
+        name=func.__name__,
+        executor=executor,
+        coalesce=True,
+        max_instances=1,
+        **trigger_args,
+    )
+
+
+def shutdown_scheduler(scheduler: AsyncIOScheduler) -> None:
+    """Stop the scheduler and hand leadership over to another process."""
+    scheduler.shutdown(wait=False)
+    if _leadership is not None:
+        _leadership.release()
+
+
+def job_metrics() -> list[JobMetrics]:
+    with _lock:
+        return [metrics.model_copy() for metrics in sorted(_metrics.values(), key=lambda m: m.job_id)]
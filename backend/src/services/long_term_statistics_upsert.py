@@ -1,70 +1,88 @@
-from sqlalchemy import func
+"""
+long_term_statistics_upsert.py
+
+Per-event, per-difficulty solve statistics kept in long_term_statistics after
+the cleanup jobs purge an event's question instances.
+
+upsert_long_term_stats_for_events() writes the statistics of any number of
+events with a single INSERT ... SELECT ... GROUP BY event_id, difficulty
+ON CONFLICT (event_id, difficulty) DO UPDATE, so refreshing every ended event
+is one round trip whatever the number of events. Events whose instances are
+already gone produce no groups and keep their stored rows.
+
+The cleanup jobs purge an event in batches across several runs. They call
+upsert_long_term_stats_for_unpurged_events(), which skips events that already
+have stored rows: those were captured in the transaction of the event's first
+purge batch, before anything was deleted. As a second line of defence, a
+stored row is only overwritten when the new solve count is not lower, so
+statistics recomputed from a partially purged event never replace the
+complete ones.
+"""
+from typing import Iterable
+
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from database_operations.dialect import insert_for
 from models.schema import LongTermStatistics, Question, QuestionInstance, UserQuestionInstance
 
 
-def upsert_long_term_stats_for_event(db: Session, event_id: int) -> int:
-    """Upsert per-difficulty solved counts and average solve time for one event."""
-    stats_rows = (
-        db.query(
-            Question.difficulty.label("difficulty"),
-            func.count(UserQuestionInstance.user_question_instance_id).label("num_solves"),
-            func.avg(UserQuestionInstance.lapse_time).label("avg_solve_time"),
+def upsert_long_term_stats_for_events(db: Session, event_ids: Iterable[int]) -> int:
+    """Upsert solved counts and average solve time per (event, difficulty); returns the rows written."""
+    event_ids = list(dict.fromkeys(event_ids))
+    if not event_ids:
+        return 0
+
+    stats = (
+        select(
+            QuestionInstance.event_id,
+            Question.difficulty,
+            func.avg(UserQuestionInstance.lapse_time),
+            func.count(UserQuestionInstance.user_question_instance_id),
         )
-        .join(QuestionInstance, Question.question_id == QuestionInstance.question_id)
+        .join(Question, Question.question_id == QuestionInstance.question_id)
         .join(
             UserQuestionInstance,
             QuestionInstance.question_instance_id == UserQuestionInstance.question_instance_id,
         )
-        .filter(
-            QuestionInstance.event_id == event_id,
+        .where(
+            QuestionInstance.event_id.in_(event_ids),
             UserQuestionInstance.points.is_not(None),
             UserQuestionInstance.points > 0,
             UserQuestionInstance.lapse_time.is_not(None),
         )
-        .group_by(Question.difficulty)
-        .all()
+        .group_by(QuestionInstance.event_id, Question.difficulty)
     )
 
-    upserted = 0
-    for row in stats_rows:
-        difficulty = getattr(row, "difficulty", None)
-        num_solves = getattr(row, "num_solves", None)
-        avg_solve_time = getattr(row, "avg_solve_time", None)
-
-        if difficulty is None or num_solves is None or avg_solve_time is None:
-            continue
-
-        existing = (
-            db.query(LongTermStatistics)
-            .filter(
-                LongTermStatistics.event_id == event_id,
-                LongTermStatistics.difficulty == difficulty,
-            )
-            .one_or_none()
-        )
-
-        if existing is None:
-            db.add(
-                LongTermStatistics(
-                    event_id=event_id,
-                    difficulty=difficulty,
-                    average_question_solve_time=float(avg_solve_time),
-                    number_solves=int(num_solves),
-                )
-            )
-        else:
-            existing.average_question_solve_time = float(avg_solve_time)
-            existing.number_solves = int(num_solves)
+    insert = insert_for(db)(LongTermStatistics).from_select(
+        ["event_id", "difficulty", "average_question_solve_time", "number_solves"],
+        stats,
+    )
+    statement = insert.on_conflict_do_update(
+        index_elements=[LongTermStatistics.event_id, LongTermStatistics.difficulty],
+        set_={
+            "average_question_solve_time": insert.excluded.average_question_solve_time,
+            "number_solves": insert.excluded.number_solves,
+        },
+        where=LongTermStatistics.number_solves <= insert.excluded.number_solves,
+    )
+    return db.execute(statement).rowcount or 0
 
-        upserted += 1
 
-    return upserted
+def upsert_long_term_stats_for_event(db: Session, event_id: int) -> int:
+    """Upsert per-difficulty solved counts and average solve time for one event."""
+    return upsert_long_term_stats_for_events(db, [event_id])
 
 
-def upsert_long_term_stats_for_events(db: Session, event_ids: list[int]) -> int:
-    total_upserts = 0
-    for event_id in event_ids:
-        total_upserts += upsert_long_term_stats_for_event(db, event_id)
-    return total_upserts
+def upsert_long_term_stats_for_unpurged_events(db: Session, event_ids: Iterable[int]) -> int:
+    """
+    Upsert the statistics of the events that have no stored rows yet; events
+    a cleanup already started purging keep the rows captured before.
+    """
+    event_ids = list(dict.fromkeys(event_ids))
+    if not event_ids:
+        return 0
+    captured = set(db.scalars(
+        select(LongTermStatistics.event_id).where(LongTermStatistics.event_id.in_(event_ids)).distinct()
+    ))
+    return upsert_long_term_stats_for_events(db, [event_id for event_id in event_ids if event_id not in captured])
@@ -0,0 +1,229 @@
+"""
+question_import.py
+
+Set-based import of question batches (questions, tags, language specific
+properties and test cases).
+
+Instead of building one ORM graph per question, a batch is:
+1. validated in memory (duplicate names, unknown difficulty, duplicate languages)
+2. resolved against the database with one query each for existing question
+   names, languages and tags; missing tags are created with a single
+   INSERT ... ON CONFLICT (tag_name) DO NOTHING, so a tag created by a
+   concurrent import is reused instead of failing the batch
+3. written in chunks of IMPORT_CHUNK_SIZE questions with executemany
+   insert().values() statements, each chunk inside a SAVEPOINT (large test
+   case payloads go to test_case_payload, see test_case_storage.py)
+
+A chunk that still fails (e.g. a concurrent insert of the same name) is
+retried row by row so only the offending questions are reported. Errors are
+returned per row instead of failing the whole batch; committing is left to
+the caller.
+"""
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from pydantic import BaseModel, Field
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from database_operations.dialect import insert_for
+from models.schema import Language, Question, QuestionLanguageSpecificProperties, Tag, TestCase, question_tag
+from services.test_case_storage import prepare_test_case_rows
+
+if TYPE_CHECKING:
+    from endpoints.questions_api import CreateQuestionRequest
+
+IMPORT_CHUNK_SIZE = 500
+QUESTION_DIFFICULTIES = frozenset(Question.__table__.c.difficulty.type.enums)
+
+
+class QuestionImportRowError(BaseModel):
+    index: int
+    question_name: Optional[str] = None
+    detail: str
+
+
+class QuestionImportResult(BaseModel):
+    created: int = 0
+    question_ids: list[int] = Field(default_factory=list)
+    errors: list[QuestionImportRowError] = Field(default_factory=list)
+
+
+def _validate_rows(
+    rows: list[tuple[int, "CreateQuestionRequest"]],
+) -> tuple[list[tuple[int, "CreateQuestionRequest"]], list[QuestionImportRowError]]:
+    valid, errors, seen_names = [], [], set()
+    for index, request in rows:
+        name = request.question_name
+        detail = None
+        if not name.strip():
+            detail = "Question name must not be empty."
+        elif name in seen_names:
+            detail = f"Duplicate question name '{name}' in batch."
+        elif request.difficulty not in QUESTION_DIFFICULTIES:
+            detail = f"Unknown difficulty '{request.difficulty}'."
+        else:
+            language_names = [lsp.language_name for lsp in request.language_specific_properties]
+            if len(set(language_names)) != len(language_names):
+                detail = "Duplicate language in language_specific_properties."
+
+        seen_names.add(name)
+        if detail:
+            errors.append(QuestionImportRowError(index=index, question_name=name, detail=detail))
+        else:
+            valid.append((index, request))
+    return valid, errors
+
+
+def _existing_question_names(db: Session, names: set[str]) -> set[str]:
+    if not names:
+        return set()
+    return set(db.scalars(select(Question.question_name).where(Question.question_name.in_(names))))
+
+
+def _resolve_languages(db: Session, names: set[str]) -> dict[str, int]:
+    """display_name -> lang_judge_id for every known language in `names`."""
+    if not names:
+        return {}
+    rows = db.execute(
+        select(Language.display_name, Language.lang_judge_id).where(Language.display_name.in_(names))
+    ).all()
+    return {display_name: lang_judge_id for display_name, lang_judge_id in rows}
+
+
+def _resolve_tags(db: Session, names: set[str]) -> dict[str, int]:
+    """tag_name -> tag_id, creating the tags that do not exist yet."""
+    if not names:
+        return {}
+    tag_ids = dict(db.execute(select(Tag.tag_name, Tag.tag_id).where(Tag.tag_name.in_(names))).all())
+    missing = sorted(names - tag_ids.keys())
+    if missing:
+        db.execute(
+            insert_for(db)(Tag)
+            .values([{"tag_name": name} for name in missing])
+            .on_conflict_do_nothing(index_elements=[Tag.tag_name])
+        )
+        # Read the ids back: some of the tags may have been created by another import meanwhile.
+        tag_ids.update(db.execute(select(Tag.tag_name, Tag.tag_id).where(Tag.tag_name.in_(missing))).all())
+    return tag_ids
+
+
+def _insert_chunk(
+    db: Session,
+    chunk: list[tuple[int, "CreateQuestionRequest"]],
+    language_ids: dict[str, int],
+    tag_ids: dict[str, int],
+) -> list[int]:
+    now = datetime.now(timezone.utc)
+    inserted = db.execute(
+        insert(Question).returning(Question.question_id, sort_by_parameter_order=True),
+        [
+            {
+                "question_name": request.question_name,
+                "question_description": request.question_description,
+                "media": request.media,
+                "difficulty": request.difficulty,
+                "created_at": now,
+                "last_modified_at": now,
+            }
+            for _, request in chunk
+        ],
+    ).scalars().all()
+
+    tag_rows, property_rows, test_case_rows = [], [], []
+    for question_id, (_, request) in zip(inserted, chunk):
+        tag_rows.extend(
+            {"question_id": question_id, "tag_id": tag_ids[name]} for name in dict.fromkeys(request.tags)
+        )
+        property_rows.extend(
+            {
+                "question_id": question_id,
+                "language_id": language_ids[lsp.language_name],
+                "imports": lsp.imports,
+                "preset_classes": lsp.preset_classes,
+                "preset_functions": lsp.preset_functions,
+                "main_function": lsp.main_function,
+                "template_code": lsp.template_code,
+            }
+            for lsp in request.language_specific_properties
+        )
+        test_case_rows.extend(
+            {"question_id": question_id, "input_data": tc.input_data, "expected_output": tc.expected_output}
+            for tc in request.test_cases
+        )
+
+    if tag_rows:
+        db.execute(insert(question_tag), tag_rows)
+    if property_rows:
+        db.execute(insert(QuestionLanguageSpecificProperties), property_rows)
+    if test_case_rows:
+        db.execute(insert(TestCase), prepare_test_case_rows(db, test_case_rows))
+    return list(inserted)
+
+
+def _error_detail(error: Exception) -> str:
+    orig = getattr(error, "orig", None)
+    message_detail = getattr(getattr(orig, "diag", None), "message_detail", None)
+    return message_detail or str(orig or error).split("\n")[0]
+
+
+def bulk_import_questions(
+    db: Session,
+    requests: Sequence["CreateQuestionRequest"],
+    start_index: int = 0,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> QuestionImportResult:
+    """
+    Insert `requests` and report which rows were created and which failed.
+
+    Row indexes in the result start at `start_index`, so callers importing a
+    stream in several batches can report positions in the original payload.
+    """
+    result = QuestionImportResult()
+    rows, result.errors = _validate_rows(list(enumerate(requests, start_index)))
+
+    existing_names = _existing_question_names(db, {request.question_name for _, request in rows})
+    language_ids = _resolve_languages(
+        db, {lsp.language_name for _, request in rows for lsp in request.language_specific_properties}
+    )
+
+    valid_rows = []
+    for index, request in rows:
+        unknown = [
+            lsp.language_name for lsp in request.language_specific_properties
+            if lsp.language_name not in language_ids
+        ]
+        if request.question_name in existing_names:
+            detail = f"Question '{request.question_name}' already exists."
+        elif unknown:
+            detail = f"Unknown language(s): {', '.join(sorted(set(unknown)))}."
+        else:
+            valid_rows.append((index, request))
+            continue
+        result.errors.append(QuestionImportRowError(index=index, question_name=request.question_name, detail=detail))
+
+    tag_ids = _resolve_tags(db, {name for _, request in valid_rows for name in request.tags})
+
+    for start in range(0, len(valid_rows), chunk_size):
+        chunk = valid_rows[start:start + chunk_size]
+        try:
+            with db.begin_nested():
+                result.question_ids.extend(_insert_chunk(db, chunk, language_ids, tag_ids))
+            continue
+        except (IntegrityError, DataError):
+            pass
+
+        # Narrow the failure down to the offending rows.
+        for row in chunk:
+            try:
+                with db.begin_nested():
+                    result.question_ids.extend(_insert_chunk(db, [row], language_ids, tag_ids))
+            except (IntegrityError, DataError) as e:
+                result.errors.append(
+                    QuestionImportRowError(index=row[0], question_name=row[1].question_name, detail=_error_detail(e))
+                )
+
+    result.created = len(result.question_ids)
+    result.errors.sort(key=lambda error: error.index)
+    return result
@@ -0,0 +1,254 @@
+"""
+question_import_jobs.py
+
+Background import of question bank files (NDJSON or a JSON array).
+
+The upload endpoint spools the file to disk and registers a job; the job
+then parses the file incrementally with iter_json_records(), validates each
+record as a CreateQuestionRequest and hands chunks to bulk_import_questions().
+Every chunk is committed on its own, so memory stays bounded by the chunk
+size rather than the file size, and progress can be polled by job ID.
+
+Jobs are tracked in process memory (like the other in-process caches), so
+progress is only visible on the worker that accepted the upload.
+"""
+import codecs
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterator, Literal, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+from database_operations.database import SessionLocal
+from services.catalogue_version import QUESTIONS_CATALOGUE, bump_catalogue_version
+from services.question_import import (
+    IMPORT_CHUNK_SIZE,
+    QuestionImportRowError,
+    bulk_import_questions,
+)
+from services.response_cache import QUESTIONS_TAG, invalidate_tags
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 1024
+MAX_REPORTED_ERRORS = 1000
+MAX_RETAINED_JOBS = 100
+
+ImportJobStatus = Literal["pending", "running", "completed", "failed"]
+
+
+class QuestionImportJob(BaseModel):
+    job_id: str
+    status: ImportJobStatus = "pending"
+    chunk_size: int
+    processed: int = 0
+    created: int = 0
+    error_count: int = 0
+    errors: list[QuestionImportRowError] = Field(default_factory=list)
+    detail: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+_jobs_lock = threading.Lock()
+_jobs: dict[str, QuestionImportJob] = {}
+
+
+class InvalidImportFile(ValueError):
+    """The file is not NDJSON or a JSON array; `index` is the failing record."""
+
+    def __init__(self, index: int, message: str):
+        super().__init__(message)
+        self.index = index
+
+
+def iter_json_records(stream: BinaryIO, read_size: int = READ_SIZE) -> Iterator[object]:
+    """
+    Yield records from a JSON array or NDJSON byte stream, reading `read_size`
+    bytes at a time. Only the record being decoded is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    eof = False
+
+    def fill() -> bool:
+        """Append the next block to the buffer; False once the stream is exhausted."""
+        nonlocal buffer, eof
+        if eof:
+            return False
+        chunk = stream.read(read_size)
+        eof = not chunk
+        buffer += text.decode(chunk, final=eof)
+        return bool(chunk)
+
+    def next_token() -> str:
+        """Skip whitespace and return the next character ("" at end of stream)."""
+        nonlocal buffer
+        buffer = buffer.lstrip()
+        while not buffer and fill():
+            buffer = buffer.lstrip()
+        return buffer[:1]
+
+    array = next_token() == "["
+    if array:
+        buffer = buffer[1:]
+    index = 0
+
+    while True:
+        token = next_token()
+        if not array:
+            if not token:
+                return
+            newline = buffer.find("\n")
+            while newline == -1 and fill():
+                newline = buffer.find("\n")
+            line, buffer = (buffer, "") if newline == -1 else (buffer[:newline], buffer[newline + 1:])
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise InvalidImportFile(index, f"Record {index} is not valid JSON: {e.msg}.") from e
+            index += 1
+            continue
+
+        if not token:
+            raise InvalidImportFile(index, "JSON array is missing its closing ']'.")
+        if token == "]" and index:
+            break
+        if index:
+            if token != ",":
+                raise InvalidImportFile(index, "Expected ',' or ']' after a record.")
+            buffer = buffer[1:]
+            if not next_token():
+                raise InvalidImportFile(index, "JSON array is missing its closing ']'.")
+        elif token == "]":
+            break
+
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer)
+                break
+            except json.JSONDecodeError as e:
+                if not fill():
+                    raise InvalidImportFile(index, f"Record {index} is not valid JSON: {e.msg}.") from e
+        buffer = buffer[end:]
+        yield record
+        index += 1
+
+    buffer = buffer[1:]
+    if next_token():
+        raise InvalidImportFile(index, "Unexpected data after the closing ']'.")
+
+
+def create_import_job(chunk_size: int = IMPORT_CHUNK_SIZE) -> QuestionImportJob:
+    job = QuestionImportJob(
+        job_id=uuid.uuid4().hex,
+        chunk_size=chunk_size,
+        created_at=datetime.now(timezone.utc),
+    )
+    with _jobs_lock:
+        _jobs[job.job_id] = job
+        # Forget the oldest finished jobs once too many are retained.
+        finished = [j for j in _jobs.values() if j.finished_at is not None]
+        for old in sorted(finished, key=lambda j: j.created_at)[:max(0, len(_jobs) - MAX_RETAINED_JOBS)]:
+            del _jobs[old.job_id]
+    return job
+
+
+def get_import_job(job_id: str) -> Optional[QuestionImportJob]:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return job.model_copy(deep=True) if job else None
+
+
+def _record_errors(job: QuestionImportJob, errors: list[QuestionImportRowError]) -> None:
+    job.error_count += len(errors)
+    room = MAX_REPORTED_ERRORS - len(job.errors)
+    if room > 0:
+        job.errors.extend(errors[:room])
+
+
+def _import_chunk(job: QuestionImportJob, chunk: list) -> None:
+    db = SessionLocal()
+    try:
+        result = bulk_import_questions(db, [request for _, request in chunk])
+        # Rows are numbered by position in the chunk; map them back to
+        # positions in the file (invalid records were already skipped).
+        positions = [index for index, _ in chunk]
+        for error in result.errors:
+            error.index = positions[error.index]
+        if result.created:
+            bump_catalogue_version(db, QUESTIONS_CATALOGUE)
+        db.commit()
+        if result.created:
+            invalidate_tags(QUESTIONS_TAG)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    with _jobs_lock:
+        job.processed = positions[-1] + 1
+        job.created += result.created
+        _record_errors(job, result.errors)
+
+
+def run_question_import_job(job_id: str, path: str) -> None:
+    """Import the file at `path` for a job created by create_import_job(), then delete the file."""
+    from endpoints.questions_api import CreateQuestionRequest
+
+    with _jobs_lock:
+        job = _jobs[job_id]
+        job.status = "running"
+
+    chunk: list[tuple[int, CreateQuestionRequest]] = []
+    index = -1
+    try:
+        with open(path, "rb") as stream:
+            for index, record in enumerate(iter_json_records(stream)):
+                try:
+                    chunk.append((index, CreateQuestionRequest.model_validate(record)))
+                except ValidationError as e:
+                    name = record.get("question_name") if isinstance(record, dict) else None
+                    detail = "; ".join(
+                        f"{'.'.join(str(part) for part in err['loc']) or 'record'}: {err['msg']}"
+                        for err in e.errors()
+                    )
+                    with _jobs_lock:
+                        _record_errors(job, [QuestionImportRowError(index=index, question_name=name, detail=detail)])
+                        job.processed = index + 1
+
+                if len(chunk) >= job.chunk_size:
+                    _import_chunk(job, chunk)
+                    chunk = []
+
+        if chunk:
+            _import_chunk(job, chunk)
+        with _jobs_lock:
+            job.processed = index + 1
+            job.status = "completed"
+    except InvalidImportFile as e:
+        logger.warning(f"Question import {job_id} stopped at record {e.index}: {e}")
+        with _jobs_lock:
+            job.status = "failed"
+            job.detail = str(e)
+    except Exception as e:
+        logger.error(f"Question import {job_id} failed: {e}")
+        with _jobs_lock:
+            job.status = "failed"
+            job.detail = "Failed to import questions."
+    finally:
+        with _jobs_lock:
+            job.finished_at = datetime.now(timezone.utc)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        logger.info(
+            f"Question import {job_id} {job.status}: {job.created} created, {job.error_count} rejected."
+        )
@@ -0,0 +1,109 @@
+"""
+question_instance_purge.py
+
+Chunked, throttled deletion of the question instances of ended events, used
+by the competition and AlgoTime cleanup jobs.
+
+A single DELETE FROM question_instance WHERE event_id IN (...) cascades
+through user_question_instance, submission and most_recent_submission in one
+statement and holds every affected row lock until it commits. Instead,
+purge_event_question_instances() deletes leaf-first:
+
+    submission / most_recent_submission -> user_question_instance -> question_instance
+
+PURGE_BATCH_SIZE rows at a time, selected by primary key through the
+event's question instances. Each batch is committed on its own, followed by
+PURGE_PAUSE_SECONDS of sleep so live traffic can get at the tables. Once
+PURGE_MAX_RUN_SECONDS have passed the purge stops between batches and reports
+itself incomplete; the cleanup job picks the same events up on its next tick
+and carries on where it stopped (already deleted rows are simply not found
+again).
+"""
+import os
+import time
+from typing import Callable, Iterable
+
+from pydantic import BaseModel, Field
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from models.schema import MostRecentSubmission, QuestionInstance, Submission, UserQuestionInstance
+
+PURGE_BATCH_SIZE = int(os.getenv("CLEANUP_PURGE_BATCH_SIZE", "1000"))
+PURGE_PAUSE_SECONDS = float(os.getenv("CLEANUP_PURGE_PAUSE_SECONDS", "0.05"))
+PURGE_MAX_RUN_SECONDS = float(os.getenv("CLEANUP_PURGE_MAX_RUN_SECONDS", "30"))
+
+
+class PurgeResult(BaseModel):
+    deleted: dict[str, int] = Field(default_factory=dict)
+    complete: bool = True
+
+    @property
+    def question_instances_deleted(self) -> int:
+        return self.deleted.get(QuestionInstance.__tablename__, 0)
+
+
+def _purge_steps(event_ids: list[int]) -> list:
+    """(primary key column, query selecting the rows to delete), leaves first."""
+    instances = QuestionInstance.event_id.in_(event_ids)
+    steps = []
+    for leaf, pk in ((Submission, Submission.submission_id), (MostRecentSubmission, MostRecentSubmission.row_id)):
+        steps.append((
+            pk,
+            select(pk)
+            .join(UserQuestionInstance,
+                  leaf.user_question_instance_id == UserQuestionInstance.user_question_instance_id)
+            .join(QuestionInstance,
+                  UserQuestionInstance.question_instance_id == QuestionInstance.question_instance_id)
+            .where(instances),
+        ))
+    steps.append((
+        UserQuestionInstance.user_question_instance_id,
+        select(UserQuestionInstance.user_question_instance_id)
+        .join(QuestionInstance,
+              UserQuestionInstance.question_instance_id == QuestionInstance.question_instance_id)
+        .where(instances),
+    ))
+    steps.append((QuestionInstance.question_instance_id, select(QuestionInstance.question_instance_id).where(instances)))
+    return steps
+
+
+def purge_event_question_instances(
+    db: Session,
+    event_ids: Iterable[int],
+    batch_size: int = PURGE_BATCH_SIZE,
+    pause_seconds: float = PURGE_PAUSE_SECONDS,
+    max_run_seconds: float = PURGE_MAX_RUN_SECONDS,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> PurgeResult:
+    """
+    Delete the question instances of `event_ids` and everything hanging off
+    them, committing after every batch (pending changes in `db` are
+    committed with the first one).
+    """
+    result = PurgeResult()
+    event_ids = list(event_ids)
+    if not event_ids:
+        return result
+
+    deadline = clock() + max_run_seconds
+    for pk, rows in _purge_steps(event_ids):
+        table = pk.table.name
+        while True:
+            if clock() >= deadline:
+                result.complete = False
+                return result
+
+            ids = db.scalars(rows.limit(batch_size)).all()
+            if not ids:
+                break
+
+            db.execute(delete(pk.table).where(pk.in_(ids)))
+            db.commit()
+            result.deleted[table] = result.deleted.get(table, 0) + len(ids)
+
+            if len(ids) < batch_size:
+                break
+            sleep(pause_seconds)
+    return result
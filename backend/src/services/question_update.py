@@ -0,0 +1,216 @@
+"""
+question_update.py
+
+Diff-based update of an existing question.
+
+Instead of deleting and re-inserting every language specific property and
+test case, apply_question_update() compares the request with what is stored
+and only writes the difference:
+- test cases are matched by test_case_id when the request carries one,
+  otherwise by a content hash of (input_data, expected_output) built from the
+  same payload hashes test_case_storage uses; unmatched stored rows are
+  deleted and unmatched request rows inserted
+- language specific properties are keyed by language, resolved for the whole
+  request in one query
+- tags and scalar fields are only touched when they differ
+
+Rows are written with bulk insert/update/delete statements; nothing is
+committed here.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Optional
+
+from pydantic import BaseModel, Field
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from models.schema import Language, Question, QuestionLanguageSpecificProperties, Tag, TestCase
+from services.test_case_storage import encode_payload, hash_payload, prepare_test_case_rows, prune_orphan_payloads
+
+if TYPE_CHECKING:
+    from endpoints.questions_api import CreateQuestionRequest
+
+QUESTION_FIELDS = ("question_name", "question_description", "media", "difficulty")
+PROPERTY_FIELDS = ("imports", "preset_classes", "preset_functions", "main_function", "template_code")
+
+
+class QuestionUpdateSummary(BaseModel):
+    fields_changed: list[str] = Field(default_factory=list)
+    tags_changed: bool = False
+    properties_inserted: int = 0
+    properties_updated: int = 0
+    properties_deleted: int = 0
+    test_cases_inserted: int = 0
+    test_cases_updated: int = 0
+    test_cases_deleted: int = 0
+    test_cases_unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(
+            self.fields_changed or self.tags_changed
+            or self.properties_inserted or self.properties_updated or self.properties_deleted
+            or self.test_cases_inserted or self.test_cases_updated or self.test_cases_deleted
+        )
+
+
+def hash_test_case(input_data: Any, expected_output: Any) -> str:
+    """Stable hash of a test case's content (key order and whitespace do not matter)."""
+    return _content_key(hash_payload(encode_payload(input_data)), hash_payload(encode_payload(expected_output)))
+
+
+def _content_key(input_hash: str, output_hash: str) -> str:
+    return f"{input_hash}:{output_hash}"
+
+
+def _stored_content_key(input_data: Any, expected_output: Any, input_ref: Optional[str], output_ref: Optional[str]) -> str:
+    # Externalized payloads are already addressed by the hash of their encoding.
+    return _content_key(
+        input_ref or hash_payload(encode_payload(input_data)),
+        output_ref or hash_payload(encode_payload(expected_output)),
+    )
+
+
+def _diff_test_cases(db: Session, question_id: int, requested: list, summary: QuestionUpdateSummary) -> None:
+    stored = {}
+    old_refs = {}
+    for test_case_id, input_data, expected_output, input_ref, output_ref in db.execute(
+        select(TestCase.test_case_id, TestCase.input_data, TestCase.expected_output,
+               TestCase.input_ref, TestCase.output_ref)
+        .where(TestCase.question_id == question_id)
+    ):
+        stored[test_case_id] = _stored_content_key(input_data, expected_output, input_ref, output_ref)
+        old_refs[test_case_id] = (input_ref, output_ref)
+
+    unmatched_requests = []
+    updates = []
+    for tc in requested:
+        test_case_id = getattr(tc, "test_case_id", None)
+        if test_case_id in stored:
+            if stored.pop(test_case_id) == hash_test_case(tc.input_data, tc.expected_output):
+                summary.test_cases_unchanged += 1
+            else:
+                updates.append({
+                    "test_case_id": test_case_id,
+                    "input_data": tc.input_data,
+                    "expected_output": tc.expected_output,
+                })
+        else:
+            unmatched_requests.append(tc)
+
+    # Remaining stored rows, grouped by content so duplicates pair off one by one.
+    by_hash: dict[str, list[int]] = defaultdict(list)
+    for test_case_id, content_key in sorted(stored.items()):
+        by_hash[content_key].append(test_case_id)
+
+    inserts = []
+    for tc in unmatched_requests:
+        candidates = by_hash.get(hash_test_case(tc.input_data, tc.expected_output))
+        if candidates:
+            candidates.pop(0)
+            summary.test_cases_unchanged += 1
+        else:
+            inserts.append({
+                "question_id": question_id,
+                "input_data": tc.input_data,
+                "expected_output": tc.expected_output,
+            })
+
+    deletes = [test_case_id for ids in by_hash.values() for test_case_id in ids]
+    if updates or inserts:
+        prepare_test_case_rows(db, updates + inserts)
+    if deletes:
+        db.execute(delete(TestCase).where(TestCase.test_case_id.in_(deletes)))
+    if updates:
+        db.execute(update(TestCase), updates)
+    if inserts:
+        db.execute(insert(TestCase), inserts)
+
+    replaced = [row["test_case_id"] for row in updates] + deletes
+    prune_orphan_payloads(db, {ref for test_case_id in replaced for ref in old_refs[test_case_id]})
+
+    summary.test_cases_deleted = len(deletes)
+    summary.test_cases_updated = len(updates)
+    summary.test_cases_inserted = len(inserts)
+
+
+def _diff_language_properties(db: Session, question_id: int, requested: list, summary: QuestionUpdateSummary) -> None:
+    names = {lsp.language_name for lsp in requested}
+    language_ids = dict(
+        db.execute(select(Language.display_name, Language.lang_judge_id).where(Language.display_name.in_(names))).all()
+    ) if names else {}
+
+    wanted = {}
+    for lsp in requested:
+        # Unknown languages are skipped, as before.
+        if lsp.language_name in language_ids:
+            wanted[language_ids[lsp.language_name]] = {field: getattr(lsp, field) or "" for field in PROPERTY_FIELDS}
+
+    # NULL and "" are the same empty snippet; only real edits count as changes.
+    stored = {
+        row.language_id: {field: getattr(row, field) or "" for field in PROPERTY_FIELDS}
+        for row in db.execute(
+            select(QuestionLanguageSpecificProperties.language_id, *[
+                getattr(QuestionLanguageSpecificProperties, field) for field in PROPERTY_FIELDS
+            ]).where(QuestionLanguageSpecificProperties.question_id == question_id)
+        )
+    }
+
+    deletes = [language_id for language_id in stored if language_id not in wanted]
+    updates = [
+        {"question_id": question_id, "language_id": language_id, **values}
+        for language_id, values in wanted.items()
+        if language_id in stored and stored[language_id] != values
+    ]
+    inserts = [
+        {"question_id": question_id, "language_id": language_id, **values}
+        for language_id, values in wanted.items()
+        if language_id not in stored
+    ]
+
+    if deletes:
+        db.execute(
+            delete(QuestionLanguageSpecificProperties).where(
+                QuestionLanguageSpecificProperties.question_id == question_id,
+                QuestionLanguageSpecificProperties.language_id.in_(deletes),
+            )
+        )
+    if updates:
+        db.execute(update(QuestionLanguageSpecificProperties), updates)
+    if inserts:
+        db.execute(insert(QuestionLanguageSpecificProperties), inserts)
+
+    summary.properties_deleted = len(deletes)
+    summary.properties_updated = len(updates)
+    summary.properties_inserted = len(inserts)
+
+
+def _diff_tags(db: Session, question: Question, requested: list[str], summary: QuestionUpdateSummary) -> None:
+    wanted = list(dict.fromkeys(requested))
+    if {tag.tag_name for tag in question.tags} == set(wanted):
+        return
+
+    existing_tags = db.query(Tag).filter(Tag.tag_name.in_(wanted)).all()
+    existing_names = {tag.tag_name for tag in existing_tags}
+    question.tags = existing_tags + [Tag(tag_name=name) for name in wanted if name not in existing_names]
+    summary.tags_changed = True
+
+
+def apply_question_update(db: Session, question: Question, request: "CreateQuestionRequest") -> QuestionUpdateSummary:
+    """Bring `question` in line with `request`, writing only what changed."""
+    summary = QuestionUpdateSummary()
+
+    for field in QUESTION_FIELDS:
+        value = getattr(request, field)
+        if getattr(question, field) != value:
+            setattr(question, field, value)
+            summary.fields_changed.append(field)
+
+    _diff_tags(db, question, request.tags, summary)
+    _diff_language_properties(db, question.question_id, request.language_specific_properties, summary)
+    _diff_test_cases(db, question.question_id, request.test_cases, summary)
+
+    if summary.changed:
+        question.last_modified_at = datetime.now(timezone.utc)
+    return summary
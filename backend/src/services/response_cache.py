@@ -0,0 +1,178 @@
+"""
+response_cache.py
+
+In-process cache of pre-serialized JSON responses for catalogue endpoints
+(question listing, riddles listing, languages, test cases).
+
+Entries are the exact response bytes, keyed by endpoint + normalized query
+parameters, so a hit skips both the database and Pydantic serialization.
+
+- LRU eviction under a byte budget (RESPONSE_CACHE_MAX_BYTES, default 32 MiB)
+- every entry carries tags; mutating endpoints call invalidate_tags() after
+  they commit (e.g. "questions", "riddles", "languages", "question:12")
+- an optional per-entry TTL bounds staleness across workers, each of which
+  has its own cache
+- stats() reports hit ratio and memory usage for the admin dashboard
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, Mapping, NamedTuple, Optional
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+DEFAULT_TTL_SECONDS = 60.0
+
+# Tags used by the catalogue endpoints.
+QUESTIONS_TAG = "questions"
+RIDDLES_TAG = "riddles"
+LANGUAGES_TAG = "languages"
+TESTCASES_TAG = "testcases"
+
+
+def question_tag(question_id: int) -> str:
+    return f"question:{question_id}"
+
+
+class _Entry(NamedTuple):
+    body: bytes
+    tags: frozenset[str]
+    expires_at: Optional[float]
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized responses bounded by total body size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._tag_index: dict[str, set[str]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.body
+
+    def set(self, key: str, body: bytes, tags: Iterable[str] = (), ttl_seconds: Optional[float] = None) -> None:
+        if len(body) > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds is not None else None
+        entry = _Entry(body, frozenset(tags), expires_at)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            for tag in entry.tags:
+                self._tag_index.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Drop every entry carrying any of the tags. Returns the number of entries removed."""
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tag_index.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+            self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= len(entry.body)
+        for tag in entry.tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_BYTES)
+
+
+def build_cache_key(namespace: str, params: Mapping[str, Any]) -> str:
+    """Stable key from query params: None values dropped, strings stripped, keys sorted."""
+    parts = []
+    for name in sorted(params):
+        value = params[name]
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        parts.append(f"{name}={value}")
+    return f"{namespace}?{'&'.join(parts)}"
+
+
+def serialize_json(payload: Any) -> bytes:
+    """Serialize like FastAPI's JSONResponse (compact, UTF-8)."""
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def cached_json_response(
+    key: str,
+    tags: Iterable[str],
+    build: Callable[[], bytes],
+    headers: Optional[Mapping[str, str]] = None,
+    ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+) -> Response:
+    """Serve `key` from the cache, or call `build()` for the serialized body and cache it."""
+    body = response_cache.get(key)
+    if body is None:
+        body = build()
+        response_cache.set(key, body, tags, ttl_seconds)
+    return Response(content=body, media_type="application/json", headers=dict(headers or {}))
+
+
+def invalidate_tags(*tags: str) -> int:
+    return response_cache.invalidate_tags(*tags)
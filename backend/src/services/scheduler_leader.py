@@ -0,0 +1,122 @@
+"""
+scheduler_leader.py
+
+Leader election for the background job scheduler, so that with several
+uvicorn workers or replicas each scheduled job runs once per interval
+cluster-wide instead of once per process.
+
+Every process still starts its scheduler, but a job only does its work in the
+process that holds the leader lock (see job_runner.py); the others skip the
+run. The lock is:
+- on PostgreSQL, a session-level advisory lock (pg_try_advisory_lock) held on
+  one dedicated AUTOCOMMIT connection for as long as the process leads. If the
+  leader dies its connection closes, the lock is released and the next
+  process to tick takes over. Session locks need a direct connection: they do
+  not work through a transaction-pooling proxy such as PgBouncer.
+- elsewhere (SQLite in local development), an exclusive flock on
+  SCHEDULER_LOCK_FILE, which elects one leader among the workers of one
+  machine. Without fcntl (Windows) every process leads.
+
+Leadership is checked, and if free taken, before every run; it is kept until
+release() or the process exits.
+"""
+import logging
+import os
+import tempfile
+import threading
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# "thinkly" as a 64-bit advisory lock key
+SCHEDULER_LOCK_KEY = int.from_bytes(b"thinkly", "big")
+SCHEDULER_LOCK_FILE = os.getenv(
+    "SCHEDULER_LOCK_FILE", os.path.join(tempfile.gettempdir(), "thinkly-scheduler.lock")
+)
+
+
+class SchedulerLeadership:
+    def __init__(self, engine: Engine, lock_file: str = SCHEDULER_LOCK_FILE, key: int = SCHEDULER_LOCK_KEY):
+        self._engine = engine
+        self._lock_file = lock_file
+        self._key = key
+        self._connection: Optional[Connection] = None
+        self._fd: Optional[int] = None
+        self._mutex = threading.Lock()
+
+    @property
+    def uses_advisory_lock(self) -> bool:
+        return self._engine.dialect.name == "postgresql"
+
+    def is_leader(self) -> bool:
+        """True if this process leads, acquiring the lock when nobody holds it."""
+        with self._mutex:
+            if self.uses_advisory_lock:
+                return self._check_advisory_lock()
+            return self._check_file_lock()
+
+    def release(self) -> None:
+        with self._mutex:
+            if self._connection is not None:
+                try:
+                    self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self._key})
+                    self._connection.close()
+                except Exception as e:
+                    logger.warning("Scheduler leadership: could not release advisory lock cleanly: %s", e)
+                    self._connection.invalidate()
+                self._connection = None
+            if self._fd is not None:
+                os.close(self._fd)  # closing the descriptor drops the flock
+                self._fd = None
+
+    def _check_advisory_lock(self) -> bool:
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT 1"))
+                return True
+            except Exception as e:
+                # The session (and with it the lock) is gone; compete again.
+                logger.warning("Scheduler leadership: lost the leader connection: %s", e)
+                self._connection.invalidate()
+                self._connection = None
+
+        connection = self._engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self._key}
+            ).scalar()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+
+        self._connection = connection
+        logger.info("Scheduler leadership: this process is now the scheduler leader.")
+        return True
+
+    def _check_file_lock(self) -> bool:
+        if fcntl is None:
+            return True
+        if self._fd is not None:
+            return True
+
+        fd = os.open(self._lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        self._fd = fd
+        logger.info("Scheduler leadership: this process is now the scheduler leader (%s).", self._lock_file)
+        return True
@@ -0,0 +1,221 @@
+"""
+session_recorder.py
+
+Write-behind recorder for UserSession rows.
+
+login / google_login used to INSERT one UserSession per request (storing the
+full JWT), and logout ran an UPDATE over every active session of the user.
+Both now only touch an in-process queue; a background job drains it and
+writes everything in one bulk INSERT plus one UPDATE per flush.
+
+Only a SHA-256 digest of the access token is persisted (64 hex chars), which
+keeps the table and its unique index at a fixed row size.
+
+Scheduled from main.py:
+    flush_pending_sessions   — every few seconds (and once more on shutdown)
+    prune_expired_sessions   — daily housekeeping
+"""
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, OperationalError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from database_operations.database import SessionLocal
+from models.schema import UserSession
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 5
+# Upper bound on queued rows if the database is unreachable for a while;
+# the oldest rows are dropped first once the bound is hit.
+MAX_PENDING_SESSIONS = 10_000
+# Expired sessions are kept long enough to back the admin dashboard login
+# charts (3 months + the previous period used for trends).
+SESSION_RETENTION_DAYS = 180
+
+_lock = threading.Lock()
+_pending_sessions: deque[dict] = deque(maxlen=MAX_PENDING_SESSIONS)
+# user_id -> time of the most recent logout not yet written to the DB
+_pending_logouts: dict[int, datetime] = {}
+
+
+def hash_session_token(token: str) -> str:
+    """Return the fixed-size digest stored in UserSession.jwt_token."""
+    return sha256(token.encode("utf-8")).hexdigest()
+
+
+def record_session(user_id: int, token: str, expires_at: datetime) -> None:
+    """Queue a new login session; it is persisted on the next flush."""
+    row = {
+        "user_id": user_id,
+        "jwt_token": hash_session_token(token),
+        "created_at": datetime.now(timezone.utc),
+        "expires_at": expires_at,
+        "is_active": True,
+    }
+    with _lock:
+        if len(_pending_sessions) == _pending_sessions.maxlen:
+            logger.warning("Session queue full; dropping oldest pending session record.")
+        _pending_sessions.append(row)
+
+
+def record_logout(user_id: int) -> None:
+    """
+    Queue the deactivation of every active session for a user.
+
+    Sessions that are still waiting in the queue are deactivated in place, so
+    they are inserted as inactive instead of needing a follow-up UPDATE.
+    """
+    now = datetime.now(timezone.utc)
+    with _lock:
+        for row in _pending_sessions:
+            if row["user_id"] == user_id:
+                row["is_active"] = False
+        _pending_logouts[user_id] = now
+
+
+def pending_counts() -> tuple[int, int]:
+    """Return (queued sessions, queued logouts), mainly for logging and tests."""
+    with _lock:
+        return len(_pending_sessions), len(_pending_logouts)
+
+
+def _drain() -> tuple[list[dict], dict[int, datetime]]:
+    with _lock:
+        sessions = list(_pending_sessions)
+        _pending_sessions.clear()
+        logouts = dict(_pending_logouts)
+        _pending_logouts.clear()
+    return sessions, logouts
+
+
+def _requeue(sessions: list[dict], logouts: dict[int, datetime]) -> None:
+    with _lock:
+        # Put the failed batch back in front of anything queued meanwhile.
+        _pending_sessions.extendleft(reversed(sessions))
+        for user_id, logged_out_at in logouts.items():
+            current = _pending_logouts.get(user_id)
+            if current is None or logged_out_at > current:
+                _pending_logouts[user_id] = logged_out_at
+
+
+def write_session_batch(db: Session, sessions: list[dict], logouts: dict[int, datetime]) -> None:
+    """Bulk insert queued sessions and apply queued logouts in one transaction."""
+    if sessions:
+        db.execute(insert(UserSession), sessions)
+
+    for user_id, logged_out_at in logouts.items():
+        db.execute(
+            update(UserSession)
+            .where(
+                UserSession.user_id == user_id,
+                UserSession.is_active.is_(True),
+                UserSession.created_at <= logged_out_at,
+            )
+            .values(is_active=False)
+        )
+
+
+def _is_transient(error: SQLAlchemyError) -> bool:
+    if isinstance(error, (IntegrityError, DataError)):
+        return False
+    return isinstance(error, OperationalError) or (
+        isinstance(error, DBAPIError) and error.connection_invalidated
+    )
+
+
+def _write_rows_individually(db: Session, sessions: list[dict], logouts: dict[int, datetime]) -> int:
+    """
+    Write the batch one row at a time, each in its own savepoint, dropping
+    the rows the database rejects. Returns the number of sessions inserted.
+    """
+    inserted = 0
+    for row in sessions:
+        try:
+            with db.begin_nested():
+                write_session_batch(db, [row], {})
+            inserted += 1
+        except (IntegrityError, DataError) as e:
+            logger.error("Session recorder: dropping session of user %s: %s", row["user_id"], e)
+    for user_id, logged_out_at in logouts.items():
+        try:
+            with db.begin_nested():
+                write_session_batch(db, [], {user_id: logged_out_at})
+        except (IntegrityError, DataError) as e:
+            logger.error("Session recorder: dropping logout of user %s: %s", user_id, e)
+    return inserted
+
+
+def flush_pending_sessions() -> int:
+    """
+    Drain the queue and persist it. Returns the number of sessions inserted.
+
+    On a transient database error (lost connection, database unreachable) the
+    batch is put back on the queue and retried on the next tick, so an outage
+    does not lose login records. When the database rejects rows (e.g. the
+    user was deleted before the flush), the batch is retried row by row and
+    only the rejected rows are dropped; any other error drops the batch, so
+    one bad batch cannot block the queue forever.
+    """
+    sessions, logouts = _drain()
+    if not sessions and not logouts:
+        return 0
+
+    db: Session = SessionLocal()
+    try:
+        try:
+            write_session_batch(db, sessions, logouts)
+            inserted = len(sessions)
+        except (IntegrityError, DataError) as e:
+            db.rollback()
+            logger.warning("Session recorder: batch rejected, writing rows one by one: %s", e)
+            inserted = _write_rows_individually(db, sessions, logouts)
+        db.commit()
+        logger.debug(
+            "Session recorder: inserted %d session(s), applied %d logout(s).",
+            inserted,
+            len(logouts),
+        )
+        return inserted
+    except SQLAlchemyError as e:
+        db.rollback()
+        if _is_transient(e):
+            _requeue(sessions, logouts)
+            logger.error("Session recorder: flush failed, batch re-queued: %s", e)
+        else:
+            logger.error(
+                "Session recorder: flush failed, dropping %d session(s) and %d logout(s): %s",
+                len(sessions),
+                len(logouts),
+                e,
+            )
+        return 0
+    finally:
+        db.close()
+
+
+def prune_expired_sessions() -> int:
+    """Delete sessions that expired more than SESSION_RETENTION_DAYS ago."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=SESSION_RETENTION_DAYS)
+    db: Session = SessionLocal()
+    try:
+        deleted = (
+            db.query(UserSession)
+            .filter(UserSession.expires_at < cutoff)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        if deleted:
+            logger.info("Session recorder: pruned %d expired session(s).", deleted)
+        return deleted
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error("Session recorder: pruning failed: %s", e)
+        return 0
+    finally:
+        db.close()
@@ -0,0 +1,115 @@
+"""
+submission_archive.py
+
+Archive of the submissions the cleanup jobs are about to purge, so
+per-submission history stays available for offline analysis without keeping
+the hot tables large.
+
+Before an ended event is purged, archive_event_submissions() streams its
+submission and most_recent_submission rows (denormalized with event_id,
+question_id and user_id) into gzip-compressed NDJSON files, one partition
+per event:
+
+    <SUBMISSION_ARCHIVE_DIR>/event_id=<id>/ended=<event end, UTC>/submission.ndjson.gz
+                                                                 /most_recent_submission.ndjson.gz
+
+Rows are read through a server-side cursor (yield_per), ARCHIVE_FETCH_SIZE
+at a time, and written to a ".partial" file that is renamed once complete,
+so a file that exists is always whole. A purge interrupted by its time limit
+finds the archive already there on the next run and does not write it again;
+an event re-opened with a new end date gets a new partition.
+
+Archiving is opt-in: it only runs when SUBMISSION_ARCHIVE_DIR is set, and the
+directory should be on durable storage (a mounted volume, not the container
+filesystem), otherwise the archive is lost with the container.
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.schema import BaseEvent, MostRecentSubmission, QuestionInstance, Submission, UserQuestionInstance
+
+SUBMISSION_ARCHIVE_DIR = os.getenv("SUBMISSION_ARCHIVE_DIR", "")
+ARCHIVE_FETCH_SIZE = int(os.getenv("SUBMISSION_ARCHIVE_FETCH_SIZE", "5000"))
+ARCHIVE_COMPRESSION_LEVEL = 6
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _archive_queries(event_id: int) -> list:
+    """(table name, query) for every archived table of one event, in primary key order."""
+    queries = []
+    for table, pk in ((Submission, Submission.submission_id), (MostRecentSubmission, MostRecentSubmission.row_id)):
+        queries.append((
+            table.__tablename__,
+            select(QuestionInstance.event_id, QuestionInstance.question_id, UserQuestionInstance.user_id,
+                   *table.__table__.c)
+            .join(UserQuestionInstance,
+                  table.user_question_instance_id == UserQuestionInstance.user_question_instance_id)
+            .join(QuestionInstance,
+                  UserQuestionInstance.question_instance_id == QuestionInstance.question_instance_id)
+            .where(QuestionInstance.event_id == event_id)
+            .order_by(pk),
+        ))
+    return queries
+
+
+def event_archive_dir(archive_dir: str, event_id: int, event_end_date: datetime) -> str:
+    return os.path.join(archive_dir, f"event_id={event_id}", f"ended={event_end_date.strftime('%Y%m%dT%H%M%S')}")
+
+
+def _write_archive(db: Session, query, path: str, fetch_size: int) -> int:
+    partial = f"{path}.partial"
+    written = 0
+    with gzip.open(partial, "wt", encoding="utf-8", compresslevel=ARCHIVE_COMPRESSION_LEVEL) as out:
+        result = db.execute(query.execution_options(yield_per=fetch_size))
+        keys = list(result.keys())
+        for rows in result.partitions():
+            out.writelines(
+                json.dumps(dict(zip(keys, row)), default=_json_default, separators=(",", ":")) + "\n"
+                for row in rows
+            )
+            written += len(rows)
+    os.replace(partial, path)
+    return written
+
+
+def archive_event_submissions(
+    db: Session,
+    event_ids: Iterable[int],
+    archive_dir: Optional[str] = None,
+    fetch_size: int = ARCHIVE_FETCH_SIZE,
+) -> dict[str, int]:
+    """
+    Write the archive partitions of `event_ids` that do not exist yet.
+    Returns the number of rows written per table.
+    """
+    archive_dir = SUBMISSION_ARCHIVE_DIR if archive_dir is None else archive_dir
+    event_ids = list(event_ids)
+    written: dict[str, int] = {}
+    if not archive_dir or not event_ids:
+        return written
+
+    end_dates = dict(db.execute(
+        select(BaseEvent.event_id, BaseEvent.event_end_date).where(BaseEvent.event_id.in_(event_ids))
+    ).all())
+    for event_id in event_ids:
+        if event_id not in end_dates:
+            continue
+        partition = event_archive_dir(archive_dir, event_id, end_dates[event_id])
+        os.makedirs(partition, exist_ok=True)
+        for table, query in _archive_queries(event_id):
+            path = os.path.join(partition, f"{table}.ndjson.gz")
+            if os.path.exists(path):
+                continue
+            written[table] = written.get(table, 0) + _write_archive(db, query, path, fetch_size)
+    return written
@@ -0,0 +1,216 @@
+"""
+test_case_storage.py
+
+Content-addressed storage for large test case payloads.
+
+A test case input or expected output whose canonical JSON encoding exceeds
+INLINE_PAYLOAD_MAX_BYTES is not stored in the test_case JSONB columns.
+Instead it is compressed into test_case_payload, keyed by the SHA-256 of the
+encoding, and the test case keeps only the hash (input_ref / output_ref).
+Identical payloads across test cases and questions are stored once.
+
+- prepare_test_case_rows() externalizes large payloads of rows about to be
+  inserted or updated (one query + one INSERT for the whole batch)
+- load_payloads() / resolve_test_case() give readers the full values back
+- describe_test_case() returns sizes and hashes for listings without the
+  payload itself
+- get_payload() / iter_payload_chunks() stream a payload for the on-demand
+  endpoint
+- prune_orphan_payloads() drops payloads no test case references any more
+
+Both writes are safe against concurrent uploads and deletes: payloads are
+inserted with ON CONFLICT (payload_hash) DO NOTHING, so two requests storing
+the same payload do not fail on the primary key, and the prune checks for
+references inside its DELETE statement rather than in a separate query.
+
+Payloads are compressed with zlib; the encoding column allows another codec
+to be added later without rewriting existing rows.
+"""
+import json
+import os
+import zlib
+from datetime import datetime, timezone
+from hashlib import sha256
+from typing import Any, Iterable, Iterator, Optional
+
+from sqlalchemy import delete, exists, or_, select
+from sqlalchemy.orm import Session
+
+from database_operations.dialect import insert_for
+from models.schema import TestCase, TestCasePayload
+
+INLINE_PAYLOAD_MAX_BYTES = int(os.getenv("TEST_CASE_INLINE_MAX_BYTES", str(16 * 1024)))
+PAYLOAD_ENCODING = "zlib"
+COMPRESSION_LEVEL = 6
+STREAM_CHUNK_SIZE = 64 * 1024
+PAYLOAD_INSERT_BATCH_SIZE = 500
+
+# (column holding the inline value, column holding the payload hash)
+PAYLOAD_FIELDS = (("input_data", "input_ref"), ("expected_output", "output_ref"))
+
+
+def encode_payload(value: Any) -> bytes:
+    """Canonical JSON encoding (sorted keys, no whitespace) used for hashing and storage."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def hash_payload(encoded: bytes) -> str:
+    return sha256(encoded).hexdigest()
+
+
+def prepare_test_case_rows(db: Session, rows: list[dict], max_inline_bytes: Optional[int] = None) -> list[dict]:
+    """
+    Move large input_data / expected_output values of `rows` (test_case
+    column dicts) into test_case_payload and replace them with refs.
+
+    Rows are updated in place and returned. Payload rows that already exist
+    are reused, so the only statements issued are one SELECT and at most one
+    INSERT per PAYLOAD_INSERT_BATCH_SIZE new payloads; a payload stored by a
+    concurrent request in between is skipped by the INSERT.
+    """
+    limit = INLINE_PAYLOAD_MAX_BYTES if max_inline_bytes is None else max_inline_bytes
+    pending: dict[str, bytes] = {}
+    for row in rows:
+        for value_field, ref_field in PAYLOAD_FIELDS:
+            encoded = encode_payload(row.get(value_field))
+            if len(encoded) <= limit:
+                row[ref_field] = None
+                continue
+            payload_hash = hash_payload(encoded)
+            pending.setdefault(payload_hash, encoded)
+            row[value_field] = None
+            row[ref_field] = payload_hash
+
+    if pending:
+        stored = set(db.scalars(
+            select(TestCasePayload.payload_hash).where(TestCasePayload.payload_hash.in_(pending))
+        ))
+        now = datetime.now(timezone.utc)
+        new_payloads = []
+        for payload_hash, encoded in pending.items():
+            if payload_hash in stored:
+                continue
+            compressed = zlib.compress(encoded, COMPRESSION_LEVEL)
+            new_payloads.append({
+                "payload_hash": payload_hash,
+                "encoding": PAYLOAD_ENCODING,
+                "size_bytes": len(encoded),
+                "compressed_size": len(compressed),
+                "data": compressed,
+                "created_at": now,
+            })
+        insert = insert_for(db)
+        for start in range(0, len(new_payloads), PAYLOAD_INSERT_BATCH_SIZE):
+            db.execute(
+                insert(TestCasePayload)
+                .values(new_payloads[start:start + PAYLOAD_INSERT_BATCH_SIZE])
+                .on_conflict_do_nothing(index_elements=[TestCasePayload.payload_hash])
+            )
+    return rows
+
+
+def _decompress(encoding: str, data: bytes) -> bytes:
+    if encoding != PAYLOAD_ENCODING:
+        raise ValueError(f"Unsupported test case payload encoding '{encoding}'")
+    return zlib.decompress(data)
+
+
+def load_payloads(db: Session, hashes: Iterable[str]) -> dict[str, Any]:
+    """payload_hash -> decoded JSON value, in one query."""
+    wanted = {h for h in hashes if h}
+    if not wanted:
+        return {}
+    rows = db.execute(
+        select(TestCasePayload.payload_hash, TestCasePayload.encoding, TestCasePayload.data)
+        .where(TestCasePayload.payload_hash.in_(wanted))
+    ).all()
+    return {payload_hash: json.loads(_decompress(encoding, data)) for payload_hash, encoding, data in rows}
+
+
+def payload_refs(test_cases: Iterable[Any]) -> set[str]:
+    return {
+        ref for tc in test_cases for _, ref_field in PAYLOAD_FIELDS
+        if (ref := getattr(tc, ref_field, None))
+    }
+
+
+def question_payload_refs(db: Session, question_ids: Iterable[int]) -> set[str]:
+    """Every payload hash referenced by the test cases of the given questions."""
+    ids = list(question_ids)
+    if not ids:
+        return set()
+    rows = db.execute(
+        select(TestCase.input_ref, TestCase.output_ref)
+        .where(TestCase.question_id.in_(ids), or_(TestCase.input_ref.is_not(None), TestCase.output_ref.is_not(None)))
+    ).all()
+    return {ref for row in rows for ref in row if ref}
+
+
+def resolve_test_case(test_case: Any, payloads: dict[str, Any]) -> tuple[Any, Any]:
+    """(input_data, expected_output) with externalized payloads substituted from `payloads`."""
+    values = []
+    for value_field, ref_field in PAYLOAD_FIELDS:
+        ref = getattr(test_case, ref_field, None)
+        values.append(payloads[ref] if ref else getattr(test_case, value_field, None))
+    return values[0], values[1]
+
+
+def describe_test_case(test_case: Any) -> dict:
+    """Sizes and hashes of a test case's payloads, without returning the payloads."""
+    description = {}
+    for (value_field, ref_field), prefix in zip(PAYLOAD_FIELDS, ("input", "output")):
+        ref = getattr(test_case, ref_field, None)
+        if ref:
+            payload = getattr(test_case, f"{prefix}_payload", None)
+            size = payload.size_bytes if payload is not None else None
+            description.update({f"{prefix}_hash": ref, f"{prefix}_size": size, f"{prefix}_external": True})
+        else:
+            encoded = encode_payload(getattr(test_case, value_field, None))
+            description.update({
+                f"{prefix}_hash": hash_payload(encoded),
+                f"{prefix}_size": len(encoded),
+                f"{prefix}_external": False,
+            })
+    return description
+
+
+def get_payload(db: Session, payload_hash: str) -> Optional[TestCasePayload]:
+    return db.get(TestCasePayload, payload_hash)
+
+
+def iter_payload_chunks(payload: TestCasePayload, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the decoded JSON of a payload, decompressing at most `chunk_size` bytes at a time."""
+    if payload.encoding != PAYLOAD_ENCODING:
+        raise ValueError(f"Unsupported test case payload encoding '{payload.encoding}'")
+
+    decompressor = zlib.decompressobj()
+    pending = payload.data
+    while pending:
+        block = decompressor.decompress(pending, chunk_size)
+        pending = decompressor.unconsumed_tail
+        if block:
+            yield block
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def prune_orphan_payloads(db: Session, candidate_hashes: Iterable[str]) -> int:
+    """
+    Delete the given payloads if no test case references them any more. The
+    reference check is part of the DELETE, so a payload reused between the
+    caller's delete and this call is kept.
+    """
+    candidates = {h for h in candidate_hashes if h}
+    if not candidates:
+        return 0
+    referenced = exists().where(or_(
+        TestCase.input_ref == TestCasePayload.payload_hash,
+        TestCase.output_ref == TestCasePayload.payload_hash,
+    ))
+    result = db.execute(
+        delete(TestCasePayload)
+        .where(TestCasePayload.payload_hash.in_(candidates), ~referenced)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
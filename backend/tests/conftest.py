@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture
+def sqlite_session():
+    """
+    Factory for a session on a fresh in-memory SQLite database holding only
+    the given tables: sqlite_session(Question, TestCase, question_tag, ...).
+
+    - threadsafe=True shares one connection across threads, for code that
+      runs its database work in asyncio.to_thread()
+    - savepoints=True makes begin_nested() work (pysqlite needs an explicit
+      BEGIN for SAVEPOINT support)
+    - foreign_keys=True enforces foreign keys, which SQLite ignores by default
+    """
+    engines = []
+    sessions = []
+
+    def make(*models, threadsafe=False, savepoints=False, foreign_keys=False):
+        if threadsafe:
+            engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        else:
+            engine = create_engine("sqlite://")
+
+        if savepoints:
+            @event.listens_for(engine, "connect")
+            def _disable_pysqlite_transactions(dbapi_connection, _):
+                dbapi_connection.isolation_level = None
+
+            @event.listens_for(engine, "begin")
+            def _begin(connection):
+                connection.exec_driver_sql("BEGIN")
+
+        if foreign_keys:
+            @event.listens_for(engine, "connect")
+            def _enforce_foreign_keys(dbapi_connection, _):
+                dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+        for model in models:
+            getattr(model, "__table__", model).create(engine)
+        engines.append(engine)
+        sessions.append(Session(engine))
+        return sessions[-1]
+
+    yield make
+    for session in sessions:
+        session.close()
+    for engine in engines:
+        engine.dispose()
@@ -2,7 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 from fastapi import HTTPException
 from unittest.mock import MagicMock, patch
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 import sys
 import os
@@ -133,6 +133,23 @@ class TestNewAccountsStats:
         assert response.status_code in [200, 401, 403]
 
 
+    @pytest.mark.asyncio
+    async def test_new_accounts_compares_periods_from_daily_rollup(self):
+        with patch.object(admin_dashboard_api, "sum_daily_statistics", return_value={"new_accounts": [7, 14]}) as sums:
+            response = await admin_dashboard_api.get_new_accounts_stats(
+                db=MagicMock(),
+                current_user={"sub": "admin@test.com", "role": "admin"},
+                time_range="7days",
+            )
+
+        today = datetime.now(timezone.utc).date()
+        previous, current = sums.call_args.args[1]
+        assert (previous.first_day, previous.last_day) == (today - timedelta(days=13), today - timedelta(days=7))
+        assert (current.first_day, current.last_day) == (today - timedelta(days=6), today)
+        assert response.value == 14
+        assert response.trend == "+100%"
+
+
 class TestQuestionsSolvedStats:
     def test_get_questions_solved_stats(self, client, mock_db_session):
         easy = MagicMock()
@@ -197,6 +214,51 @@ class TestLoginsStats:
 
         assert response.status_code in [200, 401, 403]
 
+    @pytest.mark.asyncio
+    async def test_logins_30days_sums_daily_rollup_per_week(self):
+        with patch.object(admin_dashboard_api, "sum_daily_statistics", return_value={"logins": [7, 14, 0, 21]}) as sums:
+            response = await admin_dashboard_api.get_logins_stats(
+                db=MagicMock(),
+                current_user={"sub": "admin@test.com", "role": "admin"},
+                time_range="30days",
+            )
+
+        assert [(point.month, point.logins) for point in response] == [
+            ("Week 1", 7), ("Week 2", 14), ("Week 3", 0), ("Week 4", 21),
+        ]
+        weeks = sums.call_args.args[1]
+        assert weeks[-1].last_day == datetime.now(timezone.utc).date()
+        assert all((week.last_day - week.first_day).days == 6 for week in weeks)
+
+    @pytest.mark.asyncio
+    async def test_logins_7days_are_chronological_ending_today(self):
+        with patch.object(admin_dashboard_api, "sum_daily_statistics", return_value={"logins": [1, 2, 3, 4, 5, 6, 7]}):
+            response = await admin_dashboard_api.get_logins_stats(
+                db=MagicMock(),
+                current_user={"sub": "admin@test.com", "role": "admin"},
+                time_range="7days",
+            )
+
+        today = datetime.now(timezone.utc).date()
+        assert [point.month for point in response] == [
+            (today - timedelta(days=offset)).strftime("%a") for offset in range(6, -1, -1)
+        ]
+        assert [point.logins for point in response] == [1, 2, 3, 4, 5, 6, 7]
+
+    @pytest.mark.asyncio
+    async def test_logins_3months_uses_calendar_months(self):
+        with patch.object(admin_dashboard_api, "sum_daily_statistics", return_value={"logins": [5, 6, 7]}) as sums:
+            response = await admin_dashboard_api.get_logins_stats(
+                db=MagicMock(),
+                current_user={"sub": "admin@test.com", "role": "admin"},
+                time_range="3months",
+            )
+
+        months = sums.call_args.args[1]
+        assert [point.month for point in response] == [month.label for month in months]
+        assert [point.logins for point in response] == [5, 6, 7]
+        assert all(month.first_day.day == 1 for month in months)
+
     def test_get_logins_stats_3months(self, client, mock_db_session):
         mock_db_session.query.return_value.filter.return_value.group_by.return_value.all.return_value = []
 
@@ -261,102 +323,45 @@ class TestDashboardHelpers:
         quarterly = admin_dashboard_api._build_zero_participation_series("3months")
 
         assert len(weekly) == 7
-        assert [item.date for item in weekly] == ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        assert weekly[-1].date == datetime.now(timezone.utc).date().strftime("%a")
+        assert len({item.date for item in weekly}) == 7
         assert len(monthly) == 30
         assert monthly[0].date == "Day 1"
         assert monthly[-1].date == "Day 30"
         assert len(quarterly) == 90
 
-    @patch("src.endpoints.admin_dashboard_api.inspect")
-    def test_legacy_participation_tables_available_true(self, mock_inspect):
-        inspector = MagicMock()
-        inspector.get_table_names.return_value = ["submission", "user_question_instance", "question_instance"]
-        mock_inspect.return_value = inspector
-
-        db = MagicMock()
-        db.get_bind.return_value = MagicMock()
-
-        assert admin_dashboard_api._legacy_participation_tables_available(db) is True
-
-    @patch("src.endpoints.admin_dashboard_api.inspect")
-    def test_legacy_participation_tables_available_false(self, mock_inspect):
-        inspector = MagicMock()
-        inspector.get_table_names.return_value = ["submission", "user_question_instance"]
-        mock_inspect.return_value = inspector
-
-        db = MagicMock()
-        db.get_bind.return_value = MagicMock()
-
-        assert admin_dashboard_api._legacy_participation_tables_available(db) is False
-
-    @patch("src.endpoints.admin_dashboard_api.inspect", side_effect=Exception("inspect failed"))
-    def test_legacy_participation_tables_available_exception_defaults_true(self, _):
-        db = MagicMock()
-        assert admin_dashboard_api._legacy_participation_tables_available(db) is True
-
     def test_build_participation_series_7days(self):
         db = MagicMock()
-        with patch.object(admin_dashboard_api, "_get_submission_count", side_effect=[1, 2, 3, 4, 5, 6, 7]):
+        with patch.object(admin_dashboard_api, "sum_daily_statistics",
+                          return_value={"algotime_submissions": [1, 2, 3, 4, 5, 6, 7]}) as sums:
             data = admin_dashboard_api._build_participation_series(db, "7days", "algotime")
 
         assert len(data) == 7
         assert [item.participation for item in data] == [1, 2, 3, 4, 5, 6, 7]
+        assert sums.call_args.args[2:] == ("algotime_submissions",)
+        assert data[-1].date == datetime.now(timezone.utc).date().strftime("%a")
 
     def test_build_participation_series_30days(self):
         db = MagicMock()
-        with patch.object(admin_dashboard_api, "_get_submission_count", side_effect=[1] * 30):
+        with patch.object(admin_dashboard_api, "sum_daily_statistics",
+                          return_value={"competition_submissions": [1] * 30}) as sums:
             data = admin_dashboard_api._build_participation_series(db, "30days", "competitions")
 
         assert len(data) == 30
         assert data[0].date == "Day 1"
         assert data[-1].date == "Day 30"
+        assert sums.call_args.args[2:] == ("competition_submissions",)
 
     def test_build_participation_series_3months(self):
         db = MagicMock()
-        with patch.object(admin_dashboard_api, "_get_submission_count", side_effect=[0] * 90):
+        with patch.object(admin_dashboard_api, "sum_daily_statistics",
+                          return_value={"competition_submissions": [0] * 90}):
             data = admin_dashboard_api._build_participation_series(db, "3months", "competitions")
 
+        today = datetime.now(timezone.utc).date()
         assert len(data) == 90
-
-    def test_get_submission_count_competitions_branch(self):
-        db = MagicMock()
-        base_query = MagicMock()
-        subquery = MagicMock()
-        event_filtered_query = MagicMock()
-
-        db.query.side_effect = [base_query, subquery]
-        filtered_query = base_query.join.return_value.join.return_value.filter.return_value
-        filtered_query.filter.return_value = event_filtered_query
-        event_filtered_query.scalar.return_value = 9
-
-        count = admin_dashboard_api._get_submission_count(
-            db,
-            "competitions",
-            datetime.now(timezone.utc),
-            datetime.now(timezone.utc),
-        )
-
-        assert count == 9
-
-    def test_get_submission_count_algotime_branch_returns_zero_on_null(self):
-        db = MagicMock()
-        base_query = MagicMock()
-        subquery = MagicMock()
-        event_filtered_query = MagicMock()
-
-        db.query.side_effect = [base_query, subquery]
-        filtered_query = base_query.join.return_value.join.return_value.filter.return_value
-        filtered_query.filter.return_value = event_filtered_query
-        event_filtered_query.scalar.return_value = None
-
-        count = admin_dashboard_api._get_submission_count(
-            db,
-            "algotime",
-            datetime.now(timezone.utc),
-            datetime.now(timezone.utc),
-        )
-
-        assert count == 0
+        assert data[0].date == (today - timedelta(days=89)).strftime("%b %d")
+        assert data[-1].date == today.strftime("%b %d")
 
     def test_admin_or_owner_required_allows_admin_and_owner(self):
         admin = admin_dashboard_api.admin_or_owner_required({"sub": "a@test.com", "role": "admin"})
@@ -450,7 +455,8 @@ class TestChangedRouteLogic:
     async def test_participation_stats_returns_zero_series_when_tables_missing(self):
         db = MagicMock()
 
-        with patch.object(admin_dashboard_api, "_legacy_participation_tables_available", return_value=False), \
+        missing = admin_dashboard_api.ProgrammingError("stmt", {}, RuntimeError("no such table: daily_statistics"))
+        with patch.object(admin_dashboard_api, "_build_participation_series", side_effect=missing), \
                 patch.object(admin_dashboard_api, "_build_zero_participation_series") as zero_series:
             zero_series.return_value = [admin_dashboard_api.ParticipationDataPoint(date="Mon", participation=0)]
 
@@ -469,8 +475,7 @@ class TestChangedRouteLogic:
         db = MagicMock()
         built = [admin_dashboard_api.ParticipationDataPoint(date="Day 1", participation=5)]
 
-        with patch.object(admin_dashboard_api, "_legacy_participation_tables_available", return_value=True), \
-                patch.object(admin_dashboard_api, "_build_participation_series", return_value=built):
+        with patch.object(admin_dashboard_api, "_build_participation_series", return_value=built):
             response = await admin_dashboard_api.get_participation_stats(
                 db=db,
                 current_user={"sub": "admin@test.com", "role": "admin"},
@@ -484,8 +489,7 @@ class TestChangedRouteLogic:
     async def test_participation_stats_falls_back_on_operational_errors(self):
         db = MagicMock()
 
-        with patch.object(admin_dashboard_api, "_legacy_participation_tables_available", return_value=True), \
-            patch.object(admin_dashboard_api, "_build_participation_series", side_effect=admin_dashboard_api.OperationalError("stmt", {}, RuntimeError("db"))), \
+        with patch.object(admin_dashboard_api, "_build_participation_series", side_effect=admin_dashboard_api.OperationalError("stmt", {}, RuntimeError("db"))), \
                 patch.object(admin_dashboard_api, "_build_zero_participation_series") as zero_series:
             zero_series.return_value = [admin_dashboard_api.ParticipationDataPoint(date="Mon", participation=0)]
 
@@ -503,8 +507,7 @@ class TestChangedRouteLogic:
     async def test_participation_stats_wraps_unexpected_errors(self):
         db = MagicMock()
 
-        with patch.object(admin_dashboard_api, "_legacy_participation_tables_available", return_value=True), \
-                patch.object(admin_dashboard_api, "_build_participation_series", side_effect=RuntimeError("boom")):
+        with patch.object(admin_dashboard_api, "_build_participation_series", side_effect=RuntimeError("boom")):
             with pytest.raises(HTTPException) as exc_info:
                 await admin_dashboard_api.get_participation_stats(
                     db=db,
@@ -514,3 +517,116 @@ class TestChangedRouteLogic:
                 )
 
         assert exc_info.value.status_code == 500
+
+
+class TestResponseCacheStats:
+    def test_get_response_cache_stats(self, mock_admin_user):
+        app.dependency_overrides[admin_dashboard_api.admin_or_owner_required] = lambda: mock_admin_user
+        try:
+            with patch.object(admin_dashboard_api.response_cache, "stats", return_value={
+                "entries": 2, "bytes": 512, "max_bytes": 1024, "hits": 3, "misses": 1,
+                "hit_ratio": 0.75, "evictions": 0, "invalidations": 4,
+            }):
+                response = TestClient(app).get("/admin/dashboard/stats/response-cache")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()["hit_ratio"] == 0.75
+        assert response.json()["bytes"] == 512
+
+
+class TestDashboardSnapshot:
+    @pytest.fixture(autouse=True)
+    def snapshot_environment(self, mock_admin_user):
+        admin_dashboard_api.response_cache.clear()
+        app.dependency_overrides[admin_dashboard_api.admin_or_owner_required] = lambda: mock_admin_user
+        overview = admin_dashboard_api.DashboardOverviewResponse(
+            recent_accounts=[], recent_competitions=[], recent_questions=[], recent_algotime_sessions=[]
+        )
+        new_accounts = admin_dashboard_api.NewAccountsStatsResponse(
+            value=3, subtitle="up 50% in the last 3 months", trend="+50%", description="Trending up"
+        )
+        summary = SimpleNamespace(stats=[
+            SimpleNamespace(difficulty="easy", total_questions_solved=7, average_solve_time=12.34),
+        ])
+        with patch.object(admin_dashboard_api, "SessionLocal", return_value=MagicMock()) as session_factory, \
+             patch.object(admin_dashboard_api, "track_custom_event"), \
+             patch.object(admin_dashboard_api, "_build_dashboard_overview", return_value=overview), \
+             patch.object(admin_dashboard_api, "_build_new_accounts_stats", return_value=new_accounts), \
+             patch.object(admin_dashboard_api, "get_long_term_statistics_summary", return_value=summary) as get_summary, \
+             patch.object(admin_dashboard_api, "_build_logins_series", return_value=[
+                 admin_dashboard_api.LoginsDataPoint(month="Aug", logins=4),
+             ]), \
+             patch.object(admin_dashboard_api, "_build_participation_stats", side_effect=lambda db, time_range, event_type: [
+                 admin_dashboard_api.ParticipationDataPoint(date=event_type, participation=1),
+             ]):
+            self.session_factory = session_factory
+            self.get_summary = get_summary
+            yield
+        app.dependency_overrides.clear()
+        admin_dashboard_api.response_cache.clear()
+
+    def test_snapshot_combines_every_widget(self):
+        response = TestClient(app).get("/admin/dashboard/snapshot?time_range=30days")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["time_range"] == "30days"
+        assert data["new_accounts"]["value"] == 3
+        assert data["questions_solved"][0] == {"name": "Easy", "value": 7, "color": "var(--chart-1)"}
+        assert data["time_to_solve"][0]["time"] == 12.3
+        assert data["logins"] == [{"month": "Aug", "logins": 4}]
+        assert data["participation"]["algotime"] == [{"date": "algotime", "participation": 1}]
+        assert data["participation"]["competitions"] == [{"date": "competitions", "participation": 1}]
+        # The solve summary feeds two charts but is only computed once.
+        self.get_summary.assert_called_once()
+        assert self.get_summary.call_args.kwargs["window_value"] == 30
+        # Every concurrent part runs on its own session, which is closed afterwards.
+        assert self.session_factory.call_count == 6
+        assert self.session_factory.return_value.close.call_count == 6
+
+    def test_snapshot_is_memoized_per_time_range(self):
+        client = TestClient(app)
+        first = client.get("/admin/dashboard/snapshot?time_range=7days")
+        second = client.get("/admin/dashboard/snapshot?time_range=7days")
+        client.get("/admin/dashboard/snapshot?time_range=3months")
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert self.get_summary.call_count == 2
+
+    def test_snapshot_expires_after_ttl(self):
+        client = TestClient(app)
+        with patch.object(admin_dashboard_api, "DASHBOARD_SNAPSHOT_TTL_SECONDS", 0):
+            client.get("/admin/dashboard/snapshot")
+            client.get("/admin/dashboard/snapshot")
+
+        assert self.get_summary.call_count == 2
+
+    def test_snapshot_error_is_not_cached(self):
+        client = TestClient(app)
+        with patch.object(admin_dashboard_api, "_build_logins_series", side_effect=Exception("boom")):
+            response = client.get("/admin/dashboard/snapshot")
+        assert response.status_code == 500
+        assert response.json()["detail"] == "Failed to fetch dashboard snapshot"
+
+        assert client.get("/admin/dashboard/snapshot").status_code == 200
+
+
+class TestJobStats:
+    def test_get_job_stats(self, mock_admin_user):
+        app.dependency_overrides[admin_dashboard_api.admin_or_owner_required] = lambda: mock_admin_user
+        try:
+            with patch.object(admin_dashboard_api, "job_metrics", return_value=[
+                admin_dashboard_api.JobMetrics(job_id="email_scheduler", runs=3, last_duration_seconds=0.2,
+                                               max_duration_seconds=0.5, last_lag_seconds=0.01),
+            ]):
+                response = TestClient(app).get("/admin/dashboard/stats/jobs")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        assert response.json()[0]["job_id"] == "email_scheduler"
+        assert response.json()[0]["runs"] == 3
+        assert response.json()[0]["max_duration_seconds"] == 0.5
@@ -9,6 +9,32 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
 
+@pytest.fixture(autouse=True)
+def skip_daily_rollup():
+    with patch("src.services.algotime_cleanup.rollup_event_submission_days") as rollup:
+        yield rollup
+
+
+@pytest.fixture(autouse=True)
+def purge():
+    from services.question_instance_purge import PurgeResult
+    with patch("src.services.algotime_cleanup.purge_event_question_instances",
+               return_value=PurgeResult(deleted={"question_instance": 3})) as purge:
+        yield purge
+
+
+@pytest.fixture(autouse=True)
+def archive():
+    with patch("src.services.algotime_cleanup.archive_event_submissions", return_value={}) as archive:
+        yield archive
+
+
+@pytest.fixture(autouse=True)
+def track_event():
+    with patch("src.services.algotime_cleanup.track_custom_event") as track:
+        yield track
+
+
 class TestAlgoTimeCleanup:
 
     @staticmethod
@@ -18,16 +44,13 @@ class TestAlgoTimeCleanup:
         return row
 
     @staticmethod
-    def _setup_db(mock_db, ended_rows, qi_count, deleted=None):
+    def _setup_db(mock_db, ended_rows, qi_count):
         mock_db.query.return_value.join.return_value \
                .filter.return_value.all.return_value = ended_rows
 
         mock_db.query.return_value.filter.return_value \
                .count.return_value = qi_count
 
-        mock_db.query.return_value.filter.return_value \
-               .delete.return_value = deleted if deleted is not None else qi_count
-
     @patch("src.services.algotime_cleanup.get_db")
     def test_no_ended_sessions_returns_early(self, mock_get_db):
         mock_db = MagicMock()
@@ -43,7 +66,7 @@ class TestAlgoTimeCleanup:
         mock_db.close.assert_called_once()
 
     @patch("src.services.algotime_cleanup.get_db")
-    def test_already_cleaned_skips_delete(self, mock_get_db):
+    def test_already_cleaned_skips_delete(self, mock_get_db, purge):
         mock_db = MagicMock()
         mock_get_db.return_value = iter([mock_db])
 
@@ -53,7 +76,10 @@ class TestAlgoTimeCleanup:
         from src.services.algotime_cleanup import cleanup_ended_algotime_sessions
         cleanup_ended_algotime_sessions()
 
-        mock_db.commit.assert_not_called()
+        purge.assert_not_called()
+        # The watermark is still written so the event is not selected again.
+        mock_db.query.return_value.filter.return_value.update.assert_called_once()
+        mock_db.commit.assert_called_once()
         mock_db.close.assert_called_once()
 
     @patch("src.services.algotime_cleanup.get_db")
@@ -62,7 +88,7 @@ class TestAlgoTimeCleanup:
         mock_get_db.return_value = iter([mock_db])
 
         ended_rows = [self._make_event_row(1)]
-        self._setup_db(mock_db, ended_rows, qi_count=3, deleted=3)
+        self._setup_db(mock_db, ended_rows, qi_count=3)
 
         from src.services.algotime_cleanup import cleanup_ended_algotime_sessions
         cleanup_ended_algotime_sessions()
@@ -72,7 +98,7 @@ class TestAlgoTimeCleanup:
         mock_db.close.assert_called_once()
 
     @patch("src.services.algotime_cleanup.get_db")
-    def test_sqlalchemy_error_triggers_rollback(self, mock_get_db):
+    def test_sqlalchemy_error_triggers_rollback(self, mock_get_db, purge):
         mock_db = MagicMock()
         mock_get_db.return_value = iter([mock_db])
 
@@ -81,8 +107,7 @@ class TestAlgoTimeCleanup:
                .filter.return_value.all.return_value = ended_rows
         mock_db.query.return_value.filter.return_value \
                .count.return_value = 2
-        mock_db.query.return_value.filter.return_value \
-               .delete.side_effect = SQLAlchemyError("connection lost")
+        purge.side_effect = SQLAlchemyError("connection lost")
 
         from src.services.algotime_cleanup import cleanup_ended_algotime_sessions
         cleanup_ended_algotime_sessions()
@@ -101,4 +126,41 @@ class TestAlgoTimeCleanup:
         from src.services.algotime_cleanup import cleanup_ended_algotime_sessions
         cleanup_ended_algotime_sessions()
 
-        mock_db.close.assert_called_once()
\ No newline at end of file
+        mock_db.close.assert_called_once()
+
+    @patch("src.services.algotime_cleanup.get_db")
+    def test_reports_counts_and_duration(self, mock_get_db, track_event, purge, archive):
+        mock_db = MagicMock()
+        mock_get_db.return_value = iter([mock_db])
+        self._setup_db(mock_db, [self._make_event_row(1), self._make_event_row(2)], qi_count=5)
+        purge.return_value.deleted = {"submission": 7, "user_question_instance": 5, "question_instance": 5}
+        archive.return_value = {"submission": 7, "most_recent_submission": 2}
+
+        with patch("src.services.algotime_cleanup.upsert_long_term_stats_for_unpurged_events", return_value=4):
+            from src.services.algotime_cleanup import cleanup_ended_algotime_sessions
+            cleanup_ended_algotime_sessions()
+
+        properties = track_event.call_args.kwargs["properties"]
+        assert track_event.call_args.kwargs["event_name"] == "cleanup_job_completed"
+        assert properties["job"] == "algotime_cleanup"
+        assert properties["events_processed"] == 2
+        assert properties["question_instances_deleted"] == 5
+        assert properties["rows_deleted"] == 17
+        assert properties["rows_archived"] == 9
+        assert properties["purge_complete"] is True
+        assert properties["long_term_stats_upserted"] == 4
+        assert properties["failed"] is False
+        assert properties["duration_ms"] >= 0
+
+    @patch("src.services.algotime_cleanup.get_db")
+    def test_reports_failed_run(self, mock_get_db, track_event):
+        mock_db = MagicMock()
+        mock_get_db.return_value = iter([mock_db])
+        mock_db.query.side_effect = Exception("fatal")
+
+        from src.services.algotime_cleanup import cleanup_ended_algotime_sessions
+        cleanup_ended_algotime_sessions()
+
+        properties = track_event.call_args.kwargs["properties"]
+        assert properties["failed"] is True
+        assert properties["events_processed"] == 0
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import sys
+import os
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services import bulk_email
+from services.bulk_email import send_bulk_email
+
+
+@pytest.fixture(autouse=True)
+def brevo_config():
+    with patch("endpoints.send_email_api.BREVO_API_KEY", "test-key"), \
+         patch("endpoints.send_email_api.DEFAULT_SENDER_EMAIL", "sender@example.com"), \
+         patch.object(bulk_email, "BULK_EMAIL_RETRY_BASE_SECONDS", 0):
+        yield
+
+
+def _client(handler):
+    requests = []
+
+    def record(request):
+        requests.append(json.loads(request.content))
+        return handler(request, len(requests))
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(record)), requests
+
+
+def _recipients(n):
+    return [f"user{i}@example.com" for i in range(n)]
+
+
+async def test_recipients_are_sent_in_chunks_of_message_versions():
+    client, requests = _client(lambda request, n: httpx.Response(201, json={"messageIds": []}))
+
+    result = await send_bulk_email(_recipients(5), "Reminder", "Body", client=client, chunk_size=2)
+
+    assert (result.sent, result.failed) == (5, 0)
+    assert len(requests) == 3
+    assert [len(body["messageVersions"]) for body in requests] == [2, 2, 1]
+    first = requests[0]
+    assert first["subject"] == "Reminder"
+    assert first["textContent"] == "Body"
+    assert first["sender"]["email"] == "sender@example.com"
+    assert first["messageVersions"][0] == {"to": [{"email": "user0@example.com"}]}
+    assert "to" not in first
+
+
+async def test_transient_errors_are_retried_per_chunk():
+    def handler(request, n):
+        return httpx.Response(503 if n == 1 else 201, json={})
+
+    client, requests = _client(handler)
+    result = await send_bulk_email(_recipients(3), "Reminder", "Body", client=client)
+
+    assert (result.sent, result.failed) == (3, 0)
+    assert len(requests) == 2
+
+
+async def test_chunk_failing_every_attempt_does_not_stop_the_others():
+    def handler(request, n):
+        body = json.loads(request.content)
+        if body["messageVersions"][0]["to"][0]["email"] == "user0@example.com":
+            return httpx.Response(500, json={})
+        return httpx.Response(201, json={})
+
+    client, requests = _client(handler)
+    result = await send_bulk_email(_recipients(4), "Reminder", "Body", client=client, chunk_size=2, max_attempts=3)
+
+    assert (result.sent, result.failed) == (2, 2)
+    assert len(requests) == 4
+    assert result.failed_recipients == ["user0@example.com", "user1@example.com"]
+    assert result.rejected_recipients == []
+    assert result.last_error.startswith("Brevo API error 500")
+
+
+async def test_client_errors_are_not_retried():
+    client, requests = _client(lambda request, n: httpx.Response(400, json={"code": "invalid_parameter"}))
+
+    result = await send_bulk_email(_recipients(2), "Reminder", "Body", client=client)
+
+    assert (result.sent, result.failed) == (0, 2)
+    assert len(requests) == 1
+    assert result.rejected_recipients == result.failed_recipients == ["user0@example.com", "user1@example.com"]
+
+
+async def test_invalid_and_duplicate_recipients_are_skipped():
+    client, requests = _client(lambda request, n: httpx.Response(201, json={}))
+
+    result = await send_bulk_email(["a@example.com", "a@example.com", "not-an-email"], "Reminder", "Body",
+                                   client=client)
+
+    assert (result.sent, result.failed) == (1, 1)
+    assert result.failed_recipients == ["not-an-email"]
+    assert result.rejected_recipients == ["not-an-email"]
+    assert requests[0]["messageVersions"] == [{"to": [{"email": "a@example.com"}]}]
+
+
+async def test_no_more_chunks_in_flight_than_the_concurrency_limit():
+    in_flight, peak = 0, 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(201, json={})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    result = await send_bulk_email(_recipients(10), "Reminder", "Body", client=client, chunk_size=1, concurrency=3)
+
+    assert result.sent == 10
+    assert peak == 3
+
+
+async def test_unconfigured_service_raises():
+    with patch("endpoints.send_email_api.BREVO_API_KEY", None):
+        with pytest.raises(RuntimeError):
+            await send_bulk_email(_recipients(1), "Reminder", "Body")
@@ -0,0 +1,80 @@
+from unittest.mock import MagicMock
+import sys
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services import catalogue_version
+from models.schema import CatalogueVersion
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    catalogue_version.invalidate_catalogue_version()
+    yield
+    catalogue_version.invalidate_catalogue_version()
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://")
+    CatalogueVersion.__table__.create(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def test_missing_row_reports_version_zero(session_factory):
+    with session_factory() as db:
+        version, updated_at = catalogue_version.get_catalogue_version(db)
+
+    assert version == 0
+    assert updated_at.year == 1970
+
+
+def test_cached_version_is_served_without_querying():
+    db = MagicMock()
+    db.execute.return_value.first.return_value = (4, None)
+
+    assert catalogue_version.get_catalogue_version(db)[0] == 4
+    assert catalogue_version.get_catalogue_version(db)[0] == 4
+
+    db.execute.assert_called_once()
+
+
+def test_bump_creates_then_increments_row(session_factory):
+    with session_factory() as db:
+        catalogue_version.bump_catalogue_version(db)
+        db.commit()
+        catalogue_version.bump_catalogue_version(db)
+        db.commit()
+
+        assert catalogue_version.get_catalogue_version(db)[0] == 2
+
+
+def test_commit_invalidates_cached_version(session_factory):
+    with session_factory() as db:
+        catalogue_version.bump_catalogue_version(db)
+        db.commit()
+        assert catalogue_version.get_catalogue_version(db)[0] == 1
+
+        catalogue_version.bump_catalogue_version(db)
+        # Not committed yet: the cached value still wins.
+        assert catalogue_version.get_catalogue_version(db)[0] == 1
+
+        db.commit()
+        assert catalogue_version.get_catalogue_version(db)[0] == 2
+
+
+def test_rollback_discards_pending_bump(session_factory):
+    with session_factory() as db:
+        catalogue_version.bump_catalogue_version(db)
+        db.rollback()
+
+        assert "catalogue_version_bumps" not in db.info
+        assert catalogue_version.get_catalogue_version(db)[0] == 0
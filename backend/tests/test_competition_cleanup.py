@@ -1,3 +1,4 @@
+import pytest
 from unittest.mock import MagicMock, patch
 from sqlalchemy.exc import SQLAlchemyError
 import sys
@@ -8,6 +9,32 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
 
+@pytest.fixture(autouse=True)
+def skip_daily_rollup():
+    with patch("src.services.competition_cleanup.rollup_event_submission_days") as rollup:
+        yield rollup
+
+
+@pytest.fixture(autouse=True)
+def purge():
+    from services.question_instance_purge import PurgeResult
+    with patch("src.services.competition_cleanup.purge_event_question_instances",
+               return_value=PurgeResult(deleted={"question_instance": 3})) as purge:
+        yield purge
+
+
+@pytest.fixture(autouse=True)
+def archive():
+    with patch("src.services.competition_cleanup.archive_event_submissions", return_value={}) as archive:
+        yield archive
+
+
+@pytest.fixture(autouse=True)
+def track_event():
+    with patch("src.services.competition_cleanup.track_custom_event") as track:
+        yield track
+
+
 class TestCompetitionCleanup:
     """
     Unit tests for services/competition_cleanup.py → cleanup_ended_competitions().
@@ -15,11 +42,11 @@ class TestCompetitionCleanup:
     The function:
       1. Opens its own DB session via next(get_db())
       2. Queries BaseEvent ⋈ Competition where event_end_date < now
-      3. If none found  → returns early
+      3. If none found (cleaned_at already set) → returns early
       4. Counts matching QuestionInstances
-      5. If count == 0  → returns early (already cleaned)
-      6. Bulk-deletes them (DB cascade removes UQI / Submission / MostRecentSub)
-      7. Commits and logs
+      5. If count == 0  → nothing to purge, only the watermark is written
+      6. Purges them leaf-first in committed batches (question_instance_purge.py)
+      7. Stamps cleaned_at, commits, logs and reports the run
       On any error → rollback + log, never re-raises
     """
 
@@ -32,7 +59,7 @@ class TestCompetitionCleanup:
         return row
 
     @staticmethod
-    def _setup_db(mock_db, ended_rows, qi_count, deleted=None):
+    def _setup_db(mock_db, ended_rows, qi_count):
         """Wire up the mock DB query chain for a standard test."""
         # ended_event_ids query: .join().filter().all()
         mock_db.query.return_value.join.return_value \
@@ -42,10 +69,6 @@ class TestCompetitionCleanup:
         mock_db.query.return_value.filter.return_value \
                .count.return_value = qi_count
 
-        # QI delete query: .filter().delete()
-        mock_db.query.return_value.filter.return_value \
-               .delete.return_value = deleted if deleted is not None else qi_count
-
     # ── tests ─────────────────────────────────────────────────────────────────
 
     @patch("src.services.competition_cleanup.get_db")
@@ -65,7 +88,7 @@ class TestCompetitionCleanup:
         mock_db.close.assert_called_once()
 
     @patch("src.services.competition_cleanup.get_db")
-    def test_already_cleaned_skips_delete(self, mock_get_db):
+    def test_already_cleaned_skips_delete(self, mock_get_db, purge):
         """Ended competitions found but QuestionInstances already deleted → no-op."""
         mock_db = MagicMock()
         mock_get_db.return_value = iter([mock_db])
@@ -76,7 +99,10 @@ class TestCompetitionCleanup:
         from src.services.competition_cleanup import cleanup_ended_competitions
         cleanup_ended_competitions()
 
-        mock_db.commit.assert_not_called()
+        purge.assert_not_called()
+        # The watermark is still written so the event is not selected again.
+        mock_db.query.return_value.filter.return_value.update.assert_called_once()
+        mock_db.commit.assert_called_once()
         mock_db.close.assert_called_once()
 
     @patch("src.services.competition_cleanup.get_db")
@@ -86,7 +112,7 @@ class TestCompetitionCleanup:
         mock_get_db.return_value = iter([mock_db])
 
         ended_rows = [self._make_event_row(7)]
-        self._setup_db(mock_db, ended_rows, qi_count=3, deleted=3)
+        self._setup_db(mock_db, ended_rows, qi_count=3)
 
         from src.services.competition_cleanup import cleanup_ended_competitions
         cleanup_ended_competitions()
@@ -95,6 +121,26 @@ class TestCompetitionCleanup:
         mock_db.rollback.assert_not_called()
         mock_db.close.assert_called_once()
 
+    @patch("src.services.competition_cleanup.get_db")
+    def test_rolls_up_daily_statistics_before_deleting(self, mock_get_db, skip_daily_rollup, purge, archive):
+        """Submissions are counted into daily_statistics in the same transaction as the purge."""
+        mock_db = MagicMock()
+        mock_get_db.return_value = iter([mock_db])
+        self._setup_db(mock_db, [self._make_event_row(7)], qi_count=3)
+
+        order = []
+        skip_daily_rollup.side_effect = lambda db, event_ids: order.append("rollup")
+        purge_result = purge.return_value
+        purge.side_effect = lambda db, event_ids: order.append("delete") or purge_result
+        archive.side_effect = lambda db, event_ids: order.append("archive") or {}
+
+        from src.services.competition_cleanup import cleanup_ended_competitions
+        cleanup_ended_competitions()
+
+        skip_daily_rollup.assert_called_once_with(mock_db, [7])
+        assert order == ["rollup", "archive", "delete"]
+        mock_db.commit.assert_called_once()
+
     @patch("src.services.competition_cleanup.get_db")
     def test_deletes_across_multiple_ended_competitions(self, mock_get_db):
         """Happy path: multiple ended competitions, all QIs deleted in one pass."""
@@ -102,7 +148,7 @@ class TestCompetitionCleanup:
         mock_get_db.return_value = iter([mock_db])
 
         ended_rows = [self._make_event_row(1), self._make_event_row(2), self._make_event_row(3)]
-        self._setup_db(mock_db, ended_rows, qi_count=9, deleted=9)
+        self._setup_db(mock_db, ended_rows, qi_count=9)
 
         from src.services.competition_cleanup import cleanup_ended_competitions
         cleanup_ended_competitions()
@@ -111,7 +157,7 @@ class TestCompetitionCleanup:
         mock_db.close.assert_called_once()
 
     @patch("src.services.competition_cleanup.get_db")
-    def test_sqlalchemy_error_triggers_rollback(self, mock_get_db):
+    def test_sqlalchemy_error_triggers_rollback(self, mock_get_db, purge):
         """A SQLAlchemyError during delete must rollback and not re-raise."""
         mock_db = MagicMock()
         mock_get_db.return_value = iter([mock_db])
@@ -121,8 +167,7 @@ class TestCompetitionCleanup:
                .filter.return_value.all.return_value = ended_rows
         mock_db.query.return_value.filter.return_value \
                .count.return_value = 2
-        mock_db.query.return_value.filter.return_value \
-               .delete.side_effect = SQLAlchemyError("connection lost")
+        purge.side_effect = SQLAlchemyError("connection lost")
 
         from src.services.competition_cleanup import cleanup_ended_competitions
         cleanup_ended_competitions()  # must NOT raise
@@ -154,7 +199,7 @@ class TestCompetitionCleanup:
         mock_get_db.return_value = iter([mock_db])
 
         ended_rows = [self._make_event_row(99)]
-        self._setup_db(mock_db, ended_rows, qi_count=1, deleted=1)
+        self._setup_db(mock_db, ended_rows, qi_count=1)
 
         from src.services.competition_cleanup import cleanup_ended_competitions
         cleanup_ended_competitions()
@@ -172,4 +217,148 @@ class TestCompetitionCleanup:
         from src.services.competition_cleanup import cleanup_ended_competitions
         cleanup_ended_competitions()
 
-        mock_db.close.assert_called_once()
\ No newline at end of file
+        mock_db.close.assert_called_once()
+
+    @patch("src.services.competition_cleanup.get_db")
+    def test_reports_counts_and_duration(self, mock_get_db, track_event, purge, archive):
+        mock_db = MagicMock()
+        mock_get_db.return_value = iter([mock_db])
+        self._setup_db(mock_db, [self._make_event_row(1), self._make_event_row(2)], qi_count=5)
+        purge.return_value.deleted = {"submission": 7, "user_question_instance": 5, "question_instance": 5}
+        archive.return_value = {"submission": 7, "most_recent_submission": 2}
+
+        with patch("src.services.competition_cleanup.upsert_long_term_stats_for_unpurged_events", return_value=4):
+            from src.services.competition_cleanup import cleanup_ended_competitions
+            cleanup_ended_competitions()
+
+        properties = track_event.call_args.kwargs["properties"]
+        assert track_event.call_args.kwargs["event_name"] == "cleanup_job_completed"
+        assert properties["job"] == "competition_cleanup"
+        assert properties["events_processed"] == 2
+        assert properties["question_instances_deleted"] == 5
+        assert properties["rows_deleted"] == 17
+        assert properties["rows_archived"] == 9
+        assert properties["purge_complete"] is True
+        assert properties["long_term_stats_upserted"] == 4
+        assert properties["failed"] is False
+        assert properties["duration_ms"] >= 0
+
+    @patch("src.services.competition_cleanup.get_db")
+    def test_reports_failed_run(self, mock_get_db, track_event):
+        mock_db = MagicMock()
+        mock_get_db.return_value = iter([mock_db])
+        mock_db.query.side_effect = Exception("fatal")
+
+        from src.services.competition_cleanup import cleanup_ended_competitions
+        cleanup_ended_competitions()
+
+        properties = track_event.call_args.kwargs["properties"]
+        assert properties["failed"] is True
+        assert properties["events_processed"] == 0
+
+
+def test_watermark_skips_events_cleaned_by_earlier_runs(purge, sqlite_session):
+    """End to end on SQLite: a cleaned competition is stamped and not selected again."""
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import event, select
+    from sqlalchemy.orm import Session
+    from models.schema import (
+        BaseEvent, Competition, LongTermStatistics, MostRecentSubmission, Question, QuestionInstance, Submission,
+        UserQuestionInstance,
+    )
+    from src.services.competition_cleanup import cleanup_ended_competitions
+    from services.question_instance_purge import PurgeResult, purge_event_question_instances
+
+    db = sqlite_session(BaseEvent, Competition, Question, QuestionInstance, UserQuestionInstance, Submission,
+                        MostRecentSubmission, LongTermStatistics)
+    engine = db.get_bind()
+    ended = datetime.now(timezone.utc) - timedelta(days=1)
+    db.add_all([
+        BaseEvent(event_id=1, event_name="Ended", event_start_date=ended - timedelta(hours=2), event_end_date=ended),
+        Competition(event_id=1),
+        Question(question_id=1, question_name="Q", question_description="", difficulty="easy"),
+        QuestionInstance(question_instance_id=1, question_id=1, event_id=1),
+    ])
+    db.commit()
+
+    def run():
+        statements = []
+
+        def listener(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", listener)
+        with patch("src.services.competition_cleanup.get_db", side_effect=lambda: iter([Session(engine)])):
+            cleanup_ended_competitions()
+        event.remove(engine, "before_cursor_execute", listener)
+        return statements
+
+    # Out of time before anything was purged: the event stays pending.
+    purge.return_value = PurgeResult(complete=False)
+    run()
+    with Session(engine) as session:
+        assert session.scalar(select(BaseEvent.cleaned_at)) is None
+
+    purge.side_effect = purge_event_question_instances
+    run()
+    with Session(engine) as session:
+        assert session.scalar(select(BaseEvent.cleaned_at)) is not None
+        assert session.scalar(select(QuestionInstance.question_instance_id)) is None
+
+    second_run = run()
+    assert len(second_run) == 1  # only the pending-events lookup
+
+
+def test_resumed_purge_keeps_the_statistics_captured_before_it_started(purge, sqlite_session):
+    """End to end on SQLite: a purge cut off mid-way must not lower the stored long-term statistics."""
+    from datetime import datetime, timedelta, timezone
+    from itertools import count
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import Session
+    from models.schema import (
+        BaseEvent, Competition, LongTermStatistics, MostRecentSubmission, Question, QuestionInstance, Submission,
+        UserQuestionInstance,
+    )
+    from src.services.competition_cleanup import cleanup_ended_competitions
+    from services.question_instance_purge import purge_event_question_instances
+
+    db = sqlite_session(BaseEvent, Competition, Question, QuestionInstance, UserQuestionInstance, Submission,
+                        MostRecentSubmission, LongTermStatistics)
+    engine = db.get_bind()
+    ended = datetime.now(timezone.utc) - timedelta(days=1)
+    db.add_all([
+        BaseEvent(event_id=1, event_name="Ended", event_start_date=ended - timedelta(hours=2), event_end_date=ended),
+        Competition(event_id=1),
+        Question(question_id=1, question_name="Q", question_description="", difficulty="easy"),
+        QuestionInstance(question_instance_id=1, question_id=1, event_id=1),
+    ] + [
+        UserQuestionInstance(user_id=user_id, question_instance_id=1, points=10, lapse_time=lapse_time)
+        for user_id, lapse_time in ((1, 10), (2, 20), (3, 30))
+    ])
+    db.commit()
+
+    def run():
+        with patch("src.services.competition_cleanup.get_db", side_effect=lambda: iter([Session(engine)])):
+            cleanup_ended_competitions()
+        db.expire_all()
+
+    def stored():
+        row = db.scalar(select(LongTermStatistics))
+        return row.number_solves, row.average_question_solve_time
+
+    # One user_question_instance row deleted, then out of time.
+    ticks = count()
+    purge.side_effect = lambda session, event_ids: purge_event_question_instances(
+        session, event_ids, batch_size=1, sleep=lambda seconds: None, clock=lambda: next(ticks),
+        max_run_seconds=3.5,
+    )
+    run()
+    assert db.scalar(select(func.count()).select_from(UserQuestionInstance)) == 2
+    assert db.scalar(select(BaseEvent.cleaned_at)) is None
+    assert stored() == (3, 20.0)
+
+    purge.side_effect = purge_event_question_instances
+    run()
+    assert db.scalar(select(func.count()).select_from(UserQuestionInstance)) == 0
+    assert db.scalar(select(BaseEvent.cleaned_at)) is not None
+    assert stored() == (3, 20.0)
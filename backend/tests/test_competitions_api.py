@@ -21,11 +21,13 @@ sys.path.append(parent_dir)
 from database_operations import database
 from src.endpoints.competitions_api import (
     competitions_router,
+    iter_email_recipients,
     resolve_email_recipients,
     check_competition_name_exists,
     validate_competition_times,
     create_competition_emails,
     send_competition_emails,
+    competition_question_counts,
 )
 
 
@@ -69,6 +71,7 @@ def client(mock_db):
 def create_mock_query(return_value=None):
     mock_query = MagicMock()
     mock_query.join.return_value = mock_query
+    mock_query.outerjoin.return_value = mock_query
     mock_query.filter.return_value = mock_query
     mock_query.filter_by.return_value = mock_query
     mock_query.order_by.return_value = mock_query
@@ -116,9 +119,72 @@ def test_get_all_competitions_empty(client, mock_db):
         "page": 1,
         "page_size": 11,
         "items": [],
+        "next_cursor": None,
     }
 
 
+def test_get_all_competitions_cursor_mode_returns_next_cursor(client, mock_db):
+    fake_comps = [
+        SimpleNamespace(
+            event_id=event_id,
+            base_event=SimpleNamespace(
+                event_id=event_id,
+                event_name=f"Event {event_id}",
+                event_location=None,
+                event_start_date=datetime(2025, 12, event_id, 10, 0, 0),
+                event_end_date=datetime(2025, 12, event_id, 18, 0, 0),
+            ),
+        )
+        for event_id in (3, 2, 1)
+    ]
+    query = create_mock_query(fake_comps)
+    mock_db.query.return_value = query
+
+    response = client.get("/competitions/", params={"cursor": "", "page_size": 2})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [3, 2]
+    assert data["total"] is None
+    assert data["page"] is None
+    assert data["next_cursor"]
+    query.offset.assert_not_called()
+    query.count.assert_not_called()
+    query.limit.assert_called_once_with(3)
+
+    response = client.get("/competitions/", params={"cursor": data["next_cursor"], "page_size": 2})
+    assert response.status_code == 200
+    query.filter.assert_called()
+
+
+def test_get_all_competitions_cursor_uses_only_stable_sort_keys(client, mock_db):
+    from endpoints.pagination_utils import decode_cursor
+
+    start = datetime(2025, 12, 2, 10, 0, 0)
+    fake_comps = [
+        SimpleNamespace(event_id=event_id, base_event=SimpleNamespace(
+            event_id=event_id, event_name="E", event_location=None, event_start_date=start,
+            event_end_date=start + timedelta(hours=8),
+        ))
+        for event_id in (2, 1)
+    ]
+    mock_db.query.return_value = create_mock_query(fake_comps)
+
+    response = client.get("/competitions/", params={"cursor": "", "page_size": 1})
+
+    # No status rank computed from the request time: the cursor stays valid as events start and end.
+    assert decode_cursor(response.json()["next_cursor"], "competitions:desc", 2) == [start, 2]
+
+
+def test_get_all_competitions_rejects_invalid_cursor(client, mock_db):
+    mock_db.query.return_value = create_mock_query([])
+
+    response = client.get("/competitions/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor."
+
+
 def test_get_all_competitions_db_error(client, mock_db):
     mock_query = create_mock_query()
     mock_query.all.side_effect = Exception("DB Connection Lost")
@@ -138,6 +204,9 @@ def test_list_competitions_empty(client, mock_db):
     response = client.get("/competitions/list")
     assert response.status_code == 200
     assert response.json() == []
+    assert response.headers["X-Total-Count"] == "0"
+    assert "Link" not in response.headers
+    mock_db.execute.assert_not_called()
 
 
 def test_list_competitions_error(client, mock_db):
@@ -161,25 +230,9 @@ def test_list_competitions_success(client, mock_db):
     )
     competition = SimpleNamespace(riddle_cooldown=60, event_id=5)
 
-    join_query = MagicMock()
-    join_query.join.return_value = join_query
-    join_query.order_by.return_value = join_query
-    join_query.all.return_value = [(base_event, competition)]
-
-    count_query = MagicMock()
-    count_query.filter.return_value = count_query
-    count_query.count.return_value = 3
-
-    call_count = [0]
-
-    # db.query(BaseEvent, Competition) passes TWO positional args, so *args is required.
-    def query_side_effect(*args):
-        call_count[0] += 1
-        if call_count[0] == 1:
-            return join_query
-        return count_query
-
-    mock_db.query.side_effect = query_side_effect
+    mock_query = create_mock_query([(base_event, competition)])
+    mock_db.query.return_value = mock_query
+    mock_db.execute.return_value.all.return_value = [(5, 3, 1)]
 
     response = client.get("/competitions/list")
     assert response.status_code == 200
@@ -187,6 +240,63 @@ def test_list_competitions_success(client, mock_db):
     assert len(data) == 1
     assert data[0]["event_id"] == 5
     assert data[0]["event_name"] == "Spring Contest"
+    assert data[0]["question_count"] == 3
+    assert data[0]["riddle_count"] == 1
+    assert response.headers["X-Total-Count"] == "1"
+    # Counts come from one grouped query for the page, not one count() per competition.
+    assert mock_db.execute.call_count == 1
+    mock_query.count.assert_called_once()
+
+
+def test_list_competitions_paginates(client, mock_db):
+    mock_query = create_mock_query([])
+    mock_query.count.return_value = 75
+    mock_db.query.return_value = mock_query
+
+    response = client.get("/competitions/list?page=3&page_size=20")
+
+    assert response.status_code == 200
+    mock_query.offset.assert_called_once_with(40)
+    mock_query.limit.assert_called_once_with(20)
+    assert response.headers["X-Total-Count"] == "75"
+    assert response.headers["Link"] == '<http://testserver/competitions/list?page=4&page_size=20>; rel="next"'
+
+
+def test_list_competitions_last_page_has_no_next_link(client, mock_db):
+    mock_query = create_mock_query([])
+    mock_query.count.return_value = 75
+    mock_db.query.return_value = mock_query
+
+    response = client.get("/competitions/list?page=4&page_size=20")
+
+    assert response.headers["X-Total-Count"] == "75"
+    assert "Link" not in response.headers
+
+
+def test_list_competitions_rejects_oversized_page(client, mock_db):
+    response = client.get("/competitions/list?page_size=1000")
+    assert response.status_code == 422
+
+
+def test_competition_question_counts_covers_only_the_given_events():
+    from sqlalchemy import create_engine, insert, select
+    from models.schema import QuestionInstance
+
+    engine = create_engine("sqlite://")
+    QuestionInstance.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(QuestionInstance), [
+            {"event_id": 1, "question_id": 10, "riddle_id": None},
+            {"event_id": 1, "question_id": 11, "riddle_id": None},
+            {"event_id": 1, "question_id": 12, "riddle_id": 7},
+            {"event_id": 2, "question_id": 13, "riddle_id": 8},
+            {"event_id": 3, "question_id": 14, "riddle_id": None},
+        ])
+        counts = competition_question_counts([1, 2]).subquery()
+        rows = conn.execute(select(counts).order_by(counts.c.event_id)).all()
+    engine.dispose()
+
+    assert [tuple(row) for row in rows] == [(1, 2, 1), (2, 0, 1)]
 
 
 # ---------------------------------------------------------------------------
@@ -906,56 +1016,69 @@ class TestResolveEmailRecipients:
         result = resolve_email_recipients(mock_db, "user@example.com")
         assert result == ["user@example.com"]
 
-    def test_all_participants_keyword(self, mock_db):
-        """'all' keyword queries UserAccount and filters by opted-out preferences."""
-        user_rows = [
-            SimpleNamespace(user_id=1, email="a@x.com"),
-            SimpleNamespace(user_id=2, email="b@x.com"),
-            SimpleNamespace(user_id=3, email="c@x.com"),
-        ]
-        opted_out = [SimpleNamespace(user_id=2)]
-
-        account_query = MagicMock()
-        account_query.all.return_value = user_rows
-
-        prefs_query = MagicMock()
-        prefs_query.filter.return_value = prefs_query
-        prefs_query.all.return_value = opted_out
-
-        call_count = [0]
-
-        def query_side_effect(*args):
-            call_count[0] += 1
-            return account_query if call_count[0] == 1 else prefs_query
-
-        mock_db.query.side_effect = query_side_effect
-
-        result = resolve_email_recipients(mock_db, "all")
-        assert "a@x.com" in result
-        assert "c@x.com" in result
-        assert "b@x.com" not in result  # opted out
+    @staticmethod
+    def _participants(sqlite_session):
+        from sqlalchemy import insert
+        from models.schema import UserAccount, UserPreferences
+
+        db = sqlite_session(UserAccount, UserPreferences, savepoints=True)
+        db.execute(insert(UserAccount), [
+            {"user_id": i, "email": f"{name}@x.com", "hashed_password": "", "first_name": name,
+             "last_name": "", "user_type": "participant"}
+            for i, name in ((1, "a"), (2, "b"), (3, "c"), (4, "d"))
+        ])
+        db.execute(insert(UserPreferences), [
+            {"user_id": 2, "theme": "light", "notifications_enabled": False},
+            {"user_id": 3, "theme": "dark", "notifications_enabled": True},
+        ])
+        db.commit()
+        return db
+
+    def test_all_participants_keyword(self, sqlite_session):
+        """'all' keyword returns every user except those who turned notifications off."""
+        db = self._participants(sqlite_session)
+
+        # b opted out; d has no preferences row and is included.
+        assert resolve_email_recipients(db, "all") == ["a@x.com", "c@x.com", "d@x.com"]
+
+    def test_all_participants_are_streamed(self, sqlite_session):
+        """The scheduler's iterator yields addresses as the cursor produces them, without building a list."""
+        import types
+
+        db = self._participants(sqlite_session)
+        recipients = iter_email_recipients(db, "All Users")
+
+        assert isinstance(recipients, types.GeneratorType)
+        assert next(recipients) == "a@x.com"
+        assert list(recipients) == ["c@x.com", "d@x.com"]
 
     def test_all_participants_case_insensitive(self, mock_db):
         """'ALL PARTICIPANTS' variant is recognised."""
-        mock_db.query.return_value.all.return_value = []
-        prefs_query = MagicMock()
-        prefs_query.filter.return_value = prefs_query
-        prefs_query.all.return_value = []
-
-        call_count = [0]
-        def query_side_effect(*args):
-            call_count[0] += 1
-            return MagicMock(all=MagicMock(return_value=[]))
-
-        mock_db.query.side_effect = query_side_effect
+        mock_db.execute.return_value.scalars.return_value = iter([])
         result = resolve_email_recipients(mock_db, "ALL PARTICIPANTS")
         assert result == []
+        mock_db.execute.assert_called_once()
 
     def test_all_participants_db_error_returns_empty(self, mock_db):
         """DB failure inside 'all' path returns [] instead of crashing."""
-        mock_db.query.side_effect = Exception("DB error")
+        mock_db.execute.side_effect = Exception("DB error")
         result = resolve_email_recipients(mock_db, "all")
         assert result == []
+        mock_db.begin_nested.assert_called_once()
+
+    def test_failed_lookup_leaves_the_session_usable(self, sqlite_session):
+        """The failed query is rolled back to its savepoint; the caller's pending changes survive."""
+        from sqlalchemy import select
+        from models.schema import UserAccount, UserPreferences
+
+        db = self._participants(sqlite_session)
+        db.add(UserAccount(user_id=5, email="e@x.com", hashed_password="", first_name="e", last_name="",
+                           user_type="participant"))
+        db.flush()
+        UserPreferences.__table__.drop(db.connection())
+
+        assert resolve_email_recipients(db, "all") == []
+        assert db.scalar(select(UserAccount.email).where(UserAccount.user_id == 5)) == "e@x.com"
 
     def test_skips_empty_entries_in_csv(self, mock_db):
         """Trailing commas and blank segments are ignored."""
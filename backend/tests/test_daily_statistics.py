@@ -0,0 +1,231 @@
+from datetime import date, datetime, timedelta, timezone
+import sys
+import os
+
+import pytest
+from sqlalchemy import delete, event, select
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services import daily_statistics
+from services.daily_statistics import (
+    TimeBucket,
+    compute_daily_statistics,
+    day_buckets,
+    month_buckets,
+    next_rollup_day,
+    rollup_daily_statistics,
+    rollup_event_submission_days,
+    sum_daily_statistics,
+    week_buckets,
+)
+from models.schema import (
+    AlgoTimeSession,
+    BaseEvent,
+    Competition,
+    DailyStatistics,
+    QuestionInstance,
+    Submission,
+    UserAccount,
+    UserQuestionInstance,
+    UserSession,
+)
+
+DAY = date(2026, 3, 2)
+NOON = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(sqlite_session):
+    session = sqlite_session(UserAccount, UserSession, BaseEvent, Competition, AlgoTimeSession, QuestionInstance,
+                             UserQuestionInstance, Submission, DailyStatistics)
+    end = NOON + timedelta(days=1)
+    session.add_all([
+        BaseEvent(event_id=1, event_name="Comp", event_start_date=NOON, event_end_date=end),
+        BaseEvent(event_id=2, event_name="Algo", event_start_date=NOON, event_end_date=end),
+        Competition(event_id=1),
+        AlgoTimeSession(event_id=2),
+        QuestionInstance(question_instance_id=1, question_id=1, event_id=1),
+        QuestionInstance(question_instance_id=2, question_id=1, event_id=2),
+        UserQuestionInstance(user_question_instance_id=1, user_id=1, question_instance_id=1),
+        UserQuestionInstance(user_question_instance_id=2, user_id=1, question_instance_id=2),
+    ])
+    session.commit()
+    return session
+
+
+def _account(session, user_id, created_at):
+    session.add(UserAccount(user_id=user_id, email=f"u{user_id}@test.com", hashed_password="x",
+                            first_name="U", last_name="U", created_at=created_at))
+
+
+def _login(session, token, created_at):
+    session.add(UserSession(user_id=1, jwt_token=token, created_at=created_at,
+                            expires_at=created_at + timedelta(hours=1)))
+
+
+def _submission(session, user_question_instance_id, submitted_on):
+    session.add(Submission(user_question_instance_id=user_question_instance_id, submitted_on=submitted_on,
+                           status="Accepted", lang_judge_id=71))
+
+
+def _stored(db):
+    return {
+        row.day: (row.new_accounts, row.logins, row.competition_submissions, row.algotime_submissions, row.is_final)
+        for row in db.scalars(select(DailyStatistics))
+    }
+
+
+def test_compute_groups_every_source_by_utc_day(db):
+    _account(db, 1, NOON)
+    _account(db, 2, NOON + timedelta(hours=11, minutes=59))
+    _account(db, 3, NOON + timedelta(days=1))
+    _login(db, "a", NOON - timedelta(hours=12))
+    _login(db, "b", NOON + timedelta(days=2))
+    _submission(db, 1, NOON)
+    _submission(db, 1, NOON + timedelta(days=1))
+    _submission(db, 2, NOON + timedelta(days=1))
+    db.commit()
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    counters = compute_daily_statistics(db, DAY, DAY + timedelta(days=2))
+
+    assert counters[DAY] == {"new_accounts": 2, "logins": 1, "competition_submissions": 1, "algotime_submissions": 0}
+    assert counters[DAY + timedelta(days=1)] == {
+        "new_accounts": 1, "logins": 0, "competition_submissions": 1, "algotime_submissions": 1,
+    }
+    assert counters[DAY + timedelta(days=2)]["logins"] == 1
+    assert len(statements) == 3
+
+
+def test_rollup_finalizes_past_days_and_keeps_them_after_purge(db):
+    _submission(db, 1, NOON)
+    _submission(db, 2, NOON + timedelta(days=1))
+    db.commit()
+
+    written = rollup_daily_statistics(db, DAY, now=NOON + timedelta(days=1))
+    db.commit()
+
+    assert written == 2
+    assert _stored(db) == {
+        DAY: (0, 0, 1, 0, True),
+        DAY + timedelta(days=1): (0, 0, 0, 1, False),
+    }
+
+    # Cleanup purges the submissions; the rollup must not lose them.
+    db.execute(delete(Submission))
+    db.commit()
+    rollup_daily_statistics(db, now=NOON + timedelta(days=2))
+    db.commit()
+
+    stored = _stored(db)
+    assert stored[DAY] == (0, 0, 1, 0, True)
+    assert stored[DAY + timedelta(days=1)] == (0, 0, 0, 1, True)
+    assert stored[DAY + timedelta(days=2)] == (0, 0, 0, 0, False)
+
+
+def test_next_rollup_day_resumes_after_last_final_day(db):
+    today = DAY + timedelta(days=10)
+    assert next_rollup_day(db, today) == today
+
+    _account(db, 1, NOON - timedelta(days=5))
+    db.commit()
+    assert next_rollup_day(db, today) == DAY - timedelta(days=5)
+
+    rollup_daily_statistics(db, DAY - timedelta(days=5), DAY, now=NOON + timedelta(days=10))
+    db.commit()
+    assert next_rollup_day(db, today) == DAY + timedelta(days=1)
+
+
+def test_rollup_upserts_over_rows_written_meanwhile(db):
+    """Another rollup inserting the same day first must not fail the write."""
+    _submission(db, 1, NOON)
+    db.add(DailyStatistics(day=DAY, new_accounts=3, logins=0, competition_submissions=0,
+                           algotime_submissions=0, is_final=False, computed_at=NOON))
+    db.commit()
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert rollup_daily_statistics(db, DAY, DAY, now=NOON + timedelta(days=1)) == 1
+    db.commit()
+
+    assert _stored(db) == {DAY: (3, 0, 1, 0, True)}
+    assert sum("INSERT INTO daily_statistics" in statement for statement in statements) == 1
+
+
+def test_cleanup_rollup_covers_only_the_purged_submission_days(db):
+    _account(db, 1, NOON - timedelta(days=30))
+    _submission(db, 1, NOON)
+    _submission(db, 1, NOON + timedelta(days=1))
+    _submission(db, 2, NOON + timedelta(days=3))
+    db.commit()
+
+    written = rollup_event_submission_days(db, [1], now=NOON + timedelta(days=5))
+    db.commit()
+
+    assert written == 2
+    assert _stored(db) == {
+        DAY: (0, 0, 1, 0, False),
+        DAY + timedelta(days=1): (0, 0, 1, 0, False),
+    }
+    # The scheduled rollup still backfills from the oldest day with data.
+    assert next_rollup_day(db, DAY + timedelta(days=5)) == DAY - timedelta(days=30)
+    assert rollup_event_submission_days(db, [3]) == 0
+
+
+def test_refresh_backfills_in_batches(db, monkeypatch):
+    _account(db, 1, datetime.now(timezone.utc) - timedelta(days=10))
+    db.commit()
+    monkeypatch.setattr(daily_statistics, "SessionLocal", lambda: db)
+    monkeypatch.setattr(daily_statistics, "BACKFILL_BATCH_DAYS", 4)
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(True))
+
+    daily_statistics.refresh_daily_statistics()
+
+    stored = _stored(db)
+    assert len(stored) == 11
+    assert sum(row[0] for row in stored.values()) == 1
+    assert sum(not row[4] for row in stored.values()) == 1
+    assert len(commits) == 3
+
+
+def test_bucket_builders_are_chronological():
+    assert [b.label for b in day_buckets(DAY, 3)] == ["Day 1", "Day 2", "Day 3"]
+    assert day_buckets(DAY, 2, "%a") == [TimeBucket("Sun", date(2026, 3, 1), date(2026, 3, 1)),
+                                         TimeBucket("Mon", DAY, DAY)]
+
+    weeks = week_buckets(DAY, 2)
+    assert [(w.first_day, w.last_day) for w in weeks] == [
+        (date(2026, 2, 17), date(2026, 2, 23)), (date(2026, 2, 24), DAY),
+    ]
+
+    months = month_buckets(date(2026, 1, 15), 3)
+    assert [(m.label, m.first_day, m.last_day) for m in months] == [
+        ("Nov", date(2025, 11, 1), date(2025, 11, 30)),
+        ("Dec", date(2025, 12, 1), date(2025, 12, 31)),
+        ("Jan", date(2026, 1, 1), date(2026, 1, 15)),
+    ]
+
+
+def test_sum_daily_statistics_fills_buckets_in_one_query(db):
+    now = datetime.now(timezone.utc)
+    db.add_all([
+        DailyStatistics(day=date(2025, 12, 31), logins=1, new_accounts=9, computed_at=now),
+        DailyStatistics(day=date(2026, 1, 1), logins=2, computed_at=now),
+        DailyStatistics(day=date(2026, 1, 15), logins=3, new_accounts=1, computed_at=now),
+        DailyStatistics(day=date(2026, 1, 16), logins=100, computed_at=now),
+        # Same month a year earlier must not leak into "Jan".
+        DailyStatistics(day=date(2025, 1, 10), logins=50, computed_at=now),
+    ])
+    db.commit()
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    totals = sum_daily_statistics(db, month_buckets(date(2026, 1, 15), 3), "logins", "new_accounts")
+
+    assert totals == {"logins": [0, 1, 5], "new_accounts": [0, 9, 1]}
+    assert len(statements) == 1
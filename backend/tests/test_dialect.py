@@ -0,0 +1,28 @@
+import sys
+import os
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from database_operations.dialect import insert_for, is_postgresql
+
+
+def _db_for(dialect_name):
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = dialect_name
+    return db
+
+
+def test_insert_for_picks_the_dialect_insert():
+    assert insert_for(_db_for("postgresql")) is postgresql.insert
+    assert insert_for(_db_for("sqlite")) is sqlite.insert
+
+
+def test_is_postgresql_is_false_when_the_bind_is_unavailable():
+    db = MagicMock()
+    db.get_bind.side_effect = RuntimeError("no bind")
+    assert is_postgresql(db) is False
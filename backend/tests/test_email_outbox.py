@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta, timezone
+import sys
+import os
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services import email_outbox
+from services.bulk_email import BulkSendResult
+from services.email_outbox import (
+    EMAIL_OUTBOX_MAX_ATTEMPTS,
+    drain_email_outbox,
+    enqueue_email_deliveries,
+    retry_delay,
+)
+from models.schema import CompetitionEmail, EmailOutbox
+
+NOW = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(sqlite_session):
+    session = sqlite_session(CompetitionEmail, EmailOutbox, threadsafe=True)
+    session.add(CompetitionEmail(email_id=1, competition_id=1, subject="Finals", to="all", body="Good luck"))
+    session.commit()
+    return session
+
+
+def _send(sent=None, failed=(), rejected=(), error=None):
+    async def send(recipients, subject, body, **kwargs):
+        failed_recipients = [r for r in recipients if r in failed or r in rejected]
+        return BulkSendResult(sent=len(recipients) - len(failed_recipients), failed=len(failed_recipients),
+                              failed_recipients=failed_recipients,
+                              rejected_recipients=[r for r in recipients if r in rejected], last_error=error)
+    return patch.object(email_outbox, "send_bulk_email", AsyncMock(side_effect=send))
+
+
+def _deliveries(db):
+    db.expire_all()
+    return {row.recipient: row for row in db.scalars(select(EmailOutbox))}
+
+
+def test_enqueue_is_idempotent(db):
+    assert enqueue_email_deliveries(db, 1, "24h", ["a@x.com", "b@x.com", "a@x.com"], NOW) == 2
+    assert enqueue_email_deliveries(db, 1, "24h", ["a@x.com", "c@x.com"], NOW) == 1
+    assert enqueue_email_deliveries(db, 1, "5min", ["a@x.com"], NOW) == 1
+    db.commit()
+
+    assert db.scalar(select(EmailOutbox).where(EmailOutbox.recipient == "a@x.com",
+                                               EmailOutbox.kind == "24h")).status == "pending"
+    assert len(db.scalars(select(EmailOutbox)).all()) == 4
+
+
+async def test_drain_sends_due_deliveries_with_the_kind_subject(db):
+    enqueue_email_deliveries(db, 1, "24h", ["a@x.com", "b@x.com"], NOW)
+    db.commit()
+
+    with _send() as send:
+        result = await drain_email_outbox(db, NOW)
+
+    assert (result.sent, result.retrying, result.failed) == (2, 0, 0)
+    send.assert_awaited_once()
+    recipients, subject, body = send.await_args.args
+    assert sorted(recipients) == ["a@x.com", "b@x.com"]
+    assert subject == "[24h Reminder] Finals"
+    assert body == "Good luck"
+    for delivery in _deliveries(db).values():
+        assert (delivery.status, delivery.attempts) == ("sent", 1)
+        assert delivery.sent_at is not None
+
+    with _send() as send:
+        await drain_email_outbox(db, NOW + timedelta(hours=1))
+    send.assert_not_awaited()
+
+
+async def test_failed_recipients_are_retried_with_backoff(db):
+    enqueue_email_deliveries(db, 1, "custom", ["a@x.com", "b@x.com"], NOW)
+    db.commit()
+
+    with _send(failed={"b@x.com"}, error="Brevo API error 503"):
+        result = await drain_email_outbox(db, NOW)
+
+    assert (result.sent, result.retrying, result.failed) == (1, 1, 0)
+    failed = _deliveries(db)["b@x.com"]
+    assert (failed.status, failed.attempts, failed.last_error) == ("pending", 1, "Brevo API error 503")
+
+    # Not due again before the backoff has passed.
+    with _send() as send:
+        await drain_email_outbox(db, NOW + retry_delay(1) - timedelta(seconds=1))
+    send.assert_not_awaited()
+
+    with _send() as send:
+        result = await drain_email_outbox(db, NOW + retry_delay(1))
+    assert send.await_args.args[0] == ["b@x.com"]
+    assert _deliveries(db)["b@x.com"].status == "sent"
+
+
+async def test_rejected_recipients_fail_right_away(db):
+    enqueue_email_deliveries(db, 1, "24h", ["a@x.com", "not-an-email"], NOW)
+    db.commit()
+
+    with _send(rejected={"not-an-email"}, error="Invalid recipient email"):
+        result = await drain_email_outbox(db, NOW)
+
+    assert (result.sent, result.retrying, result.failed) == (1, 0, 1)
+    rejected = _deliveries(db)["not-an-email"]
+    assert (rejected.status, rejected.attempts, rejected.last_error) == ("failed", 1, "Invalid recipient email")
+
+    with _send() as send:
+        await drain_email_outbox(db, NOW + timedelta(days=1))
+    send.assert_not_awaited()
+
+
+async def test_delivery_fails_for_good_after_max_attempts(db):
+    enqueue_email_deliveries(db, 1, "24h", ["a@x.com"], NOW)
+    db.commit()
+
+    now = NOW
+    for attempt in range(1, EMAIL_OUTBOX_MAX_ATTEMPTS + 1):
+        with _send(failed={"a@x.com"}, error="Brevo API error 500"):
+            result = await drain_email_outbox(db, now)
+        now += retry_delay(attempt)
+
+    assert result.failed == 1
+    delivery = _deliveries(db)["a@x.com"]
+    assert (delivery.status, delivery.attempts) == ("failed", EMAIL_OUTBOX_MAX_ATTEMPTS)
+
+
+async def test_claimed_deliveries_survive_a_crash_mid_send(db):
+    enqueue_email_deliveries(db, 1, "24h", ["a@x.com"], NOW)
+    db.commit()
+
+    with patch.object(email_outbox, "send_bulk_email", AsyncMock(side_effect=KeyboardInterrupt)):
+        with pytest.raises(KeyboardInterrupt):
+            await drain_email_outbox(db, NOW)
+
+    delivery = _deliveries(db)["a@x.com"]
+    assert (delivery.status, delivery.attempts) == ("pending", 1)
+    with _send() as send:
+        await drain_email_outbox(db, NOW + retry_delay(1))
+    send.assert_awaited_once()
+
+
+async def test_drain_is_capped_per_run(db):
+    enqueue_email_deliveries(db, 1, "24h", [f"user{i}@x.com" for i in range(5)], NOW)
+    db.commit()
+
+    with _send():
+        result = await drain_email_outbox(db, NOW, limit=3)
+
+    assert result.sent == 3
+    assert sum(d.status == "pending" for d in _deliveries(db).values()) == 2
@@ -1,4 +1,3 @@
-import asyncio
 import pytest
 from datetime import datetime, timezone, timedelta
 from unittest.mock import MagicMock, patch
@@ -37,111 +36,74 @@ FUTURE = NOW + timedelta(hours=1)
 
 MOD = "backend.src.services.email_scheduler"
 PATCH_SESSION = f"{MOD}.SessionLocal"
-PATCH_RESOLVE = f"{MOD}.resolve_email_recipients"
-PATCH_SEND_REM = f"{MOD}._send_reminder"
-PATCH_PROCESS = f"{MOD}._process_email"
-PATCH_SEND_ONE = f"{MOD}._send_one_email"
+PATCH_RECIPIENTS = f"{MOD}.iter_email_recipients"
+PATCH_ENQUEUE = f"{MOD}.enqueue_email_deliveries"
+PATCH_DRAIN = f"{MOD}.drain_email_outbox"
+PATCH_QUEUE = f"{MOD}._queue_emails"
 PATCH_LOGGER = f"{MOD}.logger"
 
 # ---------------------------------------------------------------------------
-# _send_reminder (async)
+# _queue_emails
 # ---------------------------------------------------------------------------
 
-class TestSendReminderAsync:
+class TestQueueEmails:
 
-    @pytest.mark.asyncio
-    async def test_calls_send_one_per_recipient(self):
-        with patch(PATCH_SEND_ONE, return_value=True) as mock_send:
-            from backend.src.services.email_scheduler import _send_reminder
-            await _send_reminder(1, ["a", "b"], "Sub", "Body")
-
-            assert mock_send.call_count == 2
-
-    @pytest.mark.asyncio
-    async def test_returns_true_if_one_success(self):
-        with patch(PATCH_SEND_ONE, side_effect=[False, True]):
-            from backend.src.services.email_scheduler import _send_reminder
-            result = await _send_reminder(1, ["a", "b"], "Sub", "Body")
-
-        assert result is True
-
-    @pytest.mark.asyncio
-    async def test_returns_false_if_all_fail(self):
-        with patch(PATCH_SEND_ONE, return_value=False):
-            from backend.src.services.email_scheduler import _send_reminder
-            result = await _send_reminder(1, ["a", "b"], "Sub", "Body")
-
-        assert result is False
-
-    @pytest.mark.asyncio
-    async def test_empty_recipients(self):
-        with patch(PATCH_SEND_ONE) as mock_send:
-            from backend.src.services.email_scheduler import _send_reminder
-            result = await _send_reminder(1, [], "Sub", "Body")
-
-        assert result is False
-        mock_send.assert_not_called()
-
-# ---------------------------------------------------------------------------
-# _send_one_email
-# ---------------------------------------------------------------------------
-
-class TestSendOneEmail:
-
-    @pytest.mark.asyncio
-    async def test_uses_to_thread(self):
-        with patch("asyncio.to_thread") as mock_thread:
-            future = asyncio.Future()
-            future.set_result(None)
-            mock_thread.return_value = future
-
-            from backend.src.services.email_scheduler import _send_one_email
-            await _send_one_email(1, "a@b.com", "Sub", "Body")
-
-        mock_thread.assert_called_once()
-
-# ---------------------------------------------------------------------------
-# _process_email
-# ---------------------------------------------------------------------------
-
-class TestProcessEmailAsync:
-
-    @pytest.mark.asyncio
-    async def test_24h_trigger(self):
+    def test_24h_trigger(self):
         email = _make_email(time_24h_before=PAST)
+        db = MagicMock()
 
-        with patch(PATCH_SEND_REM, return_value=True) as mock_send:
-            from backend.src.services.email_scheduler import _process_email
-            await _process_email(email, ["a"], NOW)
+        with patch(PATCH_ENQUEUE) as mock_enqueue:
+            from backend.src.services.email_scheduler import _queue_emails
+            assert _queue_emails(db, [email], ["a"], NOW) == 1
 
-        mock_send.assert_called_once()
+        mock_enqueue.assert_called_once_with(db, 1, "24h", ["a"], NOW)
         assert email.time_24h_before is None
 
-    @pytest.mark.asyncio
-    async def test_multiple_triggers(self):
+    def test_multiple_triggers(self):
         email = _make_email(
             time_24h_before=PAST,
             time_5min_before=PAST,
             other_time=PAST,
         )
 
-        with patch(PATCH_SEND_REM, return_value=True) as mock_send:
-            from backend.src.services.email_scheduler import _process_email
-            await _process_email(email, ["a"], NOW)
+        with patch(PATCH_ENQUEUE) as mock_enqueue:
+            from backend.src.services.email_scheduler import _queue_emails
+            _queue_emails(MagicMock(), [email], ["a"], NOW)
 
-        assert mock_send.call_count == 3
+        assert [c.args[2] for c in mock_enqueue.call_args_list] == ["24h", "5min", "custom"]
+        assert (email.time_24h_before, email.time_5min_before, email.other_time) == (None, None, None)
 
-    @pytest.mark.asyncio
-    async def test_not_due(self):
+    def test_not_due(self):
         email = _make_email(time_24h_before=FUTURE)
 
-        with patch(PATCH_SEND_REM) as mock_send:
-            from backend.src.services.email_scheduler import _process_email
-            await _process_email(email, ["a"], NOW)
+        with patch(PATCH_ENQUEUE) as mock_enqueue:
+            from backend.src.services.email_scheduler import _queue_emails
+            _queue_emails(MagicMock(), [email], ["a"], NOW)
 
-        mock_send.assert_not_called()
+        mock_enqueue.assert_not_called()
         assert email.time_24h_before == FUTURE
 
+    def test_recipients_are_queued_in_batches_for_every_email(self):
+        emails = [_make_email(email_id=1, time_24h_before=PAST), _make_email(email_id=2, other_time=PAST)]
+
+        with patch(PATCH_ENQUEUE) as mock_enqueue, patch(f"{MOD}.ENQUEUE_BATCH_SIZE", 2):
+            from backend.src.services.email_scheduler import _queue_emails
+            assert _queue_emails(MagicMock(), emails, iter(["a", "b", "c"]), NOW) == 3
+
+        assert [c.args[1:4] for c in mock_enqueue.call_args_list] == [
+            (1, "24h", ["a", "b"]), (2, "custom", ["a", "b"]), (1, "24h", ["c"]), (2, "custom", ["c"]),
+        ]
+
+    def test_no_recipients_keeps_send_times(self):
+        email = _make_email(time_24h_before=PAST)
+
+        with patch(PATCH_ENQUEUE) as mock_enqueue:
+            from backend.src.services.email_scheduler import _queue_emails
+            assert _queue_emails(MagicMock(), [email], iter([]), NOW) == 0
+
+        mock_enqueue.assert_not_called()
+        assert email.time_24h_before == PAST
+
 # ---------------------------------------------------------------------------
 # run_scheduled_emails
 # ---------------------------------------------------------------------------
@@ -155,69 +117,120 @@ class TestRunScheduledEmailsAsync:
 
     @pytest.mark.asyncio
     async def test_processes_multiple_emails(self):
-        emails = [_make_email(email_id=i, time_24h_before=PAST) for i in range(3)]
+        emails = [_make_email(email_id=i, to=f"user{i}@x.com", time_24h_before=PAST) for i in range(3)]
         mock_db = self._make_db(emails)
 
         with patch(PATCH_SESSION, return_value=mock_db), \
-             patch(PATCH_RESOLVE, return_value=["a"]), \
-             patch(PATCH_PROCESS) as mock_process:
+             patch(PATCH_QUEUE, return_value=1) as mock_queue, \
+             patch(PATCH_DRAIN) as mock_drain:
 
             from backend.src.services.email_scheduler import run_scheduled_emails
             await run_scheduled_emails()
 
-        assert mock_process.call_count == 3
+        assert [c.args[1] for c in mock_queue.call_args_list] == [[email] for email in emails]
         mock_db.commit.assert_called_once()
+        mock_drain.assert_awaited_once()
+        mock_db.close.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_concurrent_execution(self):
-        email1 = _make_email(email_id=1, time_24h_before=PAST)
-        email2 = _make_email(email_id=2, time_24h_before=PAST)
-
-        mock_db = self._make_db([email1, email2])
+    async def test_warns_when_no_recipients(self):
+        email = _make_email(time_24h_before=PAST)
+        mock_db = self._make_db([email])
 
         with patch(PATCH_SESSION, return_value=mock_db), \
-             patch(PATCH_RESOLVE, return_value=["a"]), \
-             patch(PATCH_SEND_REM, return_value=True):
+             patch(PATCH_RECIPIENTS, return_value=iter([])), \
+             patch(PATCH_ENQUEUE) as mock_enqueue, \
+             patch(PATCH_LOGGER) as mock_logger, \
+             patch(PATCH_DRAIN):
 
             from backend.src.services.email_scheduler import run_scheduled_emails
             await run_scheduled_emails()
 
-        mock_db.commit.assert_called_once()
+        mock_enqueue.assert_not_called()
+        mock_logger.warning.assert_called_once()
+        assert email.time_24h_before == PAST
 
     @pytest.mark.asyncio
-    async def test_skip_when_no_recipients(self):
+    async def test_queue_is_committed_before_draining(self):
         email = _make_email(time_24h_before=PAST)
         mock_db = self._make_db([email])
 
+        order = []
+
+        def mock_queue(*args, **kwargs):
+            order.append("queue")
+            return 1
+
+        async def mock_drain(*args, **kwargs):
+            order.append("drain")
+
+        mock_db.commit = lambda: order.append("commit")
+
         with patch(PATCH_SESSION, return_value=mock_db), \
-             patch(PATCH_RESOLVE, return_value=[]), \
-             patch(PATCH_PROCESS) as mock_process:
+             patch(PATCH_QUEUE, side_effect=mock_queue), \
+             patch(PATCH_DRAIN, side_effect=mock_drain):
 
             from backend.src.services.email_scheduler import run_scheduled_emails
             await run_scheduled_emails()
 
-        mock_process.assert_not_called()
+        assert order == ["queue", "commit", "drain"]
 
     @pytest.mark.asyncio
-    async def test_commit_after_processing(self):
-        email = _make_email(time_24h_before=PAST)
-        mock_db = self._make_db([email])
+    async def test_rolls_back_on_error(self):
+        mock_db = self._make_db([])
 
-        order = []
+        with patch(PATCH_SESSION, return_value=mock_db), \
+             patch(PATCH_DRAIN, side_effect=RuntimeError("db down")):
 
-        async def mock_process(*args, **kwargs):
-            order.append("process")
+            from backend.src.services.email_scheduler import run_scheduled_emails
+            await run_scheduled_emails()
 
-        def mock_commit():
-            order.append("commit")
+        mock_db.rollback.assert_called_once()
+        mock_db.close.assert_called_once()
 
-        mock_db.commit = mock_commit
+    @pytest.mark.asyncio
+    async def test_recipients_are_streamed_once_per_to_string_within_a_tick(self):
+        emails = [
+            _make_email(email_id=i, to=to, time_24h_before=PAST)
+            for i, to in enumerate(("all", "All Participants", "all users"))
+        ]
+        mock_db = self._make_db(emails)
 
         with patch(PATCH_SESSION, return_value=mock_db), \
-             patch(PATCH_RESOLVE, return_value=["a"]), \
-             patch(PATCH_PROCESS, side_effect=mock_process):
+             patch(PATCH_RECIPIENTS, return_value=iter(["a"])) as mock_recipients, \
+             patch(PATCH_QUEUE, return_value=1) as mock_queue, \
+             patch(PATCH_DRAIN):
 
             from backend.src.services.email_scheduler import run_scheduled_emails
             await run_scheduled_emails()
 
-        assert order == ["process", "commit"]
+        mock_recipients.assert_called_once_with(mock_db, "all")
+        mock_queue.assert_called_once()
+        assert mock_queue.call_args.args[1] == emails
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_only_skips_its_group(self):
+        from sqlalchemy.exc import OperationalError
+
+        failing = _make_email(email_id=1, to="all", time_24h_before=PAST)
+        listed = _make_email(email_id=2, to="b@x.com", time_24h_before=PAST)
+        mock_db = self._make_db([failing, listed])
+
+        def recipients(db, to):
+            if to == "all":
+                raise OperationalError("SELECT", {}, RuntimeError("db error"))
+            return iter([to])
+
+        with patch(PATCH_SESSION, return_value=mock_db), \
+             patch(PATCH_RECIPIENTS, side_effect=recipients), \
+             patch(PATCH_ENQUEUE) as mock_enqueue, \
+             patch(PATCH_DRAIN):
+
+            from backend.src.services.email_scheduler import run_scheduled_emails
+            await run_scheduled_emails()
+
+        assert [c.args[1] for c in mock_enqueue.call_args_list] == [2]
+        assert failing.time_24h_before == PAST
+        assert listed.time_24h_before is None
+        assert mock_db.begin_nested.call_count == 2
+        mock_db.commit.assert_called_once()
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+from datetime import datetime, timedelta, timezone
+import sys
+import os
+
+import pytest
+from apscheduler.events import (
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    JobExecutionEvent,
+    JobSubmissionEvent,
+)
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services import job_runner
+from services.job_runner import JOB_EXECUTOR, create_scheduler, job_metrics, schedule_job
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    job_runner._metrics.clear()
+    job_runner._running.clear()
+    yield
+    job_runner._metrics.clear()
+    job_runner._running.clear()
+    job_runner._leadership = None
+
+
+def sync_job():
+    pass
+
+
+async def async_job():
+    pass
+
+
+def test_sync_jobs_go_to_the_job_pool_and_coroutines_to_the_loop():
+    scheduler = create_scheduler()
+    schedule_job(scheduler, sync_job, "interval", id="sync", minutes=1)
+    schedule_job(scheduler, async_job, "interval", id="async", minutes=1)
+
+    sync, coroutine = scheduler.get_job("sync"), scheduler.get_job("async")
+    assert sync.executor == JOB_EXECUTOR
+    assert coroutine.executor == "default"
+    for job in (sync, coroutine):
+        assert job.max_instances == 1
+        assert job.coalesce is True
+    assert sync.name == "sync_job"
+
+
+async def test_jobs_run_off_the_loop_and_record_duration_and_lag():
+    ran = {}
+    done = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def db_job():
+        ran["sync_thread"] = threading.current_thread()
+        loop.call_soon_threadsafe(done.set)
+
+    async def loop_job():
+        ran["async_thread"] = threading.current_thread()
+
+    scheduler = create_scheduler()
+    now = datetime.now(timezone.utc)
+    schedule_job(scheduler, db_job, "interval", id="db_job", hours=1, next_run_time=now)
+    schedule_job(scheduler, loop_job, "interval", id="loop_job", hours=1, next_run_time=now)
+    scheduler.start()
+    try:
+        await asyncio.wait_for(done.wait(), timeout=5)
+        for _ in range(50):
+            if len(job_metrics()) == 2:
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        scheduler.shutdown(wait=True)
+
+    assert ran["sync_thread"] is not threading.main_thread()
+    assert ran["async_thread"] is threading.current_thread()
+    metrics = {m.job_id: m for m in job_metrics()}
+    assert metrics["db_job"].runs == 1
+    assert metrics["db_job"].failures == 0
+    assert metrics["db_job"].last_duration_seconds >= 0
+    assert metrics["db_job"].last_lag_seconds >= 0
+    assert metrics["loop_job"].runs == 1
+
+
+def test_failures_skips_and_misses_are_counted():
+    scheduled = datetime.now(timezone.utc) - timedelta(seconds=45)
+    job_runner._mark_started("cleanup")
+    job_runner._on_job_event(JobExecutionEvent(EVENT_JOB_EXECUTED, "cleanup", "default", scheduled,
+                                               exception=RuntimeError("boom")))
+    job_runner._on_job_event(JobSubmissionEvent(EVENT_JOB_MAX_INSTANCES, "cleanup", "default", [scheduled]))
+    job_runner._on_job_event(JobExecutionEvent(EVENT_JOB_MISSED, "cleanup", "default", scheduled))
+
+    [metrics] = job_metrics()
+    assert (metrics.runs, metrics.failures, metrics.skipped, metrics.missed) == (1, 1, 1, 1)
+    assert metrics.last_lag_seconds == pytest.approx(45, abs=5)
+    assert metrics.max_lag_seconds == metrics.last_lag_seconds
+
+
+class FollowerLeadership:
+    def __init__(self):
+        self.released = False
+
+    def is_leader(self):
+        return False
+
+    def release(self):
+        self.released = True
+
+
+def test_followers_skip_leader_only_jobs_and_count_them_as_standby():
+    calls = []
+    scheduler = create_scheduler(FollowerLeadership())
+    schedule_job(scheduler, lambda: calls.append("cleanup"), "interval", id="cleanup", minutes=1)
+    schedule_job(scheduler, lambda: calls.append("flush"), "interval", id="flush", leader_only=False, minutes=1)
+
+    scheduled = datetime.now(timezone.utc)
+    for job_id in ("cleanup", "flush"):
+        scheduler.get_job(job_id).func()
+        job_runner._on_job_event(JobExecutionEvent(EVENT_JOB_EXECUTED, job_id, "default", scheduled))
+
+    assert calls == ["flush"]
+    metrics = {m.job_id: m for m in job_metrics()}
+    assert (metrics["cleanup"].runs, metrics["cleanup"].standby) == (0, 1)
+    assert (metrics["flush"].runs, metrics["flush"].standby) == (1, 0)
+
+
+def test_failed_leadership_check_skips_the_run():
+    class BrokenLeadership(FollowerLeadership):
+        def is_leader(self):
+            raise ConnectionError("database unreachable")
+
+    calls = []
+    scheduler = create_scheduler(BrokenLeadership())
+    schedule_job(scheduler, lambda: calls.append(1), "interval", id="cleanup", minutes=1)
+
+    scheduler.get_job("cleanup").func()
+    assert calls == []
+
+
+def test_shutdown_releases_leadership():
+    leadership = FollowerLeadership()
+    create_scheduler(leadership)
+    scheduler = MagicMock()
+
+    job_runner.shutdown_scheduler(scheduler)
+
+    scheduler.shutdown.assert_called_once_with(wait=False)
+
+    assert leadership.released is True
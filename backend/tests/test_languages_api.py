@@ -12,10 +12,18 @@ sys.path.append(parent_dir)
 
 from database_operations.database import get_db
 from src.endpoints.languages_api import languages_router
+from services.response_cache import response_cache
 
 
 # --- FIXTURES ---
 
+@pytest.fixture(autouse=True)
+def empty_response_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
 @pytest.fixture
 def mock_db():
     """Creates a mock database session."""
@@ -1,82 +1,167 @@
-from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
-import pytest
+from datetime import datetime, timedelta, timezone
 import sys
 import os
 
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
-from src.services.long_term_statistics_upsert import (
+from services.long_term_statistics_upsert import (
     upsert_long_term_stats_for_event,
     upsert_long_term_stats_for_events,
+    upsert_long_term_stats_for_unpurged_events,
 )
+from models.schema import (
+    BaseEvent,
+    LongTermStatistics,
+    Question,
+    QuestionInstance,
+    UserQuestionInstance,
+)
+
+NOON = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(sqlite_session):
+    session = sqlite_session(BaseEvent, Question, QuestionInstance, UserQuestionInstance, LongTermStatistics)
+    session.add_all([
+        BaseEvent(event_id=event_id, event_name=f"Event {event_id}", event_start_date=NOON,
+                  event_end_date=NOON + timedelta(hours=2))
+        for event_id in (1, 2, 3)
+    ] + [
+        Question(question_id=1, question_name="Easy one", question_description="", difficulty="easy"),
+        Question(question_id=2, question_name="Hard one", question_description="", difficulty="hard"),
+        QuestionInstance(question_instance_id=1, question_id=1, event_id=1),
+        QuestionInstance(question_instance_id=2, question_id=2, event_id=1),
+        QuestionInstance(question_instance_id=3, question_id=1, event_id=2),
+    ])
+    session.commit()
+    return session
+
+
+def _attempt(session, question_instance_id, points, lapse_time):
+    session.add(UserQuestionInstance(user_id=1, question_instance_id=question_instance_id,
+                                     points=points, lapse_time=lapse_time))
+
+
+def _stored(db):
+    return {
+        (row.event_id, row.difficulty): (row.number_solves, row.average_question_solve_time)
+        for row in db.scalars(select(LongTermStatistics))
+    }
+
+
+def _count_statements(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def test_upsert_inserts_rows_for_every_event_in_one_statement(db):
+    _attempt(db, 1, 10, 30)
+    _attempt(db, 1, 5, 50)
+    _attempt(db, 2, 20, 100)
+    _attempt(db, 3, 10, 12)
+    db.flush()
+
+    statements = _count_statements(db)
+    upserted = upsert_long_term_stats_for_events(db, [1, 2, 3])
+
+    assert upserted == 3
+    assert len(statements) == 1
+    assert _stored(db) == {
+        (1, "easy"): (2, pytest.approx(40.0)),
+        (1, "hard"): (1, pytest.approx(100.0)),
+        (2, "easy"): (1, pytest.approx(12.0)),
+    }
+
+
+def test_upsert_updates_existing_rows_in_place(db):
+    db.add(LongTermStatistics(event_id=1, difficulty="easy", average_question_solve_time=0.0, number_solves=0))
+    _attempt(db, 1, 10, 20)
+    db.flush()
+    stats_id = db.scalar(select(LongTermStatistics.stats_id))
+
+    assert upsert_long_term_stats_for_event(db, 1) == 1
+
+    db.expire_all()
+    row = db.scalar(select(LongTermStatistics))
+    assert row.stats_id == stats_id
+    assert (row.number_solves, row.average_question_solve_time) == (1, pytest.approx(20.0))
 
 
-def test_upsert_long_term_stats_for_event_inserts_new_rows():
-    db = MagicMock()
-    stats_query = MagicMock()
-    existing_query = MagicMock()
-    db.query.side_effect = [stats_query, existing_query]
+def test_upsert_ignores_unsolved_and_untimed_attempts(db):
+    _attempt(db, 1, None, 30)
+    _attempt(db, 1, 0, 30)
+    _attempt(db, 1, 10, None)
+    db.flush()
 
-    stats_query.join.return_value.join.return_value.filter.return_value.group_by.return_value.all.return_value = [
-        SimpleNamespace(difficulty="easy", num_solves=3, avg_solve_time=42.5)
-    ]
-    existing_query.filter.return_value.one_or_none.return_value = None
+    assert upsert_long_term_stats_for_events(db, [1]) == 0
+    assert _stored(db) == {}
 
-    upserted = upsert_long_term_stats_for_event(db, 10)
 
-    assert upserted == 1
-    assert db.add.call_count == 1
+def test_upsert_keeps_rows_of_events_already_cleaned_up(db):
+    db.add(LongTermStatistics(event_id=3, difficulty="hard", average_question_solve_time=8.0, number_solves=4))
+    db.flush()
 
+    assert upsert_long_term_stats_for_events(db, [3]) == 0
+    assert _stored(db) == {(3, "hard"): (4, pytest.approx(8.0))}
 
 
-def test_upsert_long_term_stats_for_event_updates_existing_rows():
-    db = MagicMock()
-    stats_query = MagicMock()
-    existing_query = MagicMock()
-    existing_row = SimpleNamespace(average_question_solve_time=0.0, number_solves=0)
-    db.query.side_effect = [stats_query, existing_query]
+def test_unpurged_upsert_skips_events_with_stored_rows(db):
+    db.add(LongTermStatistics(event_id=1, difficulty="easy", average_question_solve_time=20.0, number_solves=3))
+    _attempt(db, 1, 10, 50)
+    _attempt(db, 3, 10, 12)
+    db.flush()
 
-    stats_query.join.return_value.join.return_value.filter.return_value.group_by.return_value.all.return_value = [
-        SimpleNamespace(difficulty="hard", num_solves=7, avg_solve_time=15.25)
-    ]
-    existing_query.filter.return_value.one_or_none.return_value = existing_row
+    assert upsert_long_term_stats_for_unpurged_events(db, [1, 2]) == 1
+    assert _stored(db) == {
+        (1, "easy"): (3, pytest.approx(20.0)),
+        (2, "easy"): (1, pytest.approx(12.0)),
+    }
 
-    upserted = upsert_long_term_stats_for_event(db, 11)
 
-    assert upserted == 1
-    db.add.assert_not_called()
-    assert existing_row.average_question_solve_time == pytest.approx(15.25)
-    assert existing_row.number_solves == 7
+def test_upsert_with_no_events_issues_no_statement(db):
+    statements = _count_statements(db)
 
+    assert upsert_long_term_stats_for_events(db, []) == 0
+    assert statements == []
 
 
-def test_upsert_long_term_stats_for_event_skips_incomplete_rows():
-    db = MagicMock()
-    stats_query = MagicMock()
-    db.query.return_value = stats_query
+def test_upsert_compiles_to_on_conflict_on_postgres():
+    from services import long_term_statistics_upsert
 
-    stats_query.join.return_value.join.return_value.filter.return_value.group_by.return_value.all.return_value = [
-        SimpleNamespace(difficulty=None, num_solves=1, avg_solve_time=2.0),
-        SimpleNamespace(difficulty="medium", num_solves=None, avg_solve_time=2.0),
-        SimpleNamespace(difficulty="easy", num_solves=3, avg_solve_time=None),
-    ]
+    class PostgresSession:
+        def __init__(self):
+            self.statement = None
 
-    upserted = upsert_long_term_stats_for_event(db, 12)
+        def get_bind(self):
+            return type("Bind", (), {"dialect": postgresql.dialect()})()
 
-    assert upserted == 0
-    db.add.assert_not_called()
+        def execute(self, statement):
+            self.statement = statement
+            return type("Result", (), {"rowcount": 2})()
 
+    session = PostgresSession()
+    assert long_term_statistics_upsert.upsert_long_term_stats_for_events(session, [1, 2]) == 2
 
+    sql = str(session.statement.compile(dialect=postgresql.dialect()))
+    assert "INSERT INTO long_term_statistics" in sql
+    assert "GROUP BY question_instance.event_id, question.difficulty" in sql
+    assert "ON CONFLICT (event_id, difficulty) DO UPDATE SET" in sql
 
-def test_upsert_long_term_stats_for_events_sums_per_event_upserts():
-    db = MagicMock()
 
-    with patch("src.services.long_term_statistics_upsert.upsert_long_term_stats_for_event") as mock_upsert:
-        mock_upsert.side_effect = [1, 0, 3]
-        total = upsert_long_term_stats_for_events(db, [1, 2, 3])
+def test_upsert_does_not_shrink_stats_of_partially_purged_events(db):
+    db.add(LongTermStatistics(event_id=1, difficulty="easy", average_question_solve_time=40.0, number_solves=2))
+    _attempt(db, 1, 10, 30)
+    db.flush()
 
-    assert total == 4
-    assert mock_upsert.call_count == 3
+    assert upsert_long_term_stats_for_events(db, [1]) == 0
+    db.expire_all()
+    assert _stored(db) == {(1, "easy"): (2, pytest.approx(40.0))}
@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+import sys
+import os
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import sqlite
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from src.endpoints.pagination_utils import (
+    SortKey,
+    build_keyset_predicate,
+    decode_cursor,
+    encode_cursor,
+    estimate_total,
+    keyset_paginate,
+)
+from models.schema import BaseEvent, Question, UserAccount
+
+
+def _sql(clause):
+    return str(clause.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def _query_mock(rows):
+    query = MagicMock()
+    query.filter.return_value = query
+    query.order_by.return_value = query
+    query.limit.return_value = query
+    query.all.return_value = rows
+    return query
+
+
+def test_cursor_round_trip_preserves_datetimes():
+    start = datetime(2025, 12, 1, 10, 0, tzinfo=timezone.utc)
+    token = encode_cursor("competitions:desc", [1, start, 42])
+
+    assert decode_cursor(token, "competitions:desc", 3) == [1, start, 42]
+
+
+def test_empty_cursor_means_first_page():
+    assert decode_cursor("", "questions:asc", 1) is None
+
+
+@pytest.mark.parametrize("token", ["garbage!", encode_cursor("questions:desc", [5])])
+def test_decode_cursor_rejects_malformed_or_foreign_cursor(token):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(token, "questions:asc", 1)
+    assert exc.value.status_code == 400
+
+
+def test_single_key_predicate_is_plain_comparison():
+    keys = [SortKey(Question.question_id, True, lambda q: q.question_id)]
+    assert _sql(build_keyset_predicate(keys, [10])) == "question.question_id < 10"
+
+
+def test_uniform_direction_uses_row_value_comparison():
+    keys = [
+        SortKey(UserAccount.email, False, lambda a: a.email),
+        SortKey(UserAccount.user_id, False, lambda a: a.user_id),
+    ]
+    sql = _sql(build_keyset_predicate(keys, ["a@x.io", 7]))
+    assert sql == "(user_account.email, user_account.user_id) > ('a@x.io', 7)"
+
+
+def test_mixed_direction_expands_to_or_of_ands():
+    keys = [
+        SortKey(BaseEvent.event_end_date, False, None),
+        SortKey(BaseEvent.event_id, True, None),
+    ]
+    sql = _sql(build_keyset_predicate(keys, [datetime(2025, 1, 1), 3]))
+    assert "base_event.event_end_date >" in sql
+    assert "base_event.event_end_date = " in sql
+    assert "base_event.event_id < 3" in sql
+    assert " OR " in sql
+
+
+def test_keyset_paginate_fetches_one_extra_row_for_next_cursor():
+    rows = [MagicMock(question_id=i) for i in (1, 2, 3)]
+    query = _query_mock(rows)
+    keys = [SortKey(Question.question_id, False, lambda q: q.question_id)]
+
+    items, next_cursor = keyset_paginate(query, keys, "", 2, "questions:asc")
+
+    assert items == rows[:2]
+    assert decode_cursor(next_cursor, "questions:asc", 1) == [2]
+    query.limit.assert_called_once_with(3)
+    query.filter.assert_not_called()
+
+
+def test_keyset_paginate_last_page_has_no_cursor():
+    query = _query_mock([MagicMock(question_id=3)])
+    keys = [SortKey(Question.question_id, False, lambda q: q.question_id)]
+
+    items, next_cursor = keyset_paginate(query, keys, encode_cursor("questions:asc", [2]), 2, "questions:asc")
+
+    assert len(items) == 1
+    assert next_cursor is None
+    query.filter.assert_called_once()
+
+
+def test_estimate_total_counts_exactly_outside_postgres():
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = "sqlite"
+    query = MagicMock()
+    query.count.return_value = 12
+
+    assert estimate_total(db, query) == 12
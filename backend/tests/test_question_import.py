@@ -0,0 +1,117 @@
+import sys
+import os
+
+import pytest
+from sqlalchemy import select
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services import question_import
+from services.question_import import bulk_import_questions
+from src.endpoints.questions_api import CreateQuestionRequest
+from models.schema import (
+    Language, Question, QuestionLanguageSpecificProperties, Tag, TestCase, TestCasePayload, question_tag,
+)
+
+
+@pytest.fixture
+def db(sqlite_session):
+    session = sqlite_session(Question, Tag, question_tag, Language, QuestionLanguageSpecificProperties,
+                             TestCasePayload, TestCase, savepoints=True)
+    session.add(Language(lang_judge_id=71, monaco_id="python", display_name="Python", active=True))
+    session.add(Tag(tag_name="arrays"))
+    session.commit()
+    return session
+
+
+def _request(name, tags=(), languages=("Python",), difficulty="easy", testcases=((1, 2),)):
+    return CreateQuestionRequest(
+        question_name=name,
+        question_description=f"{name} description",
+        difficulty=difficulty,
+        tags=list(tags),
+        language_specific_properties=[{"language_name": lang, "template_code": "pass"} for lang in languages],
+        testcases=list(testcases),
+    )
+
+
+def test_imports_questions_with_tags_languages_and_test_cases(db):
+    result = bulk_import_questions(db, [
+        _request("Two Sum", tags=["arrays", "hashing"]),
+        _request("Reverse", tags=["arrays"], testcases=[([1, 2], [2, 1]), ([], [])]),
+    ])
+    db.commit()
+
+    assert result.created == 2
+    assert result.errors == []
+    assert db.scalars(select(Tag.tag_name).order_by(Tag.tag_name)).all() == ["arrays", "hashing"]
+    assert len(db.execute(select(question_tag)).all()) == 3
+    assert db.scalar(select(QuestionLanguageSpecificProperties.language_id)) == 71
+    reverse = db.scalar(select(Question).where(Question.question_name == "Reverse"))
+    assert reverse.question_id in result.question_ids
+    assert [tc.expected_output for tc in reverse.test_cases] == [[2, 1], []]
+
+
+def test_reports_invalid_rows_and_keeps_the_rest(db):
+    db.add(Question(question_name="Existing", question_description="d", difficulty="easy"))
+    db.commit()
+
+    result = bulk_import_questions(db, [
+        _request("Existing"),
+        _request("Fresh"),
+        _request("Fresh"),
+        _request("Unknown Lang", languages=["Cobol"]),
+        _request("Bad Difficulty", difficulty="brutal"),
+    ], start_index=10)
+    db.commit()
+
+    assert result.created == 1
+    assert [(error.index, error.question_name) for error in result.errors] == [
+        (10, "Existing"), (12, "Fresh"), (13, "Unknown Lang"), (14, "Bad Difficulty"),
+    ]
+    assert "Cobol" in result.errors[2].detail
+    assert db.scalars(select(Question.question_name).order_by(Question.question_name)).all() == [
+        "Existing", "Fresh",
+    ]
+
+
+def test_failing_chunk_is_retried_row_by_row(db, monkeypatch):
+    # Simulate a concurrent insert: the name exists but the pre-check missed it.
+    db.add(Question(question_name="Racy", question_description="d", difficulty="easy"))
+    db.commit()
+    monkeypatch.setattr(question_import, "_existing_question_names", lambda db, names: set())
+
+    result = bulk_import_questions(db, [_request("Calm"), _request("Racy"), _request("Quiet")], chunk_size=3)
+    db.commit()
+
+    assert result.created == 2
+    assert [(error.index, error.question_name) for error in result.errors] == [(1, "Racy")]
+    assert db.scalar(select(Question).where(Question.question_name == "Quiet")).test_cases
+
+
+def test_tag_created_by_a_concurrent_import_is_reused(db, monkeypatch):
+    # Simulate a concurrent import: "graphs" exists but the tag lookup missed it.
+    db.add(Tag(tag_name="graphs"))
+    db.commit()
+    graphs_id = db.scalar(select(Tag.tag_id).where(Tag.tag_name == "graphs"))
+    execute, lookups = db.execute, []
+
+    def stale_first_lookup(statement, *args, **kwargs):
+        result = execute(statement, *args, **kwargs)
+        if not lookups and "tag.tag_name" in str(statement):
+            lookups.append(statement)
+            return type("Result", (), {"all": lambda self: [row for row in result.all() if row[0] != "graphs"]})()
+        return result
+
+    monkeypatch.setattr(db, "execute", stale_first_lookup)
+    result = bulk_import_questions(db, [_request("Paths", tags=["graphs", "arrays"])])
+    monkeypatch.undo()
+    db.commit()
+
+    assert len(lookups) == 1
+    assert result.errors == []
+    assert result.created == 1
+    assert db.scalars(select(Tag.tag_name).order_by(Tag.tag_name)).all() == ["arrays", "graphs"]
+    assert graphs_id in db.execute(select(question_tag.c.tag_id)).scalars().all()
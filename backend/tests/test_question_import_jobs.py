@@ -0,0 +1,128 @@
+import io
+import json
+import sys
+import os
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services import question_import_jobs
+from services.question_import_jobs import InvalidImportFile, create_import_job, get_import_job, iter_json_records
+from models.schema import (
+    Language, Question, QuestionLanguageSpecificProperties, Tag, TestCase, TestCasePayload, question_tag,
+)
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://")
+
+    # pysqlite needs explicit BEGIN for SAVEPOINT support.
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, _):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    for table in (Question.__table__, Tag.__table__, question_tag, Language.__table__,
+                  QuestionLanguageSpecificProperties.__table__, TestCasePayload.__table__, TestCase.__table__):
+        table.create(engine)
+
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(question_import_jobs, "SessionLocal", factory)
+    monkeypatch.setattr(question_import_jobs, "bump_catalogue_version", lambda db, name: None)
+    yield factory
+    engine.dispose()
+
+
+def _question(name, **extra):
+    return {"question_name": name, "question_description": "d", "testcases": [[1, 1]], **extra}
+
+
+def _write(tmp_path, content):
+    path = tmp_path / "import.json"
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 65536])
+def test_iter_json_records_reads_array_incrementally(read_size):
+    payload = json.dumps([_question("A"), _question("B ]\\"), _question("C")], indent=2).encode()
+
+    records = list(iter_json_records(io.BytesIO(payload), read_size=read_size))
+
+    assert [r["question_name"] for r in records] == ["A", "B ]\\", "C"]
+
+
+def test_iter_json_records_reads_ndjson_and_skips_blank_lines():
+    payload = b'{"n": 1}\n\n{"n": 2}\r\n{"n": 3}'
+
+    assert list(iter_json_records(io.BytesIO(payload), read_size=4)) == [{"n": 1}, {"n": 2}, {"n": 3}]
+
+
+@pytest.mark.parametrize("payload, index", [
+    (b'[{"n": 1} {"n": 2}]', 1),
+    (b'[{"n": 1},', 1),
+    (b'[{"n": 1}] trailing', 1),
+    (b'{"n": 1}\n{oops}\n', 1),
+])
+def test_iter_json_records_rejects_malformed_files(payload, index):
+    with pytest.raises(InvalidImportFile) as exc:
+        list(iter_json_records(io.BytesIO(payload), read_size=3))
+    assert exc.value.index == index
+
+
+def test_import_job_commits_chunks_and_reports_row_errors(session_factory, tmp_path):
+    lines = [
+        _question("One"),
+        {"question_description": "missing name"},
+        _question("Two"),
+        _question("One"),
+        _question("Three", difficulty="impossible"),
+    ]
+    path = _write(tmp_path, "\n".join(json.dumps(line) for line in lines))
+    job = create_import_job(chunk_size=2)
+
+    question_import_jobs.run_question_import_job(job.job_id, path)
+
+    finished = get_import_job(job.job_id)
+    assert finished.status == "completed"
+    assert finished.processed == 5
+    assert finished.created == 2
+    assert [(e.index, e.question_name) for e in finished.errors] == [(1, None), (3, "One"), (4, "Three")]
+    assert "question_name" in finished.errors[0].detail
+    assert not os.path.exists(path)
+    with session_factory() as db:
+        assert db.scalars(select(Question.question_name).order_by(Question.question_name)).all() == ["One", "Two"]
+
+
+def test_import_job_keeps_committed_chunks_when_file_is_truncated(session_factory, tmp_path):
+    path = _write(tmp_path, '[{"question_name": "A", "question_description": "d"}, {"question_name": "B"')
+    job = create_import_job(chunk_size=1)
+
+    question_import_jobs.run_question_import_job(job.job_id, path)
+
+    finished = get_import_job(job.job_id)
+    assert finished.status == "failed"
+    assert "Record 1" in finished.detail
+    assert finished.created == 1
+    assert finished.finished_at is not None
+
+
+def test_finished_jobs_are_pruned(monkeypatch):
+    monkeypatch.setattr(question_import_jobs, "_jobs", {})
+    monkeypatch.setattr(question_import_jobs, "MAX_RETAINED_JOBS", 2)
+    first = create_import_job()
+    question_import_jobs._jobs[first.job_id].finished_at = first.created_at
+    create_import_job()
+    create_import_job()
+
+    assert get_import_job(first.job_id) is None
+    assert len(question_import_jobs._jobs) == 2
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+import sys
+import os
+
+import pytest
+from sqlalchemy import event, func, select
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services.question_instance_purge import purge_event_question_instances
+from models.schema import (
+    BaseEvent,
+    MostRecentSubmission,
+    QuestionInstance,
+    Submission,
+    UserQuestionInstance,
+)
+
+NOON = datetime(2026, 3, 2, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(sqlite_session):
+    session = sqlite_session(BaseEvent, QuestionInstance, UserQuestionInstance, Submission, MostRecentSubmission)
+    session.add_all([
+        BaseEvent(event_id=event_id, event_name=f"Event {event_id}", event_start_date=NOON,
+                  event_end_date=NOON + timedelta(hours=2))
+        for event_id in (1, 2)
+    ])
+    uqi_id = 0
+    for event_id in (1, 2):
+        for offset in range(2):
+            question_instance_id = event_id * 10 + offset
+            session.add(QuestionInstance(question_instance_id=question_instance_id, question_id=offset + 1,
+                                         event_id=event_id))
+            for user_id in range(3):
+                uqi_id += 1
+                session.add(UserQuestionInstance(user_question_instance_id=uqi_id, user_id=user_id,
+                                                 question_instance_id=question_instance_id))
+                session.add(MostRecentSubmission(user_question_instance_id=uqi_id, code="x", lang_judge_id=71))
+                session.add_all([
+                    Submission(user_question_instance_id=uqi_id, submitted_on=NOON, status="Accepted",
+                               lang_judge_id=71)
+                    for _ in range(2)
+                ])
+    session.commit()
+    return session
+
+
+def _counts(db, event_id):
+    instances = select(QuestionInstance.question_instance_id).where(QuestionInstance.event_id == event_id)
+    uqis = select(UserQuestionInstance.user_question_instance_id).where(
+        UserQuestionInstance.question_instance_id.in_(instances)
+    )
+    return (
+        db.scalar(select(func.count()).where(Submission.user_question_instance_id.in_(uqis))),
+        db.scalar(select(func.count()).where(MostRecentSubmission.user_question_instance_id.in_(uqis))),
+        db.scalar(select(func.count()).select_from(UserQuestionInstance).where(
+            UserQuestionInstance.question_instance_id.in_(instances))),
+        db.scalar(select(func.count()).select_from(QuestionInstance).where(QuestionInstance.event_id == event_id)),
+    )
+
+
+def test_purge_deletes_leaf_first_in_committed_batches(db):
+    deletes, commits, pauses = [], [], []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statement.startswith("DELETE") and deletes.append(
+                     statement.split()[2]))
+    event.listen(db, "after_commit", lambda session: commits.append(1))
+
+    result = purge_event_question_instances(db, [1], batch_size=4, sleep=pauses.append, pause_seconds=0.01)
+
+    assert result.complete
+    assert result.deleted == {
+        "submission": 12, "most_recent_submission": 6, "user_question_instance": 6, "question_instance": 2,
+    }
+    assert deletes == ["submission"] * 3 + ["most_recent_submission"] * 2 + ["user_question_instance"] * 2 \
+        + ["question_instance"]
+    assert len(commits) == len(deletes)
+    # Only full batches are followed by a pause (the next one may have more rows).
+    assert pauses == [0.01] * 5
+    assert _counts(db, 1) == (0, 0, 0, 0)
+    assert _counts(db, 2) == (12, 6, 6, 2)
+
+
+def test_purge_stops_at_max_run_time_and_resumes(db):
+    ticks = iter(range(100))
+    result = purge_event_question_instances(
+        db, [1, 2], batch_size=5, max_run_seconds=3, sleep=lambda _: None, clock=lambda: next(ticks),
+    )
+
+    assert not result.complete
+    assert result.deleted == {"submission": 10}
+    assert _counts(db, 1)[1:] == (6, 6, 2)
+
+    result = purge_event_question_instances(db, [1, 2], batch_size=5, sleep=lambda _: None)
+
+    assert result.complete
+    assert result.deleted["submission"] == 14
+    assert result.question_instances_deleted == 4
+    assert _counts(db, 1) == _counts(db, 2) == (0, 0, 0, 0)
+
+
+def test_purge_with_no_events_does_nothing(db):
+    assert purge_event_question_instances(db, []).deleted == {}
@@ -0,0 +1,153 @@
+import sys
+import os
+
+import pytest
+from sqlalchemy import event, select
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services.question_update import apply_question_update, hash_test_case
+from src.endpoints.questions_api import CreateQuestionRequest
+from models.schema import (
+    Language, Question, QuestionLanguageSpecificProperties, Tag, TestCase, TestCasePayload, question_tag,
+)
+
+
+@pytest.fixture
+def db(sqlite_session):
+    session = sqlite_session(Question, Tag, question_tag, Language, QuestionLanguageSpecificProperties,
+                             TestCasePayload, TestCase)
+    session.add_all([
+        Language(lang_judge_id=71, monaco_id="python", display_name="Python", active=True),
+        Language(lang_judge_id=62, monaco_id="java", display_name="Java", active=True),
+    ])
+    question = Question(
+        question_id=1, question_name="Sum", question_description="Add", difficulty="easy",
+        tags=[Tag(tag_name="math")],
+    )
+    question.language_specific_properties = [
+        QuestionLanguageSpecificProperties(language_id=71, template_code="def f(): pass"),
+        QuestionLanguageSpecificProperties(language_id=62, template_code="class F {}"),
+    ]
+    question.test_cases = [
+        TestCase(test_case_id=10, input_data=[1, 2], expected_output=3),
+        TestCase(test_case_id=11, input_data={"a": 1, "b": 2}, expected_output=3),
+        TestCase(test_case_id=12, input_data=[5, 5], expected_output=10),
+    ]
+    session.add(question)
+    session.commit()
+    return session
+
+
+def _request(**overrides):
+    payload = {
+        "question_name": "Sum",
+        "question_description": "Add",
+        "difficulty": "easy",
+        "tags": ["math"],
+        "language_specific_properties": [
+            {"language_name": "Python", "template_code": "def f(): pass"},
+            {"language_name": "Java", "template_code": "class F {}"},
+        ],
+        "testcases": [[[1, 2], 3], [{"b": 2, "a": 1}, 3], [[5, 5], 10]],
+    }
+    payload.update(overrides)
+    return CreateQuestionRequest.model_validate(payload)
+
+
+def _question(db):
+    return db.get(Question, 1)
+
+
+def test_identical_request_writes_nothing(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    summary = apply_question_update(db, _question(db), _request())
+
+    assert not summary.changed
+    assert summary.test_cases_unchanged == 3
+    assert all(statement.lstrip().upper().startswith("SELECT") for statement in statements)
+
+
+def test_typo_fix_only_touches_question_row(db):
+    summary = apply_question_update(db, _question(db), _request(question_description="Add two numbers"))
+    db.commit()
+
+    assert summary.fields_changed == ["question_description"]
+    assert summary.test_cases_inserted == summary.test_cases_deleted == summary.test_cases_updated == 0
+    assert db.scalars(select(TestCase.test_case_id).order_by(TestCase.test_case_id)).all() == [10, 11, 12]
+
+
+def test_test_cases_are_matched_by_id_then_content(db):
+    summary = apply_question_update(db, _question(db), _request(testcases=[
+        {"test_case_id": 10, "input_data": [1, 2], "expected_output": 4},
+        [[5, 5], 10],
+        [[7, 7], 14],
+    ]))
+    db.commit()
+
+    assert (summary.test_cases_updated, summary.test_cases_inserted, summary.test_cases_deleted) == (1, 1, 1)
+    rows = db.execute(select(TestCase.test_case_id, TestCase.expected_output).order_by(TestCase.test_case_id)).all()
+    assert rows[:2] == [(10, 4), (12, 10)]
+    assert rows[2][1] == 14
+
+
+def test_language_properties_are_diffed_by_language(db):
+    summary = apply_question_update(db, _question(db), _request(language_specific_properties=[
+        {"language_name": "Python", "template_code": "def g(): pass"},
+        {"language_name": "Cobol", "template_code": "IDENTIFICATION DIVISION."},
+    ]))
+    db.commit()
+
+    assert (summary.properties_updated, summary.properties_deleted, summary.properties_inserted) == (1, 1, 0)
+    rows = db.execute(select(
+        QuestionLanguageSpecificProperties.language_id, QuestionLanguageSpecificProperties.template_code,
+    )).all()
+    assert rows == [(71, "def g(): pass")]
+
+
+def test_tags_are_replaced_only_when_they_differ(db):
+    summary = apply_question_update(db, _question(db), _request(tags=["math", "easy-win"]))
+    db.commit()
+
+    assert summary.tags_changed
+    assert sorted(tag.tag_name for tag in _question(db).tags) == ["easy-win", "math"]
+
+
+def test_hash_ignores_key_order():
+    assert hash_test_case({"a": 1, "b": 2}, 3) == hash_test_case({"b": 2, "a": 1}, 3)
+    assert hash_test_case([1, 2], 3) != hash_test_case([2, 1], 3)
+
+
+def test_large_payload_edits_move_between_side_table_and_inline(db, monkeypatch):
+    monkeypatch.setattr("services.test_case_storage.INLINE_PAYLOAD_MAX_BYTES", 16)
+    big = list(range(20))
+
+    apply_question_update(db, _question(db), _request(testcases=[
+        {"test_case_id": 10, "input_data": big, "expected_output": 3},
+        [{"b": 2, "a": 1}, 3],
+        [[5, 5], 10],
+    ]))
+    db.commit()
+    row = db.get(TestCase, 10)
+    assert row.input_ref is not None
+    assert db.scalar(select(TestCasePayload.size_bytes)) > 16
+
+    # Unchanged content is recognised through the stored hash.
+    summary = apply_question_update(db, _question(db), _request(testcases=[
+        [big, 3], [{"b": 2, "a": 1}, 3], [[5, 5], 10],
+    ]))
+    assert not summary.changed
+
+    # Shrinking it back inline drops the now unreferenced payload.
+    apply_question_update(db, _question(db), _request(testcases=[
+        {"test_case_id": 10, "input_data": [1, 2], "expected_output": 3},
+        [{"b": 2, "a": 1}, 3],
+        [[5, 5], 10],
+    ]))
+    db.commit()
+    assert db.get(TestCase, 10).input_ref is None
+    assert db.scalar(select(TestCasePayload.payload_hash)) is None
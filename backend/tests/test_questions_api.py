@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from datetime import datetime, timezone, timedelta
@@ -32,9 +32,47 @@ from src.endpoints.questions_api import (
     extract_question_id_from_row,
     populate_frontpage_flags,
 )
+from services.response_cache import response_cache
+from services.question_import import QuestionImportResult, QuestionImportRowError
+from services.question_update import QuestionUpdateSummary
 
 # --- FIXTURES ---
 
+CATALOGUE_UPDATED_AT = datetime(2025, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def empty_response_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def catalogue_version():
+    """Stub the cached catalogue version used for ETag / Last-Modified."""
+    with patch(
+        "src.endpoints.questions_api.get_catalogue_version",
+        return_value=(3, CATALOGUE_UPDATED_AT),
+    ) as mock_get_version:
+        yield mock_get_version
+
+
+@pytest.fixture(autouse=True)
+def catalogue_bump():
+    with patch("src.endpoints.questions_api.bump_catalogue_version") as mock_bump:
+        yield mock_bump
+
+
+@pytest.fixture
+def bulk_import():
+    with patch(
+        "src.endpoints.questions_api.bulk_import_questions",
+        return_value=QuestionImportResult(created=1, question_ids=[1]),
+    ) as mock_import:
+        yield mock_import
+
+
 @pytest.fixture
 def mock_db():
     """Creates a mock database session."""
@@ -69,6 +107,7 @@ def build_query_mock(mock_db):
     query.filter_by.return_value = query
     query.with_entities.return_value = query
     query.order_by.return_value = query
+    query.options.return_value = query
     query.offset.return_value = query
     query.limit.return_value = query
     query.first.return_value = (0, datetime(2025, 1, 1, 0, 0, 0), 0, 0)
@@ -147,10 +186,10 @@ def test_get_all_questions_success(client, mock_db):
     assert "etag" in response.headers
 
 
-def test_get_all_questions_returns_304_when_unmodified(client, mock_db):
-    query = build_query_mock(mock_db)
+def test_get_all_questions_returns_304_when_unmodified(client, mock_db, catalogue_version):
+    build_query_mock(mock_db)
     latest = datetime(2025, 2, 1, 10, 0, 0, tzinfo=timezone.utc)
-    query.first.return_value = (0, latest, 0, 0)
+    catalogue_version.return_value = (5, latest)
 
     response = client.get(
         "/get-all-questions",
@@ -160,12 +199,14 @@ def test_get_all_questions_returns_304_when_unmodified(client, mock_db):
     assert response.status_code == 304
     assert response.headers["cache-control"] == "no-cache, must-revalidate"
     assert response.headers["last-modified"] == format_datetime(latest, usegmt=True)
+    # Validation is answered from the catalogue version alone.
+    mock_db.query.assert_not_called()
 
 
-def test_get_all_questions_returns_304_when_etag_matches(client, mock_db):
+def test_get_all_questions_returns_304_when_etag_matches(client, mock_db, catalogue_version):
     query = build_query_mock(mock_db)
     latest = datetime(2025, 2, 1, 10, 0, 0, tzinfo=timezone.utc)
-    query.first.return_value = (2, latest, 7, 10)
+    catalogue_version.return_value = (2, latest)
     query.count.return_value = 2
     query.all.return_value = []
 
@@ -181,43 +222,12 @@ def test_get_all_questions_returns_304_when_etag_matches(client, mock_db):
     assert response.headers["etag"] == etag
 
 
-def test_get_all_questions_etag_changes_when_frontpage_state_changes(client, mock_db):
+def test_get_all_questions_etag_changes_when_catalogue_version_changes(client, mock_db, catalogue_version):
     latest = datetime(2025, 2, 1, 10, 0, 0, tzinfo=timezone.utc)
-
-    main_query_1 = MagicMock()
-    main_query_1.filter.return_value = main_query_1
-    main_query_1.with_entities.return_value = main_query_1
-    main_query_1.order_by.return_value = main_query_1
-    main_query_1.offset.return_value = main_query_1
-    main_query_1.limit.return_value = main_query_1
-    main_query_1.first.return_value = (2, latest, 74, 147)
-    main_query_1.count.return_value = 0
-    main_query_1.all.return_value = []
-
-    frontpage_query_1 = MagicMock()
-    frontpage_query_1.filter.return_value = frontpage_query_1
-    frontpage_query_1.first.return_value = (0, 0, 0)
-
-    main_query_2 = MagicMock()
-    main_query_2.filter.return_value = main_query_2
-    main_query_2.with_entities.return_value = main_query_2
-    main_query_2.order_by.return_value = main_query_2
-    main_query_2.offset.return_value = main_query_2
-    main_query_2.limit.return_value = main_query_2
-    main_query_2.first.return_value = (2, latest, 74, 147)
-    main_query_2.count.return_value = 0
-    main_query_2.all.return_value = []
-
-    frontpage_query_2 = MagicMock()
-    frontpage_query_2.filter.return_value = frontpage_query_2
-    frontpage_query_2.first.return_value = (1, 99, 74)
-
-    mock_db.query.side_effect = [
-        main_query_1,
-        frontpage_query_1,
-        main_query_2,
-        frontpage_query_2,
-    ]
+    query = build_query_mock(mock_db)
+    query.count.return_value = 0
+    query.all.return_value = []
+    catalogue_version.side_effect = [(7, latest), (8, latest)]
 
     first_response = client.get("/get-all-questions")
     second_response = client.get("/get-all-questions")
@@ -227,10 +237,10 @@ def test_get_all_questions_etag_changes_when_frontpage_state_changes(client, moc
     assert first_response.headers["etag"] != second_response.headers["etag"]
 
 
-def test_get_all_questions_returns_200_when_one_validator_is_stale(client, mock_db):
+def test_get_all_questions_returns_200_when_one_validator_is_stale(client, mock_db, catalogue_version):
     query = build_query_mock(mock_db)
     latest = datetime(2025, 2, 1, 10, 0, 0, tzinfo=timezone.utc)
-    query.first.return_value = (1, latest, 1, 1)
+    catalogue_version.return_value = (1, latest)
     query.count.return_value = 1
     query.all.return_value = [
         SimpleNamespace(
@@ -273,7 +283,7 @@ def test_get_all_questions_empty(client, mock_db):
 
     # Assert
     assert response.status_code == 200
-    assert response.json() == {"total": 0, "page": 1, "page_size": 25, "items": []}
+    assert response.json() == {"total": 0, "page": 1, "page_size": 25, "items": [], "next_cursor": None}
 
 
 def test_get_all_questions_applies_filters_and_pagination(client, mock_db):
@@ -303,11 +313,88 @@ def test_get_all_questions_accepts_sort_param(client, mock_db):
     query.order_by.assert_called_once()
 
 
+def test_get_all_questions_sorts_by_relevance_when_searching(client, mock_db):
+    query = build_query_mock(mock_db)
+    query.count.return_value = 0
+    query.all.return_value = []
+
+    response = client.get("/get-all-questions", params={"sort": "relevance", "search": "two sum"})
+
+    assert response.status_code == 200
+    query.order_by.assert_called_once()
+    # rank first, question_id as the tie-breaker
+    assert len(query.order_by.call_args.args) == 2
+
+
+def test_get_all_questions_cursor_mode_skips_offset_and_count(client, mock_db):
+    query = build_query_mock(mock_db)
+    query.all.return_value = []
+
+    response = client.get("/get-all-questions", params={"cursor": "", "page_size": 10})
+
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] is None
+    assert response.json()["total"] is None
+    query.offset.assert_not_called()
+    query.count.assert_not_called()
+    query.limit.assert_called_once_with(11)
+
+
+def test_get_all_questions_cursor_rejected_with_relevance_sort(client):
+    response = client.get("/get-all-questions", params={"cursor": "", "sort": "relevance", "search": "x"})
+    assert response.status_code == 400
+
+
+def _listing_question(question_id=1):
+    return SimpleNamespace(
+        question_id=question_id,
+        question_name=f"Question {question_id}",
+        question_description="desc",
+        media=None,
+        difficulty="easy",
+        created_at=datetime(2025, 1, 10, 12, 0, 0),
+        last_modified_at=datetime(2025, 1, 10, 12, 0, 0),
+        tags=[],
+        language_specific_properties=[],
+        test_cases=[SimpleNamespace(test_case_id=1, question_id=question_id, input_data="1", expected_output="2")],
+    )
+
+
+def test_get_all_questions_omits_test_cases_by_default(client, mock_db):
+    query = build_query_mock(mock_db)
+    query.count.return_value = 1
+    query.all.return_value = [_listing_question()]
+
+    response = client.get("/get-all-questions")
+
+    assert response.status_code == 200
+    assert response.json()["items"][0]["test_cases"] is None
+    query.options.assert_called_once()
+    assert len(query.options.call_args.args) == 3
+
+
+def test_get_all_questions_includes_test_cases_on_request(client, mock_db):
+    query = build_query_mock(mock_db)
+    query.count.return_value = 1
+    query.all.return_value = [_listing_question()]
+
+    response = client.get("/get-all-questions", params={"include": "test_cases"})
+
+    assert response.status_code == 200
+    test_case = response.json()["items"][0]["test_cases"][0]
+    assert test_case["expected_output"] == "2"
+    assert test_case["output_size"] == 3
+    assert len(test_case["output_hash"]) == 64
+    # test cases plus their input / output payload sizes
+    assert len(query.options.call_args.args) == 5
+
+
 def test_get_all_questions_applies_frontpage_only_filter(client, mock_db):
     main_query = MagicMock()
     main_query.filter.return_value = main_query
     main_query.with_entities.return_value = main_query
     main_query.order_by.return_value = main_query
+    main_query.options.return_value = main_query
     main_query.offset.return_value = main_query
     main_query.limit.return_value = main_query
     main_query.first.return_value = (0, datetime(2025, 1, 1, 0, 0, 0), 0, 0)
@@ -368,23 +455,17 @@ def test_build_filtered_questions_query_with_difficulty_and_frontpage_filter(moc
     assert query.filter.call_count == 2
 
 
-def test_build_questions_cache_headers_handles_empty_aggregates(mock_db):
-    aggregate_query = MagicMock()
-    aggregate_query.with_entities.return_value = aggregate_query
-    aggregate_query.first.return_value = (None, None, None, None)
-
-    frontpage_query = MagicMock()
-    frontpage_query.filter.return_value = frontpage_query
-    frontpage_query.first.return_value = None
-
-    mock_db.query.return_value = frontpage_query
-
-    headers, latest_modified = build_questions_cache_headers(aggregate_query, mock_db)
+def test_build_questions_cache_headers_uses_catalogue_version(mock_db, catalogue_version):
+    headers, latest_modified = build_questions_cache_headers(mock_db)
+    catalogue_version.return_value = (4, CATALOGUE_UPDATED_AT)
+    bumped_headers, _ = build_questions_cache_headers(mock_db)
 
     assert headers["Cache-Control"] == "no-cache, must-revalidate"
     assert headers["ETag"].startswith('W/"')
-    assert headers["Last-Modified"]
+    assert headers["ETag"] != bumped_headers["ETag"]
+    assert headers["Last-Modified"] == format_datetime(CATALOGUE_UPDATED_AT, usegmt=True)
     assert latest_modified.tzinfo == timezone.utc
+    mock_db.query.assert_not_called()
 
 
 def test_apply_question_sort_returns_ordered_query(mock_db):
@@ -441,7 +522,7 @@ def test_get_question_db_error(client, mock_db):
     assert "Failed to retrieve question" in response.json()["detail"]
     assert "Exception" in response.json()["detail"]
 
-def test_upload_question_success(client, mock_db):
+def test_upload_question_success(client, mock_db, catalogue_bump):
     """Test uploading a single question successfully."""
     
     question_payload = {
@@ -463,9 +544,12 @@ def test_upload_question_success(client, mock_db):
     assert response.status_code == 201
     mock_db.add.assert_called_once()
     mock_db.commit.assert_called_once()
+    catalogue_bump.assert_called_once_with(mock_db, "questions")
+
 
-def test_upload_question_batch_success(client, mock_db):
+def test_upload_question_batch_success(client, mock_db, bulk_import):
     """Test uploading a batch of questions successfully."""
+    bulk_import.return_value = QuestionImportResult(created=2, question_ids=[10, 11])
     
     batch_payload = [
         {
@@ -498,9 +582,50 @@ def test_upload_question_batch_success(client, mock_db):
 
     response = client.post("/upload-question-batch", json=batch_payload)
     assert response.status_code == 201
-    mock_db.add_all.assert_called_once()
+    assert response.json()["created"] == 2
+    assert response.json()["question_ids"] == [10, 11]
+    assert response.json()["errors"] == []
+    imported = bulk_import.call_args.args[1]
+    assert [q.question_name for q in imported] == ["Batch Question 1", "Batch Question 2"]
+    mock_db.commit.assert_called_once()
+
+
+def test_upload_question_batch_reports_rejected_rows(client, mock_db, bulk_import):
+    bulk_import.return_value = QuestionImportResult(
+        created=1,
+        question_ids=[10],
+        errors=[QuestionImportRowError(index=1, question_name="Dup", detail="Question 'Dup' already exists.")],
+    )
+    batch_payload = [
+        {"question_name": "New", "question_description": "d", "testcases": []},
+        {"question_name": "Dup", "question_description": "d", "testcases": []},
+    ]
+
+    response = client.post("/upload-question-batch", json=batch_payload)
+
+    assert response.status_code == 201
+    assert response.json()["created"] == 1
+    assert response.json()["errors"] == [
+        {"index": 1, "question_name": "Dup", "detail": "Question 'Dup' already exists."}
+    ]
     mock_db.commit.assert_called_once()
 
+
+def test_upload_question_batch_all_rows_rejected_returns_400(client, mock_db, bulk_import):
+    bulk_import.return_value = QuestionImportResult(
+        errors=[QuestionImportRowError(index=0, question_name="Dup", detail="Question 'Dup' already exists.")],
+    )
+
+    response = client.post(
+        "/upload-question-batch",
+        json=[{"question_name": "Dup", "question_description": "d", "testcases": []}],
+    )
+
+    assert response.status_code == 400
+    assert "row 0: Question 'Dup' already exists." in response.json()["detail"]
+    mock_db.commit.assert_not_called()
+    mock_db.rollback.assert_called_once()
+
 def test_upload_question_db_error(client, mock_db):
     """Test how the upload question endpoint handles a database exception."""
     
@@ -726,7 +851,7 @@ def test_get_question_by_id_not_found(client, mock_db):
     assert response.json()["detail"] == "Question with id 404 not found"
 
 
-def test_batch_delete_questions_partial_success(client, mock_db):
+def test_batch_delete_questions_partial_success(client, mock_db, catalogue_bump):
     id_query = MagicMock()
     id_query.filter.return_value.all.return_value = [
         SimpleNamespace(question_id=1),
@@ -747,6 +872,7 @@ def test_batch_delete_questions_partial_success(client, mock_db):
     assert payload["total_requested"] == 3
     assert payload["errors"] == [{"question_id": 2, "error": "Question not found."}]
     mock_db.commit.assert_called_once()
+    catalogue_bump.assert_called_once_with(mock_db, "questions")
 
 
 def test_batch_delete_questions_error_rolls_back(client, mock_db):
@@ -761,7 +887,7 @@ def test_batch_delete_questions_error_rolls_back(client, mock_db):
     mock_db.rollback.assert_called_once()
 
 
-def test_show_question_on_frontpage_by_id_creates_instance(client, mock_db):
+def test_show_question_on_frontpage_by_id_creates_instance(client, mock_db, catalogue_bump):
     question_lookup_query = MagicMock()
     question_lookup_query.filter.return_value.first.return_value = SimpleNamespace(question_id=5)
 
@@ -779,6 +905,7 @@ def test_show_question_on_frontpage_by_id_creates_instance(client, mock_db):
     assert response.json() == {"question_id": 5, "show_on_frontpage": True}
     mock_db.add.assert_called_once()
     mock_db.commit.assert_called_once()
+    catalogue_bump.assert_called_once_with(mock_db, "questions")
 
 
 def test_show_question_on_frontpage_by_id_deletes_instance(client, mock_db):
@@ -800,7 +927,7 @@ def test_show_question_on_frontpage_by_id_deletes_instance(client, mock_db):
     mock_db.commit.assert_called_once()
 
 
-def test_show_question_on_frontpage_by_id_returns_404_for_missing_question(client, mock_db):
+def test_show_question_on_frontpage_by_id_returns_404_for_missing_question(client, mock_db, catalogue_bump):
     question_lookup_query = MagicMock()
     question_lookup_query.filter.return_value.first.return_value = None
     mock_db.query.return_value = question_lookup_query
@@ -812,6 +939,7 @@ def test_show_question_on_frontpage_by_id_returns_404_for_missing_question(clien
 
     assert response.status_code == 404
     assert response.json()["detail"] == "Question with id 999 not found"
+    catalogue_bump.assert_not_called()
 
 
 def test_update_question_not_found_returns_404_with_message(client, mock_db):
@@ -835,7 +963,7 @@ def test_update_question_not_found_returns_404_with_message(client, mock_db):
     assert "Update failed" in response.json()["detail"]
 
 
-def test_upload_question_batch_db_error(client, mock_db):
+def test_upload_question_batch_db_error(client, mock_db, bulk_import):
     """Test that a DB error during batch upload returns 500 with generic message."""
     batch_payload = [
         {
@@ -871,7 +999,6 @@ def test_get_question_by_id_unexpected_error_returns_500(client, mock_db):
 
 def test_get_all_questions_invalid_if_modified_since_uses_fallback(client, mock_db):
     query = build_query_mock(mock_db)
-    query.first.return_value = (0, datetime(2025, 2, 1, 10, 0, 0), 0, 0)
     query.count.return_value = 0
     query.all.return_value = []
 
@@ -885,7 +1012,7 @@ def test_get_all_questions_invalid_if_modified_since_uses_fallback(client, mock_
     assert "last-modified" in response.headers
 
 
-def test_upload_question_batch_integrity_error_returns_409(client, mock_db):
+def test_upload_question_batch_integrity_error_returns_409(client, mock_db, bulk_import):
     batch_payload = [
         {
             "question_name": "Batch Q",
@@ -911,7 +1038,7 @@ def test_upload_question_batch_integrity_error_returns_409(client, mock_db):
     mock_db.rollback.assert_called_once()
 
 
-def test_upload_question_batch_data_error_returns_400(client, mock_db):
+def test_upload_question_batch_data_error_returns_400(client, mock_db, bulk_import):
     batch_payload = [
         {
             "question_name": "Batch Q",
@@ -935,7 +1062,7 @@ def test_upload_question_batch_data_error_returns_400(client, mock_db):
     mock_db.rollback.assert_called_once()
 
 
-def test_batch_delete_questions_when_ids_missing_returns_zero(client, mock_db):
+def test_batch_delete_questions_when_ids_missing_returns_zero(client, mock_db, catalogue_bump):
     id_query = MagicMock()
     id_query.filter.return_value.all.return_value = []
     mock_db.query.return_value = id_query
@@ -951,59 +1078,53 @@ def test_batch_delete_questions_when_ids_missing_returns_zero(client, mock_db):
         {"question_id": 11, "error": "Question not found."},
     ]
     mock_db.commit.assert_called_once()
+    catalogue_bump.assert_not_called()
 
 
-def test_update_question_success_replaces_fields_tags_and_testcases(client, mock_db):
-    existing_question = SimpleNamespace(
-        question_id=7,
-        question_name="Old",
-        question_description="Old desc",
-        media=None,
-        difficulty="easy",
-        preset_functions="",
-        from_string_function="",
-        to_string_function="",
-        template_code="old",
-        tags=[],
-        test_cases=[SimpleNamespace(test_case_id=1, input_data="in", expected_output="out")],
-    )
-
-    question_query = MagicMock()
-    question_query.filter.return_value.first.return_value = existing_question
-
-    tag_query = MagicMock()
-    tag_query.filter.return_value.all.return_value = []
-
-    mock_db.query.side_effect = [question_query, tag_query]
+def test_update_question_success_applies_diff_and_commits(client, mock_db, catalogue_bump):
+    existing_question = SimpleNamespace(question_id=7, question_name="Old")
+    mock_db.query.return_value.filter.return_value.first.return_value = existing_question
 
     payload = {
         "question_name": "Updated",
         "question_description": "Updated description",
-        "media": None,
         "difficulty": "medium",
-        "preset_functions": "",
-        "from_string_function": "",
-        "to_string_function": "",
-        "template_code": "def solve(): return 1",
         "tags": ["arrays"],
-        "testcases": [["1 2", "3"]],
+        "testcases": [{"test_case_id": 3, "input_data": "1 2", "expected_output": "3"}, ["4", "4"]],
     }
 
-    response = client.put("/update-question/7", json=payload)
+    with patch(
+        "src.endpoints.questions_api.apply_question_update",
+        return_value=QuestionUpdateSummary(fields_changed=["question_name"], test_cases_inserted=1),
+    ) as mock_apply:
+        response = client.put("/update-question/7", json=payload)
 
     assert response.status_code == 200
-    assert existing_question.question_name == "Updated"
-    assert existing_question.difficulty == "medium"
-    assert len(existing_question.test_cases) == 1
-    assert existing_question.test_cases[0].question_id == 7
-    mock_db.delete.assert_called_once()
+    db_arg, question_arg, request_arg = mock_apply.call_args.args
+    assert question_arg is existing_question
+    assert [tc.test_case_id for tc in request_arg.test_cases] == [3, None]
+    catalogue_bump.assert_called_once()
     mock_db.commit.assert_called_once()
     mock_db.refresh.assert_called_once_with(existing_question)
 
 
-def test_get_all_questions_uses_now_when_last_modified_missing(client, mock_db):
+def test_update_question_without_changes_skips_commit(client, mock_db, catalogue_bump):
+    mock_db.query.return_value.filter.return_value.first.return_value = SimpleNamespace(question_id=7)
+
+    with patch("src.endpoints.questions_api.apply_question_update", return_value=QuestionUpdateSummary()):
+        response = client.put(
+            "/update-question/7",
+            json={"question_name": "Same", "question_description": "Same"},
+        )
+
+    assert response.status_code == 200
+    mock_db.commit.assert_not_called()
+    catalogue_bump.assert_not_called()
+
+
+def test_get_all_questions_uses_now_when_last_modified_missing(client, mock_db, catalogue_version):
     query = build_query_mock(mock_db)
-    query.first.return_value = (0, None, 0, 0)
+    catalogue_version.return_value = (0, None)
     query.count.return_value = 0
     query.all.return_value = []
 
@@ -1039,3 +1160,38 @@ def test_question_language_specific_properties_response_handles_missing_language
     assert response.question_id == 1
     assert response.language_id == 2
     assert response.language_display_name == ""
+
+
+def test_import_questions_file_queues_background_job(client):
+    payload = b'{"question_name": "A", "question_description": "d"}\n'
+
+    with patch("src.endpoints.questions_api.run_question_import_job") as mock_run:
+        response = client.post(
+            "/import-questions?chunk_size=50",
+            files={"file": ("bank.ndjson", payload, "application/x-ndjson")},
+        )
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status"] == "pending"
+    assert body["chunk_size"] == 50
+    job_id, path = mock_run.call_args.args
+    assert job_id == body["job_id"]
+    with open(path, "rb") as spooled:
+        assert spooled.read() == payload
+    os.remove(path)
+
+
+def test_import_questions_file_rejects_oversized_upload(client):
+    with patch("src.endpoints.questions_api.MAX_IMPORT_FILE_MB", 0), \
+            patch("src.endpoints.questions_api.run_question_import_job") as mock_run:
+        response = client.post("/import-questions", files={"file": ("bank.json", b"[]", "application/json")})
+
+    assert response.status_code == 413
+    mock_run.assert_not_called()
+
+
+def test_get_question_import_job_unknown_returns_404(client):
+    response = client.get("/import-questions/does-not-exist")
+
+    assert response.status_code == 404
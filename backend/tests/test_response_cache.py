@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock, patch
+import json
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services import response_cache as cache_module
+from services.response_cache import ResponseCache, build_cache_key, serialize_json
+
+
+def test_lru_evicts_oldest_entry_over_byte_budget():
+    cache = ResponseCache(max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.get("a")  # "b" becomes least recently used
+    cache.set("c", b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.get("c") == b"1234"
+    assert cache.stats()["bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_body_larger_than_budget_is_not_cached():
+    cache = ResponseCache(max_bytes=4)
+    cache.set("big", b"12345")
+
+    assert cache.get("big") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidate_tags_drops_only_tagged_entries():
+    cache = ResponseCache(max_bytes=1024)
+    cache.set("list", b"[]", tags=["questions"])
+    cache.set("cases", b"[]", tags=["testcases", "question:7"])
+    cache.set("langs", b"[]", tags=["languages"])
+
+    assert cache.invalidate_tags("questions", "question:7") == 2
+
+    assert cache.get("list") is None
+    assert cache.get("cases") is None
+    assert cache.get("langs") == b"[]"
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_expired_entry_is_a_miss():
+    cache = ResponseCache(max_bytes=1024)
+    with patch.object(cache_module.time, "monotonic", return_value=100.0):
+        cache.set("k", b"{}", ttl_seconds=5)
+    with patch.object(cache_module.time, "monotonic", return_value=106.0):
+        assert cache.get("k") is None
+
+    assert cache.stats()["entries"] == 0
+
+
+def test_stats_report_hit_ratio():
+    cache = ResponseCache(max_bytes=1024)
+    cache.set("k", b"{}")
+    cache.get("k")
+    cache.get("k")
+    cache.get("k")
+    cache.get("missing")
+
+    stats = cache.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.75
+
+
+def test_build_cache_key_normalizes_params():
+    first = build_cache_key("questions", {"search": " two sum ", "page": 1, "sort": None})
+    second = build_cache_key("questions", {"page": 1, "search": "two sum"})
+
+    assert first == second == "questions?page=1&search=two sum"
+
+
+def test_cached_json_response_builds_once():
+    cache_module.response_cache.clear()
+    build = MagicMock(return_value=serialize_json({"items": [1, 2]}))
+
+    first = cache_module.cached_json_response("k", ["questions"], build, headers={"ETag": '"v1"'})
+    second = cache_module.cached_json_response("k", ["questions"], build)
+
+    build.assert_called_once()
+    assert json.loads(second.body) == {"items": [1, 2]}
+    assert first.headers["ETag"] == '"v1"'
+    assert first.media_type == "application/json"
+    cache_module.response_cache.clear()
@@ -25,6 +25,9 @@ class Field:
     def ilike(self, value):
         return ("ilike", self.name, value)
 
+    def __lt__(self, value):
+        return ("lt", self.name, value)
+
     def desc(self):
         return self
 
@@ -75,6 +78,10 @@ class FakeQuery:
                 needle = value.strip("%").lower()
                 if needle not in getattr(obj, name).lower():
                     return False
+            elif op == "lt":
+                _, name, value = predicate
+                if not getattr(obj, name) < value:
+                    return False
             elif op == "or":
                 _, value = predicate
                 if not any(self._evaluate_single(obj, child) for child in value):
@@ -170,6 +177,7 @@ def app_and_module(monkeypatch):
     os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
 
     riddles_module = importlib.import_module("src.endpoints.riddles_api")
+    importlib.import_module("services.response_cache").response_cache.clear()
 
     monkeypatch.setattr(riddles_module, "or_", lambda *exprs: ("or", exprs))
 
@@ -248,6 +256,27 @@ def test_list_riddles_applies_search_and_pagination(client):
     assert body["items"][0]["riddle_question"] == "Bravo"
 
 
+def test_list_riddles_cursor_mode_walks_all_pages(client):
+    for idx in range(1, 4):
+        client.post("/riddles/create", data={"question": f"Q{idx}", "answer": f"A{idx}"})
+
+    first = client.get("/riddles/", params={"cursor": "", "page_size": 2, "include_total": True}).json()
+    assert [r["riddle_id"] for r in first["items"]] == [3, 2]
+    assert first["total"] == 3
+    assert first["page"] is None
+    assert first["next_cursor"]
+
+    second = client.get("/riddles/", params={"cursor": first["next_cursor"], "page_size": 2}).json()
+    assert [r["riddle_id"] for r in second["items"]] == [1]
+    assert second["total"] is None
+    assert second["next_cursor"] is None
+
+
+def test_list_riddles_rejects_tampered_cursor(client):
+    resp = client.get("/riddles/", params={"cursor": "eyJzIjoiYWNjb3VudHM6ZGVmYXVsdCIsInYiOlsxXX0"})
+    assert resp.status_code == 400
+
+
 def test_get_riddle_by_id(client):
     create = client.post("/riddles/create", data={"question": "QX", "answer": "AX"})
     rid = create.json()["riddle_id"]
@@ -0,0 +1,85 @@
+import sys
+import os
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services.scheduler_leader import SchedulerLeadership
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+def test_one_process_leads_until_it_releases(engine, tmp_path):
+    lock_file = str(tmp_path / "scheduler.lock")
+    first, second = SchedulerLeadership(engine, lock_file), SchedulerLeadership(engine, lock_file)
+
+    assert first.uses_advisory_lock is False
+    assert first.is_leader() is True
+    assert first.is_leader() is True
+    assert second.is_leader() is False
+
+    first.release()
+    assert second.is_leader() is True
+    assert first.is_leader() is False
+    second.release()
+
+
+def _postgres_engine(acquired):
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    connection = engine.connect.return_value.execution_options.return_value
+    connection.execute.return_value.scalar.return_value = acquired
+    return engine, connection
+
+
+def test_advisory_lock_is_taken_on_a_dedicated_autocommit_connection():
+    engine, connection = _postgres_engine(acquired=True)
+    leadership = SchedulerLeadership(engine, key=42)
+
+    assert leadership.uses_advisory_lock is True
+    assert leadership.is_leader() is True
+    engine.connect.return_value.execution_options.assert_called_once_with(isolation_level="AUTOCOMMIT")
+    statement, params = connection.execute.call_args.args
+    assert "pg_try_advisory_lock" in str(statement)
+    assert params == {"key": 42}
+
+    # Still leading: the held connection is only pinged.
+    assert leadership.is_leader() is True
+    assert engine.connect.call_count == 1
+
+    leadership.release()
+    assert "pg_advisory_unlock" in str(connection.execute.call_args.args[0])
+    connection.close.assert_called_once()
+
+
+def test_advisory_lock_held_elsewhere_means_standby():
+    engine, connection = _postgres_engine(acquired=False)
+    leadership = SchedulerLeadership(engine)
+
+    assert leadership.is_leader() is False
+    connection.close.assert_called_once()
+
+
+def test_lost_leader_connection_triggers_a_new_election():
+    engine, connection = _postgres_engine(acquired=True)
+    leadership = SchedulerLeadership(engine)
+    assert leadership.is_leader() is True
+
+    # Another process took the lock while this one was disconnected.
+    taken = MagicMock()
+    taken.scalar.return_value = False
+    connection.execute.side_effect = [ConnectionError("server closed the connection"), taken]
+
+    assert leadership.is_leader() is False
+    connection.invalidate.assert_called_once()
+    assert engine.connect.call_count == 2
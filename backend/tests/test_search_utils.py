@@ -0,0 +1,93 @@
+from unittest.mock import MagicMock
+import sys
+import os
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from src.endpoints.search_utils import (
+    apply_text_search,
+    build_search_filter,
+    build_search_rank,
+    escape_like,
+    normalize_search,
+)
+from models.schema import Question, UserAccount
+
+
+def _compile(clause, dialect):
+    return str(clause.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _db_for(dialect_name):
+    db = MagicMock()
+    db.get_bind.return_value.dialect.name = dialect_name
+    return db
+
+
+def test_normalize_search_strips_and_drops_blank_terms():
+    assert normalize_search(None) is None
+    assert normalize_search("   ") is None
+    assert normalize_search("  array ") == "array"
+
+
+def test_escape_like_escapes_wildcards():
+    assert escape_like("100%_a\\b") == "100\\%\\_a\\\\b"
+
+
+def test_apply_text_search_skips_blank_search():
+    query = MagicMock()
+
+    assert apply_text_search(query, "  ", Question.question_name) is query
+    query.filter.assert_not_called()
+
+
+def test_apply_text_search_adds_single_filter():
+    query = MagicMock()
+
+    result = apply_text_search(query, "john", UserAccount.email, UserAccount.first_name)
+
+    assert result is query.filter.return_value
+    query.filter.assert_called_once()
+
+
+def test_build_search_filter_uses_escaped_ilike_on_postgres():
+    compiled = build_search_filter("50%", UserAccount.email, UserAccount.last_name).compile(
+        dialect=postgresql.dialect()
+    )
+    sql = str(compiled)
+
+    assert "user_account.email ILIKE" in sql
+    assert "user_account.last_name ILIKE" in sql
+    assert " OR " in sql
+    assert set(compiled.params.values()) == {"%50\\%%"}
+
+
+def test_build_search_rank_uses_word_similarity_on_postgres():
+    rank = build_search_rank(_db_for("postgresql"), "sum", Question.question_name, Question.question_description)
+    sql = _compile(rank, postgresql.dialect())
+
+    assert sql.startswith("greatest(word_similarity(")
+    assert sql.count("word_similarity(") == 2
+
+
+def test_build_search_rank_falls_back_to_case_on_sqlite():
+    rank = build_search_rank(_db_for("sqlite"), "Sum", Question.question_name)
+    sql = _compile(rank, sqlite.dialect())
+
+    assert "CASE" in sql
+    assert "lower(question.question_name) = 'sum'" in sql
+    assert "LIKE 'sum%'" in sql
+    assert "word_similarity" not in sql
+
+
+def test_build_search_rank_treats_unknown_bind_as_fallback():
+    db = MagicMock()
+    db.get_bind.side_effect = RuntimeError("no bind")
+
+    sql = _compile(build_search_rank(db, "x", Question.question_name), sqlite.dialect())
+
+    assert "CASE" in sql
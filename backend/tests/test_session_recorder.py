@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+from sqlalchemy.exc import OperationalError, ProgrammingError, SQLAlchemyError
+import pytest
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from src.services import session_recorder
+
+MOD = "src.services.session_recorder"
+
+
+@pytest.fixture(autouse=True)
+def empty_queue():
+    session_recorder._drain()
+    yield
+    session_recorder._drain()
+
+
+def _expires():
+    return datetime.now(timezone.utc) + timedelta(minutes=15)
+
+
+def test_hash_session_token_is_fixed_size_and_stable():
+    digest = session_recorder.hash_session_token("a" * 500)
+    assert len(digest) == 64
+    assert digest == session_recorder.hash_session_token("a" * 500)
+    assert digest != session_recorder.hash_session_token("b" * 500)
+
+
+def test_record_session_queues_hashed_token():
+    session_recorder.record_session(1, "raw.jwt.token", _expires())
+
+    sessions, logouts = session_recorder._drain()
+    assert len(sessions) == 1
+    assert sessions[0]["user_id"] == 1
+    assert sessions[0]["jwt_token"] == session_recorder.hash_session_token("raw.jwt.token")
+    assert sessions[0]["is_active"] is True
+    assert logouts == {}
+
+
+def test_record_logout_deactivates_queued_sessions_for_user_only():
+    session_recorder.record_session(1, "t1", _expires())
+    session_recorder.record_session(2, "t2", _expires())
+    session_recorder.record_logout(1)
+
+    sessions, logouts = session_recorder._drain()
+    by_user = {row["user_id"]: row for row in sessions}
+    assert by_user[1]["is_active"] is False
+    assert by_user[2]["is_active"] is True
+    assert set(logouts) == {1}
+
+
+def test_flush_with_empty_queue_does_not_open_session():
+    with patch(f"{MOD}.SessionLocal") as mock_session_local:
+        assert session_recorder.flush_pending_sessions() == 0
+    mock_session_local.assert_not_called()
+
+
+def test_flush_bulk_inserts_sessions_and_applies_logouts():
+    session_recorder.record_session(1, "t1", _expires())
+    session_recorder.record_session(2, "t2", _expires())
+    session_recorder.record_logout(3)
+    mock_db = MagicMock()
+
+    with patch(f"{MOD}.SessionLocal", return_value=mock_db):
+        inserted = session_recorder.flush_pending_sessions()
+
+    assert inserted == 2
+    # One executemany INSERT for both sessions + one UPDATE for the logout.
+    assert mock_db.execute.call_count == 2
+    insert_rows = mock_db.execute.call_args_list[0].args[1]
+    assert len(insert_rows) == 2
+    mock_db.commit.assert_called_once()
+    mock_db.close.assert_called_once()
+    assert session_recorder.pending_counts() == (0, 0)
+
+
+def test_flush_requeues_batch_on_database_error():
+    session_recorder.record_session(1, "t1", _expires())
+    session_recorder.record_logout(1)
+    mock_db = MagicMock()
+    mock_db.execute.side_effect = OperationalError("INSERT", {}, Exception("db down"))
+
+    with patch(f"{MOD}.SessionLocal", return_value=mock_db):
+        inserted = session_recorder.flush_pending_sessions()
+
+    assert inserted == 0
+    mock_db.rollback.assert_called_once()
+    mock_db.close.assert_called_once()
+    assert session_recorder.pending_counts() == (1, 1)
+
+
+def test_flush_drops_batch_on_permanent_database_error():
+    session_recorder.record_session(1, "t1", _expires())
+    mock_db = MagicMock()
+    mock_db.execute.side_effect = ProgrammingError("INSERT", {}, Exception("no such column"))
+
+    with patch(f"{MOD}.SessionLocal", return_value=mock_db):
+        assert session_recorder.flush_pending_sessions() == 0
+
+    mock_db.rollback.assert_called_once()
+    assert session_recorder.pending_counts() == (0, 0)
+
+
+def test_flush_drops_only_rejected_rows(sqlite_session):
+    """A user deleted before the flush must not block the other login records."""
+    from sqlalchemy import select
+    from sqlalchemy.orm import sessionmaker
+    from models.schema import UserAccount, UserSession
+
+    db = sqlite_session(UserAccount, UserSession, savepoints=True, foreign_keys=True)
+    db.add(UserAccount(user_id=1, email="a@x.com", hashed_password="", first_name="A", last_name="",
+                       user_type="participant"))
+    db.commit()
+
+    session_recorder.record_session(1, "t1", _expires())
+    session_recorder.record_session(2, "deleted-user", _expires())
+    session_recorder.record_session(1, "t3", _expires())
+    with patch(f"{MOD}.SessionLocal", sessionmaker(db.get_bind())):
+        inserted = session_recorder.flush_pending_sessions()
+
+    assert inserted == 2
+    assert db.scalars(select(UserSession.user_id)).all() == [1, 1]
+    assert session_recorder.pending_counts() == (0, 0)
+
+
+def test_prune_expired_sessions_deletes_and_commits():
+    mock_db = MagicMock()
+    mock_db.query.return_value.filter.return_value.delete.return_value = 4
+
+    with patch(f"{MOD}.SessionLocal", return_value=mock_db):
+        assert session_recorder.prune_expired_sessions() == 4
+
+    mock_db.commit.assert_called_once()
+    mock_db.close.assert_called_once()
+
+
+def test_prune_expired_sessions_rolls_back_on_error():
+    mock_db = MagicMock()
+    mock_db.query.return_value.filter.return_value.delete.side_effect = SQLAlchemyError("boom")
+
+    with patch(f"{MOD}.SessionLocal", return_value=mock_db):
+        assert session_recorder.prune_expired_sessions() == 0
+
+    mock_db.rollback.assert_called_once()
+    mock_db.close.assert_called_once()
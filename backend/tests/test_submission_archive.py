@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta, timezone
+import gzip
+import json
+import sys
+import os
+
+import pytest
+from sqlalchemy import event
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services.submission_archive import archive_event_submissions, event_archive_dir
+from models.schema import (
+    BaseEvent,
+    MostRecentSubmission,
+    QuestionInstance,
+    Submission,
+    UserQuestionInstance,
+)
+
+END = datetime(2026, 3, 2, 14, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(sqlite_session):
+    session = sqlite_session(BaseEvent, QuestionInstance, UserQuestionInstance, Submission, MostRecentSubmission)
+    for event_id in (1, 2):
+        session.add(BaseEvent(event_id=event_id, event_name=f"Event {event_id}",
+                              event_start_date=END - timedelta(hours=2), event_end_date=END))
+        session.add(QuestionInstance(question_instance_id=event_id, question_id=5, event_id=event_id))
+        session.add(UserQuestionInstance(user_question_instance_id=event_id, user_id=7,
+                                         question_instance_id=event_id))
+        session.add(MostRecentSubmission(user_question_instance_id=event_id, code="print(1)",
+                                         submitted_on=END, lang_judge_id=71))
+    session.add_all([
+        Submission(submission_id=submission_id, user_question_instance_id=1, status="Accepted",
+                   submitted_on=END - timedelta(minutes=submission_id), lang_judge_id=71, runtime=12)
+        for submission_id in range(1, 6)
+    ])
+    session.commit()
+    return session
+
+
+def _read(path):
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        return [json.loads(line) for line in archive]
+
+
+def test_archive_streams_rows_into_event_partitions(db, tmp_path):
+    written = archive_event_submissions(db, [1], archive_dir=str(tmp_path), fetch_size=2)
+
+    assert written == {"submission": 5, "most_recent_submission": 1}
+    partition = event_archive_dir(str(tmp_path), 1, END)
+    assert partition.endswith(os.path.join("event_id=1", "ended=20260302T140000"))
+    assert sorted(os.listdir(partition)) == ["most_recent_submission.ndjson.gz", "submission.ndjson.gz"]
+
+    submissions = _read(os.path.join(partition, "submission.ndjson.gz"))
+    assert [row["submission_id"] for row in submissions] == [1, 2, 3, 4, 5]
+    assert submissions[0]["event_id"] == 1
+    assert submissions[0]["question_id"] == 5
+    assert submissions[0]["user_id"] == 7
+    assert submissions[0]["runtime"] == 12
+    assert submissions[0]["submitted_on"].startswith("2026-03-02T13:59:00")
+    assert _read(os.path.join(partition, "most_recent_submission.ndjson.gz"))[0]["code"] == "print(1)"
+    assert not os.path.exists(os.path.join(tmp_path, "event_id=2"))
+
+
+def test_archive_is_not_rewritten_when_purge_resumes(db, tmp_path):
+    archive_event_submissions(db, [1], archive_dir=str(tmp_path))
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    assert archive_event_submissions(db, [1, 2], archive_dir=str(tmp_path)) == {
+        "submission": 0, "most_recent_submission": 1,
+    }
+    # One lookup of end dates plus the two tables of event 2 only.
+    assert len(statements) == 3
+
+
+def test_interrupted_write_leaves_no_archive(db, tmp_path, monkeypatch):
+    from services import submission_archive
+
+    def failing_dumps(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(submission_archive.json, "dumps", failing_dumps)
+    with pytest.raises(OSError):
+        archive_event_submissions(db, [1], archive_dir=str(tmp_path))
+
+    partition = event_archive_dir(str(tmp_path), 1, END)
+    assert not os.path.exists(os.path.join(partition, "submission.ndjson.gz"))
+
+
+def test_empty_archive_dir_disables_archiving(db):
+    assert archive_event_submissions(db, [1], archive_dir="") == {}
+
+
+def test_archiving_is_off_unless_configured(monkeypatch):
+    import importlib
+    from services import submission_archive
+
+    monkeypatch.delenv("SUBMISSION_ARCHIVE_DIR", raising=False)
+    try:
+        assert importlib.reload(submission_archive).SUBMISSION_ARCHIVE_DIR == ""
+    finally:
+        monkeypatch.undo()
+        importlib.reload(submission_archive)
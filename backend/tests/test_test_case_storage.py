@@ -0,0 +1,105 @@
+import json
+import sys
+import os
+
+import pytest
+from sqlalchemy import select
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from services import test_case_storage as storage
+from models.schema import Question, TestCase, TestCasePayload
+
+BIG = {"grid": [[i] * 50 for i in range(50)]}
+
+
+@pytest.fixture
+def db(sqlite_session):
+    session = sqlite_session(Question, TestCasePayload, TestCase)
+    session.add(Question(question_id=1, question_name="Q", question_description="d", difficulty="easy"))
+    session.commit()
+    return session
+
+
+def _insert(db, rows):
+    storage.prepare_test_case_rows(db, rows, max_inline_bytes=256)
+    for row in rows:
+        db.add(TestCase(question_id=1, **row))
+    db.commit()
+
+
+def test_large_payloads_are_stored_once_and_compressed(db):
+    _insert(db, [
+        {"input_data": BIG, "expected_output": 1},
+        {"input_data": BIG, "expected_output": 2},
+        {"input_data": [1, 2], "expected_output": 3},
+    ])
+
+    payloads = db.scalars(select(TestCasePayload)).all()
+    assert len(payloads) == 1
+    assert payloads[0].size_bytes == len(storage.encode_payload(BIG))
+    assert payloads[0].compressed_size < payloads[0].size_bytes
+    refs = db.scalars(select(TestCase.input_ref).order_by(TestCase.test_case_id)).all()
+    assert refs == [payloads[0].payload_hash, payloads[0].payload_hash, None]
+
+
+def test_existing_payload_is_reused_without_insert(db):
+    _insert(db, [{"input_data": BIG, "expected_output": 1}])
+    _insert(db, [{"input_data": 0, "expected_output": BIG}])
+
+    assert db.scalar(select(TestCasePayload.payload_hash)) == db.scalar(select(TestCase.output_ref).where(
+        TestCase.output_ref.is_not(None)))
+    assert len(db.scalars(select(TestCasePayload)).all()) == 1
+
+
+def test_readers_resolve_and_describe_payloads(db):
+    _insert(db, [{"input_data": BIG, "expected_output": [1]}])
+    tc = db.scalar(select(TestCase))
+
+    payloads = storage.load_payloads(db, storage.payload_refs([tc]))
+    assert storage.resolve_test_case(tc, payloads) == (BIG, [1])
+
+    description = storage.describe_test_case(tc)
+    assert description["input_external"] is True
+    assert description["input_size"] == len(storage.encode_payload(BIG))
+    assert description["output_hash"] == storage.hash_payload(b"[1]")
+    assert description["output_size"] == 3
+
+
+def test_payload_streams_in_bounded_chunks(db):
+    _insert(db, [{"input_data": BIG, "expected_output": 1}])
+    payload = storage.get_payload(db, db.scalar(select(TestCase.input_ref)))
+
+    chunks = list(storage.iter_payload_chunks(payload, chunk_size=100))
+
+    assert max(len(chunk) for chunk in chunks) <= 100
+    assert json.loads(b"".join(chunks)) == BIG
+
+
+def test_prune_keeps_payloads_that_are_still_referenced(db):
+    _insert(db, [{"input_data": BIG, "expected_output": 1}, {"input_data": BIG, "expected_output": 2}])
+    payload_hash = db.scalar(select(TestCasePayload.payload_hash))
+    first, second = db.scalars(select(TestCase).order_by(TestCase.test_case_id)).all()
+
+    db.delete(first)
+    db.flush()
+    assert storage.prune_orphan_payloads(db, {payload_hash}) == 0
+
+    db.delete(second)
+    db.flush()
+    assert storage.prune_orphan_payloads(db, {payload_hash}) == 1
+    assert storage.question_payload_refs(db, [1]) == set()
+
+
+def test_payload_stored_concurrently_is_not_inserted_again(db, monkeypatch):
+    _insert(db, [{"input_data": BIG, "expected_output": 1}])
+    # Another request stored the payload after this one looked for it.
+    monkeypatch.setattr(db, "scalars", lambda *args, **kwargs: iter(()))
+
+    _insert(db, [{"input_data": BIG, "expected_output": 2}])
+
+    monkeypatch.undo()
+    assert len(db.scalars(select(TestCasePayload)).all()) == 1
+    assert len(set(db.scalars(select(TestCase.input_ref)).all())) == 1
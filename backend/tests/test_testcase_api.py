@@ -1,5 +1,7 @@
+import json
+import zlib
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 from types import SimpleNamespace
@@ -13,10 +15,18 @@ sys.path.append(parent_dir)
 from database_operations.database import get_db
 
 from src.endpoints.testcase_api import testcase_router
-from models.schema import Question, TestCase
+from services.response_cache import response_cache
+from models.schema import Question, TestCase, TestCasePayload
 
 # --- FIXTURES ---
 
+@pytest.fixture(autouse=True)
+def empty_response_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
 @pytest.fixture
 def mock_db():
     """Creates a mock database session."""
@@ -141,4 +151,57 @@ def test_get_all_testcases_db_error(client, mock_db):
     response = client.get("/get-all-testcases/1")
 
     assert response.status_code == 500
-    assert response.json()["detail"] == "Failed to retrieve test cases."
\ No newline at end of file
+    assert response.json()["detail"] == "Failed to retrieve test cases."
+
+# --- GET /payload/{payload_hash} TESTS ---
+
+PAYLOAD_HASH = "a" * 64
+
+
+def test_get_all_testcases_resolves_externalized_payloads(client, mock_db):
+    tc = SimpleNamespace(
+        test_case_id=10, question_id=1,
+        input_data=None, expected_output=3,
+        input_ref=PAYLOAD_HASH, output_ref=None,
+    )
+    mock_question_query = MagicMock()
+    mock_question_query.filter.return_value.first.return_value = SimpleNamespace(question_id=1)
+    mock_testcase_query = MagicMock()
+    mock_testcase_query.filter_by.return_value.all.return_value = [tc]
+    mock_db.query.side_effect = lambda model: mock_question_query if model == Question else mock_testcase_query
+
+    with patch("src.endpoints.testcase_api.load_payloads", return_value={PAYLOAD_HASH: [1, 2]}) as mock_load:
+        response = client.get("/get-all-testcases/1")
+
+    assert response.status_code == 200
+    assert response.json()[0]["input_data"] == [1, 2]
+    assert mock_load.call_args.args[1] == {PAYLOAD_HASH}
+
+
+def test_get_test_case_payload_streams_decompressed_json(client, mock_db):
+    encoded = json.dumps(list(range(5000))).encode()
+    mock_db.get.return_value = TestCasePayload(
+        payload_hash=PAYLOAD_HASH, encoding="zlib", size_bytes=len(encoded),
+        compressed_size=0, data=zlib.compress(encoded),
+    )
+
+    response = client.get(f"/payload/{PAYLOAD_HASH}")
+
+    assert response.status_code == 200
+    assert response.content == encoded
+    assert response.headers["etag"] == f'"{PAYLOAD_HASH}"'
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_get_test_case_payload_not_modified(client, mock_db):
+    response = client.get(f"/payload/{PAYLOAD_HASH}", headers={"If-None-Match": f'"{PAYLOAD_HASH}"'})
+
+    assert response.status_code == 304
+    mock_db.get.assert_not_called()
+
+
+def test_get_test_case_payload_unknown_hash_returns_404(client, mock_db):
+    mock_db.get.return_value = None
+
+    assert client.get(f"/payload/{PAYLOAD_HASH}").status_code == 404
+    assert client.get("/payload/not-a-hash").status_code == 422